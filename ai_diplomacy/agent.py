@@ -6,6 +6,8 @@ import re
 
 # Assuming BaseModelClient is importable from clients.py in the same directory
 from .clients import BaseModelClient 
+from .context_budget import PROMPT_STATS
+from .prompt_layout import PromptSegments
 # Import load_prompt from utils
 from .utils import load_prompt
 
@@ -178,9 +180,9 @@ class DiplomacyAgent:
 
             # == Add detailed logging before call ==
             logger.debug(f"[{self.power_name}] Preparing context for initial state. Got board_state type: {type(board_state)}, possible_orders type: {type(possible_orders)}, game_history type: {type(game_history)}")
-            logger.debug(f"[{self.power_name}] Calling build_context_prompt with game: {game is not None}, board_state: {board_state is not None}, power_name: {self.power_name}, possible_orders: {possible_orders is not None}, game_history: {game_history is not None}")
+            logger.debug(f"[{self.power_name}] Calling build_context_segments with game: {game is not None}, board_state: {board_state is not None}, power_name: {self.power_name}, possible_orders: {possible_orders is not None}, game_history: {game_history is not None}")
 
-            context = self.client.build_context_prompt(
+            board_context, power_context = self.client.build_context_segments(
                 game=game,
                 board_state=board_state, # Pass board_state
                 power_name=self.power_name,
@@ -189,9 +191,11 @@ class DiplomacyAgent:
                 agent_goals=None, # No goals yet
                 agent_relationships=None, # No relationships yet (defaults used in prompt)
             )
-            full_prompt = initial_prompt + "\n\n" + context
+            # Instructions first, so the prefix of the prompt can be cached by the provider
+            full_prompt = PromptSegments(initial_prompt, board_context, power_context)
 
-            response = self.client.generate_response(full_prompt)
+            with PROMPT_STATS.track(self.client.model_name, "initial_state", self.client.system_prompt, full_prompt):
+                response = self.client.generate_response(full_prompt)
             logger.debug(f"[{self.power_name}] LLM response for initial state: {response}")
 
             # Try to extract JSON from the response
@@ -311,19 +315,6 @@ class DiplomacyAgent:
                 logger.warning(f"[{power_name}] No summary available for previous phase {last_phase_name}. Skipping state update.")
                 return
  
-            # == Fix: Use board_state parameter ==
-            possible_orders = game.get_all_possible_orders()
-
-            context = self.client.build_context_prompt(
-                game=game,
-                board_state=board_state, # Use provided board_state parameter
-                power_name=power_name,
-                possible_orders=possible_orders, # Pass possible_orders
-                game_history=game_history, # Pass game_history
-                agent_goals=self.goals,
-                agent_relationships=self.relationships
-            )
-
             # Add previous phase summary to the information provided to the LLM
             other_powers = [p for p in game.powers if p != power_name]
             
@@ -351,7 +342,8 @@ class DiplomacyAgent:
             logger.debug(f"[{power_name}] State update prompt:\n{prompt}")
 
             # Use the client's raw generation capability
-            response = self.client.generate_response(prompt)
+            with PROMPT_STATS.track(self.client.model_name, "state_update", self.client.system_prompt, prompt):
+                response = self.client.generate_response(prompt)
             logger.debug(f"[{power_name}] Raw LLM response for state update: {response}")
 
             # Use our robust JSON extraction helper
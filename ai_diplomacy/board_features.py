@@ -0,0 +1,137 @@
+"""
+Strategic board features.
+
+Computes a compact strategic summary of the board for a power, from the game state and the
+precomputed map tables (see map_utils.py), to be used in LLM prompts instead of raw dumps
+of all units, centers and possible orders.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from diplomacy.engine.game import Game
+
+from .map_utils import MapGraph, get_map_graph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BoardFeatures:
+    power_name: str
+    phase: str
+    nb_centers: int = 0
+    nb_units: int = 0
+    # {own center: (enemy units that can move into it, own units that can hold or move into it)}
+    threatened_centers: Dict[str, Tuple[List[str], List[str]]] = field(default_factory=dict)
+    # {center not owned: own units that can move into it}, for centers no enemy unit can reach
+    uncontested_centers: Dict[str, List[str]] = field(default_factory=dict)
+    # {own unit: enemy units in adjacent provinces}
+    units_adjacent_to_enemies: Dict[str, List[str]] = field(default_factory=dict)
+    # {target province: own units that can move into it}, for targets at least 2 units can reach
+    support_opportunities: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def adjustment(self) -> int:
+        """Number of builds (positive) or disbands (negative) if the centers do not change."""
+        return self.nb_centers - self.nb_units
+
+
+def _get_adjacent_provinces(graph: MapGraph, unit: str) -> Set[str]:
+    """Returns the provinces a unit can move to in one move (e.g. {'BUR', 'GAS', 'PIC', 'BRE'} for 'A PAR')."""
+    return {graph.locs[ix][:3] for ix in graph.neighbors[unit[0]][graph.loc_index[unit[2:]]]}
+
+
+def extract_board_features(game: Game, power_name: str) -> BoardFeatures:
+    """Computes the strategic features of the board for a power.
+
+    Args:
+        game: The Diplomacy game instance.
+        power_name: The power for which the features are computed (e.g. 'FRANCE').
+
+    Returns:
+        The BoardFeatures of the power.
+    """
+    graph = get_map_graph(game.map)
+    power = game.powers[power_name]
+    own_units = sorted(power.units)
+    own_centers = set(power.centers)
+    features = BoardFeatures(power_name=power_name, phase=game.get_current_phase(),
+                             nb_centers=len(own_centers), nb_units=len(own_units))
+
+    # Provinces occupied by enemy units, and provinces each side can move into
+    enemy_units_by_province: Dict[str, str] = {}
+    enemy_reach: Dict[str, List[str]] = defaultdict(list)               # {province: enemy units}
+    for other_power_name, other_power in sorted(game.powers.items()):
+        if other_power_name == power_name:
+            continue
+        for unit in sorted(other_power.units):
+            enemy_units_by_province[unit[2:5]] = unit
+            for province in _get_adjacent_provinces(graph, unit):
+                enemy_reach[province].append(unit)
+    own_reach: Dict[str, List[str]] = defaultdict(list)                 # {province: own units}
+    for unit in own_units:
+        for province in _get_adjacent_provinces(graph, unit):
+            own_reach[province].append(unit)
+    own_units_by_province = {unit[2:5]: unit for unit in own_units}
+
+    # Threatened centers
+    for center in sorted(own_centers):
+        if enemy_reach.get(center):
+            defenders = sorted(own_reach.get(center, []) + ([own_units_by_province[center]]
+                                                             if center in own_units_by_province else []))
+            features.threatened_centers[center] = (enemy_reach[center], defenders)
+
+    # Uncontested centers in reach
+    for center in graph.supply_centers:
+        if (center not in own_centers and center in own_reach
+                and center not in enemy_reach and center not in enemy_units_by_province):
+            features.uncontested_centers[center] = own_reach[center]
+
+    # Units adjacent to enemies
+    for unit in own_units:
+        adjacent_enemies = {enemy_units_by_province[province] for province in _get_adjacent_provinces(graph, unit)
+                            if province in enemy_units_by_province}
+        adjacent_enemies.update(enemy_reach.get(unit[2:5], []))
+        if adjacent_enemies:
+            features.units_adjacent_to_enemies[unit] = sorted(adjacent_enemies)
+
+    # Support opportunities - Centers not owned or enemy units that at least 2 of our units can reach
+    for province, units in sorted(own_reach.items()):
+        if len(units) >= 2 and (province in enemy_units_by_province
+                                or (province in graph.supply_centers and province not in own_centers)):
+            features.support_opportunities[province] = units
+
+    return features
+
+
+def format_board_features(features: BoardFeatures) -> str:
+    """Formats board features as a compact text summary for prompts."""
+    def _join(items) -> str:
+        items = list(items)
+        return ", ".join(items) if items else "none"
+
+    adjustment = features.adjustment
+    if adjustment > 0:
+        pressure = f"can build {adjustment}"
+    elif adjustment < 0:
+        pressure = f"must disband {-adjustment}"
+    else:
+        pressure = "balanced"
+
+    lines = [
+        f"Centers: {features.nb_centers}, units: {features.nb_units} ({pressure}; "
+        f"{len(features.threatened_centers)} center(s) at risk, "
+        f"{len(features.uncontested_centers)} uncontested center(s) in reach)",
+        "Threatened centers: " + _join(
+            f"{center} (attackers: {', '.join(attackers)}; defenders: {_join(defenders)})"
+            for center, (attackers, defenders) in features.threatened_centers.items()),
+        "Uncontested centers in reach: " + _join(
+            f"{center} ({', '.join(units)})" for center, units in features.uncontested_centers.items()),
+        "Units adjacent to enemies: " + _join(
+            f"{unit} (vs {', '.join(enemies)})" for unit, enemies in features.units_adjacent_to_enemies.items()),
+        "Support opportunities: " + _join(
+            f"{target} ({', '.join(units)})" for target, units in features.support_opportunities.items()),
+    ]
+    return "\n".join(lines)
@@ -6,7 +6,7 @@ import logging
 import ast
 import traceback
 
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Union
 from dotenv import load_dotenv
 
 import anthropic
@@ -20,6 +20,9 @@ from google import genai
 
 from diplomacy.engine.message import GLOBAL
 
+from .board_features import extract_board_features, format_board_features
+from .context_budget import PROMPT_STATS, get_history_token_budget
+from .prompt_layout import PromptSegments, get_cacheable_blocks
 from .game_history import GameHistory
 from .utils import load_prompt
 
@@ -38,13 +41,15 @@ class BaseModelClient:
     """
     Base interface for any LLM client we want to plug in.
     Each must provide:
-      - generate_response(prompt: str) -> str
+      - generate_response(prompt: str | PromptSegments) -> str
       - get_orders(board_state, power_name, possible_orders) -> List[str]
       - get_conversation_reply(power_name, conversation_so_far, game_phase) -> str
     """
 
     def __init__(self, model_name: str):
         self.model_name = model_name
+        # Token budget of the game history in prompts (None to include the last phases in full)
+        self.history_token_budget: Optional[int] = get_history_token_budget(model_name)
         # Load a default initially, can be overwritten by set_system_prompt
         self.system_prompt = load_prompt("system_prompt.txt") 
 
@@ -53,14 +58,28 @@ class BaseModelClient:
         self.system_prompt = content
         logger.info(f"[{self.model_name}] System prompt updated.")
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
         """
         Returns a raw string from the LLM.
-        Subclasses override this.
+        Subclasses override this. They send the system prompt first, then the prompt
+        (with cache breakpoints between its segments, if the provider API supports them).
         """
         raise NotImplementedError("Subclasses must implement generate_response().")
 
-    def build_context_prompt(
+    def record_cache_usage(self, input_tokens: Optional[int], cached_tokens: Optional[int]):
+        """Records the input tokens reported by the provider, and how many were read from its prompt cache."""
+        if input_tokens:
+            PROMPT_STATS.record_cache_usage(self.model_name, input_tokens, cached_tokens or 0)
+
+    def record_openai_cache_usage(self, response):
+        """Records the cache usage of an OpenAI-compatible chat completion (OpenAI, DeepSeek, OpenRouter)."""
+        usage = getattr(response, "usage", None)
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)  # DeepSeek
+        if cached_tokens is None:
+            cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+        self.record_cache_usage(getattr(usage, "prompt_tokens", None), cached_tokens)
+
+    def build_context_segments(
         self,
         game,
         board_state,
@@ -69,8 +88,13 @@ class BaseModelClient:
         game_history: GameHistory,
         agent_goals: Optional[List[str]] = None,
         agent_relationships: Optional[Dict[str, str]] = None,
-    ) -> str:
-        context = load_prompt("context_prompt.txt")
+    ) -> Tuple[str, str]:
+        """
+        Returns the context as two prompt segments (see prompt_layout.py):
+        the board state of the phase, then the power's own context.
+        """
+        board_context = load_prompt("board_context_prompt.txt")
+        power_context = load_prompt("power_context_prompt.txt")
 
         # === Agent State Debug Logging ===
         if agent_goals:
@@ -95,33 +119,41 @@ class BaseModelClient:
                 enemy_units[power] = info
                 enemy_centers[power] = board_state["centers"].get(power, [])
 
-        # Get possible orders
+        # Get possible orders (only for our own units, some callers pass the orders of all powers)
+        orderable_locs = set(game.get_orderable_locations(power_name))
         possible_orders_str = ""
         for loc, orders in possible_orders.items():
-            possible_orders_str += f"  {loc}: {orders}\n"
+            if loc in orderable_locs:
+                possible_orders_str += f"  {loc}: {', '.join(orders)}\n"
 
 
-        conversation_text = game_history.get_game_history(power_name)
+        conversation_text = game_history.get_game_history(power_name, token_budget=self.history_token_budget)
         if not conversation_text:
             conversation_text = "\n(No game history yet)\n"
 
         # Load in current context values
         # Simplified map representation based on DiploBench approach
-        units_repr = "\n".join([f"  {p}: {u}" for p, u in board_state["units"].items()])
-        centers_repr = "\n".join([f"  {p}: {c}" for p, c in board_state["centers"].items()])
+        units_repr = "\n".join([f"  {p}: {', '.join(u)}" for p, u in board_state["units"].items()])
+        centers_repr = "\n".join([f"  {p}: {', '.join(c)}" for p, c in board_state["centers"].items()])
 
-        context = context.format(
-            power_name=power_name,
+        # Compact strategic summary, computed from the game state and the map distance tables
+        strategic_summary = format_board_features(extract_board_features(game, power_name))
+
+        board_context = board_context.format(
             current_phase=year_phase,
-            all_unit_locations=units_repr, 
-            all_supply_centers=centers_repr, 
+            all_unit_locations=units_repr,
+            all_supply_centers=centers_repr,
+        )
+        power_context = power_context.format(
+            power_name=power_name,
+            strategic_summary=strategic_summary,
             game_history=conversation_text,
             possible_orders=possible_orders_str,
             agent_goals="\n".join(f"- {g}" for g in agent_goals) if agent_goals else "None specified",
             agent_relationships="\n".join(f"- {p}: {s}" for p, s in agent_relationships.items()) if agent_relationships else "None specified",
         )
 
-        return context
+        return board_context, power_context
 
     def build_prompt(
         self,
@@ -132,16 +164,17 @@ class BaseModelClient:
         game_history: GameHistory,
         agent_goals: Optional[List[str]] = None,
         agent_relationships: Optional[Dict[str, str]] = None,
-    ) -> str:
+    ) -> PromptSegments:
         """
         Unified prompt approach: incorporate conversation and 'PARSABLE OUTPUT' requirements.
+        The system prompt is sent first by generate_response, then the static instructions,
+        so the prefix of the prompt can be cached by the provider.
         """
         # Load prompts
-        few_shot_example = load_prompt("few_shot_example.txt")
         instructions = load_prompt("order_instructions.txt")
 
         # Build the context prompt
-        context = self.build_context_prompt(
+        board_context, power_context = self.build_context_segments(
             game,
             board_state,
             power_name,
@@ -151,8 +184,7 @@ class BaseModelClient:
             agent_relationships=agent_relationships,
         )
 
-        # Prepend the system prompt!
-        return self.system_prompt + "\n\n" + context + "\n\n" + instructions
+        return PromptSegments(instructions, board_context, power_context)
 
     def get_orders(
         self,
@@ -183,7 +215,8 @@ class BaseModelClient:
         raw_response = ""
 
         try:
-            raw_response = self.generate_response(prompt)
+            with PROMPT_STATS.track(self.model_name, "orders", self.system_prompt, prompt):
+                raw_response = self.generate_response(prompt)
             logger.debug(
                 f"[{self.model_name}] Raw LLM response for {power_name}:\n{raw_response}"
             )
@@ -352,11 +385,11 @@ class BaseModelClient:
         game_phase: str,
         agent_goals: Optional[List[str]] = None,
         agent_relationships: Optional[Dict[str, str]] = None,
-    ) -> str:
+    ) -> PromptSegments:
         
         instructions = load_prompt("planning_instructions.txt")
 
-        context = self.build_context_prompt(
+        board_context, power_context = self.build_context_segments(
             game,
             board_state,
             power_name,
@@ -366,7 +399,7 @@ class BaseModelClient:
             agent_relationships=agent_relationships,
         )
 
-        return context + "\n\n" + instructions
+        return PromptSegments(instructions, board_context, power_context)
 
     def build_conversation_prompt(
         self,
@@ -378,9 +411,10 @@ class BaseModelClient:
         game_phase: str,
         agent_goals: Optional[List[str]] = None,
         agent_relationships: Optional[Dict[str, str]] = None,
-    ) -> str:
+    ) -> PromptSegments:
         """
         Build the prompt for the conversation phase with clear JSON formatting requirements.
+        The static instructions and JSON reminder come first, so they can be cached by the provider.
         """
         # Load conversation instructions with clear JSON requirements
         instructions = load_prompt("conversation_instructions.txt")
@@ -398,7 +432,7 @@ class BaseModelClient:
         instructions = instructions.replace("{power_name}", power_name)
 
         # Build the context with additional emphasis on JSON format
-        context = self.build_context_prompt(
+        board_context, power_context = self.build_context_segments(
             game,
             board_state,
             power_name,
@@ -429,7 +463,7 @@ or
 ```
         """
 
-        return context + "\n\n" + instructions + "\n\n" + json_reminder
+        return PromptSegments(instructions + "\n\n" + json_reminder, board_context, power_context)
 
     def get_planning_reply(
         self,
@@ -454,7 +488,8 @@ or
             agent_relationships=agent_relationships,
         )
 
-        raw_response = self.generate_response(prompt)
+        with PROMPT_STATS.track(self.model_name, "planning_reply", self.system_prompt, prompt):
+            raw_response = self.generate_response(prompt)
         logger.debug(f"[{self.model_name}] Raw LLM response for {power_name}:\n{raw_response}")
         return raw_response
     
@@ -506,7 +541,8 @@ or
 
         error_info = None
         try:
-            response = self.generate_response(prompt)
+            with PROMPT_STATS.track(self.model_name, "conversation", self.system_prompt, prompt):
+                response = self.generate_response(prompt)
             logger.debug(f"[{self.model_name}] Raw LLM response for {power_name}:\n{response}")
             
             messages = []
@@ -669,14 +705,14 @@ or
             return "Error: Planning instructions not found."
 
         # 2. Build the context prompt (reusing the existing method)
-        # We don't need possible_orders for planning instructions, but build_context_prompt needs it.
+        # We don't need possible_orders for planning instructions, but build_context_segments needs it.
         # Pass an empty dict or calculate it if context depends heavily on it.
         # For simplicity, let's assume context building doesn't strictly require possible_orders
         # or can handle it being empty/None for planning purposes.
         # If necessary, calculate possible_orders here: 
         # possible_orders = game.get_all_possible_orders()
         possible_orders = {} # Pass empty for planning context
-        context_prompt = self.build_context_prompt(
+        board_context, power_context = self.build_context_segments(
             game,
             board_state,
             power_name,
@@ -686,15 +722,15 @@ or
             agent_relationships=agent_relationships,
         )
 
-        # 3. Combine context and planning instructions into the final prompt
-        # Ensure the system prompt is prepended if it exists
-        full_prompt = f"{context_prompt}\n\n{planning_instructions}"
-        if self.system_prompt:
-            full_prompt = f"{self.system_prompt}\n\n{full_prompt}"
+        # 3. Combine planning instructions and context into the final prompt
+        # Static instructions come first (the system prompt is sent first by generate_response),
+        # so the prefix of the prompt can be cached by the provider
+        full_prompt = PromptSegments(planning_instructions, board_context, power_context)
 
         # 4. Generate the response from the LLM
         try:
-            raw_plan = self.generate_response(full_prompt)
+            with PROMPT_STATS.track(self.model_name, "plan", self.system_prompt, full_prompt):
+                raw_plan = self.generate_response(full_prompt)
             logger.debug(f"[{self.model_name}] Raw LLM response for {power_name}:\n{raw_plan}")
             logger.info(f"[{self.model_name}] Validated plan for {power_name}: {raw_plan}")
             # No parsing needed for the plan, return the raw string
@@ -725,16 +761,18 @@ class OpenAIClient(BaseModelClient):
         )
         logger.debug(f"[{self.model_name}] Initialized OpenAI client with base URL: {base_url}")
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
         # Updated to new API format
+        # Prompts with a stable prefix are cached automatically by OpenAI
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt},
+                    {"role": "user", "content": str(prompt)},
                 ],
             )
+            self.record_openai_cache_usage(response)
             if not response or not hasattr(response, "choices") or not response.choices:
                 logger.warning(
                     f"[{self.model_name}] Empty or invalid result in generate_response. Returning empty."
@@ -770,14 +808,29 @@ class ClaudeClient(BaseModelClient):
             
         self.client = Anthropic(**client_params)
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
         # Updated Claude messages format
+        # Cache breakpoints after the system prompt and after each prompt segment but the last
+        cache_control = {"type": "ephemeral"}
+        system = self.system_prompt
+        if system:
+            system = [{"type": "text", "text": system, "cache_control": cache_control}]
+        content = [{"type": "text", "text": block} for block in get_cacheable_blocks(prompt)]
+        for block in content[:-1]:
+            block["cache_control"] = cache_control
         try:
             response = self.client.messages.create(
                 model=self.model_name,
                 max_tokens=2000,
-                system=self.system_prompt,  # system is now a top-level parameter
-                messages=[{"role": "user", "content": prompt}],
+                system=system,  # system is now a top-level parameter
+                messages=[{"role": "user", "content": content}],
+            )
+            usage = getattr(response, "usage", None)
+            cache_read_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+            cache_creation_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+            self.record_cache_usage(
+                (getattr(usage, "input_tokens", None) or 0) + cache_read_tokens + cache_creation_tokens,
+                cache_read_tokens,
             )
             if not response.content:
                 logger.warning(
@@ -817,14 +870,20 @@ class GeminiClient(BaseModelClient):
             
         self.client = genai.Client()
 
-    def generate_response(self, prompt: str) -> str:
-        full_prompt = self.system_prompt + prompt
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
+        # Prompts with a stable prefix are cached implicitly by Gemini
+        full_prompt = self.system_prompt + str(prompt)
 
         try:
             response = self.client.models.generate_content(
                 model=self.model_name,
                 contents=full_prompt,
             )
+            usage_metadata = getattr(response, "usage_metadata", None)
+            self.record_cache_usage(
+                getattr(usage_metadata, "prompt_token_count", None),
+                getattr(usage_metadata, "cached_content_token_count", None),
+            )
             if not response or not response.text:
                 logger.warning(
                     f"[{self.model_name}] Empty Gemini generate_response. Returning empty."
@@ -852,17 +911,19 @@ class DeepSeekClient(BaseModelClient):
         )
         logger.debug(f"[{self.model_name}] Initialized DeepSeek client with base URL: {self.base_url}")
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
+        # Prompts with a stable prefix are cached automatically by DeepSeek
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt},
+                    {"role": "user", "content": str(prompt)},
                 ],
                 stream=False,
             )
             logger.debug(f"[{self.model_name}] Raw DeepSeek response:\n{response}")
+            self.record_openai_cache_usage(response)
 
             if not response or not response.choices:
                 logger.warning(
@@ -928,19 +989,21 @@ class OpenRouterClient(BaseModelClient):
         
         logger.debug(f"[{self.model_name}] Initialized OpenRouter client with base URL: {base_url}")
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: Union[str, PromptSegments]) -> str:
         """Generate a response using OpenRouter."""
         try:
             # Prepare standard OpenAI-compatible request
+            # Prompts with a stable prefix are cached by the underlying providers that support it
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": str(prompt)}
                 ],
                 temperature=0.3,  # Lower temperature for more deterministic responses
                 max_tokens=2048,  # Reasonable default, adjust as needed
             )
+            self.record_openai_cache_usage(response)
             
             if not response.choices:
                 logger.warning(f"[{self.model_name}] OpenRouter returned no choices")
@@ -0,0 +1,177 @@
+"""
+Token budgets for LLM prompts.
+
+- Estimates prompt tokens locally (no tokenizer or API call needed).
+- Fits prompt sections (e.g. game history) into a per-model token budget, by priority: sections
+  are included in full, then summarized (or truncated to their most recent lines), then dropped,
+  most important sections first. Required sections (e.g. headers and separators) are always included.
+- Records the size and latency of every LLM call, so prompts can be kept under the knee of
+  each provider's latency curve, and the share of prompt tokens read from the provider's prompt cache.
+"""
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words and numbers count as one token per 8 characters (common words are single tokens), punctuation marks
+# are single tokens. This is usually within 20% of the BPE tokenizers used by the providers for English text
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Token budget of the game history in prompts, by model name fragment
+DEFAULT_HISTORY_TOKEN_BUDGET = 3000
+MODEL_HISTORY_TOKEN_BUDGETS: Dict[str, int] = {
+    "gpt-4o-mini": 3000,
+    "gpt-4o": 4000,
+    "o3-mini": 4000,
+    "claude": 4000,
+    "gemini": 6000,
+    "deepseek": 2000,
+    "openrouter": 3000,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Returns an estimate of the number of tokens of a text."""
+    return sum(1 + (len(piece) - 1) // 8 for piece in TOKEN_PATTERN.findall(text))
+
+
+def get_history_token_budget(model_name: str) -> int:
+    """Returns the token budget of the game history for a model (longest matching model name fragment)."""
+    lower_name = model_name.lower()
+    matches = [fragment for fragment in MODEL_HISTORY_TOKEN_BUDGETS if fragment in lower_name]
+    if not matches:
+        return DEFAULT_HISTORY_TOKEN_BUDGET
+    return MODEL_HISTORY_TOKEN_BUDGETS[max(matches, key=len)]
+
+
+@dataclass
+class ContextSection:
+    text: str
+    priority: int  # Lower is more important
+    summary: Optional[str] = None  # Shorter replacement used when the full text does not fit
+    required: bool = False  # Always included (e.g. phase headers and separators), even over budget
+    header: str = ""  # Included before the text (or its summary or truncation), only if the section is kept
+
+
+def fit_sections(sections: List[ContextSection], token_budget: int) -> str:
+    """Selects sections by priority to fit a token budget, and returns them joined in their original order.
+
+    Required sections are always included. Other sections are included in full, or as their summary, or
+    (if they have no summary) truncated to their most recent lines, if that fits in the remaining budget.
+    The header of a section is only included with the section.
+
+    Args:
+        sections: The sections, in the order in which they are displayed.
+        token_budget: The maximum number of (estimated) tokens.
+
+    Returns:
+        The concatenated text of the selected sections.
+    """
+    selected: Dict[int, str] = {
+        index: section.header + section.text for index, section in enumerate(sections) if section.required
+    }
+    remaining = token_budget - sum(estimate_tokens(text) for text in selected.values())
+    nb_truncated = 0
+    for index in sorted(range(len(sections)), key=lambda ix: sections[ix].priority):
+        section = sections[index]
+        if section.required:
+            continue
+        header_tokens = estimate_tokens(section.header)
+        for text in (section.text, section.summary):
+            if not text:
+                continue
+            nb_tokens = header_tokens + estimate_tokens(text)
+            if nb_tokens <= remaining:
+                selected[index] = section.header + text
+                remaining -= nb_tokens
+                break
+        else:
+            lines = (trim_to_budget(section.text.splitlines(keepends=True), remaining - header_tokens)
+                     if not section.summary else [])
+            if lines:
+                selected[index] = section.header + "".join(lines)
+                remaining -= estimate_tokens(selected[index])
+                nb_truncated += 1
+    if len(selected) < len(sections) or nb_truncated:
+        logger.debug(f"Context budget of {token_budget} tokens: kept {len(selected)}/{len(sections)} sections "
+                     f"({nb_truncated} truncated).")
+    return "".join(selected[index] for index in sorted(selected))
+
+
+def trim_to_budget(entries: List[str], token_budget: int) -> List[str]:
+    """Returns the most recent entries (i.e. at the end of the list) that fit in a token budget."""
+    remaining = token_budget
+    nb_kept = 0
+    for entry in reversed(entries):
+        remaining -= estimate_tokens(entry)
+        if remaining < 0:
+            break
+        nb_kept += 1
+    return entries[len(entries) - nb_kept:]
+
+
+class PromptStats:
+    """Records the estimated size and the latency of LLM calls, by model and kind of call."""
+
+    def __init__(self):
+        # {(model_name, kind): [nb_calls, total_tokens, max_tokens, total_seconds]}
+        self.stats: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0, 0, 0.])
+        # {model_name: [nb_calls, input_tokens, cached_tokens]}, as reported by the providers
+        self.cache_usage: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    @contextmanager
+    def track(self, model_name: str, kind: str, *prompt_parts: str):
+        """Context manager recording the size of a prompt and the duration of the call made in its body.
+
+        Args:
+            model_name: The model called.
+            kind: The kind of call (e.g. 'orders', 'conversation').
+            prompt_parts: The texts sent to the model (e.g. the system prompt and the prompt).
+        """
+        nb_tokens = sum(estimate_tokens(str(part)) for part in prompt_parts if part)
+        start_time = time.perf_counter()
+        try:
+            yield nb_tokens
+        finally:
+            duration = time.perf_counter() - start_time
+            stats = self.stats[(model_name, kind)]
+            stats[0] += 1
+            stats[1] += nb_tokens
+            stats[2] = max(stats[2], nb_tokens)
+            stats[3] += duration
+            logger.debug(f"[{model_name}] {kind} prompt: ~{nb_tokens} tokens, {duration:.2f}s")
+
+    def record_cache_usage(self, model_name: str, input_tokens: int, cached_tokens: int):
+        """Records the input tokens of a call reported by the provider, and how many were read from its cache."""
+        usage = self.cache_usage[model_name]
+        usage[0] += 1
+        usage[1] += input_tokens
+        usage[2] += cached_tokens
+
+    def get_cache_hit_rate(self, model_name: str) -> float:
+        """Returns the share of input tokens read from the provider's prompt cache (0. if unknown)."""
+        _, input_tokens, cached_tokens = self.cache_usage.get(model_name, (0, 0, 0))
+        return cached_tokens / input_tokens if input_tokens else 0.
+
+    def format(self) -> str:
+        """Returns a table with the number of calls, average and max prompt tokens, and average latency,
+        followed by the prompt cache hit rates reported by the providers."""
+        lines = [f"{'Model':<32} {'Kind':<14} {'Calls':>6} {'Avg tokens':>11} {'Max tokens':>11} {'Avg s':>7}"]
+        for (model_name, kind), (nb_calls, total_tokens, max_tokens, total_seconds) in sorted(self.stats.items()):
+            lines.append(f"{model_name:<32} {kind:<14} {nb_calls:>6} {total_tokens / nb_calls:>11.0f} "
+                         f"{max_tokens:>11} {total_seconds / nb_calls:>7.2f}")
+        if self.cache_usage:
+            lines.append(f"{'Model':<32} {'Calls':>6} {'Input tokens':>13} {'Cached tokens':>14} {'Hit rate':>9}")
+            for model_name, (nb_calls, input_tokens, cached_tokens) in sorted(self.cache_usage.items()):
+                lines.append(f"{model_name:<32} {nb_calls:>6} {input_tokens:>13} {cached_tokens:>14} "
+                             f"{self.get_cache_hit_rate(model_name):>9.1%}")
+        return "\n".join(lines)
+
+
+# Prompt statistics of all the clients of the process
+PROMPT_STATS = PromptStats()
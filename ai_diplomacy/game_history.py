@@ -4,6 +4,8 @@ from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from .context_budget import ContextSection, fit_sections
+
 logger = logging.getLogger("utils")
 logger.setLevel(logging.INFO)
 logging.basicConfig(level=logging.INFO)
@@ -64,6 +66,44 @@ class Phase:
                 conversations[msg.sender] += f"  {msg.sender}: {msg.content}\n"
         return conversations
 
+    def format_orders_with_results(self) -> str:
+        """Returns the orders of all powers, one per line, with their results."""
+        result = ""
+        for power, orders in self.orders_by_power.items():
+            result += f"{power}:\n"
+            results = self.results_by_power.get(power, [])
+            for i, order in enumerate(orders):
+                if (
+                    i < len(results)
+                    and results[i]
+                    and not all(r == "" for r in results[i])
+                ):
+                    # Join multiple results with commas
+                    result_str = f" ({', '.join(results[i])})"
+                else:
+                    result_str = " (successful)"
+                result += f"  {order}{result_str}\n"
+            result += "\n"
+        return result
+
+    def summarize(self, power_name: str) -> str:
+        """Returns a short summary of the phase for a power (its phase summary, or the orders on one line per power)."""
+        summary = f"\n{self.name} (summary):\n"
+        if self.phase_summaries.get(power_name):
+            summary += self.phase_summaries[power_name].strip() + "\n"
+        else:
+            for power, orders in self.orders_by_power.items():
+                results = self.results_by_power.get(power, [])
+                summary += f"{power}: " + "; ".join(
+                    order + (f" ({', '.join(results[i])})" if i < len(results) and any(results[i]) else "")
+                    for i, order in enumerate(orders)
+                ) + "\n"
+        nb_private = sum(1 for msg in self.messages
+                         if msg.recipient != "GLOBAL" and power_name in (msg.sender, msg.recipient))
+        if nb_private:
+            summary += f"({nb_private} private messages)\n"
+        return summary + "-" * 50 + "\n"
+
     def get_all_orders_formatted(self) -> str:
         if not self.orders_by_power:
             return ""
@@ -154,60 +194,78 @@ class GameHistory:
         return self.phases[-1].plans
 
     def get_game_history(
-        self, power_name: str, include_plans: bool = True, num_prev_phases: int = 5
+        self,
+        power_name: str,
+        include_plans: bool = True,
+        num_prev_phases: int = 5,
+        token_budget: Optional[int] = None,
     ) -> str:
+        """
+        Returns the recent game history (messages, orders and plans) as seen by a power.
+
+        Args:
+            power_name: The power reading the history.
+            include_plans: If True, includes the power's strategic directive for the last phase.
+            num_prev_phases: The maximum number of phases to report.
+            token_budget: Optional. If set, sections are selected by priority to fit this number of
+                (estimated) tokens: current phase private messages and directive first, then current
+                phase global messages and orders, then older phases (most recent first), which are
+                summarized when they don't fit in full. The current phase name and separator are always
+                included, and its messages and orders are truncated to the most recent lines when they don't
+                fit (their headers are only included with them).
+        """
         if not self.phases:
             return ""
 
         phases_to_report = self.phases[-num_prev_phases:]
-        game_history_str = ""
+        sections: List[ContextSection] = []
 
         # Iterate through phases
-        for phase in phases_to_report:
-            game_history_str += f"\n{phase.name}:\n"
+        for age, phase in enumerate(reversed(phases_to_report)):
+            phase_sections = [ContextSection(f"\n{phase.name}:\n", priority=0, required=True)]
 
             # Add GLOBAL section for this phase
             global_msgs = phase.get_global_messages()
             if global_msgs:
-                game_history_str += "\nGLOBAL:\n"
-                game_history_str += global_msgs
+                phase_sections.append(ContextSection(global_msgs, priority=2, header="\nGLOBAL:\n"))
 
             # Add PRIVATE section for this phase
             private_msgs = phase.get_private_messages(power_name)
             if private_msgs:
-                game_history_str += "\nPRIVATE:\n"
+                private_str = ""
                 for other_power, messages in private_msgs.items():
-                    game_history_str += f" {other_power}:\n\n"
-                    game_history_str += messages + "\n"
+                    private_str += f" {other_power}:\n\n"
+                    private_str += messages + "\n"
+                phase_sections.append(ContextSection(private_str, priority=0, header="\nPRIVATE:\n"))
 
             # Add ORDERS section for this phase
             if phase.orders_by_power:
-                game_history_str += "\nORDERS:\n"
-                for power, orders in phase.orders_by_power.items():
-                    game_history_str += f"{power}:\n"
-                    results = phase.results_by_power.get(power, [])
-                    for i, order in enumerate(orders):
-                        if (
-                            i < len(results)
-                            and results[i]
-                            and not all(r == "" for r in results[i])
-                        ):
-                            # Join multiple results with commas
-                            result_str = f" ({', '.join(results[i])})"
-                        else:
-                            result_str = " (successful)"
-                        game_history_str += f"  {order}{result_str}\n"
-                    game_history_str += "\n"
-
-            game_history_str += "-" * 50 + "\n"  # Add separator between phases
-            
+                phase_sections.append(
+                    ContextSection(phase.format_orders_with_results(), priority=2, header="\nORDERS:\n")
+                )
+
+            # Add separator between phases
+            phase_sections.append(ContextSection("-" * 50 + "\n", priority=0, required=True))
+
+            # Older phases are kept or summarized as a whole, most recent first
+            if age:
+                phase_sections = [ContextSection(
+                    "".join(section.header + section.text for section in phase_sections),
+                    priority=2 + age,
+                    summary=phase.summarize(power_name),
+                )]
+            sections = phase_sections + sections
+
         # NOTE: only reports plan for the last phase (otherwise too much clutter)
         if include_plans and phases_to_report and (power_name in phases_to_report[-1].plans):
-            game_history_str += f"\n{power_name} STRATEGIC DIRECTIVE:\n"
-            game_history_str += "Here is a high-level directive you have planned out previously for this phase.\n"
-            game_history_str += phases_to_report[-1].plans[power_name] + "\n"
-
-        return game_history_str
+            directive_str = f"\n{power_name} STRATEGIC DIRECTIVE:\n"
+            directive_str += "Here is a high-level directive you have planned out previously for this phase.\n"
+            directive_str += phases_to_report[-1].plans[power_name] + "\n"
+            sections.append(ContextSection(directive_str, priority=1))
+
+        if token_budget is None:
+            return "".join(section.header + section.text for section in sections)
+        return fit_sections(sections, token_budget)
 
     def to_dict(self):
         """
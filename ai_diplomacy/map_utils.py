@@ -1,264 +1,217 @@
+"""
+Strategic map analysis.
+
+Builds a graph of the map from ``Map.abuts`` and precomputes, for each unit type:
+    - all-pairs shortest move distances between locations (coasts included),
+      with parent pointers to reconstruct the shortest paths,
+    - distances from every location to every province,
+    - the supply centers sorted by distance from every location,
+    - the threat radius of every province (i.e. the locations a unit could move from
+      to reach the province in a given number of moves).
+
+Tables are built once per map (a few milliseconds) and cached, so queries such as
+"distance to the nearest enemy unit" for all units are simple table lookups.
+"""
 import logging
 from collections import deque
-from typing import Dict, Set, List, Tuple, Callable, Any, Optional
-from diplomacy.map import Map
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-logger = logging.getLogger(__name__)
-
-
-class DiplomacyGraph:
-    """Custom graph implementation for Diplomacy map connectivity."""
-
-    def __init__(self):
-        # Main graph structure: dict of dict of sets
-        # graph[node1][node2] = {'A', 'F'} means both army and fleet can move between nodes
-        # graph[node1][node2] = {'A'} means only army can move between nodes
-        self.graph: Dict[str, Dict[str, Set[str]]] = {}
-
-    def add_node(self, node: str):
-        """Add a node if it doesn't exist."""
-        if node not in self.graph:
-            self.graph[node] = {}
-
-    def add_edge(self, node1: str, node2: str, unit_type: str):
-        """Add an edge between nodes for specific unit type ('A' or 'F')."""
-        self.add_node(node1)
-        self.add_node(node2)
-
-        # Add connection for node1 -> node2
-        if node2 not in self.graph[node1]:
-            self.graph[node1][node2] = set()
-        self.graph[node1][node2].add(unit_type)
-
-        # Add connection for node2 -> node1 (undirected graph)
-        if node1 not in self.graph[node2]:
-            self.graph[node2][node1] = set()
-        self.graph[node2][node1].add(unit_type)
+from diplomacy.engine.game import Game
+from diplomacy.engine.map import Map
 
-    def get_adjacent(self, node: str) -> List[str]:
-        """Get all nodes adjacent to given node."""
-        return list(self.graph.get(node, {}).keys())
-
-    def get_allowed_units(self, node1: str, node2: str) -> Set[str]:
-        """Get set of unit types that can move between these nodes."""
-        return self.graph.get(node1, {}).get(node2, set())
-
-    def nodes(self) -> List[str]:
-        """Return all nodes in the graph."""
-        return list(self.graph.keys())
+logger = logging.getLogger(__name__)
 
-    def edges(self) -> List[Tuple[str, str, Set[str]]]:
-        """Return all edges with their unit types as (node1, node2, unit_types)."""
-        edges = []
-        seen = set()  # To avoid duplicates in undirected graph
+UNIT_TYPES = ('A', 'F')
+UNREACHABLE = 1 << 16           # Distance stored in tables when there is no path
+NO_PARENT = -1                  # Parent stored in tables for the source location and unreachable locations
+MAP_GRAPH_CACHE: Dict[str, 'MapGraph'] = {}
 
-        for node1 in self.graph:
-            for node2, unit_types in self.graph[node1].items():
-                # Ensure consistent ordering for the 'seen' check
-                edge_tuple = tuple(sorted((node1, node2)))
-                if edge_tuple not in seen:
-                    edges.append((node1, node2, unit_types))
-                    seen.add(edge_tuple)
 
-        return edges
+class MapGraph:
+    """Precomputed distance, path, supply center and threat tables for a Diplomacy map.
 
-# --- BFS Functions --- 
-def bfs_shortest_path(
-    graph: DiplomacyGraph,
-    start: str,
-    match_condition: Callable[[str], Any], # Function returns non-None/non-False if matched
-    allowed_unit_types: Set[str]
-) -> Tuple[Optional[List[str]], Any]:
+    Locations are indexed in ``locs`` (e.g. 'PAR', 'STP/NC') and provinces in ``provinces``
+    (e.g. 'STP'). Tables are indexed by unit type, then by location index:
+        - ``distances[unit_type][src][dest]``: number of moves from location src to location dest
+        - ``parents[unit_type][src][dest]``: location before dest on a shortest path from src
+        - ``province_distances[unit_type][src][province]``: number of moves from src to any coast of province
+        - ``nearest_centers[unit_type][src]``: (distance, center) for reachable supply centers, nearest first
+        - ``threat_sources[unit_type][province]``: (distance, loc) for locations within ``max_threat_radius``
+          moves of the province, nearest first
     """
-    Performs Breadth-First Search on a DiplomacyGraph from 'start' to find the first territory 
-    for which 'match_condition(territory)' returns a truthy value.
 
-    Args:
-        graph: The DiplomacyGraph instance to search.
-        start: The starting territory node name (e.g., 'PAR').
-        match_condition: A function that takes a territory name (str) and returns 
-                         any value that evaluates to True if the condition is met, 
-                         or False/None otherwise. The returned value is included in the output.
-        allowed_unit_types: A set of unit types ('A', 'F') allowed for traversal.
-
-    Returns:
-        Tuple[Optional[List[str]], Any]: 
-            - A list of territory names representing the shortest path from 'start' to the matched 
-              territory (inclusive), or None if no path is found.
-            - The truthy value returned by match_condition for the matched territory, or None.
-    """
-    if start not in graph.graph: # Access the internal graph dict
-        logger.warning(f"BFS shortest path: Start node '{start}' not in graph.")
+    def __init__(self, game_map: Map, max_threat_radius: int = 2):
+        """
+        Args:
+            game_map: The map to analyse (an instance of diplomacy.engine.map.Map).
+            max_threat_radius: The maximum number of moves stored in the threat radius tables.
+        """
+        self.map_name: str = game_map.name
+        self.max_threat_radius = max_threat_radius
+        self.locs: List[str] = sorted(loc.upper() for loc in game_map.locs)
+        self.loc_index: Dict[str, int] = {loc: ix for ix, loc in enumerate(self.locs)}
+        self.provinces: List[str] = sorted({loc[:3] for loc in self.locs})
+        self.province_index: Dict[str, int] = {province: ix for ix, province in enumerate(self.provinces)}
+        self.supply_centers: List[str] = sorted(center.upper() for center in game_map.scs)
+
+        self.valid_locs: Dict[str, Tuple[bool, ...]] = {}
+        self.neighbors: Dict[str, Tuple[Tuple[int, ...], ...]] = {}
+        self.distances: Dict[str, Tuple[Tuple[int, ...], ...]] = {}
+        self.parents: Dict[str, Tuple[Tuple[int, ...], ...]] = {}
+        self.province_distances: Dict[str, Tuple[Tuple[int, ...], ...]] = {}
+        self.nearest_centers: Dict[str, Tuple[Tuple[Tuple[int, str], ...], ...]] = {}
+        self.threat_sources: Dict[str, Tuple[Tuple[Tuple[int, str], ...], ...]] = {}
+
+        province_locs = [[] for _ in self.provinces]
+        for ix, loc in enumerate(self.locs):
+            province_locs[self.province_index[loc[:3]]].append(ix)
+
+        for unit_type in UNIT_TYPES:
+            valid = tuple(game_map.is_valid_unit(f'{unit_type} {loc}') for loc in self.locs)
+            neighbors = tuple(
+                tuple(sorted(self.loc_index[dest] for dest in game_map.dest_with_coasts[loc]
+                             if dest in self.loc_index and valid[self.loc_index[dest]]
+                             and game_map.abuts(unit_type, loc, '-', dest)))
+                if valid[ix] else ()
+                for ix, loc in enumerate(self.locs))
+            rows = [self._bfs(neighbors, ix) if valid[ix] else None for ix in range(len(self.locs))]
+            unreachable_row = (UNREACHABLE,) * len(self.locs)
+            no_parent_row = (NO_PARENT,) * len(self.locs)
+            distances = tuple(row[0] if row else unreachable_row for row in rows)
+            province_distances = tuple(tuple(min(row[ix] for ix in indices) for indices in province_locs)
+                                       for row in distances)
+
+            self.valid_locs[unit_type] = valid
+            self.neighbors[unit_type] = neighbors
+            self.distances[unit_type] = distances
+            self.parents[unit_type] = tuple(row[1] if row else no_parent_row for row in rows)
+            self.province_distances[unit_type] = province_distances
+            self.nearest_centers[unit_type] = tuple(
+                tuple(sorted((row[self.province_index[center]], center) for center in self.supply_centers
+                             if row[self.province_index[center]] != UNREACHABLE))
+                for row in province_distances)
+            self.threat_sources[unit_type] = tuple(
+                tuple(sorted((province_distances[ix][province_ix], loc) for ix, loc in enumerate(self.locs)
+                             if valid[ix] and 0 < province_distances[ix][province_ix] <= max_threat_radius))
+                for province_ix in range(len(self.provinces)))
+
+        logger.debug(f"Built MapGraph for '{self.map_name}' with {len(self.locs)} locations.")
+
+    @staticmethod
+    def _bfs(neighbors: Sequence[Sequence[int]], start: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """Returns the distances and parents of all locations from a start location (breadth-first search)."""
+        distances = [UNREACHABLE] * len(neighbors)
+        parents = [NO_PARENT] * len(neighbors)
+        distances[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for neighbor in neighbors[current]:
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = next_distance
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return tuple(distances), tuple(parents)
+
+    def distance(self, unit_type: str, src: str, dest: str) -> Optional[int]:
+        """Returns the number of moves for a unit to go from src to dest, or None if dest can't be reached.
+
+        Args:
+            unit_type: 'A' or 'F'.
+            src: The location of the unit (e.g. 'PAR', or 'STP/NC' for a fleet).
+            dest: A province (e.g. 'SPA', any coast is accepted) or a location with a coast (e.g. 'SPA/SC').
+        """
+        src_ix = self.loc_index[src.upper()]
+        dest = dest.upper()
+        if '/' in dest:
+            distance = self.distances[unit_type][src_ix][self.loc_index[dest]]
+        else:
+            distance = self.province_distances[unit_type][src_ix][self.province_index[dest]]
+        return None if distance == UNREACHABLE else distance
+
+    def shortest_path(self, unit_type: str, src: str, dest: str) -> Optional[List[str]]:
+        """Returns a shortest path (src and dest included) for a unit to go from src to dest, or None.
+
+        Args:
+            unit_type: 'A' or 'F'.
+            src: The location of the unit (e.g. 'PAR').
+            dest: A province (the nearest of its coasts is used) or a location with a coast.
+        """
+        src_ix = self.loc_index[src.upper()]
+        dest = dest.upper()
+        distances = self.distances[unit_type][src_ix]
+        if '/' in dest:
+            dest_ix = self.loc_index[dest]
+        else:
+            dest_ix = min((ix for ix, loc in enumerate(self.locs) if loc[:3] == dest), key=distances.__getitem__)
+        if distances[dest_ix] == UNREACHABLE:
+            return None
+
+        parents = self.parents[unit_type][src_ix]
+        path = [dest_ix]
+        while path[-1] != src_ix:
+            path.append(parents[path[-1]])
+        return [self.locs[ix] for ix in reversed(path)]
+
+    def nearest_supply_center(self, unit_type: str, src: str,
+                              excluded: Iterable[str] = ()) -> Tuple[Optional[str], Optional[int]]:
+        """Returns the nearest supply center not in excluded as (center, distance), or (None, None).
+
+        Args:
+            unit_type: 'A' or 'F'.
+            src: The location of the unit (e.g. 'PAR').
+            excluded: Supply centers to ignore (e.g. the centers already owned by the power).
+        """
+        excluded = set(excluded)
+        for distance, center in self.nearest_centers[unit_type][self.loc_index[src.upper()]]:
+            if center not in excluded:
+                return center, distance
         return None, None
-    
-    visited: Set[str] = {start}
-    # Queue stores paths (lists of nodes)
-    queue: deque[List[str]] = deque([[start]])
 
-    # Check if the starting territory itself satisfies match_condition
-    initial_match = match_condition(start)
-    if initial_match:
-        return [start], initial_match
+    def threats(self, province: str, radius: int = 1) -> List[Tuple[str, str, int]]:
+        """Returns the (unit_type, loc, distance) from which a unit could reach a province within radius moves.
 
-    while queue:
-        path = queue.popleft()
-        current = path[-1]
-        
-        # Check neighbors of the current node
-        for neighbor in graph.get_adjacent(current):
-            edge_types = graph.get_allowed_units(current, neighbor)
-            
-            # Check if any allowed unit type can traverse this edge
-            if edge_types.intersection(allowed_unit_types):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    
-                    # Check if the neighbor meets the match condition
-                    match_result = match_condition(neighbor)
-                    if match_result:
-                        return new_path, match_result
-                        
-                    queue.append(new_path)
-                    
-    logger.debug(f"BFS shortest path: No node matching condition found from '{start}'.")
-    return None, None
+        Args:
+            province: The threatened province (e.g. 'MUN').
+            radius: The maximum number of moves (at most max_threat_radius).
+        """
+        if radius > self.max_threat_radius:
+            raise ValueError(f'Radius {radius} is larger than the precomputed radius ({self.max_threat_radius}).')
+        province_ix = self.province_index[province.upper()[:3]]
+        return [(unit_type, loc, distance)
+                for unit_type in UNIT_TYPES
+                for distance, loc in self.threat_sources[unit_type][province_ix]
+                if distance <= radius]
 
-def bfs_nearest_adjacent(
-    graph: DiplomacyGraph, 
-    start: str, 
-    occupant_map: Dict[str, Any], # Map territory_name -> occupant_info 
-    allowed_unit_types: Set[str]
-) -> Tuple[Optional[List[str]], Tuple[Optional[str], Any]]:
-    """
-    Performs Breadth-First Search from 'start' to find the shortest path to a territory 
-    that is *adjacent* to any territory listed in the 'occupant_map'.
-
-    Args:
-        graph: The DiplomacyGraph instance to search.
-        start: The starting territory node name.
-        occupant_map: A dictionary where keys are territory names occupied by entities 
-                      we want to find adjacency to. Values can be any associated info 
-                      (e.g., the occupying unit type or power).
-        allowed_unit_types: A set of unit types ('A', 'F') allowed for traversal.
-
-    Returns:
-        Tuple[Optional[List[str]], Tuple[Optional[str], Any]]:
-            - A list representing the shortest path from 'start' to the territory adjacent 
-              to an occupied one, or None if no such path exists.
-            - A tuple containing: 
-                - The name of the occupied territory that was found adjacent to the path's end.
-                - The value associated with that occupied territory from occupant_map.
-              Returns (None, None) if no path is found.
-    """
-    if not occupant_map or start not in graph.graph: # Access the internal graph dict
-        logger.warning(f"BFS nearest adjacent: Invalid input - occupant_map empty or start node '{start}' not in graph.")
-        return None, (None, None)
-        
-    visited: Set[str] = {start}
-    # Queue stores paths (lists of nodes)
-    queue: deque[List[str]] = deque([[start]])
 
-    while queue:
-        path = queue.popleft()
-        current = path[-1]
-        
-        # Check if ANY neighbor of the current node is in the occupant_map
-        for neighbor in graph.get_adjacent(current):
-            if neighbor in occupant_map:
-                # Found a path ending adjacent to an occupied territory
-                occupant_info = occupant_map[neighbor]
-                return path, (neighbor, occupant_info)
+def get_map_graph(game_map: Map) -> MapGraph:
+    """Returns the MapGraph of a map, building it on first use (graphs are cached by map name)."""
+    if game_map.name not in MAP_GRAPH_CACHE:
+        MAP_GRAPH_CACHE[game_map.name] = MapGraph(game_map)
+    return MAP_GRAPH_CACHE[game_map.name]
 
-        # If no adjacent occupant found, expand the search to neighbors
-        for neighbor in graph.get_adjacent(current):
-            edge_types = graph.get_allowed_units(current, neighbor)
-            
-            # Check if traversal is possible with allowed unit types
-            if edge_types.intersection(allowed_unit_types):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    queue.append(new_path)
 
-    logger.debug(f"BFS nearest adjacent: No path found from '{start}' adjacent to occupied territories.")
-    return None, (None, None)
-
-# --- Build Function --- 
-def build_diplomacy_graph(game_map: Map) -> DiplomacyGraph:
-    """
-    Builds a DiplomacyGraph representing the connectivity of a given diplomacy map.
+def get_nearest_enemy_units(game: Game, power_name: str) -> Dict[str, Tuple[Optional[str], Optional[int]]]:
+    """Returns the nearest enemy unit of each unit of a power.
 
     Args:
-        game_map: An instance of the diplomacy.map.Map class.
+        game: The Diplomacy game instance.
+        power_name: The power whose units are considered (e.g. 'FRANCE').
 
     Returns:
-        A populated DiplomacyGraph instance.
+        Dict of {unit: (enemy unit, number of moves needed to reach its province)},
+        e.g. {'A PAR': ('A MUN', 2), ...}. Units without reachable enemy units are mapped to (None, None).
     """
-    graph = DiplomacyGraph()
-    processed_edges = set() # To avoid redundant checks in undirected graph
-
-    for loc1_name in game_map.locs:
-        graph.add_node(loc1_name)
-        loc1_area = game_map.area_data[loc1_name]
-
-        for loc2_name, coast_spec in loc1_area.adjacencies:
-            # Ensure loc2 exists in map data (should always be true)
-            if loc2_name not in game_map.area_data:
-                logger.warning(f"Adjacent location '{loc2_name}' for '{loc1_name}' not found in map data. Skipping.")
-                continue
-
-            loc2_area = game_map.area_data[loc2_name]
-            
-            # Create a canonical representation for the edge to avoid duplicates
-            edge_tuple = tuple(sorted((loc1_name, loc2_name)))
-            if edge_tuple in processed_edges:
-                continue
-
-            # --- Determine Army ('A') Movement ---            
-            can_army_move = False
-            # Army moves between land/coastal areas. Cannot move if both are sea.
-            if not (loc1_area.is_sea and loc2_area.is_sea):
-                 can_army_move = True # Simplified: Assumes land connectivity if not both sea
-                 # More precise check might involve pathfinding logic or specific land borders,
-                 # but this covers basic adjacency for armies.
-            
-            if can_army_move:
-                graph.add_edge(loc1_name, loc2_name, 'A')
-
-            # --- Determine Fleet ('F') Movement ---            
-            can_fleet_move = False
-            # Fleet moves between sea/coastal areas. Cannot move if both are pure land.
-            if not (loc1_area.is_land and not loc1_area.is_coastal and 
-                    loc2_area.is_land and not loc2_area.is_coastal):
-                # Check coasts if both are coastal
-                if loc1_area.is_coastal and loc2_area.is_coastal:
-                    # Fleet can only move if the adjacency specifically allows it (matching coasts)
-                    # The adjacency tuple (loc2_name, coast_spec) provides this info. 
-                    # We need to check if loc1 can reach loc2 via the specified coast(s).
-                    # This often means loc1 needs to have a coast matching coast_spec, 
-                    # or the adjacency implies general coastal access.
-                    # Using game_map.coast_data might be needed for complex checks.
-                    # Let's use a simplified check based on whether coast_spec exists.
-                    # A more robust method might directly check map.is_valid_move for fleets.
-                    if coast_spec: # Adjacency has coastal specification
-                        # Check if loc1_area's coasts are compatible with coast_spec
-                        # This logic can be complex; assuming adjacency implies possibility for now.
-                         if game_map.is_valid_move('F', loc1_name, loc2_name): # Use built-in check
-                            can_fleet_move = True
-                    else: # No specific coast needed
-                        if game_map.is_valid_move('F', loc1_name, loc2_name): # Use built-in check
-                            can_fleet_move = True
-                else:
-                    # One or both are sea, or one is coastal and one is sea/land
-                    # Generally possible if not land-to-land
-                    if game_map.is_valid_move('F', loc1_name, loc2_name): # Use built-in check
-                         can_fleet_move = True
-            
-            if can_fleet_move:
-                 graph.add_edge(loc1_name, loc2_name, 'F')
-
-            processed_edges.add(edge_tuple)
-
-    logger.info(f"Built DiplomacyGraph with {len(graph.nodes())} nodes and {len(graph.edges())} edges.")
-    return graph
+    graph = get_map_graph(game.map)
+    enemy_units = [(graph.province_index[unit[2:5]], unit)
+                   for other_power_name, power in game.powers.items() if other_power_name != power_name
+                   for unit in power.units]
+
+    nearest_units = {}
+    for unit in game.powers[power_name].units:
+        row = graph.province_distances[unit[0]][graph.loc_index[unit[2:]]]
+        distance, enemy_unit = min(((row[province_ix], enemy_unit) for province_ix, enemy_unit in enemy_units),
+                                   default=(UNREACHABLE, None))
+        nearest_units[unit] = (enemy_unit, distance) if distance != UNREACHABLE else (None, None)
+    return nearest_units
@@ -0,0 +1,41 @@
+"""
+Prompt layout for provider-side prompt caching.
+
+Providers cache the longest prefix of a prompt they have already seen. OpenAI, DeepSeek, OpenRouter
+and Gemini do it automatically; Anthropic needs explicit cache breakpoints. Prompts are therefore
+assembled from the most stable content to the most volatile, after the system prompt (which all clients
+send first):
+    1. static instructions (e.g. order instructions and output format),
+    2. the board state of the phase (identical for all the calls of a power during a phase),
+    3. the power's own context (goals, relationships, possible orders and game history).
+"""
+from dataclasses import dataclass
+from typing import List, Union
+
+SEGMENT_SEPARATOR = "\n\n"
+
+
+@dataclass
+class PromptSegments:
+    static: str
+    phase: str = ""
+    power: str = ""
+
+    @property
+    def segments(self) -> List[str]:
+        """The non-empty segments, from the most stable to the most volatile."""
+        return [segment for segment in (self.static, self.phase, self.power) if segment]
+
+    def __str__(self) -> str:
+        return SEGMENT_SEPARATOR.join(self.segments)
+
+
+def get_cacheable_blocks(prompt: Union[str, PromptSegments]) -> List[str]:
+    """Returns the text blocks of a prompt, that concatenated are equal to str(prompt).
+
+    Cache breakpoints can be placed after each block but the last.
+    """
+    if isinstance(prompt, str):
+        return [prompt]
+    segments = prompt.segments
+    return [segment + SEGMENT_SEPARATOR for segment in segments[:-1]] + segments[-1:]
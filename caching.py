@@ -0,0 +1,132 @@
+"""HTTP caching helpers for the Diplomacy web application.
+
+- Game fingerprints (phase, zobrist hash, message count, ...) are stored in the game metadata
+  whenever a game is saved, so conditional GETs can be answered with a 304 without loading
+  and deserializing the game itself.
+- Static map SVGs are kept in memory, with precompressed gzip (and brotli, when the optional
+  `brotli` package is installed) variants and immutable caching headers.
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from diplomacy.engine.game import Game
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SVG_DIR = Path(__file__).parent / "diplomacy" / "maps" / "svg"
+
+# Dynamic responses must be revalidated, but can then be answered with 304 Not Modified
+REVALIDATE_CACHE_CONTROL = "no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def get_game_fingerprint(game: Game) -> Dict[str, Any]:
+    """Cheap description of everything a game view depends on.
+
+    Besides phase, zobrist hash and message count, it includes the status and a digest of
+    the current orders, since submitting orders changes the page but not the board.
+    """
+    orders = json.dumps(game.get_orders(), sort_keys=True)
+    return {
+        "phase": game.get_current_phase(),
+        "zobrist_hash": game.get_hash(),
+        "message_count": len(game.messages) if game.messages else 0,
+        "status": game.status,
+        "orders": hashlib.md5(orders.encode("utf-8")).hexdigest()[:16],
+    }
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from JSON-serializable parts."""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def get_game_etag(game_id: str, metadata: Optional[Dict[str, Any]], *extra: Any) -> Optional[str]:
+    """ETag for a game resource, or None if the metadata has no fingerprint yet."""
+    if not metadata or "fingerprint" not in metadata:
+        return None
+    return make_etag(game_id, metadata["fingerprint"], *extra)
+
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Whether the client's If-None-Match header matches the current ETag."""
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def not_modified_response(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+class StaticSVGCache:
+    """In-memory map SVGs, with their ETag and precompressed variants."""
+
+    def __init__(self, svg_dir: Path = SVG_DIR):
+        self.svg_dir = svg_dir
+        self._entries = {}  # {map_name: {"text", "etag", "identity", "gzip", "br"}}
+
+    def get(self, map_name: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a map, loading it on first use. None if the map has no SVG."""
+        if map_name not in self._entries:
+            svg_path = self.svg_dir / f"{map_name}.svg"
+            if not svg_path.is_file():
+                return None
+            content = svg_path.read_bytes()
+            self._entries[map_name] = {
+                "text": content.decode("utf-8"),
+                "etag": f'"{hashlib.sha1(content).hexdigest()[:24]}"',
+                "identity": content,
+                "gzip": gzip.compress(content, compresslevel=9),
+                "br": brotli.compress(content) if brotli is not None else None,
+            }
+        return self._entries[map_name]
+
+    def get_text(self, map_name: str) -> Optional[str]:
+        entry = self.get(map_name)
+        return entry["text"] if entry else None
+
+    def response(self, request: Request, map_name: str) -> Optional[Response]:
+        """Build a (possibly 304, possibly compressed) response for a map SVG."""
+        entry = self.get(map_name)
+        if entry is None:
+            return None
+        if is_not_modified(request, entry["etag"]):
+            return not_modified_response(entry["etag"], IMMUTABLE_CACHE_CONTROL)
+
+        encoding, body = _select_encoding(request, entry)
+        headers = {
+            "ETag": entry["etag"],
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="image/svg+xml", headers=headers)
+
+
+def _select_encoding(request: Request, entry: Dict[str, Any]) -> Tuple[str, bytes]:
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if "br" in accept_encoding and entry["br"] is not None:
+        return "br", entry["br"]
+    if "gzip" in accept_encoding:
+        return "gzip", entry["gzip"]
+    return "identity", entry["identity"]
+
+
+svg_cache = StaticSVGCache()
@@ -24,6 +24,7 @@ from .engine.power import Power
 from .engine.game import Game
 from .engine.message import Message
 from .utils.game_phase_data import GamePhaseData
+from .server.server import Server
 
 # Defining root logger
 ROOT = logging.getLogger("diplomacy")
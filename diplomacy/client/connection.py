@@ -16,7 +16,9 @@
 # ==============================================================================
 """ Connection object, handling an internal websocket tornado connection. """
 import logging
+import time
 import weakref
+from collections import OrderedDict
 from datetime import timedelta
 from typing import Dict
 from tornado import gen, ioloop
@@ -25,27 +27,37 @@ from tornado.iostream import StreamClosedError
 from tornado.locks import Event
 from tornado.websocket import websocket_connect, WebSocketClosedError
 
-import ujson as json
-
 from diplomacy.client import notification_managers
 from diplomacy.client.response_managers import RequestFutureContext, handle_response
-from diplomacy.communication import notifications, requests, responses
+from diplomacy.communication import frames, notifications, requests, responses
 from diplomacy.utils import exceptions, strings, constants
 
 LOGGER = logging.getLogger(__name__)
 
+# Metrics reported to Connection.metrics_hook.
+METRIC_MESSAGE_HANDLING = 'message_handling_seconds'    # Time spent by socket reader on a received message.
+METRIC_RESPONSE_LATENCY = 'response_latency_seconds'    # Time between request writing and response reception.
+METRIC_PARKED_RESPONSE = 'parked_responses'             # Response received for an unknown request.
+METRIC_DROPPED_RESPONSE = 'dropped_responses'           # Parked response dropped (expired or too many).
+METRIC_FRAME_SENT = 'frame_sent_bytes'                  # Size of a frame written (label: number of messages).
+METRIC_FRAME_RECEIVED = 'frame_received_bytes'          # Size of a frame received (label: number of messages).
+
 @gen.coroutine
-def connect(hostname, port):
+def connect(hostname, port, use_batching=False, use_compression=False):
     """ Connect to given hostname and port.
 
         :param hostname: a hostname
         :param port: a port
+        :param use_batching: if True, try to negotiate batched frames with server (see Connection).
+        :param use_compression: if True, try to negotiate permessage-deflate compression with server.
         :return: a Connection object connected.
         :type hostname: str
         :type port: int
+        :type use_batching: bool
+        :type use_compression: bool
         :rtype: Connection
     """
-    connection = Connection(hostname, port)
+    connection = Connection(hostname, port, use_batching=use_batching, use_compression=use_compression)
     yield connection._connect('Trying to connect.')                 # pylint: disable=protected-access
     return connection
 
@@ -81,13 +93,34 @@ class Connection:
           context is added to this dictionary to be send later once reconnected.
         - **requests_waiting_responses**: a :class:`Dict` mapping a request ID to the context of a
           request **sent**. Contains requests that are waiting for a server response.
+          Requests are registered here right before being written, so that a response can never
+          be received before its request.
+        - **pending_responses**: an :class:`OrderedDict` mapping a request ID to a couple
+          (reception time, JSON response) for responses received for unknown requests. Responses are
+          kept (at most constants.MAX_PENDING_RESPONSES, for at most constants.REQUEST_TIMEOUT_SECONDS)
+          until a matching request is registered, without blocking the socket reader.
+        - **metrics_hook**: (optional) a callable ``metrics_hook(metric_name, value, label)`` called
+          with connection metrics (see METRIC_* constants in this module), e.g. to measure per-message
+          handling time (reader stalls) and response latency per request name (label).
         - **unknown_tokens**: :class:`set` a set of unknown tokens. We can safely ignore them, as the server has been
           notified.
+        - **use_batching**: :class:`bool` telling if connection should ask server for batched frames
+          (see module :mod:`diplomacy.communication.frames`). Messages are still sent one per frame
+          if server does not select a batch sub-protocol.
+        - **use_compression**: :class:`bool` telling if connection should ask server for
+          permessage-deflate compression.
+        - **protocol**: batch sub-protocol selected by server for current websocket connection, or None.
+        - **write_batch**: list of couples (JSON message, future) to write in next batched frame.
+        - **games_reconnecting**: a :class:`Dict` mapping a game address (game ID, game role) to a
+          :class:`tornado.locks.Event` set once game is synchronized after a reconnection.
+          Requests for a game being synchronized wait for this event, while other requests can be
+          sent as soon as connection is back.
     """
     __slots__ = ['hostname', 'port', 'use_ssl', 'connection', 'is_connecting', 'is_reconnecting', 'connection_count',
-                 'channels', 'requests_to_send', 'requests_waiting_responses', 'unknown_tokens']
+                 'channels', 'requests_to_send', 'requests_waiting_responses', 'pending_responses', 'unknown_tokens',
+                 'metrics_hook', 'use_batching', 'use_compression', 'protocol', 'write_batch', 'games_reconnecting']
 
-    def __init__(self, hostname, port, use_ssl=False):
+    def __init__(self, hostname, port, use_ssl=False, use_batching=False, use_compression=False):
         """ Constructor
 
             The connection class should not be initiated directly, but through the connect method
@@ -100,13 +133,22 @@ class Connection:
             :param hostname: hostname to connect (e.g. 'localhost')
             :param port: port to connect (e.g. 8888)
             :param use_ssl: telling if connection should be securized (True) or not (False).
+            :param use_batching: telling if connection should ask server for batched frames.
+            :param use_compression: telling if connection should ask server for permessage-deflate compression.
             :type hostname: str
             :type port: int
             :type use_ssl: bool
+            :type use_batching: bool
+            :type use_compression: bool
         """
         self.hostname = hostname
         self.port = port
         self.use_ssl = bool(use_ssl)
+        self.use_batching = bool(use_batching)
+        self.use_compression = bool(use_compression)
+        self.protocol = None
+        self.write_batch = []
+        self.games_reconnecting = {}                    # type: Dict[tuple, Event]
 
         self.connection = None
         self.connection_count = 0
@@ -117,7 +159,9 @@ class Connection:
 
         self.requests_to_send = {}                      # type: Dict[str, RequestFutureContext]
         self.requests_waiting_responses = {}            # type: Dict[str, RequestFutureContext]
+        self.pending_responses = OrderedDict()          # type: Dict[str, tuple]
         self.unknown_tokens = set()
+        self.metrics_hook = None
 
         # When connection is created, we are not yet connected, but reconnection does not matter
         # (we consider we are reconnected).
@@ -179,7 +223,10 @@ class Connection:
         self.connection = None
         for attempt_index in range(constants.NB_CONNECTION_ATTEMPTS):
             try:
-                future_connection = websocket_connect(self.url)
+                future_connection = websocket_connect(
+                    self.url,
+                    compression_options={} if self.use_compression else None,
+                    subprotocols=frames.get_supported_protocols() if self.use_batching else None)
                 self.connection = yield gen.with_timeout(
                     timedelta(seconds=constants.ATTEMPT_DELAY_SECONDS), future_connection)
                 break
@@ -190,6 +237,9 @@ class Connection:
                 LOGGER.warning('Connection failing (attempt %d), retrying.', attempt_index + 1)
                 yield gen.sleep(constants.ATTEMPT_DELAY_SECONDS)
 
+        # Batch sub-protocol is None if not asked or if server does not support it.
+        self.protocol = self.connection.selected_subprotocol if self.use_batching else None
+
         if not self.connection_count:
             # Start receiving messages as soon as we are connected.
             ioloop.IOLoop.current().add_callback(self._handle_socket_messages)
@@ -209,19 +259,24 @@ class Connection:
         # We will be reconnected when method Reconnection.sync_done() will finish.
         _Reconnection(self).reconnect()
 
-    @gen.coroutine
     def _on_socket_message(self, socket_message):
-        """ Manage given socket_message (string),
-            that may be a string representation of either a request or a notification.
+        """ Manage given socket_message (string or bytes), that may contain either one message or a batch
+            of messages (see module :mod:`diplomacy.communication.frames`). Each message may be
+            either a response or a notification.
         """
-
-        # Check response format and run callback (if defined).
         try:
-            json_message = json.loads(socket_message)
+            json_messages = frames.decode_frame(socket_message)
         except ValueError:
             LOGGER.exception('Unable to parse JSON from a socket message.')
             return
+        self._report(METRIC_FRAME_RECEIVED, len(socket_message), len(json_messages))
+        for json_message in json_messages:
+            self._on_json_message(json_message)
 
+    def _on_json_message(self, json_message):
+        """ Manage given JSON message, that may represent either a response or a notification. """
+
+        # Check response format and run callback (if defined).
         if not isinstance(json_message, dict):
             LOGGER.error("Unable to convert a JSON string to a dictionary.")
             return
@@ -229,25 +284,16 @@ class Connection:
         notification_id = json_message.get(strings.NOTIFICATION_ID, None)
 
         if request_id:
-            if request_id not in self.requests_waiting_responses:
-                # Response received before the request was marked as 'waiting responses'
-                # Waiting 5 secs to make sure this is not a race condition before aborting
-                for _ in range(10):
-                    yield gen.sleep(0.5)
-                    if request_id in self.requests_waiting_responses:
-                        break
-                else:
-                    LOGGER.error('Unknown request.')
-                    return
-            request_context = self.requests_waiting_responses.pop(request_id)  # type: RequestFutureContext
-            try:
-                response = responses.parse_dict(json_message)
-                managed_data = handle_response(request_context, response)
-                request_context.future.set_result(managed_data)
-            except exceptions.ResponseException as ex:
-                LOGGER.error('Error received for request %s: %s', request_context.request.name, ex)
-                LOGGER.debug('Full request was: %s', request_context.request.to_dict())
-                request_context.future.set_exception(ex)
+            request_context = self.requests_waiting_responses.pop(request_id, None)
+            if request_context is None:
+                # Request may have been moved back to requests to send by a reconnection
+                # while server was already answering it.
+                request_context = self.requests_to_send.pop(request_id, None)
+            if request_context is None:
+                # Unknown request. Keep response until a matching request is registered.
+                self._park_response(request_id, json_message)
+            else:
+                self._handle_response(request_context, json_message)
 
         elif notification_id:
             notification = notifications.parse_dict(json_message)
@@ -260,6 +306,57 @@ class Connection:
         else:
             LOGGER.error('Unknown socket message.')
 
+    def _handle_response(self, request_context, json_message):
+        """ Manage a JSON response received for given request context.
+
+            :param request_context: context of request associated to the response.
+            :param json_message: JSON response.
+            :type request_context: RequestFutureContext
+            :type json_message: dict
+        """
+        if request_context.write_time is not None:
+            self._report(METRIC_RESPONSE_LATENCY, time.perf_counter() - request_context.write_time,
+                         request_context.request.name)
+        if request_context.future.done():
+            # Request was already cancelled.
+            return
+        try:
+            response = responses.parse_dict(json_message)
+            managed_data = handle_response(request_context, response)
+            request_context.future.set_result(managed_data)
+        except exceptions.ResponseException as ex:
+            LOGGER.error('Error received for request %s: %s', request_context.request.name, ex)
+            LOGGER.debug('Full request was: %s', request_context.request.to_dict())
+            request_context.future.set_exception(ex)
+
+    def _park_response(self, request_id, json_message):
+        """ Keep a response received for an unknown request, and drop expired or exceeding parked responses.
+
+            :param request_id: ID of request associated to the response.
+            :param json_message: JSON response.
+            :type request_id: str
+            :type json_message: dict
+        """
+        now = time.perf_counter()
+        self.pending_responses[request_id] = (now, json_message)
+        self._report(METRIC_PARKED_RESPONSE, 1)
+        while self.pending_responses:
+            oldest_request_id, (reception_time, _) = next(iter(self.pending_responses.items()))
+            if (now - reception_time <= constants.REQUEST_TIMEOUT_SECONDS
+                    and len(self.pending_responses) <= constants.MAX_PENDING_RESPONSES):
+                break
+            del self.pending_responses[oldest_request_id]
+            LOGGER.error('Unknown request %s.', oldest_request_id)
+            self._report(METRIC_DROPPED_RESPONSE, 1)
+
+    def _report(self, metric_name, value, label=None):
+        """ Send a metric to metrics hook, if any. """
+        if self.metrics_hook is not None:
+            try:
+                self.metrics_hook(metric_name, value, label)
+            except Exception:                                                       # pylint: disable=broad-except
+                LOGGER.exception('Error in connection metrics hook.')
+
     @gen.coroutine
     def _handle_socket_messages(self):
         """ Main looping method used to received connection messages. """
@@ -271,7 +368,10 @@ class Connection:
                 yield self._reconnect()
             else:
                 # Check response format and run callback (if defined).
-                yield self._on_socket_message(msg)
+                # Messages are handled synchronously, so reader is never blocked waiting for anything else.
+                start_time = time.perf_counter()
+                self._on_socket_message(msg)
+                self._report(METRIC_MESSAGE_HANDLING, time.perf_counter() - start_time)
 
     def _handle_unknown_token(self, token):
         """ Notify server about an unknown channel token.
@@ -281,7 +381,7 @@ class Connection:
         # Send notification request without waiting any server response. Ignore errors if any.
         try:
             self.unknown_tokens.add(token)
-            self.connection.write_message(requests.UnknownToken(token=token).json())
+            self._write_message(requests.UnknownToken(token=token))
         except (WebSocketClosedError, StreamClosedError):
             pass
 
@@ -293,6 +393,79 @@ class Connection:
         """
         self.requests_to_send[request_context.request_id] = request_context
 
+    def _register_waiting(self, request_context):
+        """ Register given request context as waiting for a response. Must be called right before
+            writing the request, so that its response can never be received before registration.
+
+            :param request_context: context of request to write.
+            :type request_context: RequestFutureContext
+            :return: True if request was already answered with a parked response (and does not
+                need to be written anymore), False otherwise.
+        """
+        request_id = request_context.request_id
+        request_context.write_time = time.perf_counter()
+        pending_response = self.pending_responses.pop(request_id, None)
+        if pending_response is not None:
+            self._handle_response(request_context, pending_response[1])
+            return True
+        self.requests_waiting_responses[request_id] = request_context
+        return False
+
+    def _unregister(self, request_context):
+        """ Forget given request context (e.g. if request timed out).
+
+            :param request_context: context of request to forget.
+            :type request_context: RequestFutureContext
+        """
+        self.requests_waiting_responses.pop(request_context.request_id, None)
+        self.requests_to_send.pop(request_context.request_id, None)
+
+    def _write_message(self, message):
+        """ Write a request into internal connection object. If a batch sub-protocol was negotiated,
+            all messages written during current IO loop iteration are sent together in one frame.
+
+            :param message: request to write.
+            :return: a Future done when message is written.
+            :type message: diplomacy.communication.requests._AbstractRequest
+        """
+        if self.protocol is None:
+            frame = message.json()
+            self._report(METRIC_FRAME_SENT, len(frame), 1)
+            return self.connection.write_message(frame)
+        future = Future()
+        if not self.write_batch:
+            ioloop.IOLoop.current().add_callback(self._write_batch)
+        self.write_batch.append((message.to_dict(), future))
+        return future
+
+    def _write_batch(self):
+        """ Write all messages waiting in write batch into one frame. """
+        batch, self.write_batch = self.write_batch, []
+        if not batch:
+            return
+        try:
+            if self.connection is None or self.protocol is None:
+                # Disconnected, or reconnected to a server that does not support batches.
+                raise WebSocketClosedError()
+            frame = frames.encode_batch([json_message for json_message, _ in batch], self.protocol)
+            write_future = self.connection.write_message(frame, binary=isinstance(frame, bytes))
+        except (WebSocketClosedError, StreamClosedError) as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        self._report(METRIC_FRAME_SENT, len(frame), len(batch))
+
+        def on_batch_written(batch_future):
+            """ Transfer writing result or exception to each message future. """
+            exception = batch_future.exception()
+            for _, future in batch:
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(None)
+
+        write_future.add_done_callback(on_batch_written)
+
     def send(self, request, for_game=None):
         """ Send a request.
 
@@ -307,7 +480,10 @@ class Connection:
         request_context = RequestFutureContext(request=request, future=request_future, connection=self, game=for_game)
 
         self.write_request(request_context).add_done_callback(_MessageWrittenCallback(request_context).callback)
-        return gen.with_timeout(timedelta(seconds=constants.REQUEST_TIMEOUT_SECONDS), request_future)
+        response_future = gen.with_timeout(timedelta(seconds=constants.REQUEST_TIMEOUT_SECONDS), request_future)
+        # Once a response is received or request timed out, request must not be kept anymore.
+        response_future.add_done_callback(lambda _: self._unregister(request_context))
+        return response_future
 
     def write_request(self, request_context):
         """ Write a request into internal connection object.
@@ -338,10 +514,14 @@ class Connection:
                 try:
                     if self.connection is None:
                         raise WebSocketClosedError()
-                    write_future = self.connection.write_message(request.json())
+                    if self._register_waiting(request_context):
+                        future.set_result(None)
+                        return
+                    write_future = self._write_message(request)
                 except (WebSocketClosedError, StreamClosedError) as exc:
                     # We were disconnected.
                     # Save request context as a request to send.
+                    self.requests_waiting_responses.pop(request_context.request_id, None)
                     # We will re-try to send it later once reconnected.
                     self._register_to_send(request_context)
                     # Transfer exception to returned future.
@@ -349,28 +529,37 @@ class Connection:
                 else:
                     write_future.add_done_callback(on_message_written)
 
+        def on_reconnected(reconnected_future):
+            """ 1.1) Game requests also wait for their game to be synchronized. """
+            game_synchronized = self.games_reconnecting.get(_get_game_address(request), None)
+            if game_synchronized is None or game_synchronized.is_set():
+                on_connected(reconnected_future)
+            else:
+                game_synchronized.wait().add_done_callback(on_connected)
+
         # 1)    Synchronize requests just wait for connection.
         #       Other requests wait for reconnection (which also implies connection).
         if isinstance(request, requests.Synchronize):
             self.is_connecting.wait().add_done_callback(on_connected)
         else:
-            self.is_reconnecting.wait().add_done_callback(on_connected)
+            self.is_reconnecting.wait().add_done_callback(on_reconnected)
 
         return future
 
+def _get_game_address(request):
+    """ Return game address (game ID, game role) of given request, or None if it's not a game request. """
+    if request.level == strings.GAME:
+        return request.game_id, request.game_role
+    return None
+
 class _Reconnection:
     """ Class performing reconnection work for a given connection.
 
         Class properties:
 
         - connection: Connection object to reconnect.
-        - games_phases: dictionary mapping each game address (game ID + game role) to server game info:
-          {game ID => {game role => responses.DataGamePhase}}.
-          Server game info is a DataGamePhase response sent by server as response to a Synchronize request.
-          It contains 3 fields: game ID, current server game phase and current server game timestamp.
-          We currently use only game phase.
-        - n_expected_games: number of games registered in games_phases.
-        - n_synchronized_games: number of games already synchronized.
+        - connection_count: connection count when this reconnection started. If connection is lost again
+          before all games are synchronized, a new reconnection takes over and this one stops.
 
         Reconnection procedure:
 
@@ -378,29 +567,27 @@ class _Reconnection:
           move them back to responses_to_send.
         - Remove all previous synchronization requests that are not yet sent. We will send new synchronization
           requests with latest games timestamps. Future associated to removed requests will raise an exception.
-        - Initialize games_phases associating None to each game object currently opened in connection.
-        - Send synchronization request for each game object currently opened in connection. For each game:
-
-          - server will send a response describing current server game phase (current phase and timestamp). This info
-            will be used to check local requests to send. Note that concrete synchronization is done via notifications.
-            Thus, when server responses is received, game synchronization may not be yet terminated, but at least
-            we will now current server game phase.
-          - Server response is saved in games_phases (replacing None associated to game object).
-          - n_synchronized_games is incremented.
-
-        - When sync responses are received for all games registered in games_phases
-          (n_expected_games == n_synchronized_games), we can finalize reconnection:
-
-          - Remove every phase-dependent game request not yet sent for which phase does not match
+        - Register each game object currently opened in connection as being synchronized
+          (see Connection.games_reconnecting).
+        - Send all requests that are not related to a game being synchronized, and mark connection as
+          reconnected: new requests can be sent, except requests for games being synchronized, which wait
+          for their game.
+        - Send synchronization request for each game object. Each synchronization request contains
+          game phase, timestamp and zobrist hash, so that a server supporting it can send only what changed
+          (see Game.get_sync_data()). Otherwise, server sends a response describing current server game phase
+          and synchronizes game via notifications.
+        - Each game is finalized independently as soon as its synchronization response is received:
+
+          - Remove every phase-dependent request not yet sent for this game for which phase does not match
             server game phase. Futures associated to removed request will raise an exception.
-          - Finally send all remaining requests.
+          - Send remaining requests for this game, then release requests waiting for this game.
 
         These requests may be marked as re-sent.
         For these requests, server is (currently) responsible for checking if they don't represent
         a duplicated query.
     """
 
-    __slots__ = ['connection', 'games_phases', 'n_expected_games', 'n_synchronized_games']
+    __slots__ = ['connection', 'connection_count']
 
     def __init__(self, connection):
         """ Initialize reconnection data/
@@ -409,9 +596,7 @@ class _Reconnection:
             :type connection: Connection
         """
         self.connection = connection
-        self.games_phases = {}
-        self.n_expected_games = 0
-        self.n_synchronized_games = 0
+        self.connection_count = connection.connection_count
 
     def reconnect(self):
         """ Perform concrete reconnection work. """
@@ -432,22 +617,24 @@ class _Reconnection:
                 requests_to_send_updated[context.request.request_id] = context
         self.connection.requests_to_send = requests_to_send_updated
 
-        # Count games to synchronize.
+        # Register games to synchronize.
+        # Events still registered by a previous unfinished reconnection are reused, as requests may wait for them.
+        games = []
         for channel in self.connection.channels.values():
             for game_instance_set in channel.game_id_to_instances.values():
                 for game in game_instance_set.get_games():
-                    self.games_phases.setdefault(game.game_id, {})[game.role] = None
-                    self.n_expected_games += 1
-
-        if self.n_expected_games:
-            # Synchronize games.
-            for channel in self.connection.channels.values():
-                for game_instance_set in channel.game_id_to_instances.values():
-                    for game in game_instance_set.get_games():
-                        game.synchronize().add_done_callback(self.generate_sync_callback(game))
-        else:
-            # No game to sync, finish sync now.
-            self.sync_done()
+                    self.connection.games_reconnecting.setdefault((game.game_id, game.role), Event()).clear()
+                    games.append(game)
+
+        # Send requests not related to games being synchronized. We are then reconnected.
+        self.send_requests(lambda address: address not in self.connection.games_reconnecting)
+        self.connection.is_reconnecting.set()
+
+        # Synchronize games.
+        for game in games:
+            game.synchronize().add_done_callback(self.generate_sync_callback(game))
+
+        LOGGER.info('Done reconnection work, synchronizing %d game(s).', len(games))
 
     def generate_sync_callback(self, game):
         """ Generate callback to call when response to sync request is received for given game.
@@ -458,59 +645,65 @@ class _Reconnection:
         """
 
         def on_sync(future):
-            """ Callback. If exception occurs, print it as logging error. Else, register server response,
-                and move forward to final reconnection work if all games received sync responses.
-            """
+            """ Callback. If exception occurs, print it as logging error. Then finalize game synchronization. """
+            if self.connection_count != self.connection.connection_count:
+                # Connection was lost again. A newer reconnection will synchronize this game.
+                return
             exception = future.exception()
             if exception is not None:
                 LOGGER.error(str(exception))
+                self.sync_done(game, None)
             else:
-                self.games_phases[game.game_id][game.role] = future.result()
-                self.n_synchronized_games += 1
-                if self.n_synchronized_games == self.n_expected_games:
-                    self.sync_done()
+                self.sync_done(game, future.result().phase)
 
         return on_sync
 
-    def sync_done(self):
-        """ Final reconnection work. Remove obsolete game requests and send remaining requests. """
+    def sync_done(self, game, server_phase):
+        """ Final synchronization work for a game. Remove obsolete game requests and send remaining requests.
+
+            :param game: synchronized game.
+            :param server_phase: current server game phase, or None if unknown (e.g. synchronization failed).
+            :type game: diplomacy.client.network_game.NetworkGame
+            :type server_phase: str
+        """
+        game_address = (game.game_id, game.role)
 
-        # All sync requests sent have finished.
-        # Remove all obsolete game requests from connection.
         # A game request is obsolete if it's phase-dependent and if its phase does not match current game phase.
+        def is_valid(context):
+            """ Return True if request context must be sent. """
+            request = context.request
+            if server_phase is None or not request.phase_dependent or request.phase == server_phase:
+                return True
+            context.future.set_exception(exceptions.DiplomacyException(
+                'Game %s: request %s: request phase %s does not match current server game phase %s.'
+                % (request.game_id, request.name, request.phase, server_phase)))
+            return False
+
+        self.send_requests(lambda address: address == game_address, is_valid)
+
+        # Game is synchronized. Release requests waiting for it.
+        game_synchronized = self.connection.games_reconnecting.pop(game_address, None)
+        if game_synchronized is not None:
+            game_synchronized.set()
+
+    def send_requests(self, select_address, is_valid=None):
+        """ Send requests to send whose game address matches.
+
+            :param select_address: function returning True for game addresses (or None, for non-game requests)
+                whose requests must be sent now.
+            :param is_valid: (optional) function returning False for request contexts that must not be sent anymore.
+        """
+        contexts = [context for context in self.connection.requests_to_send.values()
+                    if select_address(_get_game_address(context.request))]
 
-        request_to_send_updated = {}
-        for context in self.connection.requests_to_send.values():  # type: RequestFutureContext
-            keep = True
-            if context.request.level == strings.GAME and context.request.phase_dependent:
-                request_phase = context.request.phase
-                server_phase = self.games_phases[context.request.game_id][context.request.game_role].phase
-                if request_phase != server_phase:
-                    # Request is obsolete.
-                    context.future.set_exception(exceptions.DiplomacyException(
-                        'Game %s: request %s: request phase %s does not match current server game phase %s.'
-                        % (context.request.game_id, context.request.name, request_phase, server_phase)))
-                    keep = False
-            if keep:
-                request_to_send_updated[context.request.request_id] = context
-
-        LOGGER.debug('Keep %d/%d old requests to send.',
-                     len(request_to_send_updated), len(self.connection.requests_to_send))
-
-        # All requests to send are stored in request_to_send_updated.
-        # Then we can empty connection.requests_to_send.
         # If we fail to send a request, it will be re-added again.
-        self.connection.requests_to_send.clear()
+        for context in contexts:  # type: RequestFutureContext
+            del self.connection.requests_to_send[context.request_id]
 
-        # Send requests.
-        for request_to_send in request_to_send_updated.values():  # type: RequestFutureContext
-            self.connection.write_request(request_to_send).add_done_callback(
-                _MessageWrittenCallback(request_to_send).callback)
-
-        # We are reconnected.
-        self.connection.is_reconnecting.set()
-
-        LOGGER.info('Done reconnection work.')
+        contexts = [context for context in contexts if is_valid is None or is_valid(context)]
+        LOGGER.debug('Send %d old requests.', len(contexts))
+        for context in contexts:
+            self.connection.write_request(context).add_done_callback(_MessageWrittenCallback(context).callback)
 
 class _MessageWrittenCallback:
     """ Helper class representing callback to call on a connection
@@ -527,22 +720,19 @@ class _MessageWrittenCallback:
         self.request_context = request_context
 
     def callback(self, msg_future):
-        """ Called when request is effectively written on socket, and move the request
-            from `request to send` to `request assumed sent`.
+        """ Called when request is effectively written on socket (or when writing failed).
+            Request was already registered as waiting for a response before being written.
         """
-        # Remove request context from `requests to send` in any case.
         connection = self.request_context.connection  # type: Connection
-        request_id = self.request_context.request_id
         exception = msg_future.exception()
         if exception is not None:
             if isinstance(exception, (WebSocketClosedError, StreamClosedError)):
                 # Connection suddenly closed.
-                # Request context was stored in connection.requests_to_send
-                # and will be re-sent when reconnection succeeds.
-                # For more details, see method Connection.write_request().
+                # Request context is stored either in connection.requests_to_send or in
+                # connection.requests_waiting_responses, and will be re-sent when reconnection succeeds.
+                # For more details, see method Connection.write_request() and class _Reconnection.
                 LOGGER.error('Connection was closed when sending a request. Silently waiting for a reconnection.')
             else:
                 LOGGER.error('Fatal error occurred while writing a request.')
+                connection.requests_waiting_responses.pop(self.request_context.request_id, None)
                 self.request_context.future.set_exception(exception)
-        else:
-            connection.requests_waiting_responses[request_id] = self.request_context
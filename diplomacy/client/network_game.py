@@ -123,7 +123,8 @@ class NetworkGame(Game):
         """ Send a :class:`.Synchronize` request to synchronize this game with associated server game. """
         if not self.channel:
             raise DiplomacyException('Invalid client game.')
-        return self.channel._synchronize(game=self, timestamp=self.get_latest_timestamp())
+        return self.channel._synchronize(game=self, timestamp=self.get_latest_timestamp(),
+                                         zobrist_hash=self.get_hash())
 
     # Admin / Moderator API.
     delete = _game_request_method(Channel._delete_game)
@@ -32,7 +32,7 @@ class RequestFutureContext:
     """ Helper class to store a context around a request
         (with future for response management, related connection and optional related game).
     """
-    __slots__ = ['request', 'future', 'connection', 'game']
+    __slots__ = ['request', 'future', 'connection', 'game', 'write_time']
 
     def __init__(self, request, future, connection, game=None):
         """ Initialize a request future context.
@@ -50,6 +50,7 @@ class RequestFutureContext:
         self.future = future
         self.connection = connection
         self.game = game
+        self.write_time = None  # Time (time.perf_counter()) of last write into the socket.
 
     request_id = property(lambda self: self.request.request_id)
     token = property(lambda self: self.request.token)
@@ -294,6 +295,21 @@ def on_sign_in(context, response):
     """
     return context.new_channel(response.data)
 
+def on_synchronize(context, response):
+    """ Manage response for request Synchronize.
+
+        :param context: request context
+        :param response: response received
+        :return: either a DataGameInfo response (server sends notifications to synchronize game),
+            or GameSyncData object (already applied to game).
+        :type context: RequestFutureContext
+        :type response: responses.DataGameInfo | responses.DataGameSync
+    """
+    if isinstance(response, responses.DataGameSync):
+        Game.apply_sync_data(context.game, response.data)
+        return response.data
+    return response
+
 def on_vote(context, response):
     """ Manage response for request VoteAboutDraw.
 
@@ -339,7 +355,7 @@ MAPPING = {
     requests.SetOrders: on_set_orders,
     requests.SetWaitFlag: on_set_wait_flag,
     requests.SignIn: on_sign_in,
-    requests.Synchronize: default_manager,
+    requests.Synchronize: on_synchronize,
     requests.Vote: on_vote,
 }
 
@@ -0,0 +1,92 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Websocket frames exchanged between client and server.
+
+    By default, each frame contains exactly one JSON message (request, response or notification) as a string.
+
+    Client and server may negotiate a protocol extension through websocket sub-protocols. With a batch
+    sub-protocol, each frame contains a list of messages, encoded either with JSON (text frame) or
+    with msgpack (binary frame, only if optional package `msgpack` is installed). Peers that don't know
+    the extension never select a batch sub-protocol, so they keep exchanging one JSON message per frame.
+"""
+import ujson as json
+
+from diplomacy.utils import exceptions
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Websocket sub-protocols for batched frames.
+BATCH_JSON = 'diplomacy.batch.json'
+BATCH_MSGPACK = 'diplomacy.batch.msgpack'
+
+def get_supported_protocols(use_msgpack=True):
+    """ Return batch sub-protocols supported locally, by order of preference.
+
+        :param use_msgpack: if True, include msgpack sub-protocol (if package msgpack is available).
+        :return: list of sub-protocol names
+        :type use_msgpack: bool
+    """
+    if use_msgpack and msgpack is not None:
+        return [BATCH_MSGPACK, BATCH_JSON]
+    return [BATCH_JSON]
+
+def select_protocol(requested_protocols):
+    """ Return first requested sub-protocol supported locally, or None (e.g. for a server
+        choosing the sub-protocol asked by a client).
+
+        :param requested_protocols: sub-protocols requested by peer, by order of preference.
+        :return: a sub-protocol name or None
+    """
+    supported_protocols = get_supported_protocols()
+    for protocol in requested_protocols:
+        if protocol in supported_protocols:
+            return protocol
+    return None
+
+def encode_batch(json_messages, protocol):
+    """ Encode a sequence of JSON messages into one frame.
+
+        :param json_messages: sequence of JSON messages (dictionaries).
+        :param protocol: negotiated batch sub-protocol.
+        :return: frame to write: bytes for msgpack sub-protocol, string otherwise.
+        :rtype: str | bytes
+    """
+    if protocol == BATCH_MSGPACK:
+        return msgpack.packb(list(json_messages), use_bin_type=True)
+    if protocol == BATCH_JSON:
+        return json.dumps(list(json_messages))
+    raise exceptions.DiplomacyException('Unknown batch protocol %s' % protocol)
+
+def decode_frame(frame):
+    """ Decode a received frame into a list of JSON messages.
+        Frame may contain either a single message or a batch of messages, as JSON (string) or msgpack (bytes).
+
+        :param frame: received frame.
+        :return: list of JSON messages (dictionaries are expected, but not checked)
+        :type frame: str | bytes
+        :rtype: list
+    """
+    if isinstance(frame, bytes):
+        if msgpack is None:
+            raise ValueError('Received a binary frame, but msgpack is not installed.')
+        content = msgpack.unpackb(frame, raw=False)
+    else:
+        content = json.loads(frame)
+    return content if isinstance(content, list) else [content]
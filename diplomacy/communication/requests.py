@@ -806,18 +806,30 @@ class Synchronize(_AbstractGameRequest):
         If necessary, server will send appropriate notifications to client game so that it can
         be up to date with server game state.
 
+        If client game zobrist hash is provided, server may instead send only what changed since client game
+        phase, timestamp and hash, in a :class:`.DataGameSync` response (see method Game.get_sync_data()).
+        Servers that don't support incremental synchronization ignore zobrist hash.
+
         :param timestamp: timestamp since which client game needs to synchronize.
+        :param zobrist_hash: (optional) client game zobrist hash.
         :type timestamp: int
-        :return: (server and client) a :class:`.DataGameInfo` object.
+        :type zobrist_hash: str, optional
+        :return:
+
+            - Server: a :class:`.DataGameInfo` object, or a :class:`.DataGameSync` object if zobrist hash is provided.
+            - Client: either a :class:`.DataGameInfo` object, or the :class:`.GameSyncData` object applied
+              to client game.
     """
-    __slots__ = ['timestamp']
+    __slots__ = ['timestamp', 'zobrist_hash']
     params = {
-        strings.TIMESTAMP: int
+        strings.TIMESTAMP: int,
+        strings.ZOBRIST_HASH: parsing.OptionalValueType(str),
     }
     phase_dependent = False
 
     def __init__(self, **kwargs):
         self.timestamp = None  # type: int
+        self.zobrist_hash = None  # type: str
         super(Synchronize, self).__init__(**kwargs)
 
 class Vote(_AbstractGameRequest):
@@ -21,6 +21,7 @@ from diplomacy.engine.game import Game
 from diplomacy.utils import common, parsing, strings
 from diplomacy.utils import exceptions
 from diplomacy.utils.game_phase_data import GamePhaseData
+from diplomacy.utils.game_sync_data import GameSyncData
 from diplomacy.utils.network_data import NetworkData
 from diplomacy.utils.scheduler_event import SchedulerEvent
 
@@ -248,6 +249,13 @@ class DataGamePhases(UniqueData):
         strings.DATA: parsing.SequenceType(parsing.JsonableClassType(GamePhaseData))
     }
 
+class DataGameSync(UniqueData):
+    """ Unique data containing a :class:`.GameSyncData` object (changes of a game since client game state). """
+    __slots__ = []
+    params = {
+        strings.DATA: parsing.JsonableClassType(GameSyncData)
+    }
+
 class DataGame(UniqueData):
     """ Unique data containing a :class:`.Game` object. """
     __slots__ = []
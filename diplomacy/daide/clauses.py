@@ -38,10 +38,12 @@ def break_next_group(daide_bytes):
     # Finding the matching closing parenthesis
     pos = 0
     parentheses_level = 0
+    ope_par, clo_par = bytes(tokens.OPE_PAR), bytes(tokens.CLO_PAR)
     while True:
-        if daide_bytes[pos:pos + 2] == bytes(tokens.OPE_PAR):
+        token_bytes = daide_bytes[pos:pos + 2]
+        if token_bytes == ope_par:
             parentheses_level += 1
-        elif daide_bytes[pos:pos + 2] == bytes(tokens.CLO_PAR):
+        elif token_bytes == clo_par:
             parentheses_level -= 1
         if parentheses_level <= 0:
             break
@@ -177,7 +179,7 @@ class SingleToken(AbstractClause):
 
         # Getting the token
         self._bytes = token_bytes
-        self._str = str(Token(from_bytes=token_bytes))
+        self._str = str(tokens.token_from_bytes(token_bytes))
         return remaining_bytes
 
     def from_string(self, string, on_error='raise'):
@@ -263,7 +265,7 @@ class String(AbstractClause):
         # Extract its content
         nb_bytes = len(str_group_bytes)
         self._bytes = str_group_bytes
-        self._str = ''.join([str(Token(from_bytes=str_group_bytes[pos:pos + 2])) for pos in range(2, nb_bytes - 2, 2)])
+        self._str = ''.join([str(token) for token in tokens.decode_tokens(str_group_bytes[2:nb_bytes - 2])])
         return remaining_bytes
 
     def from_string(self, string, on_error='raise'):
@@ -309,7 +311,7 @@ class Number(AbstractClause):
             return daide_bytes
 
         number_bytes, remaining_bytes = daide_bytes[:2], daide_bytes[2:]
-        number_token = Token(from_bytes=number_bytes)
+        number_token = tokens.token_from_bytes(number_bytes)
         if not tokens.is_integer_token(number_token):
             self.error(on_error, 'The token is not an integer. Got %s' % number_token)
             return daide_bytes
@@ -470,6 +472,11 @@ class Turn(AbstractClause):
             self.error(on_error, '{} bytes remaining. Turn is malformed'.format(len(turn_group_bytes)))
             return daide_bytes
 
+        # e.g. (GER) is a group of powers, not a turn
+        if season is None or year is None or str(season) not in self._alias_from_bytes:
+            self.error(on_error, 'Expected a season and a year. Turn is malformed')
+            return daide_bytes
+
         season_alias = self._alias_from_bytes.get(str(season), str(season))
         self._str = ''.join([season_alias[0], str(year), season_alias[-1]])
         return remaining_bytes
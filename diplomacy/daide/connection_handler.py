@@ -20,7 +20,8 @@ from tornado import gen
 from tornado.concurrent import Future
 from tornado.iostream import StreamClosedError
 from diplomacy.daide import notifications, request_managers, responses
-from diplomacy.daide.messages import DiplomacyMessage, DaideMessage, ErrorMessage, RepresentationMessage, MessageType
+from diplomacy.daide.messages import DiplomacyMessage, DaideMessage, ErrorMessage, MessageReader, \
+    RepresentationMessage, MessageType, encode_messages
 from diplomacy.daide.notification_managers import translate_notification
 from diplomacy.daide.requests import RequestBuilder
 from diplomacy.daide.utils import bytes_to_str
@@ -42,6 +43,7 @@ class ConnectionHandler:
 
     def __init__(self):
         self.stream = None
+        self.reader = None
         self.server = None
         self.game_id = None
         self.token = None
@@ -62,6 +64,7 @@ class ConnectionHandler:
             :type server: diplomacy.Server
         """
         self.stream = stream
+        self.reader = MessageReader(stream)
         self.server = server
         self.game_id = game_id
         stream.set_close_callback(self.on_connection_close)
@@ -116,7 +119,7 @@ class ConnectionHandler:
     def read_stream(self):
         """ Read the next message from the stream """
         messages = []
-        in_message = yield DaideMessage.from_stream(self.stream)
+        in_message = yield self.reader.read_message()
 
         if in_message and in_message.is_valid:
             message_handler = self.message_mapping.get(in_message.message_type, None)
@@ -132,8 +135,9 @@ class ConnectionHandler:
             err_message.error_code = in_message.error_code
             messages = [err_message]
 
-        for message in messages:
-            yield self.write_message(message)
+        # Sending all messages with a single write
+        if messages:
+            yield self.stream.write(encode_messages(messages))
 
     # Added for compatibility with WebSocketHandler interface
     def write_message(self, message, binary=True):
@@ -142,7 +146,8 @@ class ConnectionHandler:
             future = self.stream.write(message)
         else:
             if isinstance(message, notifications.DaideNotification):
-                LOGGER.info('[%d] notification:[%s]', self._socket_no, bytes_to_str(bytes(message)))
+                if LOGGER.isEnabledFor(logging.INFO):
+                    LOGGER.info('[%d] notification:[%s]', self._socket_no, bytes_to_str(bytes(message)))
                 notification = message
                 message = DiplomacyMessage()
                 message.content = bytes(notification)
@@ -176,7 +181,8 @@ class ConnectionHandler:
         request = RequestBuilder.from_bytes(in_message.content)
 
         try:
-            LOGGER.info('[%d] request:[%s]', self._socket_no, bytes_to_str(in_message.content))
+            if LOGGER.isEnabledFor(logging.INFO):
+                LOGGER.info('[%d] request:[%s]', self._socket_no, bytes_to_str(in_message.content))
             request.game_id = self.game_id
             message_responses = yield request_managers.handle_request(self.server, request, self)
         except exceptions.ResponseException:
@@ -185,8 +191,9 @@ class ConnectionHandler:
         if message_responses:
             for response in message_responses:
                 response_bytes = bytes(response)
-                LOGGER.info('[%d] response:[%s]', self._socket_no, bytes_to_str(response_bytes) \
-                                                                   if response_bytes else None)
+                if LOGGER.isEnabledFor(logging.INFO):
+                    LOGGER.info('[%d] response:[%s]', self._socket_no, bytes_to_str(response_bytes) \
+                                                                       if response_bytes else None)
                 message = DiplomacyMessage()
                 message.content = response_bytes
                 messages.append(message)
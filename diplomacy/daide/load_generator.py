@@ -0,0 +1,369 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Load generator for DAIDE servers.
+
+    Starts an in-process server (with in-memory persistence), creates many games with a DAIDE server each, and
+    plays them with scripted DAIDE bots (7 bots per game, each bot using its own TCP connection). Each bot sends
+    NME, MDF and YES (MAP) to join its game, then, at each phase, optionally sends press (SND), submits random
+    orders (SUB) and sets its go flag (GOF).
+
+    Bots pick random orders from the in-process server game, so that they don't have to rebuild the game
+    from DAIDE notifications.
+
+    Measured values:
+
+    - DAIDE messages per second (messages sent and received by bots),
+    - request latency (time between request writing and reception of the first response),
+    - phase latency (time between the last go flag sent for a phase and the reception of next position),
+    - memory per connection (memory allocated while bots connect and join games, divided by number of
+      connections; as bots run in the same process, it includes both ends of each connection).
+
+    Usage:
+
+    .. code-block:: bash
+
+        python -m diplomacy.daide.load_generator --games 10 --phases 6 --messages 2
+"""
+import argparse
+from collections import deque
+import logging
+import random
+import time
+import tracemalloc
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+from tornado.tcpclient import TCPClient
+
+from diplomacy.daide import clauses, tokens
+from diplomacy.daide.messages import DaideMessage, DiplomacyMessage, InitialMessage
+from diplomacy.daide.tokens import Token
+from diplomacy.daide.utils import str_to_bytes
+from diplomacy.server.load_generator import get_free_port, summarize, PASSWORD_HASH_ROUNDS
+from diplomacy.server.server import Server
+from diplomacy.server.server_game import ServerGame
+from diplomacy.utils import common, splitter
+
+LOGGER = logging.getLogger(__name__)
+
+HOSTNAME = 'localhost'
+
+# Requests sent by all bots.
+NAME_REQUEST = str_to_bytes('NME ( L o a d B o t ) ( v 1 )')
+MAP_DEFINITION_REQUEST = str_to_bytes('MDF')
+ACCEPT_MAP_REQUEST = str_to_bytes('YES ( MAP ( s t a n d a r d ) )')
+GO_FLAG_REQUEST = str_to_bytes('GOF')
+
+# Lead tokens (as bytes) used to dispatch messages received by bots.
+YES_BYTES, REJ_BYTES, THX_BYTES, MIS_BYTES = (bytes(Token(token)) for token in (tokens.YES, tokens.REJ,
+                                                                               tokens.THX, tokens.MIS))
+MAP_BYTES, MDF_BYTES, HLO_BYTES, NOW_BYTES = (bytes(Token(token)) for token in (tokens.MAP, tokens.MDF,
+                                                                               tokens.HLO, tokens.NOW))
+OFF_BYTES, SMR_BYTES = bytes(Token(tokens.OFF)), bytes(Token(tokens.SMR))
+OPE_PAR_BYTES, CLO_PAR_BYTES = bytes(Token(tokens.OPE_PAR)), bytes(Token(tokens.CLO_PAR))
+
+# Lead tokens of first response expected for each request sent by bots.
+ACCEPT_OR_REJECT = (YES_BYTES, REJ_BYTES)
+ORDER_RESULTS = (THX_BYTES, MIS_BYTES, REJ_BYTES)
+MAP_DEFINITION = (MDF_BYTES, REJ_BYTES)
+
+class DaideLoadStats:
+    """ Values collected while running DAIDE load generator.
+
+        Properties:
+
+        - **request_latencies**: list of request latencies (seconds).
+        - **phase_latencies**: list of phase latencies (seconds).
+        - **last_go_flag_time**: dictionary mapping a game ID and a position index to time when
+          last go flag was sent for this position.
+        - **nb_sent**: number of DAIDE messages sent by bots.
+        - **nb_received**: number of DAIDE messages received by bots.
+    """
+    __slots__ = ['request_latencies', 'phase_latencies', 'last_go_flag_time', 'nb_sent', 'nb_received']
+
+    def __init__(self):
+        self.request_latencies = []
+        self.phase_latencies = []
+        self.last_go_flag_time = {}
+        self.nb_sent = 0
+        self.nb_received = 0
+
+class DaideBot:
+    """ Scripted DAIDE client playing one power with random orders.
+
+        Properties:
+
+        - **server_game**: server game played by bot (used to pick random orders).
+        - **nb_phases**: number of phases to play.
+        - **nb_messages**: number of press messages to send at each movement phase.
+        - **stats**: DaideLoadStats object to update.
+        - **stream**: TCP stream connected to DAIDE server.
+        - **power_name**: name of power controlled by bot (known once HLO is received).
+        - **joined**: future done when bot has joined the game (or was rejected).
+        - **pending_requests**: queue of (expected response lead tokens, writing time) for requests sent.
+        - **nb_positions**: number of NOW notifications received.
+        - **last_phase**: last phase played by bot.
+    """
+    __slots__ = ['server_game', 'nb_phases', 'nb_messages', 'stats', 'stream', 'power_name', 'joined',
+                 'pending_requests', 'nb_positions', 'last_phase']
+
+    def __init__(self, server_game, nb_phases, nb_messages, stats):
+        """ Initialize a bot.
+
+            :param server_game: server game to play.
+            :param nb_phases: number of phases to play.
+            :param nb_messages: number of press messages to send at each movement phase.
+            :param stats: DaideLoadStats object to update.
+            :type server_game: diplomacy.server.server_game.ServerGame
+            :type stats: DaideLoadStats
+        """
+        self.server_game = server_game
+        self.nb_phases = nb_phases
+        self.nb_messages = nb_messages
+        self.stats = stats
+        self.stream = None
+        self.power_name = None
+        self.joined = Future()
+        self.pending_requests = deque()
+        self.nb_positions = 0
+        self.last_phase = None
+
+    def send_request(self, request_bytes, expected_responses=None):
+        """ Write a diplomacy message with given request bytes into bot stream.
+
+            :param request_bytes: DAIDE request bytes.
+            :param expected_responses: lead tokens bytes of first response expected for this request,
+                or None if server does not reply to this request.
+            :return: a future done when message is written.
+        """
+        message = DiplomacyMessage()
+        message.content = request_bytes
+        if expected_responses:
+            self.pending_requests.append((expected_responses, time.perf_counter()))
+        self.stats.nb_sent += 1
+        return self.stream.write(bytes(message))
+
+    @gen.coroutine
+    def play(self, port, ready):
+        """ Connect to DAIDE server and play until given number of phases is played or game is over.
+
+            :param port: DAIDE server port.
+            :param ready: future to wait before playing first phase.
+        """
+        try:
+            self.stream = yield TCPClient().connect(HOSTNAME, port)
+            yield self.stream.write(bytes(InitialMessage()))
+            yield DaideMessage.from_stream(self.stream)                         # Representation message
+            yield self.send_request(NAME_REQUEST, ACCEPT_OR_REJECT)
+
+            while True:
+                message = yield DaideMessage.from_stream(self.stream)
+                reception_time = time.perf_counter()
+                self.stats.nb_received += 1
+                if not message.content:
+                    continue
+                lead_bytes = message.content[:2]
+
+                # Request latency.
+                if self.pending_requests and lead_bytes in self.pending_requests[0][0]:
+                    _, writing_time = self.pending_requests.popleft()
+                    self.stats.request_latencies.append(reception_time - writing_time)
+
+                if lead_bytes == MAP_BYTES:
+                    yield self.send_request(MAP_DEFINITION_REQUEST, MAP_DEFINITION)
+                elif lead_bytes == MDF_BYTES:
+                    yield self.send_request(ACCEPT_MAP_REQUEST)
+                elif lead_bytes == HLO_BYTES:
+                    power, _ = clauses.parse_bytes(clauses.Power, message.content[4:6])
+                    self.power_name = str(power)
+                    self.joined.set_result(None)
+                elif lead_bytes == NOW_BYTES:
+                    self.nb_positions += 1
+                    self.on_new_position(reception_time)
+                    if self.nb_positions > self.nb_phases:
+                        break
+                    yield ready
+                    yield self.play_phase()
+                elif lead_bytes in (OFF_BYTES, SMR_BYTES, REJ_BYTES) and self.power_name is None:
+                    LOGGER.warning('DAIDE bot could not join game %s.', self.server_game.game_id)
+                    break
+                elif lead_bytes in (OFF_BYTES, SMR_BYTES):
+                    break
+        except StreamClosedError:
+            LOGGER.warning('DAIDE bot stream closed.')
+        finally:
+            if not self.joined.done():
+                self.joined.set_result(None)
+            if self.stream is not None:
+                self.stream.close()
+
+    def on_new_position(self, reception_time):
+        """ Register phase latency for current position (only first bot of a game to receive position does it). """
+        go_flag_time = self.stats.last_go_flag_time.pop((self.server_game.game_id, self.nb_positions - 1), None)
+        if go_flag_time is not None:
+            self.stats.phase_latencies.append(reception_time - go_flag_time)
+
+    @gen.coroutine
+    def play_phase(self):
+        """ Send press, random orders and go flag for current game phase. """
+        game = self.server_game
+        phase = game.get_current_phase()
+        orderable_locations = game.get_orderable_locations(self.power_name)
+
+        # Many positions may be received at once (e.g. after phases where bot had nothing to order),
+        # so a phase is played only once, and only if bot has something to order.
+        if phase == self.last_phase or not orderable_locations or not game.is_game_active:
+            return
+        self.last_phase = phase
+        power_bytes = bytes(clauses.parse_string(clauses.Power, self.power_name))
+
+        if game.phase_type == 'M':
+            if self.nb_messages and not game.no_press:
+                other_power_names = [power_name for power_name in game.powers if power_name != self.power_name]
+                for _ in range(self.nb_messages):
+                    recipient_bytes = bytes(clauses.parse_string(clauses.Power, random.choice(other_power_names)))
+                    press_bytes = b''.join([bytes(Token(tokens.SND)),
+                                            OPE_PAR_BYTES, recipient_bytes, CLO_PAR_BYTES,
+                                            OPE_PAR_BYTES, bytes(Token(tokens.PRP)),
+                                            OPE_PAR_BYTES, bytes(Token(tokens.PCE)),
+                                            OPE_PAR_BYTES, power_bytes, recipient_bytes, CLO_PAR_BYTES,
+                                            CLO_PAR_BYTES, CLO_PAR_BYTES])
+                    yield self.send_request(press_bytes, ACCEPT_OR_REJECT)
+
+            # Random holds and moves (other order types would require to know foreign units powers).
+            possible_orders = game.get_all_possible_orders()
+            orders_bytes = []
+            for location in orderable_locations:
+                orders = [order for order in possible_orders[location]
+                          if order.endswith(' H') or (' - ' in order and not order.endswith(' VIA'))]
+                if orders:
+                    order = splitter.OrderSplitter(random.choice(orders))
+                    order.unit = ' '.join([self.power_name, order.unit])
+                    orders_bytes.extend([OPE_PAR_BYTES, clauses.parse_order_to_bytes('M', order), CLO_PAR_BYTES])
+            if orders_bytes:
+                yield self.send_request(bytes(Token(tokens.SUB)) + b''.join(orders_bytes), ORDER_RESULTS)
+
+        # Go flag (server submits empty orders for retreat and adjustment phases).
+        self.stats.last_go_flag_time[(game.game_id, self.nb_positions)] = time.perf_counter()
+        yield self.send_request(GO_FLAG_REQUEST, ACCEPT_OR_REJECT)
+
+def run(nb_games=1, nb_phases=4, nb_messages=0, port=None):
+    """ Start a server with one DAIDE server per game, play given number of games concurrently with DAIDE bots,
+        stop server and return results.
+
+        :param nb_games: number of games to play concurrently.
+        :param nb_phases: number of phases to play in each game.
+        :param nb_messages: number of press messages sent by each bot at each movement phase.
+            If 0, games are played with rule NO_PRESS.
+        :param port: (optional) port where server must run. If not given, a free port is selected.
+        :return: a dictionary of results.
+    """
+    port = port or get_free_port()
+    stats = DaideLoadStats()
+    io_loop = IOLoop()
+    common.Tornado.stop_loop_on_callback_error(io_loop)
+    server = Server(password_hash_rounds=PASSWORD_HASH_ROUNDS)
+    rules = ['POWER_CHOICE', 'IGNORE_ERRORS']
+    if not nb_messages:
+        rules.append('NO_PRESS')
+    results = {}
+
+    @gen.coroutine
+    def main():
+        """ Play all games, then stop IO loop. """
+        try:
+            server_games = []
+            for _ in range(nb_games):
+                server_game = ServerGame(map_name='standard', n_controls=7, rules=rules, server=server)
+                server.add_new_game(server_game)
+                server_games.append((server_game, server.start_new_daide_server(server_game.game_id)))
+            history_sizes = [len(server_game.state_history) for server_game, _ in server_games]
+
+            # Connecting bots.
+            ready = Future()
+            tracemalloc.start()
+            memory_before, _ = tracemalloc.get_traced_memory()
+            bots, playing = [], []
+            for server_game, daide_port in server_games:
+                for _ in range(7):
+                    bot = DaideBot(server_game, nb_phases, nb_messages, stats)
+                    bots.append(bot)
+                    playing.append(bot.play(daide_port, ready))
+            yield [bot.joined for bot in bots]
+            memory_after, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results['memory_per_connection'] = (memory_after - memory_before) / len(bots)
+
+            # Playing.
+            start_time = time.perf_counter()
+            ready.set_result(None)
+            yield playing
+            results['duration'] = time.perf_counter() - start_time
+            results['phases'] = sum(len(server_game.state_history) - history_size
+                                    for (server_game, _), history_size in zip(server_games, history_sizes))
+
+            # Letting server handle bots disconnections.
+            while server.users.count_connections():
+                yield gen.sleep(0.01)
+        finally:
+            io_loop.stop()
+
+    io_loop.add_callback(main)
+    server.start(port=port, io_loop=io_loop)
+    server.stop()
+    io_loop.close()
+    if 'duration' not in results:
+        raise RuntimeError('DAIDE load generator did not complete.')
+
+    duration = results['duration']
+    nb_messages_exchanged = stats.nb_sent + stats.nb_received
+    results.update({'games': nb_games,
+                    'connections': 7 * nb_games,
+                    'messages': nb_messages_exchanged,
+                    'messages_per_second': nb_messages_exchanged / duration if duration else 0.,
+                    'request_latency': summarize(stats.request_latencies),
+                    'phase_latency': summarize(stats.phase_latencies)})
+    return results
+
+def print_results(results):
+    """ Print results returned by function run(). """
+    print('Games: %d, connections: %d, phases processed: %d, duration: %.3f s' % (
+        results['games'], results['connections'], results['phases'], results['duration']))
+    print('Messages: %d (%.1f messages/s)' % (results['messages'], results['messages_per_second']))
+    print('Memory per connection: %.1f KiB' % (results['memory_per_connection'] / 1024))
+    for key, title in (('request_latency', 'Request latency'),
+                       ('phase_latency', 'Phase latency')):
+        summary = results[key]
+        print('%s (ms): mean %.2f, p50 %.2f, p99 %.2f, max %.2f (%d values)' % (
+            title, 1000 * summary['mean'], 1000 * summary['p50'], 1000 * summary['p99'], 1000 * summary['max'],
+            summary['count']))
+
+def main():
+    """ Parse command line arguments and run DAIDE load generator. """
+    parser = argparse.ArgumentParser(description='Run a diplomacy server and load it with DAIDE bots.')
+    parser.add_argument('--games', type=int, default=1, help='number of concurrent games (default: 1)')
+    parser.add_argument('--phases', type=int, default=4, help='number of phases played per game (default: 4)')
+    parser.add_argument('--messages', type=int, default=0,
+                        help='number of messages sent by each bot per movement phase (default: 0, no press)')
+    parser.add_argument('--port', type=int, default=None, help='server port (default: a free port)')
+    args = parser.parse_args()
+    print_results(run(nb_games=args.games, nb_phases=args.phases, nb_messages=args.messages, port=args.port))
+
+if __name__ == '__main__':
+    main()
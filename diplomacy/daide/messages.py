@@ -18,11 +18,15 @@
 from abc import ABCMeta, abstractmethod
 from enum import Enum
 import logging
+import struct
 from tornado import gen
 
 # Constants
 DAIDE_VERSION = 1
 LOGGER = logging.getLogger(__name__)
+HEADER_STRUCT = struct.Struct('>BxH')                   # Message type, Pad, Remaining Length (2x)
+HEADER_SIZE = HEADER_STRUCT.size
+INITIAL_READ_BUFFER_SIZE = 1024
 
 class MessageType(Enum):
     """ Enumeration of message types """
@@ -60,10 +64,34 @@ class DaideMessage(metaclass=ABCMeta):
         self.content = b''
 
     @abstractmethod
+    def parse(self, data):
+        """ Builds a message from its content (i.e. the bytes following the header)
+
+            :param data: The message content. Might be a view on a reused buffer, so it must be copied if kept.
+            :type data: bytes | memoryview
+        """
+        raise NotImplementedError()
+
     @gen.coroutine
     def build(self, stream, remaining_length):
         """ Builds a message from a stream and its declared length """
-        raise NotImplementedError()
+        data = (yield stream.read_bytes(remaining_length)) if remaining_length else b''
+        self.parse(data)
+
+    @staticmethod
+    def from_header(header):
+        """ Creates an empty message from a message header
+
+            :param header: The 4 header bytes (Message type, Pad, Remaining Length (2x))
+            :return: A tuple with the (unparsed) message and the length of its content
+        """
+        message_type, remaining_length = HEADER_STRUCT.unpack_from(header)
+        message_cls = MESSAGE_CLASSES.get(message_type, None)
+
+        # Invalid message type
+        if message_cls is None:
+            raise ValueError('Unknown Message Type %d' % message_type)
+        return message_cls(), remaining_length
 
     @staticmethod
     @gen.coroutine
@@ -76,26 +104,45 @@ class DaideMessage(metaclass=ABCMeta):
         if stream.reading():
             return None
 
-        data = yield stream.read_bytes(4)                               # Message type, Pad, Remaining Length (2x)
+        data = yield stream.read_bytes(HEADER_SIZE)
+        message, remaining_length = DaideMessage.from_header(data)
+        yield message.build(stream, remaining_length)
+        return message
 
-        # Parsing data
-        message_type = data[0]
-        remaining_length = data[2] * 256 + data[3]
+class MessageReader:
+    """ Reads messages from a stream into a single buffer reused for the whole connection.
+        The header and the content of each message are read in place (with stream.read_into()),
+        so only the content of diplomacy messages is copied out of the buffer.
+        The buffer starts small and grows to the size of the largest message received.
+    """
+    __slots__ = ['stream', 'buffer', 'view']
 
-        # Creating message
-        message_cls = {MessageType.INITIAL.value: InitialMessage,
-                       MessageType.REPRESENTATION.value: RepresentationMessage,
-                       MessageType.DIPLOMACY.value: DiplomacyMessage,
-                       MessageType.FINAL.value: FinalMessage,
-                       MessageType.ERROR.value: ErrorMessage}.get(message_type, None)
+    def __init__(self, stream, buffer_size=INITIAL_READ_BUFFER_SIZE):
+        """ Constructor
 
-        # Invalid message type
-        if message_cls is None:
-            raise ValueError('Unknown Message Type %d' % message_type)
+            :param stream: An opened Tornado stream.
+            :param buffer_size: The initial size of the read buffer (in bytes).
+            :type stream: tornado.iostream.BaseIOStream
+        """
+        self.stream = stream
+        self.buffer = bytearray(max(buffer_size, HEADER_SIZE))
+        self.view = memoryview(self.buffer)
 
-        # Otherwise, return message
-        message = message_cls()
-        yield message.build(stream, remaining_length)
+    @gen.coroutine
+    def read_message(self):
+        """ Reads the next message from the stream. Returns None if the stream is already being read. """
+        if self.stream.reading():
+            return None
+
+        yield self.stream.read_into(self.view[:HEADER_SIZE])
+        message, remaining_length = DaideMessage.from_header(self.buffer)
+        if HEADER_SIZE + remaining_length > len(self.buffer):
+            self.buffer = bytearray(HEADER_SIZE + remaining_length)
+            self.view = memoryview(self.buffer)
+        content = self.view[HEADER_SIZE:HEADER_SIZE + remaining_length]
+        if remaining_length:
+            yield self.stream.read_into(content)
+        message.parse(content)
         return message
 
 class InitialMessage(DaideMessage):
@@ -113,17 +160,15 @@ class InitialMessage(DaideMessage):
                       0, DAIDE_VERSION,                         # Daide version (2 bytes)
                       0xDA, 0x10])                              # Magic Number (2 bytes)
 
-    @gen.coroutine
-    def build(self, stream, remaining_length):
-        """ Builds a message from a stream and its declared length """
+    def parse(self, data):
+        """ Builds a message from its content """
         # Checking length
-        if remaining_length != 4:
-            LOGGER.error('Expected 4 bytes remaining in initial message. Got %d. Aborting.', remaining_length)
+        if len(data) != 4:
+            LOGGER.error('Expected 4 bytes remaining in initial message. Got %d. Aborting.', len(data))
             self.is_valid = False
             return
 
-        # Getting data and validating version
-        data = yield stream.read_bytes(remaining_length)        # Version (x2) - Magic Number (x2)
+        # Validating version (x2) - Magic Number (x2)
         version = data[0] * 256 + data[1]
         magic_number = data[2] * 256 + data[3]
 
@@ -155,11 +200,8 @@ class RepresentationMessage(DaideMessage):
                       0,                                        # Padding
                       0, 0])                                    # Remaining length (2 bytes)
 
-    @gen.coroutine
-    def build(self, stream, remaining_length):
-        """ Builds a message from a stream and its declared length """
-        if remaining_length:
-            yield stream.read_bytes(remaining_length)
+    def parse(self, data):
+        """ Builds a message from its content """
         self.is_valid = False
         self.error_code = ErrorCode.RM_SENT_BY_CLIENT
 
@@ -175,23 +217,17 @@ class DiplomacyMessage(DaideMessage):
         if not self.is_valid:
             return bytes()
 
-        header = bytes([MessageType.DIPLOMACY.value,                            # Message Type
-                        0,                                                      # Padding
-                        len(self.content) // 256, len(self.content) % 256])     # Remaining length
+        return HEADER_STRUCT.pack(MessageType.DIPLOMACY.value, len(self.content)) + self.content
 
-        return header + self.content
-
-    @gen.coroutine
-    def build(self, stream, remaining_length):
-        """ Builds a message from a stream and its declared length """
-        if remaining_length < 2 or remaining_length % 2 == 1:
+    def parse(self, data):
+        """ Builds a message from its content """
+        if len(data) < 2 or len(data) % 2 == 1:
             self.is_valid = False
-            if remaining_length:
-                yield stream.read_bytes(remaining_length)
-            LOGGER.warning('Got a diplomacy message of length %d. Ignoring.', remaining_length)
+            LOGGER.warning('Got a diplomacy message of length %d. Ignoring.', len(data))
+            return
 
-        # Getting data
-        self.content = yield stream.read_bytes(remaining_length)
+        # Copying data (it might be a view on a reused buffer)
+        self.content = bytes(data)
 
 class FinalMessage(DaideMessage):
     """ Final message sent/received by/from the server """
@@ -206,11 +242,8 @@ class FinalMessage(DaideMessage):
                       0,                                        # Padding
                       0, 0])                                    # Remaining length (2 bytes)
 
-    @gen.coroutine
-    def build(self, stream, remaining_length):
-        """ Builds a message from a stream and its declared length """
-        if remaining_length:
-            yield stream.read_bytes(remaining_length)
+    def parse(self, data):
+        """ Builds a message from its content """
 
 class ErrorMessage(DaideMessage):
     """ Error message sent/received by/from the server """
@@ -227,14 +260,22 @@ class ErrorMessage(DaideMessage):
                       0, 2,                                     # Remaining length (2 bytes)
                       0, error_code])                           # Error code (2 bytes)
 
-    @gen.coroutine
-    def build(self, stream, remaining_length):
-        """ Builds a message from a stream and its declared length """
-        if remaining_length != 2:
+    def parse(self, data):
+        """ Builds a message from its content """
+        if len(data) != 2:
             self.is_valid = False
-            yield stream.read_bytes(remaining_length)
             return
 
         # Parsing error
-        data = yield stream.read_bytes(remaining_length)
         self.error_code = ErrorCode(data[1])
+
+def encode_messages(messages):
+    """ Converts a list of messages to a single byte array, to send them with a single stream write """
+    return b''.join([bytes(message) for message in messages])
+
+# Mapping from message type value to message class
+MESSAGE_CLASSES = {MessageType.INITIAL.value: InitialMessage,
+                   MessageType.REPRESENTATION.value: RepresentationMessage,
+                   MessageType.DIPLOMACY.value: DiplomacyMessage,
+                   MessageType.FINAL.value: FinalMessage,
+                   MessageType.ERROR.value: ErrorMessage}
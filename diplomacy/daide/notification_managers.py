@@ -80,7 +80,7 @@ def _build_completed_notifications(server_users, has_draw_vote, powers, state_hi
                              if not powers_year_of_elimination[power_name] and
                              (all(unit.startswith('*') for unit in units) or not units)]
         for power_name in eliminated_powers:
-            powers_year_of_elimination[power_name] = splitter.PhaseSplitter(phase.value).year
+            powers_year_of_elimination[power_name] = splitter.PhaseSplitter(phase).year
 
     years_of_elimination = [powers_year_of_elimination[power_name] for power_name in sorted(powers_year_of_elimination)]
     notifs.append(notifications.SMR(last_phase.input_str, powers, daide_users, years_of_elimination))
@@ -19,7 +19,7 @@ from diplomacy.communication.requests import _AbstractGameRequest
 from diplomacy.daide.clauses import String, Number, Power, Order, Turn, SingleToken, strip_parentheses, \
     break_next_group, parse_bytes
 from diplomacy.daide import tokens
-from diplomacy.daide.tokens import Token, is_ascii_token
+from diplomacy.daide.tokens import Token, decode_tokens, is_ascii_token
 from diplomacy.utils import parsing, strings
 
 class RequestBuilder:
@@ -66,15 +66,15 @@ class DaideRequest(_AbstractGameRequest):
         self._bytes = daide_bytes
 
         # Building str representation
-        while daide_bytes:
-            token = Token(from_bytes=(daide_bytes[0], daide_bytes[1]))
+        buffer = []
+        for token in decode_tokens(daide_bytes):
             new_str = str(token)
-            daide_bytes = daide_bytes[2:]
-            pad = '' if (not self._str
-                         or self._str[-1] == '('
+            pad = '' if (not buffer
+                         or buffer[-1][-1] == '('
                          or new_str == ')'
                          or (is_ascii_token(token) and new_str != '(')) else ' '
-            self._str = self._str + pad + new_str
+            buffer.append(pad + new_str)
+        self._str = self._str + ''.join(buffer)
 
 
 # ====================
@@ -388,7 +388,7 @@ def run_game_data(nb_daide_clients, rules, csv_file):
         server.start_new_daide_server(game_id)
 
         # Creating human player
-        human_username = 'username'
+        human_username = 'user'
         human_password = 'password'
 
         # Creating bot player to play for dummy powers
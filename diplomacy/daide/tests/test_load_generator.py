@@ -0,0 +1,29 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test DAIDE load generator """
+from diplomacy.daide import load_generator
+
+def test_load_generator():
+    """ Test a small DAIDE load generator run (2 games, 3 phases, with press). """
+    results = load_generator.run(nb_games=2, nb_phases=3, nb_messages=1)
+    assert results['games'] == 2
+    assert results['connections'] == 14
+    assert results['phases'] == 6
+    assert results['messages'] > 0
+    assert results['request_latency']['count'] > 0
+    assert results['phase_latency']['count'] > 0
+    assert results['memory_per_connection'] > 0
@@ -0,0 +1,43 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Tests for notification managers """
+from diplomacy import Game
+from diplomacy.daide import notification_managers, notifications
+from diplomacy.daide.utils import bytes_to_str
+from diplomacy.server.users import Users
+
+def test_completed_game_with_eliminated_power():
+    """ Tests the notifications sent when a game in which a power was eliminated is completed """
+    game = Game()
+    game.clear_units('FRANCE')
+    game.clear_centers('FRANCE')
+    game.process()
+    game.process()
+    game.draw()
+    powers = [game.powers[power_name] for power_name in sorted(game.powers)]
+
+    # pylint: disable=protected-access
+    notifs = notification_managers._build_completed_notifications(Users(), True, powers, game.state_history)
+    assert [type(notif) for notif in notifs] == [notifications.DRW, notifications.SMR, notifications.OFF]
+    assert bytes_to_str(bytes(notifs[1])) == ('SMR ( SPR #1902 ) '
+                                              '( AUS ( d u m m y ) ( v 0 . 0 . 0 ) #3 ) '
+                                              '( ENG ( d u m m y ) ( v 0 . 0 . 0 ) #3 ) '
+                                              '( FRA ( d u m m y ) ( v 0 . 0 . 0 ) #0 #1901 ) '
+                                              '( GER ( d u m m y ) ( v 0 . 0 . 0 ) #3 ) '
+                                              '( ITA ( d u m m y ) ( v 0 . 0 . 0 ) #3 ) '
+                                              '( RUS ( d u m m y ) ( v 0 . 0 . 0 ) #4 ) '
+                                              '( TUR ( d u m m y ) ( v 0 . 0 . 0 ) #3 )')
@@ -764,6 +764,18 @@ def test_snd_009():
     assert request.powers == ['FRANCE', 'GERMANY']
     assert request.message_bytes == str_to_bytes('HUH ( ERR PRP ( ALY ( FRA ENG GER ) VSS ( ITA ) ) )')
 
+def test_snd_010():
+    """ Tests the SND request """
+    daide_str = 'SND ( GER ) ( PRP ( PCE ( ENG GER ) ) )'
+    expected_str = 'SND (GER) (PRP (PCE (ENG GER)))'
+    request = RequestBuilder.from_bytes(str_to_bytes(daide_str))
+    assert isinstance(request, requests.SND), 'Expected a SND request'
+    assert bytes(request) == str_to_bytes(daide_str)
+    assert str(request) == expected_str
+    assert request.phase == ''
+    assert request.powers == ['GERMANY']
+    assert request.message_bytes == str_to_bytes('PRP ( PCE ( ENG GER ) )')
+
 def test_not_sub():
     """ Tests the NOT request """
     daide_str = 'NOT ( SUB )'
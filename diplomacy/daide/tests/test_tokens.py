@@ -16,7 +16,7 @@
 # ==============================================================================
 """ Tests the DAIDE tokens"""
 from enum import Enum
-from diplomacy.daide.tokens import Token
+from diplomacy.daide.tokens import Token, decode_tokens, token_from_bytes
 
 class ExpectedTokens(Enum):
     """ Copy of the tokens definition from aiclient/adjudicator/TOKENS.h """
@@ -266,3 +266,26 @@ def test_tokens():
         assert str(token_from_bytes) == token_str
         assert bytes(token_from_str) == token_bytes
         assert bytes(token_from_bytes) == token_bytes
+
+def test_integer_tokens():
+    """ Test integer tokens, including negative values """
+    for value in (0, 1, 42, 8191, -1, -42, -8192):
+        token_bytes = bytes(Token(from_int=value))
+        assert int(token_from_bytes(token_bytes)) == value
+        assert str(token_from_bytes(token_bytes)) == str(value)
+
+def test_negative_integer_token_from_int():
+    """ Test that tokens built from negative integers keep their value (e.g. not 8191 for -1) """
+    for value, token_bytes in ((-1, b'\x3f\xff'), (-42, b'\x3f\xd6'), (-8192, b'\x20\x00')):
+        token = Token(from_int=value)
+        assert bytes(token) == token_bytes
+        assert int(token) == value
+        assert str(token) == str(value)
+        assert token == Token(from_bytes=token_bytes)
+
+def test_decode_tokens():
+    """ Test decoding a byte array into interned tokens """
+    daide_bytes = b''.join(token.value.to_bytes(2, byteorder='big') for token in ExpectedTokens)
+    decoded = decode_tokens(memoryview(daide_bytes))
+    assert [str(token) for token in decoded] == [token.name[-3:] for token in ExpectedTokens]
+    assert decode_tokens(daide_bytes)[0] is decoded[0]
@@ -15,11 +15,17 @@
 #  with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ==============================================================================
 """ Contains the list of valid tokens and their byte representation """
+import struct
 
 # Constants
 BYTES_TO_STR = {}         # (0x46, 0x04) -> 'ECS'
 STR_TO_BYTES = {}         # 'ECS' -> (0x46, 0x04)
 ASCII_BYTE = 0x4B         # Byte identifying an ASCII char
+TOKEN_STRUCT = struct.Struct('>H')  # A token is encoded as a big-endian 16 bits code.
+
+# Table of interned tokens, indexed by token code (i.e. first byte * 256 + second byte).
+# Table is filled when a token code is decoded for the first time (see function get_token()).
+TOKENS_BY_CODE = [None] * 65536
 
 # Utilities
 class Token:
@@ -77,22 +83,14 @@ class Token:
         if from_int > 8191 or from_int < -8192:
             raise ValueError('Valid values for strings are -8192 to +8191.')
 
-        # Negative numbers start with a 1
-        prefix = '0'
-        if from_int < 0:
-            prefix = '1'
-            from_int += 8192
-
-        # Encoding the number as 14 bit. + a prefix of '00' for a total of 16 bit
-        bit_encoding = bin(from_int)[2:]
-        bit_encoding = '00' + prefix + '0' * (13 - len(bit_encoding)) + bit_encoding
+        # Encoding the number as 14 bit two's complement, with a prefix of '00' for a total of 16 bit
         self.repr_str = str(from_int)
         self.repr_int = from_int
-        self.repr_bytes = bytes((int(bit_encoding[0:8], 2), int(bit_encoding[8:16], 2)))
+        self.repr_bytes = TOKEN_STRUCT.pack(from_int & 0x3FFF)
 
     def _load_from_bytes(self, from_bytes):
         """ Creates a token from its bytes representation """
-        if isinstance(from_bytes, tuple):
+        if not isinstance(from_bytes, bytes):
             from_bytes = bytes(from_bytes)
         if len(from_bytes) != 2:
             raise ValueError('Expected a couple of 2 bytes 0x000xFF. Got [{}]' \
@@ -108,12 +106,10 @@ class Token:
             self.repr_str = chr(from_bytes[1])
             self.repr_bytes = from_bytes
 
-        # Integer
+        # Integer - 14 bits two's complement
         elif from_bytes[0] < 64:
-            bin_0, bin_1 = bin(from_bytes[0])[2:], bin(from_bytes[1])[2:]
-            from_binary = '0' * (6 - len(bin_0)) + bin_0 + '0' * (8 - len(bin_1)) + bin_1
-            is_negative = int(from_binary[0] == '1')
-            self.repr_int = is_negative * -8192 + int(from_binary[1:14], 2)
+            code = from_bytes[0] << 8 | from_bytes[1]
+            self.repr_int = code - 0x4000 if code & 0x2000 else code
             self.repr_str = str(self.repr_int)
             self.repr_bytes = from_bytes
 
@@ -169,8 +165,41 @@ def register_token(str_repr, bytes_repr):
         raise ValueError('Bytes %s have already been registered.' % bytes_repr)
     STR_TO_BYTES[str_repr] = bytes_repr
     BYTES_TO_STR[bytes_repr] = str_repr
+    TOKENS_BY_CODE[TOKEN_STRUCT.unpack(bytes_repr)[0]] = None
     return Token(from_str=str_repr)
 
+def get_token(code):
+    """ Return the interned token with given code. Interned tokens are shared and must not be modified.
+
+        :param code: The token code, i.e. the integer value of the 2 bytes of the token (first byte * 256 + second byte)
+        :return: The token (instance of Token)
+    """
+    token = TOKENS_BY_CODE[code]
+    if token is None:
+        token = TOKENS_BY_CODE[code] = Token(from_bytes=TOKEN_STRUCT.pack(code))
+    return token
+
+def token_from_bytes(token_bytes):
+    """ Return the interned token with given bytes representation. Interned tokens are shared and must not be modified.
+
+        :param token_bytes: The bytes representation of the token (2 bytes)
+        :return: The token (instance of Token)
+    """
+    if len(token_bytes) != 2:
+        raise ValueError('Expected a couple of 2 bytes 0x000xFF. Got [{}]'
+                         .format(''.join([hex(b) for b in token_bytes])))
+    return get_token(token_bytes[0] << 8 | token_bytes[1])
+
+def decode_tokens(daide_bytes):
+    """ Decode a bytes representation into a list of interned tokens
+
+        :param daide_bytes: The DAIDE bytes (bytes, bytearray or memoryview) with an even length
+        :return: The list of tokens (interned tokens are shared and must not be modified)
+    """
+    nb_tokens = len(daide_bytes) // 2
+    return [TOKENS_BY_CODE[code] or get_token(code)
+            for code in struct.unpack_from('>%dH' % nb_tokens, daide_bytes)]
+
 
 # ------------------------
 # Registering tokens
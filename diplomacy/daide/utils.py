@@ -16,7 +16,7 @@
 # ==============================================================================
 """ Settings - Contains a list of utils to help handle DAIDE communication """
 from collections import namedtuple
-from diplomacy.daide.tokens import is_integer_token, Token
+from diplomacy.daide.tokens import decode_tokens, is_integer_token, Token
 
 ClientConnection = namedtuple('ClientConnection', ['username', 'daide_user', 'token', 'power_name'])
 
@@ -45,16 +45,16 @@ def str_to_bytes(daide_str):
 
         Note: Integers starts with a '#' character
     """
-    buffer = []
+    buffer = bytearray()
     str_split = daide_str.split(' ') if daide_str else []
     for word in str_split:
         if word == '':
-            buffer.append(bytes(Token(from_str=' ')))
+            buffer += bytes(Token(from_str=' '))
         elif word[0] == '#':
-            buffer.append(bytes(Token(from_int=int(word[1:]))))
+            buffer += bytes(Token(from_int=int(word[1:])))
         else:
-            buffer.append(bytes(Token(from_str=word)))
-    return b''.join(buffer)
+            buffer += bytes(Token(from_str=word))
+    return bytes(buffer)
 
 def bytes_to_str(daide_bytes):
     """ Converts a bytes into its str representation
@@ -64,12 +64,7 @@ def bytes_to_str(daide_bytes):
 
         Note: Integers starts with a '#' character
     """
-    buffer = []
-    length = len(daide_bytes) if daide_bytes else 0
-    for i in range(0, length, 2):
-        token = Token(from_bytes=(daide_bytes[i], daide_bytes[i + 1]))
-        if is_integer_token(token):
-            buffer.append('#' + str(token))
-        else:
-            buffer.append(str(token))
-    return ' '.join(buffer)
+    if not daide_bytes:
+        return ''
+    return ' '.join('#' + str(token) if is_integer_token(token) else str(token)
+                    for token in decode_tokens(daide_bytes))
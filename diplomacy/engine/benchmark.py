@@ -0,0 +1,385 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Engine micro-benchmarks
+
+    Measures the time taken by the main engine operations:
+
+    - map loading (cold and cached) for every map in ``diplomacy/maps``,
+    - ``get_all_possible_orders`` for each phase type (movement, retreats, adjustments), and in a movement phase
+      with cached possible orders, and after moving a single unit,
+    - ``set_orders`` validation,
+    - ``process()`` on DATC positions, on a movement phase and on a full random game (as in ``random_game.py``),
+    - ``to_saved_game_format`` / ``from_saved_game_format``,
+    - ``deepcopy`` of a game,
+    - SVG rendering.
+
+    Each benchmark is run ``repeat`` times, each run executing the benchmarked operation enough times to
+    last at least ``min_time`` seconds. Results (seconds per operation) are printed, and can be written to
+    a JSON file and compared to a baseline file written by a previous run. Any benchmark slower than its
+    baseline by more than the given tolerance is reported as a regression, and the command exits with an error.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python -m diplomacy.engine.benchmark --output baseline.json
+        python -m diplomacy.engine.benchmark --baseline baseline.json --tolerance 0.25
+        python -m diplomacy.engine.benchmark --filter map_load --filter process
+"""
+import argparse
+from copy import deepcopy
+import gc
+import os
+import platform
+import random
+import sys
+import time
+import ujson as json
+
+from diplomacy import settings
+from diplomacy.engine import map as map_module
+from diplomacy.engine.game import Game
+from diplomacy.engine.map import Map
+from diplomacy.engine.renderer import Renderer
+from diplomacy.engine.self_play import play_game, random_policy
+from diplomacy.utils.export import to_saved_game_format, from_saved_game_format
+
+# Constants
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_TOLERANCE = 0.25
+MAX_NUMBER = 10000
+RANDOM_GAME_MAX_PHASES = 60
+SEED = 0
+
+# DATC positions: (name, {power name: units}, {power name: orders})
+DATC_POSITIONS = [
+    ('6.C.3', {'TURKEY': ['F ANK', 'A CON', 'A SMY', 'A BUL']},
+     {'TURKEY': ['F ANK - CON', 'A CON - SMY', 'A SMY - ANK', 'A BUL - CON']}),
+    ('6.D.1', {'AUSTRIA': ['F ADR', 'A TRI'], 'ITALY': ['A VEN', 'A TYR']},
+     {'AUSTRIA': ['F ADR S A TRI - VEN', 'A TRI - VEN'], 'ITALY': ['A VEN H', 'A TYR S A VEN']}),
+    ('6.E.15', {'ENGLAND': ['F HOL', 'A RUH'], 'FRANCE': ['A KIE', 'A MUN', 'A SIL'],
+                'GERMANY': ['A BER', 'F DEN', 'F HEL'], 'RUSSIA': ['F BAL', 'A PRU']},
+     {'ENGLAND': ['F HOL S A RUH - KIE', 'A RUH - KIE'],
+      'FRANCE': ['A KIE - BER', 'A MUN S A KIE - BER', 'A SIL S A KIE - BER'],
+      'GERMANY': ['A BER - KIE', 'F DEN S A BER - KIE', 'F HEL S A BER - KIE'],
+      'RUSSIA': ['F BAL S A PRU - BER', 'A PRU - BER']}),
+    ('6.F.14', {'ENGLAND': ['F LON', 'F WAL'], 'FRANCE': ['A BRE', 'F ENG']},
+     {'ENGLAND': ['F LON S F WAL - ENG', 'F WAL - ENG'], 'FRANCE': ['A BRE - LON', 'F ENG C A BRE - LON']}),
+    ('6.F.24', {'ENGLAND': ['F EDI', 'F LON', 'F IRI', 'F MAO'], 'FRANCE': ['A BRE', 'F ENG', 'F BEL'],
+                'RUSSIA': ['A NWY', 'F NTH']},
+     {'ENGLAND': ['F EDI - NTH', 'F LON S F EDI - NTH', 'F IRI - ENG', 'F MAO S F IRI - ENG'],
+      'FRANCE': ['A BRE - LON', 'F ENG C A BRE - LON', 'F BEL S F ENG'],
+      'RUSSIA': ['A NWY - BEL', 'F NTH C A NWY - BEL']}),
+    ('6.G.8', {'FRANCE': ['A BEL'], 'ENGLAND': ['F NTH', 'A HOL']},
+     {'FRANCE': ['A BEL - HOL VIA'], 'ENGLAND': ['F NTH - HEL', 'A HOL - KIE']}),
+]
+
+class Benchmark:
+    """ A benchmarked operation.
+
+        Properties:
+
+        - **name**: name of the benchmark (e.g. 'map_load/cold/standard').
+        - **run**: callable executing the benchmarked operation. Receives the value returned by setup.
+        - **setup**: callable preparing the operation (not timed). Returns the value given to run.
+        - **fresh**: if True, setup is called before each execution of run (e.g. if run modifies its argument),
+          otherwise it is only called once.
+    """
+    __slots__ = ['name', 'run', 'setup', 'fresh']
+
+    def __init__(self, name, run, setup=None, fresh=False):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+        self.fresh = fresh
+
+def _game_from_state(state, orders=None):
+    """ Returns a new game with the given state (and orders) """
+    game = Game(map_name=state['map'], rules=state['rules'])
+    game.set_state(state)
+    for power_name, power_orders in (orders or {}).items():
+        game.set_orders(power_name, power_orders)
+    return game
+
+def _get_positions():
+    """ Plays a random game and returns its states at the first movement, retreats and adjustments phases
+        (with dislodged units, and with builds or disbands) after 1902, and the last state.
+
+        :return: A dictionary {phase type: (state, random orders)}, and the game
+    """
+    rng = random.Random(SEED)
+    game = Game()
+    positions = {}
+    while not game.is_game_done and len(positions) < 3:
+        possible_orders = game.get_all_possible_orders()
+        orders = {power_name: random_policy(game, power_name, possible_orders, rng) for power_name in game.powers}
+        phase_type = game.phase_type
+        if (phase_type not in positions
+                and int(game.get_current_phase()[1:5]) > 1902
+                and any(orders.values())
+                and (phase_type != 'R' or any(power.retreats for power in game.powers.values()))):
+            state = game.get_state()
+            state.update({'map': game.map_name, 'rules': list(game.rules)})
+            positions[phase_type] = (state, orders)
+        for power_name, power_orders in orders.items():
+            game.set_orders(power_name, power_orders)
+        game.process()
+    return positions, game
+
+def _warm_game_from_state(state):
+    """ Returns a new game with the given state, with its possible orders already computed """
+    game = _game_from_state(state)
+    game.get_all_possible_orders()
+    return game
+
+def _move_one_unit(game):
+    """ Moves a unit of the game to an adjacent location (and back on the next call) and returns the game """
+    for power in game.powers.values():
+        for unit in power.units:
+            dests = [dest for dest in sorted(game.map.abut_list(unit[2:])) if unit[0] == 'A'
+                     and dest.upper() == dest and game.map.area_type(dest) == 'LAND'
+                     and not game._occupant(dest, any_coast=1)]                   # pylint: disable=protected-access
+            if dests:
+                units = [other_unit for other_unit in power.units if other_unit != unit] + ['A ' + dests[0]]
+                game.set_units(power.name, units, reset=True)
+                return game
+    return game
+
+def _map_load_cold(map_name):
+    """ Loads a map without using the map cache """
+    cached_map = map_module.MAP_CACHE.pop(map_name, None)
+    try:
+        return Map(map_name, use_cache=False)
+    finally:
+        if cached_map is not None:
+            map_module.MAP_CACHE[map_name] = cached_map
+
+def _datc_games():
+    """ Returns the list of games set up with the DATC positions and orders """
+    games = []
+    for _, units, orders in DATC_POSITIONS:
+        game = Game()
+        game.clear_units()
+        for power_name, power_units in units.items():
+            game.set_units(power_name, power_units)
+        for power_name, power_orders in orders.items():
+            game.set_orders(power_name, power_orders)
+        games.append(game)
+    return games
+
+def _set_orders(game, orders):
+    """ Clears orders and sets the given orders """
+    game.clear_orders()
+    for power_name, power_orders in orders.items():
+        game.set_orders(power_name, power_orders)
+
+def get_benchmarks():
+    """ Returns the list of all benchmarks
+
+        :rtype: List[Benchmark]
+    """
+    benchmarks = []
+
+    # Maps
+    map_names = sorted(file_name[:-4] for file_name in os.listdir(os.path.join(settings.PACKAGE_DIR, 'maps'))
+                       if file_name.endswith('.map'))
+    for map_name in map_names:
+        benchmarks.append(Benchmark('map_load/cold/%s' % map_name, lambda _, name=map_name: _map_load_cold(name)))
+        benchmarks.append(Benchmark('map_load/cached/%s' % map_name, lambda _, name=map_name: Map(name)))
+
+    # Positions are computed only once, and only if a game benchmark is run
+    positions_cache = []
+
+    def get_position(phase_type):
+        """ Returns the (state, orders) of the position for given phase type """
+        if not positions_cache:
+            positions_cache.append(_get_positions()[0])
+        return positions_cache[0][phase_type]
+
+    for phase_type, phase_name in (('M', 'movement'), ('R', 'retreats'), ('A', 'adjustments')):
+        benchmarks.append(Benchmark('possible_orders/%s' % phase_name,
+                                    lambda game: game.get_all_possible_orders(),
+                                    setup=lambda phase_type=phase_type: _game_from_state(get_position(phase_type)[0]),
+                                    fresh=True))
+    benchmarks.append(Benchmark('possible_orders/movement_cached',
+                                lambda game: game.get_all_possible_orders(),
+                                setup=lambda: _warm_game_from_state(get_position('M')[0])))
+    benchmarks.append(Benchmark('possible_orders/movement_edit',
+                                lambda game: _move_one_unit(game).get_all_possible_orders(),
+                                setup=lambda: _warm_game_from_state(get_position('M')[0])))
+    benchmarks.append(Benchmark('set_orders',
+                                lambda args: _set_orders(*args),
+                                setup=lambda: (_game_from_state(get_position('M')[0]), get_position('M')[1])))
+
+    # Processing
+    benchmarks.append(Benchmark('process/datc',
+                                lambda games: [game.process() for game in games],
+                                setup=_datc_games,
+                                fresh=True))
+    benchmarks.append(Benchmark('process/movement',
+                                lambda game: game.process(),
+                                setup=lambda: _game_from_state(*get_position('M')),
+                                fresh=True))
+    benchmarks.append(Benchmark('process/random_game',
+                                lambda _: play_game('random', seed=SEED, max_phases=RANDOM_GAME_MAX_PHASES)))
+
+    # Saved games, copies and rendering
+    played_game_cache = []
+
+    def get_played_game():
+        """ Returns a game played randomly """
+        if not played_game_cache:
+            played_game_cache.append(play_game('random', seed=SEED, max_phases=40)[0])
+        return played_game_cache[0]
+
+    benchmarks.append(Benchmark('saved_game/to', to_saved_game_format, setup=get_played_game))
+    benchmarks.append(Benchmark('saved_game/from', from_saved_game_format,
+                                setup=lambda: to_saved_game_format(get_played_game())))
+    benchmarks.append(Benchmark('deepcopy_game', deepcopy, setup=get_played_game))
+    benchmarks.append(Benchmark('render/init', lambda game: Renderer(game), setup=get_played_game))
+    benchmarks.append(Benchmark('render/render',
+                                lambda renderer: renderer.render(incl_orders=True),
+                                setup=lambda: Renderer(_game_from_state(*get_position('M')))))
+    return benchmarks
+
+def _time_runs(benchmark, number):
+    """ Returns the time (seconds) taken by ``number`` executions of a benchmark
+        (setup excluded, garbage collection disabled as in ``timeit``)
+    """
+    if benchmark.fresh:
+        arguments = [benchmark.setup() for _ in range(number)]
+    else:
+        arguments = [benchmark.setup()] * number
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        for argument in arguments:
+            benchmark.run(argument)
+        return time.perf_counter() - start_time
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def measure(benchmark, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """ Runs a benchmark and returns its results
+
+        :param benchmark: The benchmark to run
+        :param repeat: The number of timed runs
+        :param min_time: The minimum duration (seconds) of a run. Used to compute the number of executions per run.
+        :type benchmark: Benchmark
+        :return: A dictionary with the number of executions per run, the number of runs, and
+            the min, median and mean time (seconds) per execution
+    """
+    # Warming up (e.g. to fill caches), then calibrating
+    _time_runs(benchmark, 1)
+    duration = _time_runs(benchmark, 1)
+    number = max(1, min(MAX_NUMBER, int(min_time / duration) if duration > 0 else MAX_NUMBER))
+
+    times = sorted(_time_runs(benchmark, number) / number for _ in range(repeat))
+    return {'number': number,
+            'repeat': repeat,
+            'min': times[0],
+            'median': times[len(times) // 2],
+            'mean': sum(times) / len(times)}
+
+def run(filters=None, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """ Runs the benchmarks and returns the results
+
+        :param filters: Optional. List of strings. If set, only benchmarks with a name containing one of them are run.
+        :param repeat: The number of timed runs per benchmark
+        :param min_time: The minimum duration (seconds) of a timed run
+        :return: A dictionary with the benchmark environment and {benchmark name: results} (see :meth:`measure`)
+    """
+    results = {'version': RESULTS_VERSION,
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'benchmarks': {}}
+    for benchmark in get_benchmarks():
+        if filters and not any(name_filter in benchmark.name for name_filter in filters):
+            continue
+        results['benchmarks'][benchmark.name] = measure(benchmark, repeat=repeat, min_time=min_time)
+    return results
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """ Compares results with a baseline. Benchmarks missing in either results or baseline are ignored.
+
+        :param results: The benchmark results (from :meth:`run`)
+        :param baseline: The baseline results (from :meth:`run`)
+        :param tolerance: The accepted slowdown ratio (e.g. 0.25 to accept benchmarks up to 25% slower)
+        :return: A dictionary {benchmark name: ratio of min time over baseline min time} for regressions
+    """
+    regressions = {}
+    for name, benchmark_results in results['benchmarks'].items():
+        baseline_results = baseline['benchmarks'].get(name)
+        if not baseline_results or not baseline_results['min']:
+            continue
+        ratio = benchmark_results['min'] / baseline_results['min']
+        if ratio > 1. + tolerance:
+            regressions[name] = ratio
+    return regressions
+
+def print_results(results, baseline=None):
+    """ Prints benchmark results (and their ratio to baseline, if provided) """
+    print('%-45s %12s %12s %8s %10s' % ('Benchmark', 'Min (ms)', 'Median (ms)', 'Number', 'Baseline'))
+    for name, benchmark_results in results['benchmarks'].items():
+        ratio = ''
+        if baseline and baseline['benchmarks'].get(name, {}).get('min'):
+            ratio = '%.2fx' % (benchmark_results['min'] / baseline['benchmarks'][name]['min'])
+        print('%-45s %12.4f %12.4f %8d %10s' % (name,
+                                                benchmark_results['min'] * 1000.,
+                                                benchmark_results['median'] * 1000.,
+                                                benchmark_results['number'],
+                                                ratio))
+
+def main():
+    """ Parse command line arguments, run benchmarks and compare them with baseline. """
+    parser = argparse.ArgumentParser(description='Run diplomacy engine micro-benchmarks.')
+    parser.add_argument('--filter', action='append', default=None,
+                        help='only run benchmarks with a name containing this string (can be repeated)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='number of timed runs per benchmark (default: %d)' % DEFAULT_REPEAT)
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help='minimum duration of a timed run, in seconds (default: %s)' % DEFAULT_MIN_TIME)
+    parser.add_argument('--output', default=None, help='path of JSON file where results are written')
+    parser.add_argument('--baseline', default=None, help='path of JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='accepted slowdown ratio before failing (default: %s)' % DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            baseline = json.loads(baseline_file.read())
+
+    results = run(filters=args.filter, repeat=args.repeat, min_time=args.min_time)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(json.dumps(results, indent=2))
+
+    if baseline:
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for name, ratio in sorted(regressions.items()):
+            print('REGRESSION: %s is %.2fx slower than baseline.' % (name, ratio))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,8 @@ import diplomacy.utils.errors as err
 from diplomacy.utils.order_results import OK, NO_CONVOY, BOUNCE, VOID, CUT, DISLODGED, DISRUPTED, DISBAND, MAYBE
 from diplomacy.engine.map import Map
 from diplomacy.engine.message import Message, GLOBAL
+from diplomacy.engine import profiling
+from diplomacy.engine.possible_orders import PossibleOrdersCache, get_support_move_orders, get_unit_template
 from diplomacy.engine.power import Power
 from diplomacy.engine.renderer import Renderer
 from diplomacy.utils import PriorityDict, common, exceptions, parsing, strings
@@ -40,6 +42,7 @@ from diplomacy.utils.jsonable import Jsonable
 from diplomacy.utils.sorted_dict import SortedDict
 from diplomacy.utils.constants import OrderSettings, DEFAULT_GAME_RULES
 from diplomacy.utils.game_phase_data import GamePhaseData, MESSAGES_TYPE
+from diplomacy.utils.game_sync_data import GameSyncData
 
 # Constants
 UNDETERMINED, POWER, UNIT, LOCATION, COAST, ORDER, MOVE_SEP, OTHER = 0, 1, 2, 3, 4, 5, 6, 7
@@ -226,8 +229,9 @@ class Game(Jsonable):
                  'result', 'supports', 'dislodged', 'lost', 'convoy_paths', 'convoy_paths_possible',
                  'convoy_paths_dest', 'zobrist_hash', 'renderer', 'game_id', 'map_name', 'role', 'rules',
                  'message_history', 'state_history', 'result_history', 'status', 'timestamp_created', 'n_controls',
-                 'deadline', 'registration_password', 'observer_level', 'controlled_powers', '_phase_wrapper_type',
-                 'phase_abbr', '_unit_owner_cache', 'daide_port', 'fixed_state', 'power_model_map', 'phase_summaries']
+                 'deadline', 'registration_password', 'observer_level', 'controlled_powers', 'phase_abbr',
+                 '_unit_owner_cache', 'daide_port', 'fixed_state', 'power_model_map', 'phase_summaries',
+                 '_profile', '_possible_orders_cache']
     zobrist_tables = {}
     rule_cache = ()
     model = {
@@ -301,6 +305,8 @@ class Game(Jsonable):
         self.phase_summaries = {}
         # Caches
         self._unit_owner_cache = None               # {(unit, coast_required): owner}
+        self._profile = None                        # ProcessProfile of the phase being processed, if profiling
+        self._possible_orders_cache = PossibleOrdersCache()     # Possible orders of units in movement phases
 
         # Remove rules from kwargs (if present), as we want to add them manually using self.add_rule().
         rules = kwargs.pop(strings.RULES, None)
@@ -374,21 +380,27 @@ class Game(Jsonable):
 
         # Wrap history fields into runtime sorted dictionaries.
         # This is necessary to sort history fields by phase name.
-
-        self._phase_wrapper_type = common.str_cmp_class(self.map.compare_phases)
-
-        self.order_history = SortedDict(self._phase_wrapper_type, dict,
-                                        {self._phase_wrapper_type(key): value
-                                         for key, value in self.order_history.items()})
-        self.message_history = SortedDict(self._phase_wrapper_type, SortedDict,
-                                          {self._phase_wrapper_type(key): value
-                                           for key, value in self.message_history.items()})
-        self.state_history = SortedDict(self._phase_wrapper_type, dict,
-                                        {self._phase_wrapper_type(key): value
-                                         for key, value in self.state_history.items()})
-        self.result_history = SortedDict(self._phase_wrapper_type, dict,
-                                         {self._phase_wrapper_type(key): value
-                                          for key, value in self.result_history.items()})
+        # Keys are phase names sorted by phase ordinal (see Map.phase_ordinal).
+
+        if self.is_trusted_init():
+            # Trusted histories were saved from sorted dicts, so they are already sorted by phase.
+            self.order_history = self._wrap_sorted_history(self.order_history, dict)
+            self.message_history = self._wrap_sorted_history(self.message_history, SortedDict)
+            self.state_history = self._wrap_sorted_history(self.state_history, dict)
+            self.result_history = self._wrap_sorted_history(self.result_history, dict)
+        else:
+            self.order_history = SortedDict(common.OrdinalString, dict,
+                                            {self._phase_key(key): value
+                                             for key, value in self.order_history.items()})
+            self.message_history = SortedDict(common.OrdinalString, SortedDict,
+                                              {self._phase_key(key): value
+                                               for key, value in self.message_history.items()})
+            self.state_history = SortedDict(common.OrdinalString, dict,
+                                            {self._phase_key(key): value
+                                             for key, value in self.state_history.items()})
+            self.result_history = SortedDict(common.OrdinalString, dict,
+                                             {self._phase_key(key): value
+                                              for key, value in self.result_history.items()})
 
     def __str__(self):
         """ Returns a string representation of the game instance """
@@ -410,10 +422,11 @@ class Game(Jsonable):
 
         # Deep copying
         for key in self._slots:
-            if key in ['map', 'renderer', 'powers']:
+            if key in ['map', 'renderer', 'powers', '_possible_orders_cache']:
                 continue
             setattr(result, key, deepcopy(getattr(self, key)))
         setattr(result, 'map', self.map)
+        setattr(result, '_possible_orders_cache', self._possible_orders_cache.copy())
         setattr(result, 'powers', {})
         for power in self.powers.values():
             result.powers[power.name] = deepcopy(power)
@@ -706,11 +719,11 @@ class Game(Jsonable):
         if isinstance(from_phase, int):
             from_phase = self.state_history.key_from_index(from_phase)
         elif isinstance(from_phase, str):
-            from_phase = self._phase_wrapper_type(from_phase)
+            from_phase = self._phase_key(from_phase)
         if isinstance(to_phase, int):
             to_phase = self.state_history.key_from_index(to_phase)
         elif isinstance(to_phase, str):
-            to_phase = self._phase_wrapper_type(to_phase)
+            to_phase = self._phase_key(to_phase)
         phases = self.state_history.sub_keys(from_phase, to_phase)
         states = self.state_history.sub(from_phase, to_phase)
         orders = self.order_history.sub(from_phase, to_phase)
@@ -752,7 +765,7 @@ class Game(Jsonable):
             :param game_phase_data: a GamePhaseData object.
             :type game_phase_data: GamePhaseData
         """
-        phase = self._phase_wrapper_type(game_phase_data.name)
+        phase = self._phase_key(game_phase_data.name)
         assert phase not in self.state_history
         assert phase not in self.message_history
         assert phase not in self.order_history
@@ -783,7 +796,7 @@ class Game(Jsonable):
         self.clear_orders()
 
         # Collect data about current phase before drawing.
-        previous_phase = self._phase_wrapper_type(self.current_short_phase)
+        previous_phase = self._phase_key(self.current_short_phase)
         previous_orders = self.get_orders()
         previous_messages = self.messages.copy()
         previous_state = self.get_state()
@@ -1450,16 +1463,39 @@ class Game(Jsonable):
         if reinit_powers:
             self.powers = {}
 
-    def process(self, phase_summary_callback=None):
+    def process(self, phase_summary_callback=None, generate_summary=True):
         """
         Process the current phase of the game, optionally providing
         a `phase_summary_callback(system_prompt, user_prompt) -> str` that generates
         a summary with an external LLM or similar approach.
+
+        Set `generate_summary` to False to skip the phase summary (e.g. for self-play, where it is never read).
+        The phase then has no entry in `self.phase_summaries`.
+
+        If a profile sink is registered (see :func:`diplomacy.engine.profiling.profile_process`), the time spent
+        in each stage of the processing is sent to the sink once the phase is processed.
         """
-        previous_phase = self._phase_wrapper_type(self.current_short_phase)
-        previous_orders = self.get_orders()
-        previous_messages = self.messages.copy()
-        previous_state = self.get_state()
+        sink = profiling.get_sink()
+        if sink is None:
+            return self._process_phase(phase_summary_callback, generate_summary)
+
+        profile = profiling.ProcessProfile(self.game_id, self.current_short_phase)
+        self._profile = profile
+        try:
+            with profile.stage(profiling.PROCESS):
+                phase_data = self._process_phase(phase_summary_callback, generate_summary)
+        finally:
+            self._profile = None
+        sink(profile)
+        return phase_data
+
+    def _process_phase(self, phase_summary_callback=None, generate_summary=True):
+        """ Processes the current phase of the game, archives it, and returns its GamePhaseData (see process()) """
+        with self._stage(profiling.ARCHIVE_HISTORY):
+            previous_phase = self._phase_key(self.current_short_phase)
+            previous_orders = self.get_orders()
+            previous_messages = self.messages.copy()
+            previous_state = self.get_state()
 
         if self.error:
             if 'IGNORE_ERRORS' not in self.rules:
@@ -1478,16 +1514,20 @@ class Game(Jsonable):
         self.messages.clear()
 
         # Archive prior data
-        self.order_history.put(previous_phase, previous_orders)
-        self.message_history.put(previous_phase, previous_messages)
-        self.state_history.put(previous_phase, previous_state)
+        with self._stage(profiling.ARCHIVE_HISTORY):
+            self.order_history.put(previous_phase, previous_orders)
+            self.message_history.put(previous_phase, previous_messages)
+            self.state_history.put(previous_phase, previous_state)
 
         # Generate a text summary (if a callback is provided)
-        phase_summary_text = self._generate_phase_summary(
-            previous_phase,
-            summary_callback=phase_summary_callback
-        )
-        self.phase_summaries[str(previous_phase)] = phase_summary_text
+        phase_summary_text = None
+        if generate_summary:
+            with self._stage(profiling.PHASE_SUMMARY):
+                phase_summary_text = self._generate_phase_summary(
+                    previous_phase,
+                    summary_callback=phase_summary_callback
+                )
+            self.phase_summaries[str(previous_phase)] = phase_summary_text
 
         # Now build the GamePhaseData to return. (This is the new object that your `lm_game.py` receives.)
         # IMPORTANT: copy the summary we just generated so that `phase_data.summary` is not empty.
@@ -1641,6 +1681,86 @@ class Game(Jsonable):
         self.messages = current_phase_data.messages.copy()
         # We ignore 'results' for current phase data.
 
+    def get_sync_data(self, phase, timestamp, zobrist_hash=None, game_role=strings.OMNISCIENT_TYPE):
+        """ Return changes of this game since a client game state, to synchronize client game incrementally.
+
+            - If client is in current phase, only new messages, orders, and state (if client zobrist hash
+              does not match game hash) are returned.
+            - If client phase is in game history, phase data of all phases since client phase are returned.
+            - Otherwise, whole game history is returned, and client must clear its own history.
+
+            :param phase: client game short phase.
+            :param timestamp: client game latest timestamp (see method get_latest_timestamp()).
+            :param zobrist_hash: (optional) client game zobrist hash.
+            :param game_role: client game role, used to filter messages and orders.
+            :return: a GameSyncData object
+            :rtype: GameSyncData
+        """
+        if game_role not in self.powers and game_role != strings.OBSERVER_TYPE:
+            game_role = strings.OMNISCIENT_TYPE
+        current_phase = self.current_short_phase
+        clear_history = False
+
+        if phase == current_phase:
+            phases = []
+            messages = Game.filter_messages(self.messages, game_role, timestamp_from=timestamp + 1)
+            state = None if zobrist_hash is not None and zobrist_hash == self.get_hash() else self.get_state()
+        else:
+            if self._phase_key(phase) in self.state_history:
+                phases = self.get_phase_history(from_phase=phase, game_role=game_role)
+            else:
+                clear_history = True
+                phases = self.get_phase_history(game_role=game_role)
+            messages = Game.filter_messages(self.messages, game_role)
+            state = self.get_state()
+
+        # Observers can't see orders, and a power can only see its own orders.
+        if game_role in self.powers:
+            visible_powers = [self.powers[game_role]]
+        elif game_role == strings.OBSERVER_TYPE:
+            visible_powers = []
+        else:
+            visible_powers = self.powers.values()
+        orders = {power.name: (self.get_orders(power.name) if power.order_is_set else None)
+                  for power in visible_powers}
+
+        return GameSyncData(phase=current_phase, timestamp=self.get_latest_timestamp(), clear_history=clear_history,
+                            phases=phases, state=state, orders=orders, messages=messages)
+
+    def apply_sync_data(self, sync_data):
+        """ Update game with changes returned by method get_sync_data() of a more recent game.
+
+            :param sync_data: changes to apply.
+            :type sync_data: GameSyncData
+        """
+        # As in set_phase_data(), we use Game.method instead of self.method to avoid
+        # calling any asynchronous overriden method from a derived class (especially NetworkGame class).
+        previous_phase = self.current_short_phase
+
+        if sync_data.clear_history:
+            self.state_history.clear()
+            self.order_history.clear()
+            self.result_history.clear()
+            self.message_history.clear()
+        for game_phase_data in sync_data.phases:  # type: GamePhaseData
+            if self._phase_key(game_phase_data.name) not in self.state_history:
+                Game.extend_phase_history(self, game_phase_data)
+
+        if sync_data.state is not None:
+            Game.set_state(self, sync_data.state, clear_history=False)
+
+        Game.clear_orders(self)
+        for power_name, power_orders in sync_data.orders.items():
+            if power_orders is not None:
+                Game.set_orders(self, power_name, power_orders)
+
+        if sync_data.clear_history or sync_data.phase != previous_phase:
+            Game.clear_vote(self)
+            self.messages = sync_data.messages.copy()
+        else:
+            for message in sync_data.messages.values():
+                self.messages.put(message.time_sent, message)
+
     def get_state(self):
         """ Gets the internal saved state of the game.
             This state is intended to represent current game view
@@ -1776,105 +1896,26 @@ class Game(Jsonable):
                        for power_name, power in self.powers.items()}
 
         # Movement phase
+        # Possible orders of each unit are cached, and only recomputed for units near locations that changed
         if self.phase_type == 'M':
-
-            # Building a list of units and homes for each power
-            power_units = {power_name: power.units[:] for power_name, power in self.powers.items()}
-
-            # Hold
-            for power_name in self.powers:
-                for unit in power_units[power_name]:
-                    order = unit + ' H'
-                    possible_orders[unit[2:]].add(order)
+            cache = self._possible_orders_cache
+            cache.update(self.map_name, {loc: unit for loc, (unit, is_dislodged, _, _) in unit_dict.items()
+                                         if not is_dislodged})
+            convoying_locs = None
+            for power in self.powers.values():
+                for unit in power.units:
+                    unit_orders = cache.get(unit)
+                    if unit_orders is None:
+                        if convoying_locs is None:
+                            convoying_locs = self._get_convoying_locs()
+                        read_locs = set()
+                        unit_orders = cache.put(unit,
+                                                self._get_possible_unit_orders(unit, unit_dict, convoying_locs,
+                                                                               read_locs),
+                                                read_locs)
+                    possible_orders[unit[2:]] = unit_orders
                     if '/' in unit:
-                        possible_orders[unit[2:5]].add(order)
-
-            # Move, Support, Convoy
-            for power_name in self.powers:
-                for unit in power_units[power_name]:
-                    unit_type, unit_loc = unit[0], unit[2:]
-                    unit_on_coast = '/' in unit_loc
-                    for dest in self.map.dest_with_coasts[unit_loc]:
-
-                        # Move (Regular)
-                        if self._abuts(unit_type, unit_loc, '-', dest):
-                            order = unit + ' - ' + dest
-                            possible_orders[unit_loc].add(order)
-                            if unit_on_coast:
-                                possible_orders[unit_loc[:3]].add(order)
-
-                        # Support (Hold)
-                        if self._abuts(unit_type, unit_loc, 'S', dest):
-                            if dest in unit_dict:
-                                other_unit, _, _, duplicate = unit_dict[dest]
-                                if not duplicate:
-                                    order = unit + ' S ' + other_unit[0] + ' ' + dest
-                                    possible_orders[unit_loc].add(order)
-                                    if unit_on_coast:
-                                        possible_orders[unit_loc[:3]].add(order)
-
-                        # Support (Move)
-                        # Computing src of move (both from adjacent provinces and possible convoys)
-                        # We can't support a unit that needs us to convoy it to its destination
-                        abut_srcs = self.map.abut_list(dest, incl_no_coast=True)
-                        convoy_srcs = self._get_convoy_destinations('A', dest, exclude_convoy_locs=[unit_loc])
-
-                        # Computing coasts for source
-                        src_with_coasts = [self.map.find_coasts(src) for src in abut_srcs + convoy_srcs]
-                        src_with_coasts = {val for sublist in src_with_coasts for val in sublist}
-
-                        for src in src_with_coasts:
-                            if src not in unit_dict:
-                                continue
-                            src_unit, _, _, duplicate = unit_dict[src]
-                            if duplicate:
-                                continue
-
-                            # Checking if src unit can move to dest (through adj or convoy), and that we can support it
-                            # Only armies can move through convoy
-                            if src[:3] != unit_loc[:3] \
-                                    and self._abuts(unit_type, unit_loc, 'S', dest) \
-                                    and ((src in convoy_srcs and src_unit[0] == 'A')
-                                         or self._abuts(src_unit[0], src, '-', dest)):
-
-                                # Adding with coast
-                                order = unit + ' S ' + src_unit[0] + ' ' + src + ' - ' + dest
-                                possible_orders[unit_loc].add(order)
-                                if unit_on_coast:
-                                    possible_orders[unit_loc[:3]].add(order)
-
-                                # Adding without coasts
-                                if '/' in dest:
-                                    order = unit + ' S ' + src_unit[0] + ' ' + src + ' - ' + dest[:3]
-                                    possible_orders[unit_loc].add(order)
-                                    if unit_on_coast:
-                                        possible_orders[unit_loc[:3]].add(order)
-
-                    # Move Via Convoy
-                    for dest in self._get_convoy_destinations(unit_type, unit_loc):
-                        order = unit + ' - ' + dest + ' VIA'
-                        possible_orders[unit_loc].add(order)
-
-                    # Convoy
-                    if unit_type == 'F':
-                        convoy_srcs = self._get_convoy_destinations(unit_type, unit_loc, unit_is_convoyer=True)
-                        for src in convoy_srcs:
-
-                            # Making sure there is an army at the source location
-                            if src not in unit_dict:
-                                continue
-                            src_unit, _, _, _ = unit_dict[src]
-                            if src_unit[0] != 'A':
-                                continue
-
-                            # Checking where the src unit can actually go
-                            convoy_dests = self._get_convoy_destinations('A', src, unit_is_convoyer=False)
-
-                            # Adding them as possible moves
-                            for dest in convoy_dests:
-                                if self._has_convoy_path('A', src, dest, convoying_loc=unit_loc):
-                                    order = unit + ' C A ' + src + ' - ' + dest
-                                    possible_orders[unit_loc].add(order)
+                        possible_orders[unit[2:5]] = unit_orders
 
         # Retreat phase
         if self.phase_type == 'R':
@@ -1940,6 +1981,82 @@ class Game(Jsonable):
         # Returning
         return {loc: list(possible_orders[loc]) for loc in possible_orders}
 
+    def _get_possible_unit_orders(self, unit, unit_dict, convoying_locs, read_locs):
+        """ Computes the possible orders of a unit during a movement phase, by filtering its order template
+            (see :class:`diplomacy.engine.possible_orders.UnitOrderTemplate`) with the current unit locations
+
+            :param unit: The unit (e.g. 'A PAR')
+            :param unit_dict: Dictionary {loc: (unit, is_dislodged, retreat_list, duplicate)}
+                (see get_all_possible_orders)
+            :param convoying_locs: The set of locations of fleets that can convoy (i.e. fleets on water or port)
+            :param read_locs: A set where the locations whose occupant is used to compute the orders are added
+                (i.e. the locations of supported units, and of the fleets in the convoy paths considered)
+            :return: The set of possible orders of the unit
+        """
+        # pylint: disable=too-many-branches
+        template = get_unit_template(self.map, unit)
+        unit_loc = unit[2:]
+        read_locs.update(template.support_reads)
+        read_locs.update(template.fleet_reads)
+
+        # Hold, Move (Regular)
+        possible_orders = set(template.static_orders)
+
+        # Support (Hold)
+        for dest, orders_by_type in template.support_holds:
+            if dest in unit_dict:
+                other_unit, _, _, duplicate = unit_dict[dest]
+                if not duplicate:
+                    possible_orders.add(orders_by_type[other_unit[0]])
+
+        # Support (Move)
+        # Sources are the adjacent provinces (from the template) and the possible convoys
+        # We can't support a unit that needs us to convoy it to its destination
+        for dest, is_convoy_start, adjacent_srcs, adjacent_src_set in template.support_moves:
+            convoy_srcs = set(self._get_convoy_destinations('A', dest, exclude_convoy_locs=[unit_loc])) \
+                if is_convoy_start else set()
+
+            for src, movable_types, orders_by_type in adjacent_srcs:
+                if src not in unit_dict:
+                    continue
+                src_unit, _, _, duplicate = unit_dict[src]
+                if duplicate:
+                    continue
+
+                # Only armies can move through convoy
+                src_type = src_unit[0]
+                if src_type in movable_types or (src_type == 'A' and src in convoy_srcs):
+                    possible_orders.update(orders_by_type[src_type])
+
+            for src in {src for convoy_src in convoy_srcs for src in self.map.find_coasts(convoy_src)}:
+                if src in adjacent_src_set or src[:3] == unit_loc[:3]:
+                    continue
+                read_locs.add(src)
+                if src not in unit_dict:
+                    continue
+                src_unit, _, _, duplicate = unit_dict[src]
+                if duplicate:
+                    continue
+                src_type = src_unit[0]
+                if (src in convoy_srcs and src_type == 'A') or self._abuts(src_type, src, '-', dest):
+                    possible_orders.update(get_support_move_orders(unit, src_type, src, dest))
+
+        # Move Via Convoy
+        if template.via_convoy:
+            for dest in self._get_convoy_destinations('A', unit_loc):
+                possible_orders.add(unit + ' - ' + dest + ' VIA')
+
+        # Convoy
+        # Making sure the convoy path is possible, and that there is an army at the source location
+        for src, fleets, convoy_orders in template.convoy_paths:
+            if not fleets <= convoying_locs:
+                continue
+            read_locs.add(src)
+            if src in unit_dict and unit_dict[src][0][0] == 'A':
+                possible_orders.update(convoy_orders)
+
+        return possible_orders
+
     # ====================================================================
     #   Private Interface - CONVOYS Methods
     # ====================================================================
@@ -1951,15 +2068,8 @@ class Game(Jsonable):
         self.convoy_paths_possible = []
         self.convoy_paths_dest = {}
 
-        # Finding fleets on water
-        convoying_locs = []
-        for power in self.powers.values():
-            for unit in power.units:
-                if unit[0] == 'F' and self.map.area_type(unit[2:]) in ['WATER', 'PORT']:
-                    convoying_locs += [unit[2:]]
-        convoying_locs = set(convoying_locs)
-
         # Finding all possible convoy paths
+        convoying_locs = self._get_convoying_locs()
         for nb_fleets in range(1, len(convoying_locs) + 1):
             for start, fleets, dests in self.map.convoy_paths[nb_fleets]:
                 if fleets.issubset(convoying_locs):
@@ -1971,6 +2081,11 @@ class Game(Jsonable):
                         self.convoy_paths_dest[start].setdefault(dest, [])
                         self.convoy_paths_dest[start][dest] += [fleets]
 
+    def _get_convoying_locs(self):
+        """ Returns the set of locations of the fleets that can convoy (i.e. fleets on water or on a port) """
+        return {unit[2:] for power in self.powers.values() for unit in power.units
+                if unit[0] == 'F' and self.map.area_type(unit[2:]) in ['WATER', 'PORT']}
+
     def _is_convoyer(self, army, loc):
         """ Detects if there is a convoyer at thru location for army/fleet (e.g. can an army be convoyed through PAR)
 
@@ -2650,6 +2765,27 @@ class Game(Jsonable):
             # Updating game.orders object
             self.orders[unit] = orders[unit]
 
+    def _phase_key(self, phase):
+        """ Returns the key used for given phase in history dicts (i.e. phase name sorted by phase ordinal)
+
+            :param phase: The phase name (e.g. 'S1901M')
+            :rtype: diplomacy.utils.common.OrdinalString
+        """
+        if isinstance(phase, common.OrdinalString):
+            return phase
+        phase = str(phase)
+        return common.OrdinalString(phase, self.map.phase_ordinal(phase))
+
+    def _wrap_sorted_history(self, history, val_type):
+        """ Wraps a history dict already sorted by phase into a runtime sorted dictionary
+
+            :param history: dict mapping phase names to values, in phase order
+            :param val_type: expected type for history values
+            :return: a SortedDict with phase keys (see :meth:`_phase_key`)
+        """
+        return SortedDict.from_sorted(common.OrdinalString, val_type,
+                                      ((self._phase_key(key), value) for key, value in history.items()))
+
     def _validate_status(self, reinit_powers=True):
         """ Validates the status of the game object"""
         # Loading map and setting victory condition
@@ -2818,23 +2954,25 @@ class Game(Jsonable):
         # Convert all raw movement phase "ORDER"s in a NO_CHECK game to standard orders before calling
         # Game.process(). All "INVALID" and "REORDER" orders are left raw -- the Game.move_results() method
         # knows how to detect and report them
-        if 'NO_CHECK' in self.rules and self.phase_type == 'M':
-            for power in self.powers.values():
-                orders, power.orders, civil_disorder = power.orders, {}, power.civil_disorder
-                for status, order in orders.items():
-                    if status[:5] != 'ORDER':
-                        power.orders[status] = order
-                    elif order:
-                        self._add_order(power, order.split())
-                power.civil_disorder = civil_disorder
-
-        # Processing the game
-        if self.phase_type == 'M':
-            self._determine_orders()
-            self._add_coasts()
+        with self._stage(profiling.EXPAND_ORDERS):
+            if 'NO_CHECK' in self.rules and self.phase_type == 'M':
+                for power in self.powers.values():
+                    orders, power.orders, civil_disorder = power.orders, {}, power.civil_disorder
+                    for status, order in orders.items():
+                        if status[:5] != 'ORDER':
+                            power.orders[status] = order
+                        elif order:
+                            self._add_order(power, order.split())
+                    power.civil_disorder = civil_disorder
+
+            # Processing the game
+            if self.phase_type == 'M':
+                self._determine_orders()
+                self._add_coasts()
 
         # Resolving orders
-        self._resolve()
+        with self._stage(profiling.RESOLVE):
+            self._resolve()
 
     def _advance_phase(self):
         """ Advance the game to the next phase (skipping phases with no actions)
@@ -2845,7 +2983,7 @@ class Game(Jsonable):
         # Save results for current phase.
         # NB: result_history is updated here, neither in process() nor in draw(),
         # unlike order_history, message_history and state_history.
-        self.result_history.put(self._phase_wrapper_type(self.current_short_phase), self.result)
+        self.result_history.put(self._phase_key(self.current_short_phase), self.result)
         self.result = {}
 
         # For each possible phase
@@ -3646,6 +3784,15 @@ class Game(Jsonable):
         self._build_unit_owner_cache()
         return self._unit_owner_cache.get((unit, bool(coast_required)), None)
 
+    def _stage(self, name):
+        """ Returns a context manager timing a stage of the processing (a no-op if profiling is disabled)
+
+            :param name: The name of the stage (e.g. 'resolve')
+        """
+        if self._profile is None:
+            return profiling.NO_STAGE
+        return self._profile.stage(name)
+
     def _occupant(self, site, any_coast=0):
         """ Finds the occupant of a site
 
@@ -3653,6 +3800,8 @@ class Game(Jsonable):
             :param any_coast: Boolean to indicate to return unit on any coast
             :return: The unit (e.g. "A STP", "F STP/NC") occupying the site, None otherwise
         """
+        if self._profile is not None:
+            self._profile.count(profiling.OCCUPANT_CALLS)
         if any_coast:
             site = site[:3]
         for power in self.powers.values():
@@ -3672,28 +3821,29 @@ class Game(Jsonable):
         # A MUN H, A SIL - MUN, A BOH S A SIL - MUN, A RUH - MUN would result in:
         # e.g. { 'MUN': { 1 : [ ['A MUN', [] ], ['A RUH', [] ] ], 2 : [ ['A SIL', ['A BOH'] ] ] } }
         # MUN is holding, being attack without support from RUH and being attacked with support from SIL (S from BOH)
-        self.combat = {}
+        with self._stage(profiling.STRENGTHS):
+            self.combat = {}
 
-        # For each order
-        for unit, order in self.command.items():
-            word = order.split()
+            # For each order
+            for unit, order in self.command.items():
+                word = order.split()
 
-            # Strength of a non-move or failed move is 1 + support
-            if word[0] != '-' or self.result[unit]:
-                place, strength = unit[2:5], 1
+                # Strength of a non-move or failed move is 1 + support
+                if word[0] != '-' or self.result[unit]:
+                    place, strength = unit[2:5], 1
 
-            # Strength of move depends on * and ~ in adjacency list
-            else:
-                offset = 1 if word[-1] == 'VIA' else 0
-                place = word[-1 - offset][:3]
-                strength = 1
+                # Strength of move depends on * and ~ in adjacency list
+                else:
+                    offset = 1 if word[-1] == 'VIA' else 0
+                    place = word[-1 - offset][:3]
+                    strength = 1
 
-            # Adds the list of supporting units
-            # Only adding the support that DOES NOT count toward dislodgment
-            self.combat \
-                .setdefault(place, {}) \
-                .setdefault(strength + self.supports[unit][0], []) \
-                .append([unit, self.supports[unit][1]])
+                # Adds the list of supporting units
+                # Only adding the support that DOES NOT count toward dislodgment
+                self.combat \
+                    .setdefault(place, {}) \
+                    .setdefault(strength + self.supports[unit][0], []) \
+                    .append([unit, self.supports[unit][1]])
 
     def _detect_paradox(self, starting_node, paradox_action, paradox_last_words):
         """ Paradox detection algorithm. Start at starting node and move chain to see if node if performing
@@ -3704,26 +3854,29 @@ class Game(Jsonable):
             :param paradox_last_words: The last words to detect in a order to cause a paradox (e.g. ['F', 'NTH'])
             :return: Boolean (1 or 0) to indicate if a paradox action was detected in the chain
         """
-        visited_units = []
-        current_node = starting_node
-        current_unit = self._occupant(current_node)
-        while current_unit is not None and current_unit not in visited_units:
-            visited_units += [current_unit]
-            current_order = self.command.get(current_unit, 'H')
-
-            # Action and last words detected
-            if (current_order[0] == paradox_action
-                    and current_order.split()[-1 * len(paradox_last_words):] == paradox_last_words):
-                return True
-
-            # Continuing chain only if order is Support or Convoy
-            if current_order.split()[0] not in 'SC':
-                break
-            current_node = current_order.split()[-1]
+        if self._profile is not None:
+            self._profile.count(profiling.PARADOX_CHECKS)
+        with self._stage(profiling.PARADOX_DETECTION):
+            visited_units = []
+            current_node = starting_node
             current_unit = self._occupant(current_node)
+            while current_unit is not None and current_unit not in visited_units:
+                visited_units += [current_unit]
+                current_order = self.command.get(current_unit, 'H')
+
+                # Action and last words detected
+                if (current_order[0] == paradox_action
+                        and current_order.split()[-1 * len(paradox_last_words):] == paradox_last_words):
+                    return True
 
-        # No paradox detected
-        return False
+                # Continuing chain only if order is Support or Convoy
+                if current_order.split()[0] not in 'SC':
+                    break
+                current_node = current_order.split()[-1]
+                current_unit = self._occupant(current_node)
+
+            # No paradox detected
+            return False
 
     def _check_disruptions(self, may_convoy, result, coresult=None):
         """ Determines convoy disruptions.
@@ -3819,6 +3972,8 @@ class Game(Jsonable):
         bounced = 1
         while bounced:
             bounced = 0
+            if self._profile is not None:
+                self._profile.count(profiling.BOUNCE_PASSES)
 
             # STEP 6. MARK (non-convoyed) PLACE-SWAP BOUNCERS
             for unit, order in self.command.items():
@@ -3996,47 +4151,48 @@ class Game(Jsonable):
 
         # -----------------------------------------------------------
         # STEP 1A. CANCEL ALL INVALID ORDERS GIVEN TO UNITS ATTEMPTING TO MOVE BY CONVOY
-        for unit, order in list(self.command.items()):
-            word = order.split()
-            if word[0] != '-':
-                continue
+        with self._stage(profiling.CONVOY_PATHS):
+            for unit, order in list(self.command.items()):
+                word = order.split()
+                if word[0] != '-':
+                    continue
 
-            offset = 1 if word[-1] == 'VIA' else 0
-            def flatten(nested_list):
-                """ Flattens a sublist """
-                return [list_item for sublist in nested_list for list_item in sublist]
-
-            has_via_convoy_flag = 1 if word[-1] == 'VIA' else 0
-            convoying_units = self._get_convoying_units_for_path(unit[0], unit[2:], word[1])
-            possible_paths = self._get_convoy_paths(unit[0],
-                                                    unit[2:],
-                                                    word[1],
-                                                    has_via_convoy_flag,
-                                                    convoying_units)
-
-            # No convoy path - Removing VIA and checking if adjacent
-            if not possible_paths:
-                if has_via_convoy_flag:
-                    self.command[unit] = ' '.join(word[:-1])
-                if not self._abuts(unit[0], unit[2:], 'S', word[1]):
-                    self.result[unit] += [NO_CONVOY]
-
-            # There is a convoy path, remembering the convoyers
-            else:
-                self.convoy_paths[unit] = possible_paths
-                may_convoy.setdefault(unit, [])
-                for convoyer in convoying_units:
-                    if convoyer[2:] in flatten(possible_paths) and convoyer[2:] not in may_convoy[unit]:
-                        may_convoy[unit] += [convoyer[2:]]
-
-            # Marking all convoys that are not in any path
-            invalid_convoys = convoying_units[:]
-            all_path_locs = list(set(flatten(possible_paths)))
-            for convoy in convoying_units:
-                if convoy[2:] in all_path_locs:
-                    invalid_convoys.remove(convoy)
-            for convoy in invalid_convoys:
-                self.result[convoy] = [NO_CONVOY]
+                offset = 1 if word[-1] == 'VIA' else 0
+                def flatten(nested_list):
+                    """ Flattens a sublist """
+                    return [list_item for sublist in nested_list for list_item in sublist]
+
+                has_via_convoy_flag = 1 if word[-1] == 'VIA' else 0
+                convoying_units = self._get_convoying_units_for_path(unit[0], unit[2:], word[1])
+                possible_paths = self._get_convoy_paths(unit[0],
+                                                        unit[2:],
+                                                        word[1],
+                                                        has_via_convoy_flag,
+                                                        convoying_units)
+
+                # No convoy path - Removing VIA and checking if adjacent
+                if not possible_paths:
+                    if has_via_convoy_flag:
+                        self.command[unit] = ' '.join(word[:-1])
+                    if not self._abuts(unit[0], unit[2:], 'S', word[1]):
+                        self.result[unit] += [NO_CONVOY]
+
+                # There is a convoy path, remembering the convoyers
+                else:
+                    self.convoy_paths[unit] = possible_paths
+                    may_convoy.setdefault(unit, [])
+                    for convoyer in convoying_units:
+                        if convoyer[2:] in flatten(possible_paths) and convoyer[2:] not in may_convoy[unit]:
+                            may_convoy[unit] += [convoyer[2:]]
+
+                # Marking all convoys that are not in any path
+                invalid_convoys = convoying_units[:]
+                all_path_locs = list(set(flatten(possible_paths)))
+                for convoy in convoying_units:
+                    if convoy[2:] in all_path_locs:
+                        invalid_convoys.remove(convoy)
+                for convoy in invalid_convoys:
+                    self.result[convoy] = [NO_CONVOY]
 
         # -----------------------------------------------------------
         # STEP 1B. CANCEL ALL INVALID CONVOY ORDERS
@@ -4059,62 +4215,63 @@ class Game(Jsonable):
 
         # -----------------------------------------------------------
         # STEP 2. CANCEL INCONSISTENT SUPPORT ORDERS AND COUNT OTHERS
-        for unit, order in self.command.items():
-            if order[0] != 'S':
-                continue
-            word, signal = order.split(), 0
+        with self._stage(profiling.SUPPORTS):
+            for unit, order in self.command.items():
+                if order[0] != 'S':
+                    continue
+                word, signal = order.split(), 0
 
-            # Remove any trailing "H" from a support-in-place order.
-            if word[-1] == 'H':
-                del word[-1]
-                self.command[unit] = ' '.join(word)
+                # Remove any trailing "H" from a support-in-place order.
+                if word[-1] == 'H':
+                    del word[-1]
+                    self.command[unit] = ' '.join(word)
 
-            # Stick the proper unit type (A or F) into the order;
-            # All supports will have it from here on
-            where = 1 + (word[1] in 'AF')
-            guy = self._occupant(word[where])
+                # Stick the proper unit type (A or F) into the order;
+                # All supports will have it from here on
+                where = 1 + (word[1] in 'AF')
+                guy = self._occupant(word[where])
 
-            # See if there is a unit to receive the support
-            if not guy:
-                self.command[unit] = 'H'
-                if not signal:
-                    self.result[unit] += [VOID]
-                continue
-            word[1:where + 1] = guy.split()
-            self.command[unit] = ' '.join(word)
+                # See if there is a unit to receive the support
+                if not guy:
+                    self.command[unit] = 'H'
+                    if not signal:
+                        self.result[unit] += [VOID]
+                    continue
+                word[1:where + 1] = guy.split()
+                self.command[unit] = ' '.join(word)
 
-            # See if the unit's order matches the supported order
-            if signal:
-                continue
-            coord = self.command[guy].split()
+                # See if the unit's order matches the supported order
+                if signal:
+                    continue
+                coord = self.command[guy].split()
 
-            # 1) Void if support is for hold and guy is moving
-            if len(word) < 5 and coord[0] == '-':
-                self.result[unit] += [VOID]
-                continue
+                # 1) Void if support is for hold and guy is moving
+                if len(word) < 5 and coord[0] == '-':
+                    self.result[unit] += [VOID]
+                    continue
 
-            # 2) Void if support is for move and guy isn't going where support is given
-            offset = 1 if coord[-1] == 'VIA' else 0
-            if len(word) > 4 and (coord[0], coord[-1 - offset]) != ('-', word[4]):
-                self.result[unit] += [VOID]
-                continue
+                # 2) Void if support is for move and guy isn't going where support is given
+                offset = 1 if coord[-1] == 'VIA' else 0
+                if len(word) > 4 and (coord[0], coord[-1 - offset]) != ('-', word[4]):
+                    self.result[unit] += [VOID]
+                    continue
 
-            # 3) Void if support is giving for army moving via convoy, but move over convoy failed
-            if NO_CONVOY in self.result[guy] and guy[0] == 'A':
-                self.result[unit] += [VOID]
-                continue
+                # 3) Void if support is giving for army moving via convoy, but move over convoy failed
+                if NO_CONVOY in self.result[guy] and guy[0] == 'A':
+                    self.result[unit] += [VOID]
+                    continue
 
-            # Okay, the support is valid
-            self.supports[guy][0] += 1
+                # Okay, the support is valid
+                self.supports[guy][0] += 1
 
-            # If the unit is owned by the owner of the piece being attacked, add the unit to those
-            # whose supports are not counted toward dislodgment.
-            if coord[0] != '-':
-                continue
-            owner = self._unit_owner(unit)
-            other = self._unit_owner(self._occupant(coord[-1], any_coast=1))
-            if owner is other:
-                self.supports[guy][1] += [unit]
+                # If the unit is owned by the owner of the piece being attacked, add the unit to those
+                # whose supports are not counted toward dislodgment.
+                if coord[0] != '-':
+                    continue
+                owner = self._unit_owner(unit)
+                other = self._unit_owner(self._occupant(coord[-1], any_coast=1))
+                if owner is other:
+                    self.supports[guy][1] += [unit]
 
         # -----------------------------------------------------------
         # STEP 3. LET DIRECT (NON-CONVOYED) ATTACKS CUT SUPPORTS
@@ -4124,83 +4281,89 @@ class Game(Jsonable):
 
         # -----------------------------------------------------------
         # STEPS 4 AND 5. DETERMINE CONVOY DISRUPTIONS
-        cut, cutters = 1, []
-        while cut:
-            cut = 0
-            self._strengths()
-
-            # STEP 4. CUT SUPPORTS MADE BY (non-maybe) CONVOYED ATTACKS
-            self._check_disruptions(may_convoy, MAYBE)
-            for unit in may_convoy:
-                if self.result[unit] or unit in cutters:
-                    continue
-                self._cut_support(unit)
-                cutters += [unit]
-                cut = 1
-            if cut:
-                continue
-
-            # STEP 5. LOCATE NOW-DEFINITE CONVOY DISRUPTIONS, VOID SUPPORTS
-            #         THESE CONVOYERS WERE GIVEN, AND ALLOW CONVOYING UNITS TO CUT SUPPORT
-            self._check_disruptions(may_convoy, NO_CONVOY, DISRUPTED)
-            for unit in may_convoy:
-                if NO_CONVOY in self.result[unit]:
-                    for sup, help_unit in self.command.items():
-                        if not (help_unit.find('S %s' % unit) or self.result[sup]):
-                            self.result[sup] = [NO_CONVOY]
-                        if not (help_unit.find('C %s' % unit) or self.result[sup]):
-                            self.result[sup] = [NO_CONVOY]
-                    self.supports[unit] = [0, []]
-                elif MAYBE in self.result[unit] and unit not in cutters:
-                    self.result[unit], cut = [], 1
+        with self._stage(profiling.CONVOY_DISRUPTIONS):
+            cut, cutters = 1, []
+            while cut:
+                cut = 0
+                if self._profile is not None:
+                    self._profile.count(profiling.DISRUPTION_PASSES)
+                self._strengths()
+
+                # STEP 4. CUT SUPPORTS MADE BY (non-maybe) CONVOYED ATTACKS
+                self._check_disruptions(may_convoy, MAYBE)
+                for unit in may_convoy:
+                    if self.result[unit] or unit in cutters:
+                        continue
                     self._cut_support(unit)
                     cutters += [unit]
+                    cut = 1
+                if cut:
+                    continue
+
+                # STEP 5. LOCATE NOW-DEFINITE CONVOY DISRUPTIONS, VOID SUPPORTS
+                #         THESE CONVOYERS WERE GIVEN, AND ALLOW CONVOYING UNITS TO CUT SUPPORT
+                self._check_disruptions(may_convoy, NO_CONVOY, DISRUPTED)
+                for unit in may_convoy:
+                    if NO_CONVOY in self.result[unit]:
+                        for sup, help_unit in self.command.items():
+                            if not (help_unit.find('S %s' % unit) or self.result[sup]):
+                                self.result[sup] = [NO_CONVOY]
+                            if not (help_unit.find('C %s' % unit) or self.result[sup]):
+                                self.result[sup] = [NO_CONVOY]
+                        self.supports[unit] = [0, []]
+                    elif MAYBE in self.result[unit] and unit not in cutters:
+                        self.result[unit], cut = [], 1
+                        self._cut_support(unit)
+                        cutters += [unit]
 
         # Recalculate strengths now that some are reduced by cuts
         self._strengths()
 
         # Mark bounces, then dislodges, and if any dislodges caused a cut
         # loop over this whole kaboodle again
-        self.dislodged, cut = {}, 1
-        while cut:  # pylint: disable=too-many-nested-blocks
-            # -----------------------------------------------------------
-            # STEPS 6-8. MARK BOUNCERS
-            self._bounce()
-
-            # STEP 9. MARK SUPPORTS CUT BY DISLODGES
-            cut = 0
-            for unit, order in self.command.items():
-                if order[0] != '-' or self.result[unit]:
-                    continue
-                attack_order = order.split()
-                offset = 1 if attack_order[-1] == 'VIA' else 0
-                victim = self._occupant(attack_order[-1 - offset], any_coast=1)
-                if victim and self.command[victim][0] == 'S' and not self.result[victim]:
-                    word = self.command[victim].split()
-                    supported, sup_site = self._occupant(word[2]), word[-1][:3]
-
-                    # This next line is the key. Convoyed attacks can dislodge, but even when doing so, they cannot cut
-                    # supports offered for or against a convoying fleet
-                    # (They can cut supports directed against the original position of the army, though.)
-                    if len(attack_order) > 2 and sup_site != unit[2:5]:
+        with self._stage(profiling.BOUNCES):
+            self.dislodged, cut = {}, 1
+            while cut:  # pylint: disable=too-many-nested-blocks
+                if self._profile is not None:
+                    self._profile.count(profiling.DISLODGE_PASSES)
+                # -----------------------------------------------------------
+                # STEPS 6-8. MARK BOUNCERS
+                self._bounce()
+
+                # STEP 9. MARK SUPPORTS CUT BY DISLODGES
+                cut = 0
+                for unit, order in self.command.items():
+                    if order[0] != '-' or self.result[unit]:
                         continue
-                    self.result[victim] += [CUT]
-                    cut = 1
-                    for sups in self.combat.get(sup_site, {}):
-                        for guy, no_help in self.combat[sup_site][sups]:
-                            if guy != supported:
+                    attack_order = order.split()
+                    offset = 1 if attack_order[-1] == 'VIA' else 0
+                    victim = self._occupant(attack_order[-1 - offset], any_coast=1)
+                    if victim and self.command[victim][0] == 'S' and not self.result[victim]:
+                        word = self.command[victim].split()
+                        supported, sup_site = self._occupant(word[2]), word[-1][:3]
+
+                        # This next line is the key. Convoyed attacks can dislodge, but even when doing so,
+                        # they cannot cut supports offered for or against a convoying fleet
+                        # (They can cut supports directed against the original position of the army, though.)
+                        if len(attack_order) > 2 and sup_site != unit[2:5]:
+                            continue
+                        self.result[victim] += [CUT]
+                        cut = 1
+                        for sups in self.combat.get(sup_site, {}):
+                            for guy, no_help in self.combat[sup_site][sups]:
+                                if guy != supported:
+                                    continue
+                                self.combat[sup_site][sups].remove([guy, no_help])
+                                if not self.combat[sup_site][sups]:
+                                    del self.combat[sup_site][sups]
+                                sups -= 1
+                                if victim in no_help:
+                                    no_help.remove(victim)
+                                self.combat[sup_site].setdefault(sups, []).append([guy, no_help])
+                                break
+                            else:
                                 continue
-                            self.combat[sup_site][sups].remove([guy, no_help])
-                            if not self.combat[sup_site][sups]:
-                                del self.combat[sup_site][sups]
-                            sups -= 1
-                            if victim in no_help:
-                                no_help.remove(victim)
-                            self.combat[sup_site].setdefault(sups, []).append([guy, no_help])
                             break
-                        else:
-                            continue
-                        break
 
         # -----------------------------------------------------------
         # STEP 10. MARK DISLODGEMENTS AND UNBOUNCE ALL MOVES THAT LEAD TO DISLODGING UNITS
@@ -4240,7 +4403,8 @@ class Game(Jsonable):
             :return: A list of lines for the results file explaining what happened during the phase
         """
         # Resolving moves
-        self._resolve_moves()
+        with self._stage(profiling.RESOLVE_MOVES):
+            self._resolve_moves()
 
         # Determine any retreats
         for power in self.powers.values():
@@ -4551,10 +4715,13 @@ class Game(Jsonable):
         # This method knows how to process movement, retreat, and adjustment phases.
         # For others, implement resolve_phase()
         if this_phase == 'M':
-            self._move_results()
+            with self._stage(profiling.MOVE_RESULTS):
+                self._move_results()
         elif this_phase in 'RA':
-            self._other_results()
-        self._advance_phase()
+            with self._stage(profiling.OTHER_RESULTS):
+                self._other_results()
+        with self._stage(profiling.ADVANCE_PHASE):
+            self._advance_phase()
 
     def _clear_history(self):
         """ Clear all game history fields. """
@@ -4591,11 +4758,10 @@ class Game(Jsonable):
         #    We'll do this by checking the index of `phase_key` in `self.state_history`.
         #    If there's a previous index, we'll fetch that phase_data for comparison.
         prev_phase_data = None
-        all_phases = list(self.state_history.keys())
-        if str(phase_key) in all_phases:
-            idx = all_phases.index(str(phase_key))
-            if idx > 0:
-                prev_phase_key = all_phases[idx - 1]
+        phase_key = self._phase_key(phase_key)
+        if phase_key in self.state_history:
+            prev_phase_key = self.state_history.get_previous_key(phase_key)
+            if prev_phase_key is not None:
                 try:
                     prev_phase_data = self.get_phase_from_history(prev_phase_key)
                 except:
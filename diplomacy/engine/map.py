@@ -29,6 +29,11 @@ import diplomacy.utils.errors as err
 UNDETERMINED, POWER, UNIT, LOCATION, COAST, ORDER, MOVE_SEP, OTHER = 0, 1, 2, 3, 4, 5, 6, 7
 MAP_CACHE = {}
 
+# Phase ordinals of special phases (other phases are year * number of seasons + rank of season in year)
+UNKNOWN_PHASE_ORDINAL = -2 ** 63
+FORMING_PHASE_ORDINAL = -2 ** 62
+COMPLETED_PHASE_ORDINAL = 2 ** 62
+
 
 class Map:
     """ Map Class
@@ -79,6 +84,8 @@ class Map:
           e.g. 'standard' or '/some/path/to/file.map'
         - **own_word**: Dict to indicate the word used to refer to people living in each power's country
           e.g. {'RUSSIA': 'RUSSIAN', 'FRANCE': 'FRENCH', 'UNOWNED': 'UNOWNED', 'TURKEY': 'TURKISH', ... }
+        - **order_templates**: Dict of possible orders templates by unit, built when first needed
+          e.g. {'A PAR': UnitOrderTemplate, ...} - See :mod:`diplomacy.engine.possible_orders`
         - **owns**: List that indicates which power have a OWNS or CENTERS line
           e.g. ['FRANCE']
         - **phase**: String to indicate the beginning phase of the map
@@ -114,7 +121,7 @@ class Map:
                  'homes', 'loc_name', 'loc_type', 'loc_abut', 'loc_coasts', 'own_word', 'abbrev', 'centers', 'units',
                  'pow_name', 'rules', 'files', 'powers', 'scs', 'owns', 'inhabits', 'flow', 'dummies', 'locs', 'error',
                  'seq', 'phase_abbrev', 'unclear', 'unit_names', 'keywords', 'aliases', 'convoy_paths',
-                 'dest_with_coasts']
+                 'dest_with_coasts', 'phase_ordinals', 'order_templates']
 
     def __new__(cls, name='standard', use_cache=True):
         """ New function - Retrieving object from cache if possible
@@ -145,6 +152,8 @@ class Map:
         self.flow, self.dummies, self.locs = [], [], []
         self.error, self.seq = [], []
         self.phase_abbrev, self.unclear, self.dest_with_coasts = {}, {}, {}
+        self.phase_ordinals = {}
+        self.order_templates = {}
         self.unit_names = {'A': 'ARMY', 'F': 'FLEET'}
         self.keywords, self.aliases = KEYWORDS.copy(), ALIASES.copy()
         self.load()
@@ -1416,6 +1425,42 @@ class Map:
             return 1 if 'NEWYEAR' in [x.split()[0] for x in self.seq[(season_ix1) + (1):season_ix2]] else -1
         return 0
 
+    def phase_ordinal(self, phase):
+        """ Return an integer ordinal for a phase, so that comparing the ordinals of 2 phases gives the same
+            result as :meth:`compare_phases`. Ordinals are computed once per phase name.
+
+            :param phase: The phase (e.g. S1901M, SPRING 1901 MOVEMENT, FORMING, COMPLETED)
+            :return: The phase ordinal
+            :rtype: int
+        """
+        ordinal = self.phase_ordinals.get(phase)
+        if ordinal is None:
+            ordinal = self.phase_ordinals[phase] = self._compute_phase_ordinal(phase)
+        return ordinal
+
+    def _compute_phase_ordinal(self, phase):
+        """ Computes the ordinal of a phase. See :meth:`phase_ordinal` """
+        # If the phase ends with '?', we assume it's the last phase type of that season
+        if phase[-1] == '?':
+            phase = phase[:-1] + [season.split()[1][0] for season in self.seq if season[0] == phase[0]][-1]
+
+        # Converting S1901M (abbrv) to long phase (SPRING 1901 MOVEMENT)
+        if len(phase.split()) == 1:
+            phase = self.phase_long(phase, phase.upper())
+        words = phase.split()
+
+        # FORMING, COMPLETED or unknown phase
+        if len(words) < 3:
+            return {'FORMING': FORMING_PHASE_ORDINAL, 'COMPLETED': COMPLETED_PHASE_ORDINAL}.get(phase,
+                                                                                                 UNKNOWN_PHASE_ORDINAL)
+
+        # Seasons are ranked from the first NEWYEAR of the sequence
+        season_ix = self.seq.index('%s %s' % (words[0], words[2]))
+        new_year_ix = ([season_ix for season_ix, season in enumerate(self.seq)
+                        if season.split()[0] == 'NEWYEAR'] or [0])[0]
+        season_rank = (season_ix - new_year_ix) % len(self.seq)
+        return int(words[1]) * (self.flow_sign or 1) * len(self.seq) + season_rank
+
     @staticmethod
     def phase_abbr(phase, default='?????'):
         """ Constructs a 5 character representation (S1901M) from a phase (SPRING 1901 MOVEMENT)
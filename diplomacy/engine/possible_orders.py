@@ -0,0 +1,261 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Possible orders cache
+    - Caches the possible orders of each unit during movement phases, with the locations they depend on.
+    - Used by :meth:`diplomacy.engine.game.Game.get_all_possible_orders` to only recompute the orders
+      of units near the locations that changed since the last call.
+    - Order templates contain everything about the possible orders of a unit that only depends on the map
+      (e.g. which units could be supported from where). They are built once per map and unit, and stored
+      with the map (i.e. in the map cache), so computing possible orders only has to filter them by occupancy.
+
+    The possible orders of a unit only depend on the map, on the unit itself, and on the occupants of some
+    locations (i.e. the units that can be supported, and the fleets that can convoy from or through a location).
+    These locations are recorded when the orders are computed. When the orders are requested again, the occupant
+    of each location is compared with its occupant when the cache was last updated, and only the units having
+    read a changed location are invalidated.
+"""
+
+# Constants
+CONVOY_DEPENDENCIES_CACHE = {}                  # {map name: (start fleets, convoyer fleets)}
+
+def get_convoy_dependencies(map_object):
+    """ Returns the fleet locations that convoy paths depend on
+
+        :param map_object: The map
+        :type map_object: diplomacy.engine.map.Map
+        :return: A tuple of two dictionaries
+
+            - {start location: set of fleet locations in any convoy path from start}
+            - {fleet location: set of fleet locations in any convoy path going through fleet location}
+    """
+    if map_object.name not in CONVOY_DEPENDENCIES_CACHE:
+        start_fleets, convoyer_fleets = {}, {}
+        for paths in map_object.convoy_paths.values():
+            for start, fleets, _ in paths:
+                start_fleets.setdefault(start, set()).update(fleets)
+                for fleet_loc in fleets:
+                    convoyer_fleets.setdefault(fleet_loc, set()).update(fleets)
+        CONVOY_DEPENDENCIES_CACHE[map_object.name] = (start_fleets, convoyer_fleets)
+    return CONVOY_DEPENDENCIES_CACHE[map_object.name]
+
+class UnitOrderTemplate:
+    """ Possible orders of a unit during movement phases, as far as they only depend on the map
+
+        Properties:
+
+        - **static_orders**: Tuple of orders that are always possible (i.e. hold and moves)
+        - **support_holds**: Tuple of (dest, {unit type: support order}) for each location the unit can support
+        - **support_moves**: Tuple of (dest, dest is a convoy start, adjacent sources, set of adjacent sources)
+          for each location the unit can support a move to, where adjacent sources is a tuple of
+          (src, unit types that can move from src to dest, {unit type: tuple of support orders})
+        - **via_convoy**: Boolean. Indicates that the unit is an army that could move via convoy.
+        - **convoy_paths**: Tuple of (army location, fleet locations, tuple of convoy orders) for each convoy path
+          through the location of the unit (fleets only)
+        - **support_reads**: Set of locations whose occupants determine possible supports (convoys excluded)
+        - **fleet_reads**: Set of fleet locations whose occupants determine possible convoys (and supports of
+          convoyed moves)
+    """
+    __slots__ = ['static_orders', 'support_holds', 'support_moves', 'via_convoy', 'convoy_paths', 'support_reads',
+                 'fleet_reads']
+
+    def __init__(self, map_object, unit):
+        """ Constructor
+
+            :param map_object: The map
+            :param unit: The unit (e.g. 'A PAR')
+            :type map_object: diplomacy.engine.map.Map
+        """
+        start_fleets, convoyer_fleets = get_convoy_dependencies(map_object)
+        unit_type, unit_loc = unit[0], unit[2:]
+        static_orders = [unit + ' H']
+        support_holds, support_moves, support_reads, fleet_reads = [], [], set(), set()
+
+        for dest in sorted(map_object.dest_with_coasts[unit_loc]):
+
+            # Move (Regular)
+            if map_object.abuts(unit_type, unit_loc, '-', dest):
+                static_orders.append(unit + ' - ' + dest)
+
+            # We can only support units in locations adjacent for support
+            if not map_object.abuts(unit_type, unit_loc, 'S', dest):
+                continue
+
+            # Support (Hold)
+            support_holds.append((dest, {other_type: '%s S %s %s' % (unit, other_type, dest) for other_type in 'AF'}))
+            support_reads.add(dest)
+
+            # Support (Move) - From adjacent sources (moves via convoy are filtered when computing orders)
+            # We can't support a unit moving from our own location
+            adjacent_srcs = []
+            for src in sorted({src for abut in map_object.abut_list(dest, incl_no_coast=True)
+                               for src in map_object.find_coasts(abut)}):
+                if src[:3] == unit_loc[:3]:
+                    continue
+                movable_types = ''.join(src_type for src_type in 'AF' if map_object.abuts(src_type, src, '-', dest))
+                adjacent_srcs.append((src, movable_types, {src_type: get_support_move_orders(unit, src_type, src, dest)
+                                                           for src_type in 'AF'}))
+                support_reads.add(src)
+            support_moves.append((dest, dest in start_fleets, tuple(adjacent_srcs),
+                                  frozenset(src for src, _, _ in adjacent_srcs)))
+            fleet_reads.update(start_fleets.get(dest, ()))
+
+        # Move Via Convoy
+        via_convoy = unit_type == 'A' and unit_loc in start_fleets
+        if via_convoy:
+            fleet_reads.update(start_fleets[unit_loc])
+
+        # Convoy
+        convoy_paths = []
+        if unit_type == 'F' and unit_loc in convoyer_fleets:
+            fleet_reads.update(convoyer_fleets[unit_loc])
+            for paths in map_object.convoy_paths.values():
+                for start, fleets, dests in paths:
+                    if unit_loc in fleets:
+                        convoy_paths.append((start, frozenset(fleets),
+                                             tuple('%s C A %s - %s' % (unit, start, dest) for dest in sorted(dests))))
+
+        self.static_orders = tuple(static_orders)
+        self.support_holds = tuple(support_holds)
+        self.support_moves = tuple(support_moves)
+        self.via_convoy = via_convoy
+        self.convoy_paths = tuple(convoy_paths)
+        self.support_reads = frozenset(support_reads)
+        self.fleet_reads = frozenset(fleet_reads)
+
+def get_support_move_orders(unit, src_type, src, dest):
+    """ Returns the orders for unit to support a move from src to dest (with and without coast, if dest has one)
+
+        :param unit: The supporting unit (e.g. 'A PAR')
+        :param src_type: The type of the supported unit (e.g. 'F')
+        :param src: The location of the supported unit (e.g. 'BRE')
+        :param dest: The destination of the supported move (e.g. 'PIC')
+        :return: A tuple of orders (e.g. ('A PAR S F BRE - PIC',))
+    """
+    order = '%s S %s %s - %s' % (unit, src_type, src, dest)
+    if '/' in dest:
+        return order, '%s S %s %s - %s' % (unit, src_type, src, dest[:3])
+    return (order,)
+
+def get_unit_template(map_object, unit):
+    """ Returns the order template of a unit, building it if it is not yet stored with the map
+
+        :param map_object: The map
+        :param unit: The unit (e.g. 'A PAR')
+        :type map_object: diplomacy.engine.map.Map
+        :rtype: UnitOrderTemplate
+    """
+    template = map_object.order_templates.get(unit)
+    if template is None:
+        template = map_object.order_templates[unit] = UnitOrderTemplate(map_object, unit)
+    return template
+
+class PossibleOrdersCache:
+    """ Dependency-tracked cache of the possible orders of each unit (movement phases)
+
+        Properties:
+
+        - **map_name**: The name of the map of the cached orders
+        - **occupants**: The occupants of each location at the last update, i.e. {loc: occupant}
+        - **unit_orders**: Dictionary {unit: (tuple of possible orders, frozenset of locations read)}
+        - **readers**: Dictionary {loc: set of units whose possible orders depend on the occupant of loc}
+    """
+    __slots__ = ['map_name', 'occupants', 'unit_orders', 'readers']
+
+    def __init__(self):
+        """ Constructor """
+        self.map_name = None
+        self.occupants = {}
+        self.unit_orders = {}
+        self.readers = {}
+
+    def __len__(self):
+        """ Returns the number of cached units """
+        return len(self.unit_orders)
+
+    def copy(self):
+        """ Returns a copy of the cache (e.g. for a copy of the game). Cached orders are shared (immutable). """
+        cache = PossibleOrdersCache()
+        cache.map_name = self.map_name
+        cache.occupants = dict(self.occupants)
+        cache.unit_orders = dict(self.unit_orders)
+        cache.readers = {loc: set(units) for loc, units in self.readers.items()}
+        return cache
+
+    def clear(self):
+        """ Clears the cache """
+        self.map_name = None
+        self.occupants = {}
+        self.unit_orders = {}
+        self.readers = {}
+
+    def update(self, map_name, occupants):
+        """ Invalidates the units whose possible orders depend on a location whose occupant changed
+
+            :param map_name: The name of the current map
+            :param occupants: The current occupant of each location (i.e. {loc: occupant}).
+                Occupants must be comparable, and must not be modified afterwards.
+            :return: The set of invalidated units
+        """
+        if map_name != self.map_name:
+            invalidated_units = set(self.unit_orders)
+            self.clear()
+            self.map_name = map_name
+            self.occupants = occupants
+            return invalidated_units
+
+        invalidated_units = set()
+        previous_occupants = self.occupants
+        changed_locs = [loc for loc, occupant in occupants.items() if previous_occupants.get(loc) != occupant]
+        changed_locs += [loc for loc in previous_occupants if loc not in occupants]
+        for loc in changed_locs:
+            for unit in list(self.readers.get(loc, ())):
+                self.invalidate(unit)
+                invalidated_units.add(unit)
+        self.occupants = occupants
+        return invalidated_units
+
+    def get(self, unit):
+        """ Returns the cached possible orders of a unit (as a tuple), or None if they need to be computed """
+        entry = self.unit_orders.get(unit)
+        return entry[0] if entry is not None else None
+
+    def put(self, unit, orders, read_locs):
+        """ Caches the possible orders of a unit
+
+            :param unit: The unit (e.g. 'A PAR')
+            :param orders: The possible orders of the unit
+            :param read_locs: The locations whose occupants were used to compute the orders
+            :return: The possible orders, as a tuple
+        """
+        orders, read_locs = tuple(sorted(orders)), frozenset(read_locs)
+        self.invalidate(unit)
+        self.unit_orders[unit] = (orders, read_locs)
+        for loc in read_locs:
+            self.readers.setdefault(loc, set()).add(unit)
+        return orders
+
+    def invalidate(self, unit):
+        """ Removes the cached possible orders of a unit """
+        entry = self.unit_orders.pop(unit, None)
+        if entry is None:
+            return
+        for loc in entry[1]:
+            readers = self.readers.get(loc)
+            if readers is not None:
+                readers.discard(unit)
+                if not readers:
+                    del self.readers[loc]
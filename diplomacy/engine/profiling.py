@@ -0,0 +1,204 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Engine profiling
+
+    Opt-in instrumentation of :meth:`diplomacy.engine.game.Game.process`.
+
+    When a sink is registered with :func:`profile_process`, each call to ``Game.process()`` made in the
+    current context (thread, or asyncio / tornado task) records the time spent in each stage of the phase
+    resolution, and a few counters, into a :class:`ProcessProfile`. The profile is sent to the sink once the
+    phase is processed. When no sink is registered, the instrumentation costs a few attribute lookups per phase.
+
+    Stage timers are inclusive (e.g. ``resolve_moves`` includes ``strengths`` and ``bounce``) and are
+    accumulated when a stage runs many times during a phase (e.g. ``strengths``).
+
+    Usage:
+
+    .. code-block:: python
+
+        from diplomacy.engine.profiling import EngineProfiler, profile_process
+
+        profiler = EngineProfiler()
+        with profile_process(profiler):
+            game.process()
+        print(profiler.format())
+"""
+from contextlib import contextmanager, nullcontext
+import contextvars
+import time
+
+# Stages
+PROCESS = 'process'                             # Game.process() (total)
+ARCHIVE_HISTORY = 'archive_history'             # Copying state, orders and messages, and saving them to history
+EXPAND_ORDERS = 'expand_orders'                 # Converting NO_CHECK orders, adding default orders and coasts
+RESOLVE = 'resolve'                             # Resolving orders and advancing to next phase
+RESOLVE_MOVES = 'resolve_moves'                 # Adjudication of movement phases
+CONVOY_PATHS = 'convoy_paths'                   # Finding convoy paths of units moving by convoy
+SUPPORTS = 'supports'                           # Checking and counting supports
+CONVOY_DISRUPTIONS = 'convoy_disruptions'       # Loop cutting supports and detecting convoy disruptions
+STRENGTHS = 'strengths'                         # Computing the strength of each unit at each destination
+BOUNCES = 'bounces'                             # Bounce loop (including cuts by dislodgement and dislodgements)
+PARADOX_DETECTION = 'paradox_detection'         # Detecting convoy paradoxes
+MOVE_RESULTS = 'move_results'                   # Applying results of movement phases (retreats, moves)
+OTHER_RESULTS = 'other_results'                 # Resolving retreats and adjustments phases
+ADVANCE_PHASE = 'advance_phase'                 # Advancing to the next phase (and skipping empty phases)
+PHASE_SUMMARY = 'phase_summary'                 # Generating the phase summary
+
+# Counters
+BOUNCE_PASSES = 'bounce_passes'                 # Number of passes of the bounce loop
+DISLODGE_PASSES = 'dislodge_passes'             # Number of passes of the loop marking bounces and cuts by dislodges
+DISRUPTION_PASSES = 'disruption_passes'         # Number of passes of the convoy disruptions loop
+OCCUPANT_CALLS = 'occupant_calls'               # Number of calls to Game._occupant()
+PARADOX_CHECKS = 'paradox_checks'               # Number of calls to Game._detect_paradox()
+
+# Context manager used in place of stage timers when profiling is disabled
+NO_STAGE = nullcontext()
+
+_SINK = contextvars.ContextVar('diplomacy_process_profile_sink', default=None)
+
+class _Stage:
+    """ Context manager adding the time spent in its block to a stage timer """
+    __slots__ = ['timers', 'name', 'start_time']
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+        self.start_time = None
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.timers[self.name] = self.timers.get(self.name, 0.) + time.perf_counter() - self.start_time
+
+class ProcessProfile:
+    """ Profile of a call to Game.process()
+
+        Properties:
+
+        - **game_id**: The id of the processed game
+        - **phase**: The name of the processed phase (e.g. 'S1901M')
+        - **timers**: Dictionary {stage name: time in seconds}
+        - **counters**: Dictionary {counter name: count}
+    """
+    __slots__ = ['game_id', 'phase', 'timers', 'counters']
+
+    def __init__(self, game_id, phase):
+        """ Constructor
+
+            :param game_id: The id of the processed game
+            :param phase: The name of the processed phase
+        """
+        self.game_id = game_id
+        self.phase = phase
+        self.timers = {}
+        self.counters = {}
+
+    @property
+    def duration(self):
+        """ Returns the total time (seconds) taken by Game.process() """
+        return self.timers.get(PROCESS, 0.)
+
+    def stage(self, name):
+        """ Returns a context manager adding the time spent in its block to the given stage timer
+
+            :param name: The name of the stage (e.g. 'resolve')
+        """
+        return _Stage(self.timers, name)
+
+    def count(self, name, value=1):
+        """ Increments a counter
+
+            :param name: The name of the counter (e.g. 'bounce_passes')
+            :param value: The value to add to the counter
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        """ Returns a dictionary representation of the profile """
+        return {'game_id': self.game_id, 'phase': self.phase, 'timers': self.timers, 'counters': self.counters}
+
+class EngineProfiler:
+    """ Sink aggregating the profiles of all processed phases
+
+        Properties:
+
+        - **nb_phases**: The number of processed phases
+        - **timers**: Dictionary {stage name: total time in seconds}
+        - **counters**: Dictionary {counter name: total count}
+        - **profiles**: The list of received profiles (if keep_profiles is True)
+        - **callback**: Optional callable called with each received profile
+    """
+    __slots__ = ['nb_phases', 'timers', 'counters', 'profiles', 'keep_profiles', 'callback']
+
+    def __init__(self, callback=None, keep_profiles=False):
+        """ Constructor
+
+            :param callback: Optional. Callable ``callback(profile)`` called with each received profile.
+            :param keep_profiles: Boolean. If True, all received profiles are kept in self.profiles
+        """
+        self.nb_phases = 0
+        self.timers = {}
+        self.counters = {}
+        self.profiles = []
+        self.keep_profiles = keep_profiles
+        self.callback = callback
+
+    def __call__(self, profile):
+        """ Adds the profile of a processed phase
+
+            :type profile: ProcessProfile
+        """
+        self.nb_phases += 1
+        for name, duration in profile.timers.items():
+            self.timers[name] = self.timers.get(name, 0.) + duration
+        for name, count in profile.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + count
+        if self.keep_profiles:
+            self.profiles.append(profile)
+        if self.callback is not None:
+            self.callback(profile)
+
+    def format(self):
+        """ Returns a text report of the total and per-phase time spent in each stage, and of the counters """
+        nb_phases = max(1, self.nb_phases)
+        lines = ['%d phase(s) processed' % self.nb_phases,
+                 '%-25s %12s %14s' % ('Stage', 'Total (ms)', 'Per phase (ms)')]
+        for name, duration in sorted(self.timers.items(), key=lambda item: -item[1]):
+            lines.append('%-25s %12.3f %14.3f' % (name, duration * 1000., duration * 1000. / nb_phases))
+        lines.append('%-25s %12s %14s' % ('Counter', 'Total', 'Per phase'))
+        for name, count in sorted(self.counters.items()):
+            lines.append('%-25s %12d %14.1f' % (name, count, count / nb_phases))
+        return '\n'.join(lines)
+
+def get_sink():
+    """ Returns the profile sink registered in the current context, or None if profiling is disabled """
+    return _SINK.get()
+
+@contextmanager
+def profile_process(sink):
+    """ Context manager sending the profile of each Game.process() called in its block to the given sink
+
+        :param sink: Callable ``sink(profile)`` receiving a :class:`ProcessProfile` after each processed phase
+            (e.g. an :class:`EngineProfiler` or ``list.append``)
+    """
+    token = _SINK.set(sink)
+    try:
+        yield sink
+    finally:
+        _SINK.reset(token)
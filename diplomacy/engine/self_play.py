@@ -0,0 +1,341 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Self-play runner
+
+    Plays many games between bots (policies) without any network, message or phase summary, optionally
+    across a process pool, and streams the finished games to an archive file (see :mod:`diplomacy.utils.archive`).
+
+    A policy is a callable ``policy(game, power_name, possible_orders, rng)`` returning the list of orders of
+    a power, where ``possible_orders`` is ``game.get_all_possible_orders()`` and ``rng`` is a ``random.Random``
+    seeded from the seed of the run and the index of the game. Runs are deterministic given a seed.
+    To be used with worker processes, a custom policy must be picklable (e.g. a module-level function).
+
+    Built-in policies are 'random' (random possible order for each unit, as in ``random_game.py``),
+    'hold' (all units hold, no builds) and 'heuristic' (greedy supply center grabbing with supports).
+
+    Usage:
+
+    .. code-block:: bash
+
+        python -m diplomacy.engine.self_play --games 1000 --policy heuristic --workers 8 --output games.arc
+        python -m diplomacy.engine.self_play --games 100 --policy my_package.my_module:my_policy --seed 42
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+import os
+import random
+import time
+
+from diplomacy.engine.game import Game
+from diplomacy.engine.map import Map
+from diplomacy.utils.archive import ArchiveWriter, encode_game
+from diplomacy.utils.export import to_saved_game_format
+
+# Constants
+DEFAULT_CHUNK_SIZE = 4                          # Nb of games sent to a worker process at once
+
+def random_policy(game, power_name, possible_orders, rng):
+    """ Returns a random possible order for each orderable location of the power """
+    return [rng.choice(sorted(possible_orders[loc])) for loc in sorted(game.get_orderable_locations(power_name))
+            if possible_orders[loc]]
+
+def hold_policy(game, power_name, possible_orders, rng):                     # pylint: disable=unused-argument
+    """ Holds all units during movement phases. Does not retreat (i.e. disbands) and does not build. """
+    if game.phase_type != 'M':
+        return []
+    return ['%s H' % unit for unit in game.get_units(power_name)]
+
+def heuristic_policy(game, power_name, possible_orders, rng):
+    """ Greedy policy
+
+        - Movement: moves units to supply centers not owned by the power (one unit per center), then supports
+          these moves with the other units if possible. Other units hold supply centers threatened by other powers,
+          or move randomly to a location not occupied by the power.
+        - Retreats: retreats to a supply center if possible, otherwise anywhere.
+        - Adjustments: builds as many units as possible, and disbands randomly.
+    """
+    power = game.get_power(power_name)
+    supply_centers = game.map.scs
+    candidates = {loc: sorted(possible_orders[loc]) for loc in sorted(game.get_orderable_locations(power_name))
+                  if possible_orders[loc]}
+
+    # Retreats
+    if game.phase_type == 'R':
+        orders = []
+        for loc_orders in candidates.values():
+            retreats = [order for order in loc_orders if order.split()[2] == 'R']
+            to_centers = [order for order in retreats if order.split()[-1][:3] in supply_centers]
+            orders.append(rng.choice(to_centers or retreats or loc_orders))
+        return orders
+
+    # Adjustments
+    if game.phase_type == 'A':
+        nb_builds = len(power.centers) - len(power.units)
+        locs = list(candidates)
+        rng.shuffle(locs)
+        if nb_builds > 0:
+            return [rng.choice([order for order in candidates[loc] if order.split()[-1] == 'B'])
+                    for loc in locs[:nb_builds] if any(order.split()[-1] == 'B' for order in candidates[loc])]
+        return [rng.choice([order for order in candidates[loc] if order.split()[-1] == 'D'])
+                for loc in locs[:-nb_builds] if any(order.split()[-1] == 'D' for order in candidates[loc])]
+
+    # Movement - Attacking supply centers
+    locs = list(candidates)
+    rng.shuffle(locs)
+    orders, targets = {}, set()
+    for loc in locs:
+        attacks = [order for order in candidates[loc]
+                   if len(order.split()) == 4 and order.split()[2] == '-'
+                   and order.split()[-1][:3] in supply_centers
+                   and order.split()[-1][:3] not in power.centers
+                   and order.split()[-1][:3] not in targets]
+        if attacks:
+            orders[loc] = rng.choice(attacks)
+            targets.add(orders[loc].split()[-1][:3])
+
+    # Supporting attacks, holding supply centers threatened by other powers, or moving elsewhere
+    attack_orders = set(orders.values())
+    own_locs = {unit[2:5] for unit in power.units}
+    other_locs = {unit[2:5] for other_power in game.powers.values() if other_power is not power
+                  for unit in other_power.units}
+    for loc in locs:
+        if loc in orders:
+            continue
+        supports = [order for order in candidates[loc]
+                    if order.split()[2] == 'S' and order.split(' S ', 1)[1] in attack_orders]
+        holds = []
+        if loc[:3] in supply_centers and any(abut.upper()[:3] in other_locs for abut in game.map.abut_list(loc)):
+            holds = [order for order in candidates[loc] if order.split()[-1] == 'H']
+        moves = [order for order in candidates[loc] if len(order.split()) == 4 and order.split()[2] == '-'
+                 and order.split()[-1][:3] not in own_locs]
+        orders[loc] = rng.choice(supports or holds or moves or candidates[loc])
+    return [orders[loc] for loc in sorted(orders)]
+
+POLICIES = {'random': random_policy, 'hold': hold_policy, 'heuristic': heuristic_policy}
+
+def get_policy(policy):
+    """ Returns a policy callable
+
+        :param policy: A policy callable, the name of a built-in policy (e.g. 'random'), or the import path of
+            a policy (e.g. 'my_package.my_module:my_policy')
+    """
+    if callable(policy):
+        return policy
+    if policy in POLICIES:
+        return POLICIES[policy]
+    if ':' in policy:
+        module_name, function_name = policy.split(':', 1)
+        return getattr(importlib.import_module(module_name), function_name)
+    raise ValueError('Unknown policy %s. Expected a callable, %s or "module:function".' %
+                     (policy, ', '.join(sorted(POLICIES))))
+
+def _get_power_policies(policy, power_names):
+    """ Returns a dictionary {power name: policy callable}
+
+        :param policy: A policy (see :meth:`get_policy`), or a dictionary {power name: policy}
+    """
+    if isinstance(policy, dict):
+        return {power_name: get_policy(policy[power_name]) for power_name in power_names}
+    return {power_name: get_policy(policy) for power_name in power_names}
+
+def play_game(policy='random', seed=0, game_ix=0, map_name='standard', max_phases=None):
+    """ Plays a game between policies
+
+        :param policy: The policy of all powers (see :meth:`get_policy`), or a dictionary {power name: policy}
+        :param seed: The seed of the run
+        :param game_ix: The index of the game in the run. Each game of a run uses a different random generator.
+        :param map_name: The name of the map to play on
+        :param max_phases: Optional. The maximum number of phases to process (game is not completed if reached)
+        :return: The game and the number of processed phases
+        :rtype: (diplomacy.engine.game.Game, int)
+    """
+    rng = random.Random('%s/%d' % (seed, game_ix))
+    game = Game(game_id='self_play_%s_%d' % (seed, game_ix), map_name=map_name)
+    policies = _get_power_policies(policy, game.powers)
+
+    nb_phases = 0
+    while not game.is_game_done and (max_phases is None or nb_phases < max_phases):
+        possible_orders = game.get_all_possible_orders()
+        for power_name in sorted(game.powers):
+            game.set_orders(power_name, policies[power_name](game, power_name, possible_orders, rng))
+        game.process(generate_summary=False)
+        nb_phases += 1
+    return game, nb_phases
+
+def _init_worker(map_name):
+    """ Preloads the map (and the class-level caches of Game) in a worker process """
+    Game(map_name=map_name)
+
+def _play_games(game_indices, policy, seed, map_name, max_phases, compress):
+    """ Plays games and encodes them for the archive
+
+        :param compress: Boolean to compress encoded games, or None to not encode games.
+        :return: A list of (game_ix, pid, nb_phases, duration, encoded game or None) for each game
+    """
+    results = []
+    for game_ix in game_indices:
+        start_time = time.time()
+        game, nb_phases = play_game(policy, seed=seed, game_ix=game_ix, map_name=map_name, max_phases=max_phases)
+        encoded_game = None
+        if compress is not None:
+            encoded_game = encode_game(to_saved_game_format(game), compress=compress)
+        results.append((game_ix, os.getpid(), nb_phases, time.time() - start_time, encoded_game))
+    return results
+
+def _iter_results(nb_games, policy, seed, map_name, max_phases, compress, nb_workers, chunk_size):
+    """ Plays games (in the current process or across a process pool) and yields their results in order.
+        See :meth:`_play_games` for the format of results.
+    """
+    if nb_workers is not None and nb_workers <= 1:
+        for game_ix in range(nb_games):
+            yield from _play_games([game_ix], policy, seed, map_name, max_phases, compress)
+        return
+
+    # Playing games across a process pool, with a bounded number of chunks in flight.
+    # The map and caches are loaded before forking, so workers can share them.
+    _init_worker(map_name)
+    nb_workers = nb_workers or os.cpu_count() or 1
+    max_pending = 2 * nb_workers
+    chunks = (range(start, min(start + chunk_size, nb_games)) for start in range(0, nb_games, chunk_size))
+    executor = ProcessPoolExecutor(max_workers=nb_workers, initializer=_init_worker, initargs=(map_name,))
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.append(executor.submit(_play_games, list(chunk), policy, seed, map_name, max_phases,
+                                               compress))
+            if not pending:
+                break
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+class SelfPlayStats:
+    """ Statistics of a self-play run
+
+        Properties:
+
+        - **nb_games**: The number of games played
+        - **nb_phases**: The number of phases processed
+        - **duration**: The duration of the run (seconds)
+        - **workers**: Dictionary {pid: [nb games, nb phases, time spent playing (seconds)]}
+    """
+    __slots__ = ['nb_games', 'nb_phases', 'duration', 'workers']
+
+    def __init__(self):
+        """ Constructor """
+        self.nb_games = 0
+        self.nb_phases = 0
+        self.duration = 0.
+        self.workers = {}
+
+    def add(self, pid, nb_phases, duration):
+        """ Adds a game played by a worker """
+        worker_stats = self.workers.setdefault(pid, [0, 0, 0.])
+        worker_stats[0] += 1
+        worker_stats[1] += nb_phases
+        worker_stats[2] += duration
+        self.nb_games += 1
+        self.nb_phases += nb_phases
+
+    def format(self):
+        """ Returns a text report of the throughput of the run and of each worker """
+        duration = self.duration or float('inf')
+        lines = ['%d games, %d phases in %.2f s: %.2f games/s, %.1f phases/s'
+                 % (self.nb_games, self.nb_phases, self.duration, self.nb_games / duration,
+                    self.nb_phases / duration)]
+        for pid, (nb_games, nb_phases, busy_time) in sorted(self.workers.items()):
+            busy_time = busy_time or float('inf')
+            lines.append('  Worker %d: %d games, %d phases: %.2f games/s, %.1f phases/s'
+                         % (pid, nb_games, nb_phases, nb_games / busy_time, nb_phases / busy_time))
+        return '\n'.join(lines)
+
+def run_self_play(nb_games, policy='random', seed=0, output_path=None, nb_workers=None, map_name='standard',
+                  max_phases=None, chunk_size=DEFAULT_CHUNK_SIZE, compress=True):
+    """ Plays games between policies, and streams them (in order) to an archive file
+
+        :param nb_games: The number of games to play
+        :param policy: The policy of all powers (see :meth:`get_policy`), or a dictionary {power name: policy}.
+            With worker processes, the policy must be picklable.
+        :param seed: The seed of the run. Games (and archive) are the same for the same seed and parameters.
+        :param output_path: Optional. The path of the archive file where games are written.
+        :param nb_workers: Optional. Number of worker processes. 0 or 1 to play in the current process,
+            None to use all CPUs.
+        :param map_name: The name of the map to play on
+        :param max_phases: Optional. The maximum number of phases to process per game
+        :param chunk_size: Optional. With worker processes, the number of games sent to a worker at once.
+        :param compress: Optional. Indicates to compress the archive. See :meth:`diplomacy.utils.archive.write_archive`
+        :type nb_workers: int | None, optional
+        :return: The statistics of the run
+        :rtype: SelfPlayStats
+    """
+    stats = SelfPlayStats()
+    start_time = time.time()
+    writer = ArchiveWriter(output_path, compress=compress) if output_path else None
+    results = _iter_results(nb_games, policy, seed, map_name, max_phases,
+                            compress=compress if writer is not None else None,
+                            nb_workers=nb_workers,
+                            chunk_size=chunk_size)
+    try:
+        for _, pid, nb_phases, duration, encoded_game in results:
+            stats.add(pid, nb_phases, duration)
+            if writer is not None:
+                writer.write_encoded(encoded_game)
+    finally:
+        results.close()
+        if writer is not None:
+            writer.close()
+    stats.duration = time.time() - start_time
+    return stats
+
+def main():
+    """ Parse command line arguments and play games. """
+    parser = argparse.ArgumentParser(description='Play games between bots.')
+    parser.add_argument('--games', type=int, default=10, help='number of games to play (default: 10)')
+    parser.add_argument('--policy', default='random',
+                        help='policy of all powers: %s or module:function (default: random)'
+                        % ', '.join(sorted(POLICIES)))
+    parser.add_argument('--seed', type=int, default=0, help='seed of the run (default: 0)')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all CPUs)')
+    parser.add_argument('--output', default=None, help='path of the archive file where games are written')
+    parser.add_argument('--map', default='standard', help='name of the map to play on (default: standard)')
+    parser.add_argument('--max-phases', type=int, default=None, help='maximum number of phases per game')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='number of games sent to a worker at once (default: %d)' % DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    # Checking the policy before starting workers
+    get_policy(args.policy)
+    stats = run_self_play(args.games,
+                          policy=args.policy,
+                          seed=args.seed,
+                          output_path=args.output,
+                          nb_workers=args.workers,
+                          map_name=args.map,
+                          max_phases=args.max_phases,
+                          chunk_size=args.chunk_size)
+    print(stats.format())
+
+if __name__ == '__main__':
+    main()
@@ -26,18 +26,25 @@ LOGGER = logging.getLogger(__name__)
 class BaseAPI(metaclass=ABCMeta):
     """ Base API class """
 
-    def __init__(self, api_key, connect_timeout=30, request_timeout=60):
+    def __init__(self, api_key, connect_timeout=30, request_timeout=60, max_clients=None):
         """ Constructor
 
             :param api_key: The API key to use for sending API requests
             :param connect_timeout: The maximum amount of time to wait for the connection to be established
             :param request_timeout: The maximum amount of time to wait for the request to be processed
+            :param max_clients: Optional. If set, requests are sent with a dedicated HTTP client
+                running at most this number of requests simultaneously (others are queued).
+                Otherwise, the shared AsyncHTTPClient of the current IO loop is used.
             :type api_key: str
             :type connect_timeout: int, optional
             :type request_timeout: int, optional
+            :type max_clients: int, optional
         """
         self.api_key = api_key
-        self.http_client = AsyncHTTPClient()
+        if max_clients is None:
+            self.http_client = AsyncHTTPClient()
+        else:
+            self.http_client = AsyncHTTPClient(force_instance=True, max_clients=max_clients)
         self.connect_timeout = connect_timeout
         self.request_timeout = request_timeout
 
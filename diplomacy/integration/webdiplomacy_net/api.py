@@ -38,6 +38,23 @@ API_WEBDIPLOMACY_NET = os.environ.get('API_WEBDIPLOMACY', 'https://webdiplomacy.
 class API(BaseAPI):
     """ API to interact with webdiplomacy.net """
 
+    def __init__(self, api_key, connect_timeout=30, request_timeout=60, max_clients=None, api_url=None):
+        """ Constructor
+
+            :param api_key: The API key to use for sending API requests
+            :param connect_timeout: The maximum amount of time to wait for the connection to be established
+            :param request_timeout: The maximum amount of time to wait for the request to be processed
+            :param max_clients: Optional. Maximum number of simultaneous requests (see :class:`.BaseAPI`).
+            :param api_url: Optional. The API endpoint. Defaults to env. variable API_WEBDIPLOMACY or webdiplomacy.net
+            :type api_key: str
+            :type connect_timeout: int, optional
+            :type request_timeout: int, optional
+            :type max_clients: int, optional
+            :type api_url: str, optional
+        """
+        super(API, self).__init__(api_key, connect_timeout, request_timeout, max_clients)
+        self.api_url = api_url or API_WEBDIPLOMACY_NET
+
     @gen.coroutine
     def list_games_with_players_in_cd(self):
         """ Lists the game on the standard map where a player is in CD (civil disorder)
@@ -46,7 +63,7 @@ class API(BaseAPI):
             :return: List of :class:`.GameIdCountryId` tuples  [(game_id, country_id), (game_id, country_id)]
         """
         route = 'players/cd'
-        url = '%s?%s' % (API_WEBDIPLOMACY_NET, urlencode({'route': route}))
+        url = '%s?%s' % (self.api_url, urlencode({'route': route}))
         return_val = []
 
         # Sending request
@@ -80,7 +97,7 @@ class API(BaseAPI):
             :return: List of :class:`.GameIdCountryId` tuples  [(game_id, country_id), (game_id, country_id)]
         """
         route = 'players/missing_orders'
-        url = '%s?%s' % (API_WEBDIPLOMACY_NET, urlencode({'route': route}))
+        url = '%s?%s' % (self.api_url, urlencode({'route': route}))
         return_val = []
 
         # Sending request
@@ -123,9 +140,24 @@ class API(BaseAPI):
                 #. The power name (e.g. 'FRANCE') referred to by country_id
         """
         # pylint: disable=arguments-differ
+        state_dict = yield self.get_game_state(game_id, country_id)
+        if state_dict is None:
+            return None, None
+        return state_dict_to_game_and_power(state_dict, country_id, max_phases=max_phases)
+
+    @gen.coroutine
+    def get_game_state(self, game_id, country_id):
+        """ Returns the game state (in dictionary format) for the country we are playing
+
+            :param game_id: The id of the game object (integer)
+            :param country_id: The id of the country for which we want the game state (integer)
+            :type game_id: int
+            :type country_id: int
+            :return: The game state in dictionary format from webdiplomacy.net, or None if an error occurred
+        """
         route = 'game/status'
-        url = '%s?%s' % (API_WEBDIPLOMACY_NET, urlencode({'route': route, 'gameID': game_id, 'countryID': country_id}))
-        return_val = None, None
+        url = '%s?%s' % (self.api_url, urlencode({'route': route, 'gameID': game_id, 'countryID': country_id}))
+        return_val = None
 
         # Sending request
         try:
@@ -141,8 +173,7 @@ class API(BaseAPI):
             except (TypeError, ValueError):
                 LOGGER.warning('ERROR during "%s". Unable to load JSON: %s.', route, response.body.decode('utf-8'))
                 return return_val
-            game, power_name = state_dict_to_game_and_power(state_dict, country_id, max_phases=max_phases)
-            return_val = game, power_name
+            return_val = state_dict
 
         # Error Occurred
         else:
@@ -195,7 +226,7 @@ class API(BaseAPI):
 
         # Sending request
         route = 'game/orders'
-        url = '%s?%s' % (API_WEBDIPLOMACY_NET, urlencode({'route': route}))
+        url = '%s?%s' % (self.api_url, urlencode({'route': route}))
         body = {'gameID': game_id,
                 'turn': turn,
                 'phase': phase,
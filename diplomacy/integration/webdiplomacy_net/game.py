@@ -215,6 +215,81 @@ def process_phase_dict(phase_dict, map_id=1):
             'orders': orders_per_power}
 
 
+def _set_units_and_centers(game, phase):
+    """ Sets the units and centers of a processed phase dict as the units and centers of the game """
+    game.clear_units()
+    for power_name, power_units in phase['units'].items():
+        if power_name == 'GLOBAL':
+            continue
+        game.set_units(power_name, power_units)
+
+    game.clear_centers()
+    for power_name, power_centers in phase['centers'].items():
+        if power_name == 'GLOBAL':
+            continue
+        game.set_centers(power_name, power_centers)
+
+def _replay_phase(game, phase):
+    """ Replays a past phase (from a processed phase dict) on the game """
+    game.set_current_phase(phase['name'])
+    _set_units_and_centers(game, phase)
+
+    # Orders
+    game.clear_orders()
+    for power_name, power_orders in phase['orders'].items():
+        if power_name == 'GLOBAL':
+            continue
+        game.set_orders(power_name, power_orders)
+
+    # Processing
+    game.process()
+
+def _set_current_phase(game, phase, map_id, standoffs, occupied_from):
+    """ Sets the current phase (from a processed phase dict) on the game """
+    game.set_current_phase(phase['name'])
+    _set_units_and_centers(game, phase)
+
+    # Setting retreat locs
+    if phase['name'][-1] == 'R':
+        invalid_retreat_locs = set()
+        attack_source = {}
+
+        # Loc is occupied
+        for power in game.powers.values():
+            for unit in power.units:
+                invalid_retreat_locs.add(unit[2:5])
+
+        # Loc was in standoff
+        if standoffs:
+            for loc_dict in standoffs:
+                _, loc = center_dict_to_str(loc_dict, map_id=map_id)
+                invalid_retreat_locs.add(loc[:3])
+
+        # Loc was attacked from
+        if occupied_from:
+            for loc_id, occupied_from_id in occupied_from.items():
+                loc_name = CACHE[map_id]['ix_to_loc'][int(loc_id)][:3]
+                from_loc_name = CACHE[map_id]['ix_to_loc'][int(occupied_from_id)][:3]
+                attack_source[loc_name] = from_loc_name
+
+        # Removing invalid retreat locs
+        for power in game.powers.values():
+            for retreat_unit in power.retreats:
+                power.retreats[retreat_unit] = [loc for loc in power.retreats[retreat_unit]
+                                                if loc[:3] not in invalid_retreat_locs
+                                                and loc[:3] != attack_source.get(retreat_unit[2:5], '')]
+
+def _is_state_dict_valid(state_dict):
+    """ Checks that a game state in dictionary format has all the required fields """
+    if state_dict is None:
+        return False
+    req_fields = ('gameID', 'variantID', 'turn', 'phase', 'gameOver', 'phases', 'standoffs', 'occupiedFrom')
+    if [1 for field in req_fields if field not in state_dict]:
+        LOGGER.error('The required fields for state dict are %s. Cannot translate %s', req_fields, state_dict)
+        return False
+    return True
+
+
 # Format:
 # {'gameID':      integer,
 #  'variantID':   integer,
@@ -234,19 +309,12 @@ def state_dict_to_game_and_power(state_dict, country_id, max_phases=None):
             #. None, None       - on error or if the conversion is not possible, or game is invalid / not-started / done
             #. game, power_name - on successful conversion
     """
-    if state_dict is None:
-        return None, None
-
-    req_fields = ('gameID', 'variantID', 'turn', 'phase', 'gameOver', 'phases', 'standoffs', 'occupiedFrom')
-    if [1 for field in req_fields if field not in state_dict]:
-        LOGGER.error('The required fields for state dict are %s. Cannot translate %s', req_fields, state_dict)
+    if not _is_state_dict_valid(state_dict):
         return None, None
 
     # Extracting information
     game_id = str(state_dict['gameID'])
     map_id = int(state_dict['variantID'])
-    standoffs = state_dict['standoffs']
-    occupied_from = state_dict['occupiedFrom']
 
     # Parsing all phases
     state_dict_phases = state_dict.get('phases', [])
@@ -256,81 +324,75 @@ def state_dict_to_game_and_power(state_dict, country_id, max_phases=None):
 
     # Building game - Replaying the last phases
     game = Game(game_id=game_id, map_name=CACHE['ix_to_map'][map_id])
-
     for phase_to_replay in all_phases[:-1]:
-        game.set_current_phase(phase_to_replay['name'])
-
-        # Units
-        game.clear_units()
-        for power_name, power_units in phase_to_replay['units'].items():
-            if power_name == 'GLOBAL':
-                continue
-            game.set_units(power_name, power_units)
-
-        # Centers
-        game.clear_centers()
-        for power_name, power_centers in phase_to_replay['centers'].items():
-            if power_name == 'GLOBAL':
-                continue
-            game.set_centers(power_name, power_centers)
-
-        # Orders
-        for power_name, power_orders in phase_to_replay['orders'].items():
-            if power_name == 'GLOBAL':
-                continue
-            game.set_orders(power_name, power_orders)
-
-        # Processing
-        game.process()
+        _replay_phase(game, phase_to_replay)
 
     # Setting the current phase
-    current_phase = all_phases[-1]
-    game.set_current_phase(current_phase['name'])
+    _set_current_phase(game, all_phases[-1], map_id, state_dict['standoffs'], state_dict['occupiedFrom'])
 
-    # Units
-    game.clear_units()
-    for power_name, power_units in current_phase['units'].items():
-        if power_name == 'GLOBAL':
-            continue
-        game.set_units(power_name, power_units)
-
-    # Centers
-    game.clear_centers()
-    for power_name, power_centers in current_phase['centers'].items():
-        if power_name == 'GLOBAL':
-            continue
-        game.set_centers(power_name, power_centers)
+    # Returning
+    power_name = CACHE[map_id]['ix_to_power'][country_id]
+    return game, power_name
 
-    # Setting retreat locs
-    if current_phase['name'][-1] == 'R':
-        invalid_retreat_locs = set()
-        attack_source = {}
+def update_game_from_state_dict(game, state_dict, country_id, check_hash=False, max_phases=None):
+    """ Updates a game previously converted from a game state with a newer game state from the same game.
+        Only phases added since the game current phase are replayed, so the cost is proportional
+        to the number of new phases rather than to the game length.
 
-        # Loc is occupied
-        for power in game.powers.values():
-            for unit in power.units:
-                invalid_retreat_locs.add(unit[2:5])
+        :param game: The game previously returned by :func:`state_dict_to_game_and_power`
+            (or by this function) for the same remote game. It is updated in place.
+        :param state_dict: The newer game state in dictionary format from webdiplomacy.net
+        :param country_id: The country id we want to convert.
+        :param check_hash: Optional. If True, also replays the full game state and checks that both games
+            have the same current phase and the same zobrist hash (i.e. the same units and centers).
+            On mismatch, the fully replayed game is returned.
+        :param max_phases: Optional. If set, games that must be fully replayed (e.g. when the given game can't
+            be updated, or to check the hash) are regenerated using only the last 'x' phases.
+        :return: A tuple of
 
-        # Loc was in standoff
-        if standoffs:
-            for loc_dict in standoffs:
-                _, loc = center_dict_to_str(loc_dict, map_id=map_id)
-                invalid_retreat_locs.add(loc[:3])
+            #. None, None       - on error or if the conversion is not possible
+            #. game, power_name - on successful conversion. The game is a new game if the given game
+               could not be updated (e.g. its current phase is not in the newer game state).
+    """
+    if not _is_state_dict_valid(state_dict):
+        return None, None
 
-        # Loc was attacked from
-        if occupied_from:
-            for loc_id, occupied_from_id in occupied_from.items():
-                loc_name = CACHE[map_id]['ix_to_loc'][int(loc_id)][:3]
-                from_loc_name = CACHE[map_id]['ix_to_loc'][int(occupied_from_id)][:3]
-                attack_source[loc_name] = from_loc_name
+    # Extracting information
+    map_id = int(state_dict['variantID'])
+    state_dict_phases = state_dict.get('phases', [])
+    if game is None or not state_dict_phases \
+            or game.game_id != str(state_dict['gameID']) or game.map_name != CACHE['ix_to_map'][map_id]:
+        return state_dict_to_game_and_power(state_dict, country_id, max_phases=max_phases)
+
+    # Finding the game current phase, from the most recent phase
+    current_phase_name = game.get_current_phase()
+    start_ix = len(state_dict_phases) - 1
+    while start_ix >= 0:
+        phase_dict = state_dict_phases[start_ix]
+        if turn_to_phase(phase_dict.get('turn', 0), phase_dict.get('phase', 'Diplomacy')) == current_phase_name:
+            break
+        start_ix -= 1
+
+    # Current phase not found - Replaying the full game
+    if start_ix < 0:
+        LOGGER.info('[%s] Phase %s not found in game state. Replaying the full game.', game.game_id, current_phase_name)
+        return state_dict_to_game_and_power(state_dict, country_id, max_phases=max_phases)
+
+    # Replaying the new phases, then setting the current phase
+    new_phases = [process_phase_dict(phase_dict, map_id=map_id) for phase_dict in state_dict_phases[start_ix:]]
+    for phase_to_replay in new_phases[:-1]:
+        _replay_phase(game, phase_to_replay)
+    _set_current_phase(game, new_phases[-1], map_id, state_dict['standoffs'], state_dict['occupiedFrom'])
+    power_name = CACHE[map_id]['ix_to_power'][country_id]
 
-        # Removing invalid retreat locs
-        for power in game.powers.values():
-            for retreat_unit in power.retreats:
-                power.retreats[retreat_unit] = [loc for loc in power.retreats[retreat_unit]
-                                                if loc[:3] not in invalid_retreat_locs
-                                                and loc[:3] != attack_source.get(retreat_unit[2:5], '')]
+    # Checking against a full replay
+    if check_hash:
+        full_game, _ = state_dict_to_game_and_power(state_dict, country_id, max_phases=max_phases)
+        if full_game.get_current_phase() != game.get_current_phase() or full_game.get_hash() != game.get_hash():
+            LOGGER.warning('[%s] Incremental update does not match full replay (phase %s, hash %s - expected %s, %s).',
+                           game.game_id, game.get_current_phase(), game.get_hash(),
+                           full_game.get_current_phase(), full_game.get_hash())
+            return full_game, power_name
 
     # Returning
-    power_name = CACHE[map_id]['ix_to_power'][country_id]
     return game, power_name
@@ -0,0 +1,164 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Contains a bot runner playing many webdiplomacy.net games concurrently """
+from collections import OrderedDict
+import inspect
+import logging
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.locks import Semaphore
+from diplomacy.integration.webdiplomacy_net.game import state_dict_to_game_and_power, update_game_from_state_dict
+
+# Constants
+LOGGER = logging.getLogger(__name__)
+
+class BotRunner:
+    """ Polls webdiplomacy.net for games where orders are missing and submits orders for all of them concurrently.
+
+        Each remote game is reconstructed only once: reconstructed games are cached, reused as long as the
+        remote game state does not change (e.g. while waiting for other players), and updated with only
+        the new phases when it does.
+    """
+
+    def __init__(self, api, get_orders, max_concurrency=10, poll_interval=5., max_phases=None,
+                 max_cached_games=1000, wait=False):
+        """ Constructor
+
+            :param api: The API to use to send requests (possibly created with max_clients to bound HTTP requests)
+            :param get_orders: Callable ``get_orders(game, power_name)`` returning the list of orders to submit
+                (or a future / coroutine returning it). If it returns None, no orders are submitted.
+                As games are cached, ``get_orders`` must not modify the game it receives.
+            :param max_concurrency: The maximum number of games processed simultaneously
+            :param poll_interval: The minimum number of seconds between the start of two consecutive polls
+            :param max_phases: Optional. If set, games are reconstructed using only the last 'x' phases.
+            :param max_cached_games: The maximum number of reconstructed games kept in cache
+            :param wait: Optional. If True, sets ready=False, if False sets ready=True when submitting orders.
+            :type api: diplomacy.integration.webdiplomacy_net.api.API
+            :type max_concurrency: int, optional
+            :type poll_interval: float, optional
+            :type max_phases: int | None, optional
+            :type max_cached_games: int, optional
+            :type wait: bool | None, optional
+        """
+        self.api = api
+        self.get_orders = get_orders
+        self.semaphore = Semaphore(max_concurrency)
+        self.poll_interval = poll_interval
+        self.max_phases = max_phases
+        self.max_cached_games = max_cached_games
+        self.wait = wait
+        self.games = OrderedDict()                      # {(game_id, country_id): (version, game, power_name)}
+        self.is_running = False
+        self.nb_cache_hits = 0
+        self.nb_updates = 0
+        self.nb_rebuilds = 0
+
+    @gen.coroutine
+    def run(self, nb_polls=None):
+        """ Polls until stop() is called, or until the given number of polls is reached
+
+            :param nb_polls: Optional. The number of polls to run.
+            :type nb_polls: int | None, optional
+        """
+        self.is_running = True
+        poll_ix = 0
+        while self.is_running and (nb_polls is None or poll_ix < nb_polls):
+            start_time = IOLoop.current().time()
+            yield self.poll()
+            poll_ix += 1
+            if self.is_running and (nb_polls is None or poll_ix < nb_polls):
+                yield gen.sleep(max(0., self.poll_interval - (IOLoop.current().time() - start_time)))
+        self.is_running = False
+
+    def stop(self):
+        """ Stops polling (after the current poll) """
+        self.is_running = False
+
+    @gen.coroutine
+    def poll(self):
+        """ Lists the games with missing orders and plays all of them concurrently
+
+            :return: A dict of {GameIdCountryId: True if orders were successfully submitted, False otherwise}
+        """
+        games_with_missing_orders = yield self.api.list_games_with_missing_orders()
+        results = yield [self.play_game(game.game_id, game.country_id) for game in games_with_missing_orders]
+        return dict(zip(games_with_missing_orders, results))
+
+    @gen.coroutine
+    def play_game(self, game_id, country_id):
+        """ Retrieves the game state, computes the orders and submits them
+
+            :param game_id: The id of the game object (integer)
+            :param country_id: The id of the country we are playing (integer)
+            :return: True if orders were successfully submitted, False otherwise
+        """
+        with (yield self.semaphore.acquire()):
+            state_dict = yield self.api.get_game_state(game_id, country_id)
+            game, power_name = self.get_game_and_power(game_id, country_id, state_dict)
+            if game is None:
+                return False
+
+            # Computing orders
+            try:
+                orders = self.get_orders(game, power_name)
+                if inspect.isawaitable(orders):
+                    orders = yield orders
+            except Exception:                                                       # pylint: disable=broad-except
+                LOGGER.exception('[%s/%s] Unable to compute orders.', game_id, power_name)
+                return False
+            if orders is None:
+                return False
+
+            # Submitting orders
+            return (yield self.api.set_orders(game, power_name, orders, wait=self.wait))
+
+    def get_game_and_power(self, game_id, country_id, state_dict):
+        """ Returns the game and the power we are playing from a game state, using cached game if still valid
+
+            :param game_id: The id of the game object (integer)
+            :param country_id: The id of the country we are playing (integer)
+            :param state_dict: The game state in dictionary format from webdiplomacy.net
+            :return: A tuple of (game, power_name), or (None, None) on error
+        """
+        if state_dict is None:
+            return None, None
+        key = (game_id, country_id)
+        version = (state_dict.get('turn'), state_dict.get('phase'), len(state_dict.get('phases', [])))
+
+        # Remote game did not change since last reconstruction
+        if key in self.games and self.games[key][0] == version:
+            self.games.move_to_end(key)
+            self.nb_cache_hits += 1
+            _, game, power_name = self.games[key]
+            return game, power_name
+
+        # Remote game changed - Replaying only the new phases on cached game
+        if key in self.games:
+            game, power_name = update_game_from_state_dict(self.games[key][1], state_dict, country_id,
+                                                           max_phases=self.max_phases)
+            self.nb_updates += 1
+        else:
+            game, power_name = state_dict_to_game_and_power(state_dict, country_id, max_phases=self.max_phases)
+            self.nb_rebuilds += 1
+        if game is None:
+            self.games.pop(key, None)
+            return None, None
+        self.games[key] = (version, game, power_name)
+        self.games.move_to_end(key)
+        while len(self.games) > self.max_cached_games:
+            self.games.popitem(last=False)
+        return game, power_name
@@ -15,8 +15,12 @@
 #  with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ==============================================================================
 """ Test order conversion. """
+import random
+from diplomacy import Game
 from diplomacy.integration.webdiplomacy_net.game import turn_to_phase, unit_dict_to_str, center_dict_to_str, \
-    order_dict_to_str
+    order_dict_to_str, state_dict_to_game_and_power, update_game_from_state_dict
+from diplomacy.integration.webdiplomacy_net.orders import Order
+from diplomacy.integration.webdiplomacy_net.utils import CACHE
 
 # ------------------------------------
 # ---- Tests for turn_to_phase ----
@@ -183,3 +187,105 @@ def test_s1902m_hold():
     power_name, order = order_dict_to_str(order_dict, phase='Diplomacy')
     assert power_name == 'FRANCE'
     assert order == 'A LON H'
+
+
+# ------------------------------------------------
+# ---- Tests for incremental game reconstruction ----
+# ------------------------------------------------
+def phase_data_to_phase_dict(phase_data):
+    """ Converts a phase data of a standard game to the webdiplomacy.net phase dict format """
+    name = phase_data.name
+    year, season, phase_type = int(name[1:5]), name[0], name[-1]
+    turn = 2 * (year - 1901) + (0 if season == 'S' else 1)
+    phase_dict = {'turn': turn,
+                  'phase': {'M': 'Diplomacy', 'R': 'Retreats', 'A': 'Builds'}[phase_type],
+                  'units': [],
+                  'centers': [],
+                  'orders': []}
+    for power_name, units in phase_data.state['units'].items():
+        for unit in units:
+            phase_dict['units'].append({'unitType': 'Army' if unit.lstrip('*')[0] == 'A' else 'Fleet',
+                                        'terrID': CACHE[1]['loc_to_ix'][unit.lstrip('*')[2:]],
+                                        'countryID': CACHE[1]['power_to_ix'][power_name],
+                                        'retreating': 'Yes' if unit[0] == '*' else 'No'})
+    for power_name, centers in phase_data.state['centers'].items():
+        for center in centers:
+            phase_dict['centers'].append({'terrID': CACHE[1]['loc_to_ix'][center],
+                                          'countryID': CACHE[1]['power_to_ix'][power_name]})
+    for power_name, orders in phase_data.orders.items():
+        for order in orders or []:
+            order_dict = Order(order, map_name='standard', phase_type=phase_type).to_dict()
+            order_dict['countryID'] = CACHE[1]['power_to_ix'][power_name]
+            phase_dict['orders'].append(order_dict)
+    return phase_dict
+
+def game_to_state_dict(game, game_id):
+    """ Converts a standard game to the webdiplomacy.net state dict format """
+    phases = [phase_data_to_phase_dict(phase_data) for phase_data in game.get_phase_history()]
+    phases.append(phase_data_to_phase_dict(game.get_phase_data()))
+    return {'gameID': game_id,
+            'variantID': 1,
+            'turn': phases[-1]['turn'],
+            'phase': phases[-1]['phase'],
+            'gameOver': 'No',
+            'phases': phases,
+            'standoffs': [],
+            'occupiedFrom': {}}
+
+def test_update_game_from_state_dict():
+    """ Tests that updating a game with new phases gives the same game as a full replay """
+    random.seed(0)
+    local_game = Game(map_name='standard')
+    game, power_name = state_dict_to_game_and_power(game_to_state_dict(local_game, 1), 2)
+    nb_phases_before = 0
+    for _ in range(8):
+        # Playing 1 or 2 phases between updates
+        for _ in range(random.randint(1, 2)):
+            possible_orders = local_game.get_all_possible_orders()
+            for power in local_game.powers.values():
+                local_game.set_orders(power.name, [random.choice(possible_orders[loc])
+                                                   for loc in local_game.get_orderable_locations(power.name)
+                                                   if possible_orders[loc]])
+            local_game.process()
+        state_dict = game_to_state_dict(local_game, 1)
+        updated_game, power_name = update_game_from_state_dict(game, state_dict, 2, check_hash=True)
+        full_game, _ = state_dict_to_game_and_power(state_dict, 2)
+        assert updated_game is game
+        assert power_name == 'FRANCE'
+        assert game.get_current_phase() == full_game.get_current_phase() == local_game.get_current_phase()
+        assert game.get_hash() == full_game.get_hash() == local_game.get_hash()
+        assert len(game.state_history) > nb_phases_before
+        nb_phases_before = len(game.state_history)
+
+def test_update_game_from_unknown_phase():
+    """ Tests that a game is fully replayed if its current phase is not in the new state """
+    game, _ = state_dict_to_game_and_power(game_to_state_dict(Game(map_name='standard'), 1), 2)
+    game.set_current_phase('F1905M')
+    state_dict = game_to_state_dict(Game(map_name='standard'), 1)
+    updated_game, power_name = update_game_from_state_dict(game, state_dict, 2)
+    assert updated_game is not game
+    assert power_name == 'FRANCE'
+    assert updated_game.get_current_phase() == 'S1901M'
+
+def test_update_game_max_phases():
+    """ Tests that games fully replayed during an update only use the last 'x' phases """
+    local_game = Game(map_name='standard')
+    for _ in range(6):
+        local_game.process()
+    state_dict = game_to_state_dict(local_game, 1)
+    game, _ = state_dict_to_game_and_power(game_to_state_dict(Game(map_name='standard'), 1), 2)
+    game.set_current_phase('F1905M')
+
+    updated_game, _ = update_game_from_state_dict(game, state_dict, 2, max_phases=3)
+    assert updated_game is not game
+    assert len(updated_game.state_history) == 2
+    assert updated_game.get_current_phase() == local_game.get_current_phase()
+    assert updated_game.get_hash() == local_game.get_hash()
+
+    # Checking the hash against a replay of the last 3 phases
+    game, _ = state_dict_to_game_and_power(state_dict, 2, max_phases=3)
+    local_game.process()
+    updated_game, _ = update_game_from_state_dict(game, game_to_state_dict(local_game, 1), 2,
+                                                  check_hash=True, max_phases=3)
+    assert updated_game is game
+    assert updated_game.get_hash() == local_game.get_hash()
@@ -0,0 +1,119 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test bot runner against a local stand-in of the webdiplomacy.net API. """
+import socket
+from tornado import gen
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.web import Application, RequestHandler
+import ujson as json
+from diplomacy import Game
+from diplomacy.integration.webdiplomacy_net.api import API
+from diplomacy.integration.webdiplomacy_net.runner import BotRunner
+from diplomacy.integration.webdiplomacy_net.tests.test_game import game_to_state_dict
+
+class StandInHandler(RequestHandler):
+    """ Stand-in for api.php """
+    # pylint: disable=abstract-method, arguments-differ
+
+    def initialize(self, stand_in):
+        """ Initialize handler with stand-in data """
+        self.stand_in = stand_in
+
+    @gen.coroutine
+    def _respond(self, body):
+        """ Writes a JSON body after a small delay, recording the number of concurrent requests """
+        self.stand_in['nb_active'] += 1
+        self.stand_in['max_active'] = max(self.stand_in['max_active'], self.stand_in['nb_active'])
+        yield gen.sleep(0.01)
+        self.stand_in['nb_active'] -= 1
+        self.write(json.dumps(body))
+
+    @gen.coroutine
+    def get(self):
+        """ Handles routes players/missing_orders and game/status """
+        route = self.get_argument('route')
+        if route == 'players/missing_orders':
+            yield self._respond([{'gameID': game_id, 'countryID': 2} for game_id in sorted(self.stand_in['games'])])
+        else:
+            game_id = int(self.get_argument('gameID'))
+            yield self._respond(game_to_state_dict(self.stand_in['games'][game_id], game_id))
+
+    @gen.coroutine
+    def post(self):
+        """ Handles route game/orders (echoes submitted orders) """
+        body = json.loads(self.request.body.decode('utf-8'))
+        self.stand_in['submitted'][body['gameID']] = body
+        yield self._respond(body['orders'])
+
+def test_bot_runner():
+    """ Plays many games concurrently against a local stand-in """
+    games = {}
+    for game_id in range(1, 9):
+        game = Game(map_name='standard')
+        game.set_orders('FRANCE', ['A PAR - BUR', 'F BRE - MAO', 'A MAR H'])
+        game.process()
+        games[game_id] = game
+    stand_in = {'games': games, 'submitted': {}, 'nb_active': 0, 'max_active': 0}
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    received = []
+
+    def get_orders(game, power_name):
+        """ Holds all units """
+        received.append((game, power_name))
+        return ['%s H' % unit for unit in game.get_units(power_name)]
+
+    @gen.coroutine
+    def run():
+        """ Runs two polls """
+        http_server = HTTPServer(Application([(r'/api.php', StandInHandler, {'stand_in': stand_in})]))
+        http_server.listen(port, '127.0.0.1')
+        api = API('api_key', max_clients=4, api_url='http://127.0.0.1:%d/api.php' % port)
+        runner = BotRunner(api, get_orders, max_concurrency=3, poll_interval=0.)
+        results = yield runner.poll()
+        assert len(results) == 8 and all(results.values())
+        assert runner.nb_rebuilds == 8 and runner.nb_cache_hits == 0
+
+        # Remote games did not change - Reusing reconstructed games
+        yield runner.run(nb_polls=1)
+        assert runner.nb_rebuilds == 8 and runner.nb_cache_hits == 8
+        for game, power_name in received:
+            assert power_name == 'FRANCE'
+            assert game.get_current_phase() == 'F1901M'
+            assert sorted(game.get_units('FRANCE')) == ['A BUR', 'A MAR', 'F MAO']
+
+        # Remote games processed - Updating reconstructed games
+        for game in games.values():
+            game.set_orders('FRANCE', ['A BUR - BEL', 'F MAO - POR', 'A MAR - SPA'])
+            game.process()
+        del received[:]
+        yield runner.run(nb_polls=1)
+        assert runner.nb_rebuilds == 8 and runner.nb_updates == 8
+        for game, power_name in received:
+            assert game.get_current_phase() == 'W1901A'
+            assert sorted(game.get_centers('FRANCE')) == ['BEL', 'BRE', 'MAR', 'PAR', 'POR', 'SPA']
+        http_server.stop()
+
+    IOLoop().run_sync(run)
+    assert 1 < stand_in['max_active'] <= 3
+    assert len(received) == 8
+    assert sorted(stand_in['submitted']) == list(range(1, 9))
+    assert all(len(body['orders']) == 3 and body['ready'] == 'Yes' for body in stand_in['submitted'].values())
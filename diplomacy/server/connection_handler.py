@@ -0,0 +1,179 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Tornado connection handler class, used internally to manage data received by server application. """
+import logging
+import time
+
+from tornado import gen, ioloop
+from tornado.concurrent import Future
+from tornado.iostream import StreamClosedError
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+
+from diplomacy.communication import frames, requests, responses
+from diplomacy.server import request_managers
+from diplomacy.utils import exceptions, strings
+from diplomacy.utils.network_data import NetworkData
+
+LOGGER = logging.getLogger(__name__)
+
+# Metric reported to server metrics hook: time spent to handle a request (label: request name).
+METRIC_REQUEST_HANDLING = 'request_handling_seconds'
+
+class ConnectionHandler(WebSocketHandler):
+    """ ConnectionHandler class. Properties:
+
+        - **server**: server object representing running server.
+        - **protocol**: batch sub-protocol negotiated with client, or None (one JSON message per frame).
+        - **write_batch**: list of couples (JSON message, future) waiting to be written in next batch frame.
+    """
+    # pylint: disable=abstract-method
+
+    def __init__(self, *args, **kwargs):
+        self.server = None
+        self.protocol = None
+        self.write_batch = []
+        super(ConnectionHandler, self).__init__(*args, **kwargs)
+
+    def initialize(self, server=None):
+        """ Initialize the connection handler.
+
+            :param server: a Server object.
+            :type server: diplomacy.server.server.Server
+        """
+        # pylint: disable=arguments-differ
+        self.server = server
+
+    def get_compression_options(self):
+        """ Return compression options for the connection (see tornado.web.WebSocketHandler).
+            Return an empty dict, so that server accepts permessage-deflate compression if client asks it.
+        """
+        return {}
+
+    def select_subprotocol(self, subprotocols):
+        """ Select a batch sub-protocol requested by client, if any (see tornado.web.WebSocketHandler). """
+        self.protocol = frames.select_protocol(subprotocols)
+        return self.protocol
+
+    def check_origin(self, origin):
+        """ Return True if we should accept connexion from given origin (str).
+            Any origin is accepted, as this server is intended for local usage and load testing.
+        """
+        return True
+
+    def on_close(self):
+        """ Invoked when the socket is closed (see tornado.web.WebSocketHandler).
+            Tokens are kept, so that client can reuse them after reconnection.
+        """
+        self.server.users.remove_connection(self, remove_tokens=False)
+        LOGGER.info("Removed connection. Remaining %d connection(s).", self.server.users.count_connections())
+
+    def write_message(self, message, binary=False):
+        """ Sends the given message to the client of this Web Socket (see tornado.web.WebSocketHandler).
+            Message may be a NetworkData object (response or notification). If a batch sub-protocol
+            was negotiated, all messages written during current IO loop iteration are sent in one frame.
+
+            :param message: message to write.
+            :param binary: (for messages which are not NetworkData objects) send message as binary data.
+            :return: a Future done when message is written.
+        """
+        if not isinstance(message, NetworkData):
+            return super(ConnectionHandler, self).write_message(message, binary=binary)
+        if self.protocol is None:
+            return super(ConnectionHandler, self).write_message(message.json())
+        future = Future()
+        if not self.write_batch:
+            ioloop.IOLoop.current().add_callback(self._write_batch)
+        self.write_batch.append((message.to_dict(), future))
+        return future
+
+    def _write_batch(self):
+        """ Write all messages waiting in write batch into one frame. """
+        batch, self.write_batch = self.write_batch, []
+        if not batch:
+            return
+        try:
+            frame = frames.encode_batch([json_message for json_message, _ in batch], self.protocol)
+            write_future = super(ConnectionHandler, self).write_message(frame, binary=isinstance(frame, bytes))
+        except (WebSocketClosedError, StreamClosedError) as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        def on_batch_written(batch_future):
+            """ Transfer writing result or exception to each message future. """
+            exception = batch_future.exception()
+            for _, future in batch:
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(None)
+
+        write_future.add_done_callback(on_batch_written)
+
+    @staticmethod
+    def translate_notification(notification):
+        """ Translate a notification to an array of notifications.
+
+            :param notification: a notification object to pass to handler function.
+                See diplomacy.communication.notifications for possible notifications.
+            :return: An array of notifications containing a single notification.
+        """
+        return [notification]
+
+    @gen.coroutine
+    def on_message(self, message):
+        """ Parse given message and manage parsed data (expected a string representation of a request,
+            or a batch frame of requests if a batch sub-protocol was negotiated).
+            Requests from a same frame are handled in order.
+        """
+        try:
+            json_requests = frames.decode_frame(message)
+        except ValueError as exc:
+            LOGGER.error('Unable to decode frame: %s', exc)
+            return
+        for json_request in json_requests:
+            yield self._handle_json_request(json_request)
+
+    @gen.coroutine
+    def _handle_json_request(self, json_request):
+        """ Handle a JSON request and write response to client. """
+        response = None
+        request_id = json_request.get(strings.REQUEST_ID, None) if isinstance(json_request, dict) else None
+        try:
+            request = requests.parse_dict(json_request)
+            start_time = time.perf_counter()
+            response = yield request_managers.handle_request(self.server, request, self)
+            self.server.report_metric(
+                METRIC_REQUEST_HANDLING, time.perf_counter() - start_time, request.name)
+            if response is None:
+                response = responses.Ok(request_id=request.request_id)
+        except exceptions.ResponseException as exc:
+            if request_id is None:
+                LOGGER.error('Unable to answer request without request ID: %s', exc.message)
+                return
+            response = responses.Error(error_type=type(exc).__name__, message=exc.message, request_id=request_id)
+        except exceptions.DiplomacyException as exc:
+            LOGGER.exception('Error while handling request.')
+            if request_id is None:
+                return
+            response = responses.Error(error_type=type(exc).__name__, message=exc.message, request_id=request_id)
+
+        if response:
+            try:
+                yield self.write_message(response)
+            except (WebSocketClosedError, StreamClosedError):
+                LOGGER.error('Unable to write response %s: websocket closed.', response.name)
@@ -0,0 +1,269 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Load generator for diplomacy server.
+
+    Starts an in-process server (with in-memory persistence) and plays many concurrent games on it with
+    simulated clients. Each game is created by a game master and played by 7 clients, each client using
+    its own websocket connection to control one power. At each phase, every client sends random orders
+    (picked among possible orders), optionally with some press messages, and waits for game processing.
+
+    Measured values:
+
+    - requests per second handled by server (based on responses received by clients),
+    - client request latency (time between request writing and response reception),
+    - phase latency (time between the last orders sent for a phase and the reception of
+      game processing notification),
+    - server game processing time (reported by server metrics hook).
+
+    Usage:
+
+    .. code-block:: bash
+
+        python -m diplomacy.server.load_generator --games 10 --phases 6 --messages 2 --batching --compression
+"""
+import argparse
+import logging
+import random
+import socket
+import time
+from collections import defaultdict
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from diplomacy.client.connection import connect, METRIC_RESPONSE_LATENCY
+from diplomacy.server.server import Server, METRIC_GAME_PROCESSING
+from diplomacy.utils import common
+
+LOGGER = logging.getLogger(__name__)
+
+HOSTNAME = 'localhost'
+PASSWORD = 'password'
+
+# bcrypt cost factor used by load generator server (lower than default, so that many users can sign in quickly).
+PASSWORD_HASH_ROUNDS = 4
+
+def get_free_port():
+    """ Return a TCP port currently available on local host. """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def summarize(values):
+    """ Return a dictionary summarizing given list of numbers (count, mean, 50th/95th/99th percentiles and max). """
+    if not values:
+        return {'count': 0, 'mean': 0., 'p50': 0., 'p95': 0., 'p99': 0., 'max': 0.}
+    values = sorted(values)
+    return {'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': values[int(0.50 * (len(values) - 1))],
+            'p95': values[int(0.95 * (len(values) - 1))],
+            'p99': values[int(0.99 * (len(values) - 1))],
+            'max': values[-1]}
+
+class LoadStats:
+    """ Values collected while running load generator.
+
+        Properties:
+
+        - **request_latencies**: list of client request latencies (seconds).
+        - **phase_latencies**: list of phase latencies (seconds).
+        - **processing_times**: list of server game processing times (seconds).
+        - **last_orders_time**: dictionary mapping a game ID and a phase to time when last orders were sent.
+        - **nb_phases**: number of phases processed (all games).
+    """
+    __slots__ = ['request_latencies', 'phase_latencies', 'processing_times', 'last_orders_time', 'nb_phases']
+
+    def __init__(self):
+        self.request_latencies = []
+        self.phase_latencies = []
+        self.processing_times = []
+        self.last_orders_time = {}
+        self.nb_phases = 0
+
+    def on_client_metric(self, metric_name, value, label=None):
+        """ Client connections metrics hook. """
+        # pylint: disable=unused-argument
+        if metric_name == METRIC_RESPONSE_LATENCY:
+            self.request_latencies.append(value)
+
+    def on_server_metric(self, metric_name, value, label=None):
+        """ Server metrics hook. """
+        # pylint: disable=unused-argument
+        if metric_name == METRIC_GAME_PROCESSING:
+            self.processing_times.append(value)
+
+@gen.coroutine
+def play_power(game, nb_phases, nb_messages, stats):
+    """ Play given power game (random orders and messages) for given number of phases,
+        or until game is completed.
+
+        :param game: a NetworkGame object controlling a power.
+        :param nb_phases: number of phases to play.
+        :param nb_messages: number of press messages to send at each movement phase.
+        :param stats: LoadStats object to update.
+        :type game: diplomacy.client.network_game.NetworkGame
+        :type stats: LoadStats
+    """
+    processed = {'future': None}
+
+    def on_game_processed(network_game, notification):
+        """ Register phase latency and wake up player. """
+        sent_time = stats.last_orders_time.get((network_game.game_id, notification.previous_phase_data.name))
+        if sent_time is not None:
+            stats.phase_latencies.append(time.perf_counter() - sent_time)
+        if processed['future'] is not None and not processed['future'].done():
+            processed['future'].set_result(None)
+
+    game.add_on_game_processed(on_game_processed)
+    power_name = game.role
+    other_power_names = [name for name in game.powers if name != power_name]
+    # Many phases may be processed while player waits (e.g. phases where player has nothing to order),
+    # so we count phases in game history rather than phases played.
+    last_history_size = len(game.state_history) + nb_phases
+    while len(game.state_history) < last_history_size:
+        if game.is_game_done or game.get_power(power_name).is_eliminated():
+            break
+        phase = game.current_short_phase
+        if nb_messages and not game.no_press and phase.endswith('M'):
+            for _ in range(nb_messages):
+                message = game.new_power_message(random.choice(other_power_names), 'Load test message.')
+                yield game.send_game_message(message=message)
+        orderable_locations = game.get_orderable_locations(power_name)
+        # Powers without orderable locations (e.g. in retreat or adjustment phases) are not waited by server.
+        if orderable_locations:
+            possible_orders = game.get_all_possible_orders()
+            orders = [random.choice(possible_orders[location])
+                      for location in orderable_locations if possible_orders[location]]
+            stats.last_orders_time[(game.game_id, phase)] = time.perf_counter()
+            yield game.set_orders(orders=orders, wait=False)
+        # Many game processing notifications may be received at once (e.g. in a batched frame),
+        # so we wait for phase change rather than for a specific notification.
+        while game.current_short_phase == phase and not game.is_game_done:
+            processed['future'] = Future()
+            yield processed['future']
+
+@gen.coroutine
+def play_game(port, game_index, nb_phases, nb_messages, use_batching, use_compression, stats):
+    """ Create a game on server and play it with 7 simulated clients.
+
+        :param port: server port.
+        :param game_index: index of game to play (used to generate user names).
+        :param nb_phases: number of phases to play.
+        :param nb_messages: number of press messages sent by each power at each movement phase.
+        :param use_batching: if True, clients ask server for batched frames.
+        :param use_compression: if True, clients ask server for permessage-deflate compression.
+        :param stats: LoadStats object to update.
+    """
+    connection_kwargs = {'use_batching': use_batching, 'use_compression': use_compression}
+    master_connection = yield connect(HOSTNAME, port, **connection_kwargs)
+    master_connection.metrics_hook = stats.on_client_metric
+    master_channel = yield master_connection.authenticate('master_%d' % game_index, PASSWORD)
+    rules = ['POWER_CHOICE', 'REAL_TIME']
+    if not nb_messages:
+        rules.append('NO_PRESS')
+    master_game = yield master_channel.create_game(rules=rules, deadline=0, n_controls=7)
+
+    power_games = []
+    for power_name in sorted(master_game.powers):
+        connection = yield connect(HOSTNAME, port, **connection_kwargs)
+        connection.metrics_hook = stats.on_client_metric
+        channel = yield connection.authenticate('player_%d_%s' % (game_index, power_name), PASSWORD)
+        power_game = yield channel.join_game(game_id=master_game.game_id, power_name=power_name)
+        power_games.append(power_game)
+
+    nb_phases_before = len(power_games[0].state_history)
+    yield [play_power(power_game, nb_phases, nb_messages, stats) for power_game in power_games]
+    stats.nb_phases += max(len(power_game.state_history) for power_game in power_games) - nb_phases_before
+
+def run(nb_games=1, nb_phases=4, nb_messages=0, use_batching=False, use_compression=False, port=None):
+    """ Start a server, play given number of games concurrently on it, stop server and return results.
+
+        :param nb_games: number of games to play concurrently.
+        :param nb_phases: number of phases to play in each game.
+        :param nb_messages: number of press messages sent by each power at each movement phase.
+            If 0, games are played with rule NO_PRESS.
+        :param use_batching: if True, clients ask server for batched frames.
+        :param use_compression: if True, clients ask server for permessage-deflate compression.
+        :param port: (optional) port where server must run. If not given, a free port is selected.
+        :return: a dictionary of results.
+    """
+    port = port or get_free_port()
+    stats = LoadStats()
+    io_loop = IOLoop()
+    common.Tornado.stop_loop_on_callback_error(io_loop)
+    server = Server(password_hash_rounds=PASSWORD_HASH_ROUNDS, metrics_hook=stats.on_server_metric)
+    timing = {}
+
+    @gen.coroutine
+    def main():
+        """ Play all games, then stop IO loop. """
+        try:
+            timing['start'] = time.perf_counter()
+            yield [play_game(port, game_index, nb_phases, nb_messages, use_batching, use_compression, stats)
+                   for game_index in range(nb_games)]
+            timing['end'] = time.perf_counter()
+        finally:
+            io_loop.stop()
+
+    io_loop.add_callback(main)
+    server.start(port=port, io_loop=io_loop)
+    server.stop()
+    io_loop.close()
+    if 'end' not in timing:
+        raise RuntimeError('Load generator did not complete.')
+
+    duration = timing['end'] - timing['start']
+    return {'games': nb_games,
+            'phases': stats.nb_phases,
+            'duration': duration,
+            'requests': len(stats.request_latencies),
+            'requests_per_second': len(stats.request_latencies) / duration if duration else 0.,
+            'request_latency': summarize(stats.request_latencies),
+            'phase_latency': summarize(stats.phase_latencies),
+            'game_processing': summarize(stats.processing_times)}
+
+def print_results(results):
+    """ Print results returned by function run(). """
+    print('Games: %d, phases processed: %d, duration: %.3f s' % (
+        results['games'], results['phases'], results['duration']))
+    print('Requests: %d (%.1f requests/s)' % (results['requests'], results['requests_per_second']))
+    for key, title in (('request_latency', 'Request latency'),
+                       ('phase_latency', 'Phase latency'),
+                       ('game_processing', 'Game processing')):
+        summary = results[key]
+        print('%s (ms): mean %.2f, p50 %.2f, p95 %.2f, max %.2f (%d values)' % (
+            title, 1000 * summary['mean'], 1000 * summary['p50'], 1000 * summary['p95'], 1000 * summary['max'],
+            summary['count']))
+
+def main():
+    """ Parse command line arguments and run load generator. """
+    parser = argparse.ArgumentParser(description='Run a diplomacy server and load it with simulated games.')
+    parser.add_argument('--games', type=int, default=1, help='number of concurrent games (default: 1)')
+    parser.add_argument('--phases', type=int, default=4, help='number of phases played per game (default: 4)')
+    parser.add_argument('--messages', type=int, default=0,
+                        help='number of messages sent by each power per movement phase (default: 0, no press)')
+    parser.add_argument('--batching', action='store_true', help='ask server for batched frames')
+    parser.add_argument('--compression', action='store_true', help='ask server for permessage-deflate compression')
+    parser.add_argument('--port', type=int, default=None, help='server port (default: a free port)')
+    args = parser.parse_args()
+    print_results(run(nb_games=args.games, nb_phases=args.phases, nb_messages=args.messages,
+                      use_batching=args.batching, use_compression=args.compression, port=args.port))
+
+if __name__ == '__main__':
+    main()
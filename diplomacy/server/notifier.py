@@ -0,0 +1,255 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Server notifier class. Used to send server notifications, allowing to ignore some addresses. """
+from diplomacy.communication import notifications
+from diplomacy.utils import strings
+
+class Notifier:
+    """ Server notifier class. """
+    __slots__ = ['server', 'ignore_tokens', 'ignore_addresses']
+
+    def __init__(self, server, ignore_tokens=None, ignore_addresses=None):
+        """ Initialize a server notifier. You can specify some tokens or addresses to ignore using
+            ignore_tokens or ignore_addresses. Note that these parameters are mutually exclusive
+            (you can use either none of them or only one of them).
+
+            :param server: a server object.
+            :param ignore_tokens: (optional) sequence of tokens to ignore.
+            :param ignore_addresses: (optional) sequence of couples (power name, token) to ignore.
+            :type server: diplomacy.server.server.Server
+        """
+        self.server = server
+        self.ignore_tokens = None
+        self.ignore_addresses = None
+        if ignore_tokens and ignore_addresses:
+            raise AssertionError('Notifier cannot ignore both tokens and addresses.')
+
+        # Expect a sequence of tokens to ignore.
+        # Convert it to a set.
+        elif ignore_tokens:
+            self.ignore_tokens = set(ignore_tokens)
+
+        # Expect a sequence of tuples (power name, token) to ignore.
+        # Convert it to a dict {power name => {token}} (each power name with all associated ignored tokens).
+        elif ignore_addresses:
+            self.ignore_addresses = {}
+            for power_name, token in ignore_addresses:
+                self.ignore_addresses.setdefault(power_name, set()).add(token)
+
+    def ignores(self, notification):
+        """ Return True if given notification must be ignored.
+
+            :param notification: notification to check
+            :return: True if notification must be ignored.
+            :type notification: diplomacy.communication.notifications._AbstractNotification
+        """
+        if self.ignore_tokens:
+            return notification.token in self.ignore_tokens
+        if self.ignore_addresses and notification.level == strings.GAME:
+            # We can ignore addresses only for game requests (as other requests only have a token, not a full address).
+            return (notification.game_role in self.ignore_addresses
+                    and notification.token in self.ignore_addresses[notification.game_role])
+        return False
+
+    def _notify(self, notification):
+        """ Register a notification to send if it is not ignored. """
+        if not self.ignores(notification):
+            self.server.notify(notification)
+
+    def _notify_game_addresses(self, game_id, addresses, notification_class, **kwargs):
+        """ Send a notification to given game addresses.
+
+            :param game_id: game ID.
+            :param addresses: sequence of couples (game role, token).
+            :param notification_class: class of notification to send.
+            :param kwargs: (optional) other notification parameters.
+        """
+        for game_role, token in addresses:
+            self._notify(notification_class(token=token, game_id=game_id, game_role=game_role, **kwargs))
+
+    def notify_game_addresses(self, game_id, addresses, notification_class, **kwargs):
+        """ Public version of _notify_game_addresses(). See it for parameters. """
+        self._notify_game_addresses(game_id, addresses, notification_class, **kwargs)
+
+    def notify_account_deleted(self, username):
+        """ Notify all tokens of given username about account deleted. """
+        for token in self.server.users.get_tokens(username):
+            self._notify(notifications.AccountDeleted(token=token))
+
+    def notify_game_deleted(self, server_game):
+        """ Notify all game tokens about game deleted.
+
+            :param server_game: game deleted
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.GameDeleted)
+
+    def notify_game_powers_controllers(self, server_game):
+        """ Notify all game tokens about current game powers controllers.
+
+            :param server_game: game notified
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.PowersControllers,
+                                    powers=server_game.get_controllers(),
+                                    timestamps=server_game.get_controllers_timestamps())
+
+    def notify_game_status(self, server_game):
+        """ Notify all game tokens about current game status.
+
+            :param server_game: game notified
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.GameStatusUpdate, status=server_game.status)
+
+    def notify_game_phase_data(self, server_game, phase_data, phase_data_type, addresses=None):
+        """ Notify game tokens about a new phase data, filtered for each recipient role.
+
+            :param server_game: game notified
+            :param phase_data: phase data to send
+            :param phase_data_type: either strings.PHASE (current phase) or strings.STATE_HISTORY (past phase).
+            :param addresses: (optional) addresses to notify. Default to all game addresses.
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        is_current = phase_data_type == strings.PHASE
+        filtered_phase_data = {}
+        for game_role, token in (server_game.get_reception_addresses() if addresses is None else addresses):
+            if game_role not in filtered_phase_data:
+                filtered_phase_data[game_role] = server_game.filter_phase_data(phase_data, game_role, is_current)
+            self._notify(notifications.GamePhaseUpdate(token=token, game_id=server_game.game_id, game_role=game_role,
+                                                       phase_data=filtered_phase_data[game_role],
+                                                       phase_data_type=phase_data_type))
+
+    def notify_game_processed(self, server_game, previous_phase_data, current_phase_data):
+        """ Notify all game tokens about a game phase update (game processing).
+
+            :param server_game: game notified
+            :param previous_phase_data: game phase data before phase update
+            :param current_phase_data: game phase data after phase update
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        filtered_phase_data = {}
+        for game_role, token in server_game.get_reception_addresses():
+            if game_role not in filtered_phase_data:
+                filtered_phase_data[game_role] = (
+                    server_game.filter_phase_data(previous_phase_data, game_role, is_current=False),
+                    server_game.filter_phase_data(current_phase_data, game_role, is_current=True))
+            previous_data, current_data = filtered_phase_data[game_role]
+            self._notify(notifications.GameProcessed(token=token, game_id=server_game.game_id, game_role=game_role,
+                                                     previous_phase_data=previous_data,
+                                                     current_phase_data=current_data))
+
+    def notify_power_orders_update(self, server_game, power, orders):
+        """ Notify game tokens about new orders for given power:
+
+            - omniscient tokens and other tokens of given power receive orders;
+            - tokens of other powers only receive the order flag.
+
+            :param server_game: game to notify
+            :param power: power which orders were updated
+            :param orders: new power orders
+            :type server_game: diplomacy.server.server_game.ServerGame
+            :type power: diplomacy.engine.power.Power
+        """
+        self._notify_game_addresses(server_game.game_id,
+                                    server_game.get_omniscient_addresses()
+                                    + server_game.get_power_addresses(power.name),
+                                    notifications.PowerOrdersUpdate, power_name=power.name, orders=orders)
+        for other_power_name in server_game.get_map_power_names():
+            if other_power_name != power.name:
+                self._notify_game_addresses(server_game.game_id, server_game.get_power_addresses(other_power_name),
+                                            notifications.PowerOrdersFlag, power_name=power.name,
+                                            order_is_set=power.order_is_set)
+
+    def notify_power_wait_flag(self, server_game, power, wait_flag):
+        """ Notify all game tokens about new wait flag for given power.
+
+            :param server_game: game to notify
+            :param power: power to notify about
+            :param wait_flag: new wait flag
+            :type power: diplomacy.engine.power.Power
+        """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.PowerWaitFlag, power_name=power.name, wait=wait_flag)
+
+    def notify_cleared_units(self, server_game, power_name):
+        """ Notify all game tokens about cleared units for given power name (None for all powers). """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.ClearedUnits, power_name=power_name)
+
+    def notify_cleared_centers(self, server_game, power_name):
+        """ Notify all game tokens about cleared centers for given power name (None for all powers). """
+        self._notify_game_addresses(server_game.game_id, server_game.get_reception_addresses(),
+                                    notifications.ClearedCenters, power_name=power_name)
+
+    def notify_cleared_orders(self, server_game, power_name):
+        """ Notify all game tokens allowed to see orders about cleared orders
+            for given power name (None for all powers).
+        """
+        if power_name is None:
+            addresses = server_game.get_reception_addresses()
+        else:
+            addresses = server_game.get_omniscient_addresses() + server_game.get_power_addresses(power_name)
+        self._notify_game_addresses(server_game.game_id, addresses,
+                                    notifications.ClearedOrders, power_name=power_name)
+
+    def notify_game_vote_updated(self, server_game, power_name):
+        """ Notify game tokens about current game vote, after given power voted:
+
+            - given power tokens receive their power vote and vote counts;
+            - omniscient tokens receive all powers votes;
+            - observer tokens receive only vote counts.
+
+            :param server_game: game to notify
+            :param power_name: name of power which voted.
+            :type server_game: diplomacy.server.server_game.ServerGame
+        """
+        count_voted = server_game.count_voted()
+        count_expected = server_game.count_controlled_powers()
+        self._notify_game_addresses(server_game.game_id, server_game.get_observer_addresses(),
+                                    notifications.VoteCountUpdated,
+                                    count_voted=count_voted, count_expected=count_expected)
+        self._notify_game_addresses(server_game.game_id, server_game.get_omniscient_addresses(),
+                                    notifications.VoteUpdated,
+                                    vote={power.name: power.vote for power in server_game.powers.values()})
+        self._notify_game_addresses(server_game.game_id, server_game.get_power_addresses(power_name),
+                                    notifications.PowerVoteUpdated,
+                                    count_voted=count_voted, count_expected=count_expected,
+                                    vote=server_game.get_power(power_name).vote)
+
+    def notify_game_message(self, server_game, game_message):
+        """ Notify game message recipients about a new game message.
+
+            :param server_game: game to notify
+            :param game_message: message to send
+            :type server_game: diplomacy.server.server_game.ServerGame
+            :type game_message: diplomacy.engine.message.Message
+        """
+        if game_message.is_global():
+            addresses = server_game.get_reception_addresses()
+        elif game_message.for_observer():
+            addresses = server_game.get_observer_addresses() + server_game.get_omniscient_addresses()
+        else:
+            addresses = server_game.get_omniscient_addresses()
+            for power_name in (game_message.sender, game_message.recipient):
+                if server_game.has_power(power_name):
+                    addresses.extend(server_game.get_power_addresses(power_name))
+        self._notify_game_addresses(server_game.game_id, addresses,
+                                    notifications.GameMessageReceived, message=game_message)
@@ -0,0 +1,148 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Persistence backends used by server to save and load server data (users) and games.
+
+    Data are exchanged with persistence backends as JSON dictionaries (as returned by Jsonable.to_dict()).
+
+    - MemoryPersistence keeps data in memory only. Data are lost when server process ends.
+      Useful for tests and load testing.
+    - FilePersistence saves data as JSON files in a server folder: server data are saved in
+      `<server_dir>/data/server.json`, and each game is saved in `<server_dir>/data/games/<game ID>.json`.
+"""
+import logging
+import os
+
+import ujson as json
+
+from diplomacy.utils import exceptions
+
+LOGGER = logging.getLogger(__name__)
+
+class Persistence:
+    """ Abstract persistence backend. """
+    __slots__ = []
+
+    def load_server_data(self):
+        """ Return saved server data (JSON dictionary), or None if there are no saved server data. """
+        raise NotImplementedError()
+
+    def save_server_data(self, json_dict):
+        """ Save given server data (JSON dictionary). """
+        raise NotImplementedError()
+
+    def get_game_ids(self):
+        """ Return set of saved game IDs. """
+        raise NotImplementedError()
+
+    def load_game(self, game_id):
+        """ Return saved game (JSON dictionary) with given game ID, or None if game is not saved. """
+        raise NotImplementedError()
+
+    def save_game(self, game_id, json_dict):
+        """ Save given game (JSON dictionary) with given game ID. """
+        raise NotImplementedError()
+
+    def delete_game(self, game_id):
+        """ Delete saved game with given game ID, if any. """
+        raise NotImplementedError()
+
+class MemoryPersistence(Persistence):
+    """ Persistence backend keeping data in memory. """
+    __slots__ = ['server_data', 'games']
+
+    def __init__(self):
+        self.server_data = None  # type: dict
+        self.games = {}  # type: dict
+
+    def load_server_data(self):
+        return self.server_data
+
+    def save_server_data(self, json_dict):
+        self.server_data = json_dict
+
+    def get_game_ids(self):
+        return set(self.games)
+
+    def load_game(self, game_id):
+        return self.games.get(game_id, None)
+
+    def save_game(self, game_id, json_dict):
+        self.games[game_id] = json_dict
+
+    def delete_game(self, game_id):
+        self.games.pop(game_id, None)
+
+class FilePersistence(Persistence):
+    """ Persistence backend saving data as JSON files in a server folder. """
+    __slots__ = ['server_dir', 'data_path', 'games_path', 'server_data_path']
+
+    def __init__(self, server_dir):
+        """ Initialize file persistence.
+
+            :param server_dir: path to server folder. Folder and sub-folders are created if necessary.
+        """
+        self.server_dir = os.path.abspath(server_dir)
+        self.data_path = os.path.join(self.server_dir, 'data')
+        self.games_path = os.path.join(self.data_path, 'games')
+        self.server_data_path = os.path.join(self.data_path, 'server.json')
+        try:
+            os.makedirs(self.games_path, exist_ok=True)
+        except OSError as exc:
+            raise exceptions.ServerDirException('Unable to create server folder %s (%s).' % (self.server_dir, exc))
+
+    def _get_game_path(self, game_id):
+        """ Return path to JSON file for given game ID. """
+        return os.path.join(self.games_path, '%s.json' % game_id)
+
+    @staticmethod
+    def _load_json(path):
+        """ Load JSON dictionary from given file path, or return None if file does not exist. """
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    @staticmethod
+    def _save_json(path, json_dict):
+        """ Save JSON dictionary into given file path. File is written atomically,
+            so that a crash while saving never leaves a truncated file.
+        """
+        temporary_path = '%s.tmp' % path
+        with open(temporary_path, 'w') as file:
+            json.dump(json_dict, file)
+        os.replace(temporary_path, path)
+
+    def load_server_data(self):
+        return self._load_json(self.server_data_path)
+
+    def save_server_data(self, json_dict):
+        self._save_json(self.server_data_path, json_dict)
+
+    def get_game_ids(self):
+        return {file_name[:-len('.json')] for file_name in os.listdir(self.games_path)
+                if file_name.endswith('.json')}
+
+    def load_game(self, game_id):
+        return self._load_json(self._get_game_path(game_id))
+
+    def save_game(self, game_id, json_dict):
+        self._save_json(self._get_game_path(game_id), json_dict)
+
+    def delete_game(self, game_id):
+        game_path = self._get_game_path(game_id)
+        if os.path.isfile(game_path):
+            os.remove(game_path)
@@ -0,0 +1,206 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Utility classes and functions used for request management.
+    Put here to avoid having file request_managers.py with too many lines.
+"""
+from diplomacy.communication import notifications
+from diplomacy.utils import exceptions, strings
+
+class GameRequestLevel:
+    """ Describe a game level retrieved from a game request. Used by some game requests managers
+        to determine user rights in a game. Possible game levels:
+        power, observer, omniscient and master.
+    """
+    __slots__ = ['game', 'power_name', '__action_level']
+
+    def __init__(self, game, action_level, power_name=None):
+        """ Initialize a game request level.
+
+            :param game: related game data
+            :param action_level: action level, either:
+
+                - 'power'
+                - 'observer'
+                - 'omniscient'
+                - 'master'
+
+            :param power_name: (optional) power name specified in game request. Required if level is 'power'.
+            :type game: diplomacy.server.server_game.ServerGame
+            :type action_level: str
+            :type power_name: str
+        """
+        assert action_level in {'power', 'observer', 'omniscient', 'master'}
+        self.game = game
+        self.power_name = power_name  # type: str
+        self.__action_level = action_level  # type: str
+
+    def is_power(self):
+        """ Return True if game level is power. """
+        return self.__action_level == 'power'
+
+    def is_observer(self):
+        """ Return True if game level is observer. """
+        return self.__action_level == 'observer'
+
+    def is_omniscient(self):
+        """ Return True if game level is omniscient. """
+        return self.__action_level == 'omniscient'
+
+    def is_master(self):
+        """ Return True if game level is master. """
+        return self.__action_level == 'master'
+
+    @classmethod
+    def power_level(cls, game, power_name):
+        """ Create and return a game power level with given game data and power name. """
+        return cls(game, 'power', power_name)
+
+    @classmethod
+    def observer_level(cls, game, power_name):
+        """ Create and return a game observer level with given game data and power name. """
+        return cls(game, 'observer', power_name)
+
+    @classmethod
+    def omniscient_level(cls, game, power_name):
+        """ Create and return a game omniscient level with given game data and power name. """
+        return cls(game, 'omniscient', power_name)
+
+    @classmethod
+    def master_level(cls, game, power_name):
+        """ Create and return a game master level with given game data and power name. """
+        return cls(game, 'master', power_name)
+
+def verify_request(server, request, connection_handler,
+                   omniscient_role=True, observer_role=True, power_role=True, require_power=False,
+                   require_master=True):
+    """ Verify request token, and game role and rights if request is a game request.
+
+        Verify token for a channel request, and additionally for a game request:
+
+        - game ID must be valid;
+        - request game role must be allowed for this request (see parameters);
+        - request token must be registered for request game role inside game;
+        - request phase must match current game phase if request depends on game phase.
+
+        :param server: server which receives the request
+        :param request: request received by server
+        :param connection_handler: connection handler which receives the request
+        :param omniscient_role: (for game requests) Indicate if omniscient role is accepted for this request.
+        :param observer_role: (for game requests) Indicate if observer role is accepted for this request.
+        :param power_role: (for game requests) Indicate if power role is accepted for this request.
+        :param require_power: (for game requests) Indicate if a power name is required for this request.
+            If true, either game role must be a power name, or request must have a filled field `power_name`.
+        :param require_master: (for game requests) Indicate if an omniscient must be a game master.
+            If true and if request role is omniscient, then request token must be a master token.
+        :return: for game requests, a GameRequestLevel object. None for other requests.
+        :type server: diplomacy.server.server.Server
+        :rtype: GameRequestLevel
+    """
+    # A request may be a channel request or a game request.
+    if request.level is None:
+        return None
+
+    # Check token.
+    server.assert_token(request.token, connection_handler)
+    if request.level == strings.CHANNEL:
+        return None
+
+    # Check game.
+    server_game = server.get_game(request.game_id)
+    username = server.users.get_name(request.token)
+    power_name = getattr(request, 'power_name', None)
+
+    if strings.role_is_special(request.game_role):
+        if request.game_role == strings.OMNISCIENT_TYPE:
+            if not omniscient_role:
+                raise exceptions.ResponseException('Omniscient role disallowed for request %s.' % request.name)
+            if not server_game.has_omniscient_token(request.token):
+                raise exceptions.GameTokenException()
+            if server_game.can_be_master(username):
+                level = GameRequestLevel.master_level(server_game, power_name)
+            elif require_master:
+                raise exceptions.GameMasterTokenException()
+            else:
+                level = GameRequestLevel.omniscient_level(server_game, power_name)
+        else:
+            if not observer_role:
+                raise exceptions.ResponseException('Observer role disallowed for request %s.' % request.name)
+            if not server_game.has_observer_token(request.token):
+                raise exceptions.GameTokenException()
+            level = GameRequestLevel.observer_level(server_game, power_name)
+        if require_power and power_name is None:
+            raise exceptions.MapPowerException(None)
+    else:
+        if not power_role:
+            raise exceptions.ResponseException('Power role disallowed for request %s.' % request.name)
+        if not server_game.has_power(request.game_role):
+            raise exceptions.MapPowerException(request.game_role)
+        if not server_game.power_has_token(request.game_role, request.token):
+            raise exceptions.GameTokenException()
+        if power_name is not None and power_name != request.game_role:
+            raise exceptions.GameRoleException('Power role %s cannot act for power %s.'
+                                               % (request.game_role, power_name))
+        level = GameRequestLevel.power_level(server_game, request.game_role)
+
+    if level.power_name is not None and not server_game.has_power(level.power_name):
+        raise exceptions.MapPowerException(level.power_name)
+
+    # Check phase.
+    if request.phase_dependent and request.phase != server_game.current_short_phase:
+        raise exceptions.GamePhaseException(server_game.current_short_phase, request.phase)
+
+    return level
+
+def assert_game_not_finished(server_game):
+    """ Check if given game is not yet completed or canceled, otherwise raise a GameFinishedException.
+
+        :param server_game: server game to check
+        :type server_game: diplomacy.server.server_game.ServerGame
+    """
+    if server_game.is_game_completed or server_game.is_game_canceled:
+        raise exceptions.GameFinishedException()
+
+def transfer_special_tokens(server_game, server, username, grade_update, from_observation=True):
+    """ Transfer tokens of given username from an observation role to the opposite in given server game,
+        and notify all user tokens about observation role update with given grade update.
+        This method is used in request manager on_set_grade().
+
+        :param server_game: server game in which tokens roles must be changed.
+        :param server: server from which notifications will be sent.
+        :param username: name of user whom tokens will be transferred. Only user tokens registered in
+            server games as observer tokens or omniscient tokens will be updated.
+        :param grade_update: type of upgrading. Possibles values in strings.ALL_GRADE_UPDATES (PROMOTE or DEMOTE).
+        :param from_observation: indicate transfer direction.
+            If True, we expect to transfer role from observer to omniscient.
+            If False, we expect to transfer role from omniscient to observer.
+        :type server_game: diplomacy.server.server_game.ServerGame
+        :type server: diplomacy.server.server.Server
+    """
+    if from_observation:
+        old_role = strings.OBSERVER_TYPE
+        new_role = strings.OMNISCIENT_TYPE
+    else:
+        old_role = strings.OMNISCIENT_TYPE
+        new_role = strings.OBSERVER_TYPE
+
+    transferred_tokens = server_game.transfer_special_tokens(username, old_role)
+    if transferred_tokens:
+        client_game = server_game.cast(new_role, username)
+        for token in transferred_tokens:
+            server.notify(notifications.OmniscientUpdated(token=token, game_id=server_game.game_id,
+                                                          game_role=old_role, grade_update=grade_update,
+                                                          game=client_game))
@@ -0,0 +1,904 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Request managers (server side). One manager corresponds to one request.
+    Each manager is a function with name format "on_<request name in snake case>", expecting a server,
+    a request and a connection handler as parameters, and returning either:
+
+    - None (an Ok response is then sent to client),
+    - a response object (see diplomacy.communication.responses),
+    - a NoResponse object, if nothing must be sent back to client.
+
+    Manager can raise a ResponseException (see diplomacy.utils.exceptions) to send an Error response to client.
+"""
+import logging
+import re
+
+from tornado import gen
+from tornado.concurrent import Future
+
+from diplomacy.communication import requests, responses
+from diplomacy.server.notifier import Notifier
+from diplomacy.server.request_manager_utils import assert_game_not_finished, transfer_special_tokens, verify_request
+from diplomacy.server.server_game import ServerGame
+from diplomacy.utils import common, constants, exceptions, export, strings
+from diplomacy.utils.game_phase_data import GamePhaseData
+
+LOGGER = logging.getLogger(__name__)
+
+# Allowed game IDs: letters, digits, underscores and hyphens (as in game IDs generated by server).
+GAME_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+def on_clear_centers(server, request, connection_handler):
+    """ Manage request ClearCenters.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.ClearCenters
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False)
+    assert_game_not_finished(level.game)
+    level.game.clear_centers(level.power_name)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_cleared_centers(level.game,
+                                                                                        level.power_name)
+    server.save_game(level.game)
+
+def on_clear_orders(server, request, connection_handler):
+    """ Manage request ClearOrders.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.ClearOrders
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False)
+    assert_game_not_finished(level.game)
+    level.game.clear_orders(level.power_name)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_cleared_orders(level.game,
+                                                                                       level.power_name)
+    server.save_game(level.game)
+
+def on_clear_units(server, request, connection_handler):
+    """ Manage request ClearUnits.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.ClearUnits
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False)
+    assert_game_not_finished(level.game)
+    level.game.clear_units(level.power_name)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_cleared_units(level.game,
+                                                                                      level.power_name)
+    server.save_game(level.game)
+
+def on_create_game(server, request, connection_handler):
+    """ Manage request CreateGame.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGame response with a client game for game creator.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.CreateGame
+    """
+    verify_request(server, request, connection_handler)
+    username = server.users.get_name(request.token)
+
+    game_id = request.game_id
+    if game_id is None or game_id == '':
+        game_id = server.create_game_id()
+    elif not GAME_ID_PATTERN.match(game_id):
+        # Game ID may be used as a file name by persistence backend.
+        raise exceptions.GameIdException('Invalid game ID (%s).' % game_id)
+    elif server.has_game_id(game_id):
+        raise exceptions.GameIdException('Game ID already used (%s).' % game_id)
+
+    if not server.has_map(request.map_name):
+        raise exceptions.MapIdException()
+
+    registration_password = None
+    if request.registration_password:
+        registration_password = common.hash_password(request.registration_password, server.password_hash_rounds)
+
+    server_game = ServerGame(server=server,
+                             game_id=game_id,
+                             map_name=request.map_name,
+                             rules=request.rules,
+                             n_controls=request.n_controls,
+                             deadline=request.deadline,
+                             registration_password=registration_password)
+    server_game.promote_moderator(username)
+    if request.state:
+        server_game.set_state(request.state)
+
+    power_name = request.power_name
+    if power_name is not None:
+        if not server_game.has_power(power_name):
+            raise exceptions.MapPowerException(power_name)
+        if server_game.solitaire:
+            raise exceptions.GameSolitaireException()
+        server_game.control(power_name, username, request.token)
+        client_game = server_game.cast(power_name, username)
+    else:
+        server_game.add_omniscient_token(request.token)
+        client_game = server_game.cast(strings.OMNISCIENT_TYPE, username)
+
+    server.add_new_game(server_game)
+    if server_game.is_game_forming and server_game.has_expected_controls_count() and not server_game.start_master:
+        server.start_game(server_game)
+        client_game.set_status(server_game.status)
+    server.save_game(server_game)
+    return responses.DataGame(data=client_game, request_id=request.request_id)
+
+def on_delete_account(server, request, connection_handler):
+    """ Manage request DeleteAccount.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.DeleteAccount
+    """
+    verify_request(server, request, connection_handler)
+    username = server.users.get_name(request.token)
+
+    if request.username is not None and request.username != username:
+        if not server.users.token_is_admin(request.token):
+            raise exceptions.AdminTokenException()
+        username = request.username
+    if not server.users.has_username(username):
+        raise exceptions.UserException()
+
+    # Remove user from games, making controlled powers dummy.
+    user_tokens = server.users.get_tokens(username)
+    for server_game in server.get_games():
+        updated = False
+        for power_name in server_game.get_controlled_power_names(username):
+            server_game.set_controlled(power_name, None)
+            updated = True
+        for token in user_tokens:
+            if server_game.has_token(token):
+                server_game.remove_token(token)
+                updated = True
+        server_game.demote_moderator(username)
+        server_game.demote_omniscient(username)
+        if updated:
+            Notifier(server, ignore_tokens=user_tokens).notify_game_powers_controllers(server_game)
+            server.stop_game_if_needed(server_game)
+            server.save_game(server_game)
+
+    Notifier(server, ignore_tokens=[request.token]).notify_account_deleted(username)
+    server.users.remove_user(username)
+    server.save_data()
+
+def on_delete_game(server, request, connection_handler):
+    """ Manage request DeleteGame.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.DeleteGame
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, power_role=False)
+    server.delete_game(level.game)
+    Notifier(server, ignore_tokens=[request.token]).notify_game_deleted(level.game)
+
+def on_get_all_possible_orders(server, request, connection_handler):
+    """ Manage request GetAllPossibleOrders.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataPossibleOrders response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetAllPossibleOrders
+    """
+    level = verify_request(server, request, connection_handler, require_master=False)
+    return responses.DataPossibleOrders(possible_orders=level.game.get_all_possible_orders(),
+                                        orderable_locations=level.game.get_orderable_locations(),
+                                        request_id=request.request_id)
+
+def on_get_available_maps(server, request, connection_handler):
+    """ Manage request GetAvailableMaps.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataMaps response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetAvailableMaps
+    """
+    verify_request(server, request, connection_handler)
+    return responses.DataMaps(data=server.get_available_maps(), request_id=request.request_id)
+
+def on_get_daide_port(server, request, connection_handler):
+    """ Manage request GetDaidePort.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataPort response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetDaidePort
+    """
+    del connection_handler  # Unused.
+    daide_port = server.get_daide_port(request.game_id)
+    if daide_port is None:
+        raise exceptions.DaidePortException(
+            "Invalid game id %s or game's DAIDE server not started for that game id" % request.game_id)
+    return responses.DataPort(data=daide_port, request_id=request.request_id)
+
+def on_get_dummy_waiting_powers(server, request, connection_handler):
+    """ Manage request GetDummyWaitingPowers.
+        Registers requesting bot token into returned dummy powers, so that bot can then join and
+        play these powers.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGamesToPowerNames response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetDummyWaitingPowers
+    """
+    verify_request(server, request, connection_handler)
+    if server.users.get_name(request.token) != constants.PRIVATE_BOT_USERNAME:
+        raise exceptions.ResponseException('Invalid bot token %s' % request.token)
+    return responses.DataGamesToPowerNames(
+        data=server.get_dummy_waiting_power_names(request.buffer_size, request.token),
+        request_id=request.request_id)
+
+def _build_game_info(server_game, username, request_id):
+    """ Return a DataGameInfo response describing given server game for given username. """
+    return responses.DataGameInfo(game_id=server_game.game_id,
+                                  phase=server_game.current_short_phase,
+                                  timestamp=server_game.get_latest_timestamp(),
+                                  timestamp_created=server_game.timestamp_created,
+                                  map_name=server_game.map_name,
+                                  observer_level=server_game.get_observer_level(username),
+                                  controlled_powers=server_game.get_controlled_power_names(username),
+                                  rules=server_game.rules,
+                                  status=server_game.status,
+                                  n_players=server_game.count_controlled_powers(),
+                                  n_controls=server_game.get_expected_controls_count(),
+                                  deadline=server_game.deadline,
+                                  registration_password=bool(server_game.registration_password),
+                                  request_id=request_id)
+
+def on_get_games_info(server, request, connection_handler):
+    """ Manage request GetGamesInfo.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGames response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetGamesInfo
+    """
+    verify_request(server, request, connection_handler)
+    username = server.users.get_name(request.token)
+    games = [_build_game_info(server.get_game(game_id), username, request.request_id)
+             for game_id in request.games if server.has_game_id(game_id)]
+    return responses.DataGames(data=games, request_id=request.request_id)
+
+def on_get_phase_history(server, request, connection_handler):
+    """ Manage request GetPhaseHistory.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGamePhases response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetPhaseHistory
+    """
+    level = verify_request(server, request, connection_handler, require_master=False)
+    phase_history = level.game.get_phase_history(request.from_phase, request.to_phase, request.game_role)
+    return responses.DataGamePhases(data=phase_history, request_id=request.request_id)
+
+def on_get_playable_powers(server, request, connection_handler):
+    """ Manage request GetPlayablePowers.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataPowerNames response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.GetPlayablePowers
+    """
+    verify_request(server, request, connection_handler)
+    return responses.DataPowerNames(data=server.get_game(request.game_id).get_dummy_power_names(),
+                                    request_id=request.request_id)
+
+def _join_power(server_game, power_name, username, token):
+    """ Make given token of given username control given power in given server game.
+        Return True if power controller changed.
+
+        :type server_game: ServerGame
+    """
+    if not server_game.has_power(power_name):
+        raise exceptions.MapPowerException(power_name)
+
+    # Private bot can only register into dummy powers.
+    if username == constants.PRIVATE_BOT_USERNAME:
+        if not server_game.is_dummy(power_name):
+            raise exceptions.GamePlayerException('Bot can only join dummy powers.')
+        server_game.get_power(power_name).add_token(token)
+        return False
+
+    if server_game.is_controlled_by(power_name, username):
+        server_game.get_power(power_name).add_token(token)
+        return False
+
+    if server_game.is_controlled(power_name):
+        raise exceptions.GamePlayerException('Power %s is already controlled by another user.' % power_name)
+    if server_game.solitaire:
+        raise exceptions.GameSolitaireException()
+    assert_game_not_finished(server_game)
+    if (not server_game.multiple_powers_per_player
+            and server_game.get_controlled_power_names(username)
+            and not server_game.can_be_master(username)):
+        raise exceptions.GamePlayerException('User %s already controls a power in this game.' % username)
+
+    server_game.control(power_name, username, token)
+    return True
+
+def _after_powers_joined(server, server_game, request):
+    """ Notify powers controllers and start game if possible after some powers were joined. """
+    Notifier(server, ignore_tokens=[request.token]).notify_game_powers_controllers(server_game)
+    if server_game.is_game_forming and server_game.has_expected_controls_count() and not server_game.start_master:
+        server.start_game(server_game)
+
+def on_join_game(server, request, connection_handler):
+    """ Manage request JoinGame.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGame response with client game.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.JoinGame
+    """
+    verify_request(server, request, connection_handler)
+    username = server.users.get_name(request.token)
+    server_game = server.get_game(request.game_id)
+
+    if not server_game.can_be_master(username) and not server_game.is_valid_password(request.registration_password):
+        raise exceptions.GameRegistrationPasswordException()
+
+    power_name = request.power_name
+    if power_name is None:
+        # Special game: omniscient if allowed, else observer.
+        if server_game.can_be_omniscient(username):
+            role = strings.OMNISCIENT_TYPE
+            server_game.remove_special_token(strings.OBSERVER_TYPE, request.token)
+            server_game.add_omniscient_token(request.token)
+        elif server_game.no_observations:
+            raise exceptions.GameObserverException()
+        else:
+            role = strings.OBSERVER_TYPE
+            server_game.add_observer_token(request.token)
+    else:
+        if not server_game.power_choice and not server_game.can_be_master(username):
+            # Without power choice, a random power is assigned to a new player.
+            controlled_power_names = server_game.get_controlled_power_names(username)
+            power_name = controlled_power_names[0] if controlled_power_names else server_game.get_random_power_name()
+        role = power_name
+        if _join_power(server_game, power_name, username, request.token):
+            _after_powers_joined(server, server_game, request)
+
+    server.save_game(server_game)
+    return responses.DataGame(data=server_game.cast(role, username), request_id=request.request_id)
+
+def on_join_powers(server, request, connection_handler):
+    """ Manage request JoinPowers.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.JoinPowers
+    """
+    verify_request(server, request, connection_handler)
+    username = server.users.get_name(request.token)
+    server_game = server.get_game(request.game_id)
+
+    if not server_game.can_be_master(username):
+        if not server_game.is_valid_password(request.registration_password):
+            raise exceptions.GameRegistrationPasswordException()
+        if not server_game.power_choice:
+            raise exceptions.ResponseException('Power choice not allowed in this game.')
+        if not server_game.multiple_powers_per_player and len(request.power_names) > 1:
+            raise exceptions.GamePlayerException('Game does not allow to control multiple powers.')
+
+    updated = False
+    for power_name in sorted(request.power_names):
+        updated = _join_power(server_game, power_name, username, request.token) or updated
+    if updated:
+        _after_powers_joined(server, server_game, request)
+    server.save_game(server_game)
+
+def on_leave_game(server, request, connection_handler):
+    """ Manage request LeaveGame.
+        If user is a power, power becomes dummy (if no other token of this user still plays this power,
+        user still loses power control).
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.LeaveGame
+    """
+    level = verify_request(server, request, connection_handler, require_master=False)
+    server_game = level.game
+    if level.is_power():
+        server_game.set_controlled(level.power_name, None)
+        Notifier(server, ignore_tokens=[request.token]).notify_game_powers_controllers(server_game)
+        server.stop_game_if_needed(server_game)
+    else:
+        server_game.remove_special_token(request.game_role, request.token)
+    server.save_game(server_game)
+
+def on_list_games(server, request, connection_handler):
+    """ Manage request ListGames.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGames response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.ListGames
+    """
+    verify_request(server, request, connection_handler)
+    if request.map_name is not None and not server.has_map(request.map_name):
+        raise exceptions.MapIdException()
+    username = server.users.get_name(request.token)
+    selected_games = []
+    for server_game in server.get_games():
+        if request.status is not None and server_game.status != request.status:
+            continue
+        if request.map_name is not None and server_game.map_name != request.map_name:
+            continue
+        if not request.include_protected and server_game.registration_password is not None:
+            continue
+        if request.for_omniscience and not server_game.can_be_omniscient(username):
+            continue
+        if request.game_id and request.game_id not in server_game.game_id:
+            continue
+        selected_games.append(_build_game_info(server_game, username, request.request_id))
+    return responses.DataGames(data=selected_games, request_id=request.request_id)
+
+def on_logout(server, request, connection_handler):
+    """ Manage request Logout.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.Logout
+    """
+    verify_request(server, request, connection_handler)
+    server.remove_token(request.token)
+
+def on_process_game(server, request, connection_handler):
+    """ Manage request ProcessGame.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.ProcessGame
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, power_role=False)
+    if not level.game.is_game_active:
+        raise exceptions.GameNotPlayingException()
+    server.process_game(level.game)
+
+def on_query_schedule(server, request, connection_handler):
+    """ Manage request QuerySchedule.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataGameSchedule response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.QuerySchedule
+    """
+    level = verify_request(server, request, connection_handler, require_master=False)
+    schedule_event = server.get_game_schedule(level.game)
+    if schedule_event is None:
+        raise exceptions.ResponseException('Game not scheduled.')
+    return responses.DataGameSchedule(game_id=level.game.game_id,
+                                      phase=level.game.current_short_phase,
+                                      schedule=schedule_event,
+                                      request_id=request.request_id)
+
+def on_save_game(server, request, connection_handler):
+    """ Manage request SaveGame.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataSavedGame response.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SaveGame
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, require_master=False)
+    return responses.DataSavedGame(data=export.to_saved_game_format(level.game), request_id=request.request_id)
+
+def on_send_game_message(server, request, connection_handler):
+    """ Manage request SendGameMessage.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataTimeStamp response with message timestamp.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SendGameMessage
+    """
+    level = verify_request(server, request, connection_handler, omniscient_role=False, observer_role=False)
+    server_game = level.game
+    message = request.message
+    assert_game_not_finished(server_game)
+    if server_game.no_press:
+        raise exceptions.ResponseException('Messages not allowed for this game.')
+    if message.sender != level.power_name:
+        raise exceptions.GameRoleException('A power can only send its own messages.')
+    if not message.is_global() and not server_game.has_power(message.recipient):
+        raise exceptions.MapPowerException(message.recipient)
+    if server_game.public_press and not message.is_global():
+        raise exceptions.ResponseException('Only public messages allowed for this game.')
+    if message.phase != server_game.current_short_phase:
+        raise exceptions.GamePhaseException(server_game.current_short_phase, message.phase)
+    message.time_sent = None
+    server_game.add_message(message)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_game_message(server_game, message)
+    server.save_game(server_game)
+    return responses.DataTimeStamp(data=message.time_sent, request_id=request.request_id)
+
+def on_set_dummy_powers(server, request, connection_handler):
+    """ Manage request SetDummyPowers.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetDummyPowers
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, power_role=False)
+    server_game = level.game
+    power_names = request.power_names
+    if power_names is None:
+        power_names = list(server_game.get_map_power_names())
+    updated = False
+    for power_name in power_names:
+        if not server_game.has_power(power_name):
+            raise exceptions.MapPowerException(power_name)
+        if server_game.is_controlled(power_name) and (
+                request.username is None or server_game.is_controlled_by(power_name, request.username)):
+            server_game.set_controlled(power_name, None)
+            updated = True
+    if updated:
+        Notifier(server, ignore_tokens=[request.token]).notify_game_powers_controllers(server_game)
+        server.stop_game_if_needed(server_game)
+        server.save_game(server_game)
+
+def on_set_game_state(server, request, connection_handler):
+    """ Manage request SetGameState.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetGameState
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, power_role=False)
+    server_game = level.game
+    server_game.set_phase_data(GamePhaseData(name=request.state['name'],
+                                             state=request.state,
+                                             orders=request.orders,
+                                             messages=request.messages,
+                                             results=request.results))
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_game_phase_data(
+        server_game, server_game.get_phase_data(), strings.PHASE)
+    server.reschedule_game(server_game)
+    server.save_game(server_game)
+
+def on_set_game_status(server, request, connection_handler):
+    """ Manage request SetGameStatus.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetGameStatus
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, power_role=False)
+    server_game = level.game
+    status = request.status
+    if status == server_game.status:
+        return
+    if status == strings.COMPLETED:
+        server.draw_game(server_game, ignore_addresses=[request.address_in_game])
+        return
+    if status == strings.ACTIVE:
+        if server_game.is_game_completed or server_game.is_game_canceled:
+            raise exceptions.GameFinishedException()
+        server_game.set_status(status)
+        server.schedule_game(server_game)
+    else:
+        server_game.set_status(status)
+        server.unschedule_game(server_game)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_game_status(server_game)
+    server.save_game(server_game)
+
+def on_set_grade(server, request, connection_handler):
+    """ Manage request SetGrade.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetGrade
+    """
+    verify_request(server, request, connection_handler)
+    username = request.username
+    if not server.users.has_username(username):
+        raise exceptions.UserException()
+    promote = request.grade_update == strings.PROMOTE
+    requester_is_admin = server.users.token_is_admin(request.token)
+
+    if request.grade == strings.ADMIN:
+        if not requester_is_admin:
+            raise exceptions.AdminTokenException()
+        # Administrators are omniscient in every game. We get games where omniscient rights will change.
+        affected_games = [server_game for server_game in server.get_games()
+                          if not server_game.is_moderator(username) and not server_game.is_omniscient(username)]
+        if promote:
+            server.users.add_admin(username)
+        else:
+            server.users.remove_admin(username)
+        for server_game in affected_games:
+            transfer_special_tokens(server_game, server, username, request.grade_update, from_observation=promote)
+        server.save_data()
+        return
+
+    server_game = server.get_game(request.game_id)
+    requester = server.users.get_name(request.token)
+    if not server_game.can_be_master(requester):
+        raise exceptions.GameMasterTokenException()
+    was_omniscient = server_game.can_be_omniscient(username)
+    if request.grade == strings.MODERATOR:
+        if promote:
+            server_game.promote_moderator(username)
+        else:
+            server_game.demote_moderator(username)
+    elif promote:
+        server_game.promote_omniscient(username)
+    else:
+        server_game.demote_omniscient(username)
+    is_omniscient = server_game.can_be_omniscient(username)
+    if was_omniscient != is_omniscient:
+        transfer_special_tokens(server_game, server, username, request.grade_update, from_observation=is_omniscient)
+    server.save_game(server_game)
+
+def _check_power_can_order(level):
+    """ Raise an exception if level power can not currently order. """
+    server_game = level.game
+    assert_game_not_finished(server_game)
+    if not server_game.is_game_active and not server_game.is_game_forming:
+        raise exceptions.GameNotPlayingException()
+    if level.power_name is None:
+        raise exceptions.MapPowerException(None)
+    if server_game.get_power(level.power_name).is_eliminated():
+        raise exceptions.ResponseException('Power %s is eliminated.' % level.power_name)
+
+def on_set_orders(server, request, connection_handler):
+    """ Manage request SetOrders.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetOrders
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, require_power=True)
+    _check_power_can_order(level)
+    server_game = level.game
+    power = server_game.get_power(level.power_name)
+    server_game.set_orders(power.name, request.orders)
+    notifier = Notifier(server, ignore_addresses=[request.address_in_game])
+    notifier.notify_power_orders_update(server_game, power, server_game.get_orders(power.name))
+    if request.wait is not None:
+        server_game.set_wait(power.name, request.wait)
+        notifier.notify_power_wait_flag(server_game, power, request.wait)
+    server.process_game_if_ready(server_game)
+    server.save_game(server_game)
+
+def on_set_wait_flag(server, request, connection_handler):
+    """ Manage request SetWaitFlag.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SetWaitFlag
+    """
+    level = verify_request(server, request, connection_handler, observer_role=False, require_power=True)
+    _check_power_can_order(level)
+    server_game = level.game
+    power = server_game.get_power(level.power_name)
+    server_game.set_wait(power.name, request.wait)
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_power_wait_flag(server_game, power,
+                                                                                        request.wait)
+    server.process_game_if_ready(server_game)
+    server.save_game(server_game)
+
+def on_sign_in(server, request, connection_handler):
+    """ Manage request SignIn. Create user if username is unknown and server allows registrations.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :return: a DataToken response with a new token for user.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.SignIn
+    """
+    username, password = request.username, request.password
+    if not username:
+        raise exceptions.UserException()
+    if not password:
+        raise exceptions.PasswordException()
+    if not server.users.has_username(username):
+        if not server.allow_registrations:
+            raise exceptions.ServerRegistrationException()
+        server.users.add_user(username, common.hash_password(password, server.password_hash_rounds))
+    elif not server.users.has_user(username, password):
+        raise exceptions.UserException()
+    token = server.users.connect_user(username, connection_handler)
+    server.save_data()
+    return responses.DataToken(data=token, request_id=request.request_id)
+
+def on_synchronize(server, request, connection_handler):
+    """ Manage request Synchronize.
+
+        - If request has a zobrist hash, return a DataGameSync response with game changes since client game state.
+        - Otherwise, send missing past phases and current phase as GamePhaseUpdate notifications to request sender,
+          and return a DataGameInfo response.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.Synchronize
+    """
+    level = verify_request(server, request, connection_handler, require_master=False)
+    server_game = level.game
+    if request.zobrist_hash is not None:
+        return responses.DataGameSync(
+            data=server_game.get_sync_data(request.phase, request.timestamp, request.zobrist_hash, request.game_role),
+            request_id=request.request_id)
+
+    notifier = Notifier(server)
+    addresses = [request.address_in_game]
+    for phase_data in server_game.phase_history_from_timestamp(request.timestamp + 1):
+        notifier.notify_game_phase_data(server_game, phase_data, strings.STATE_HISTORY, addresses=addresses)
+    notifier.notify_game_phase_data(server_game, server_game.get_phase_data(), strings.PHASE, addresses=addresses)
+    return _build_game_info(server_game, server.users.get_name(request.token), request.request_id)
+
+def on_unknown_token(server, request, connection_handler):
+    """ Manage notification request UnknownToken. Client does not know given token anymore,
+        so token is disconnected. No response is sent back.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.UnknownToken
+    """
+    del connection_handler  # Unused.
+    if server.users.has_token(request.token):
+        server.remove_token(request.token)
+    return responses.NoResponse(request_id=request.request_id)
+
+def on_vote(server, request, connection_handler):
+    """ Manage request Vote.
+
+        :param server: server which receives the request.
+        :param request: request to manage.
+        :param connection_handler: connection handler from which the request was sent.
+        :type server: diplomacy.Server
+        :type request: diplomacy.communication.requests.Vote
+    """
+    level = verify_request(server, request, connection_handler, omniscient_role=False, observer_role=False,
+                           require_power=True)
+    server_game = level.game
+    if not server_game.is_game_active:
+        raise exceptions.GameNotPlayingException()
+    power = server_game.get_power(level.power_name)
+    if power.is_eliminated():
+        raise exceptions.ResponseException('Power %s is eliminated.' % power.name)
+    power.vote = request.vote
+    Notifier(server, ignore_addresses=[request.address_in_game]).notify_game_vote_updated(server_game, power.name)
+    if server_game.has_draw_vote():
+        server.draw_game(server_game)
+    server.save_game(server_game)
+
+# Mapping dictionary from request class to request handler function.
+MAPPING = {
+    requests.ClearCenters: on_clear_centers,
+    requests.ClearOrders: on_clear_orders,
+    requests.ClearUnits: on_clear_units,
+    requests.CreateGame: on_create_game,
+    requests.DeleteAccount: on_delete_account,
+    requests.DeleteGame: on_delete_game,
+    requests.GetAllPossibleOrders: on_get_all_possible_orders,
+    requests.GetAvailableMaps: on_get_available_maps,
+    requests.GetDaidePort: on_get_daide_port,
+    requests.GetDummyWaitingPowers: on_get_dummy_waiting_powers,
+    requests.GetGamesInfo: on_get_games_info,
+    requests.GetPhaseHistory: on_get_phase_history,
+    requests.GetPlayablePowers: on_get_playable_powers,
+    requests.JoinGame: on_join_game,
+    requests.JoinPowers: on_join_powers,
+    requests.LeaveGame: on_leave_game,
+    requests.ListGames: on_list_games,
+    requests.Logout: on_logout,
+    requests.ProcessGame: on_process_game,
+    requests.QuerySchedule: on_query_schedule,
+    requests.SaveGame: on_save_game,
+    requests.SendGameMessage: on_send_game_message,
+    requests.SetDummyPowers: on_set_dummy_powers,
+    requests.SetGameState: on_set_game_state,
+    requests.SetGameStatus: on_set_game_status,
+    requests.SetGrade: on_set_grade,
+    requests.SetOrders: on_set_orders,
+    requests.SetWaitFlag: on_set_wait_flag,
+    requests.SignIn: on_sign_in,
+    requests.Synchronize: on_synchronize,
+    requests.UnknownToken: on_unknown_token,
+    requests.Vote: on_vote,
+}
+
+def handle_request(server, request, connection_handler):
+    """ (coroutine) Find request handler function for associated request, run it and return its result.
+
+        :param server: a Server object to pass to handler function.
+        :param request: a request object to pass to handler function.
+            See diplomacy.communication.requests for possible requests.
+        :param connection_handler: a ConnectionHandler object to pass to handler function.
+        :return: (future) either None, or a response object.
+            See module diplomacy.communication.responses for possible responses.
+    """
+    request_handler_fn = MAPPING.get(type(request), None)
+    if not request_handler_fn:
+        raise exceptions.RequestException()
+    if gen.is_coroutine_function(request_handler_fn):
+        # Return the future returned by this coroutine.
+        return request_handler_fn(server, request, connection_handler)
+    # Create and return a future.
+    future = Future()
+    try:
+        result = request_handler_fn(server, request, connection_handler)
+        future.set_result(result)
+    except exceptions.DiplomacyException as exc:
+        future.set_exception(exc)
+    return future
@@ -0,0 +1,664 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Concrete standalone server object. Manages and save server data and games on disk, send notifications,
+    receives requests and send responses.
+
+    Example:
+
+    .. code-block:: python
+
+        >>> from diplomacy.server.server import Server
+        >>> Server().start(port=1234)  # If port is not given, a random port will be selected.
+
+    You can interrupt server by sending a keyboard interrupt signal (Ctrl+C).
+
+    .. code-block:: text
+
+        >>> from diplomacy.server.server import Server
+        >>> Server().start()
+        DIPLOMACY:Running on port 8432
+
+    Server is a lightweight in-process implementation of the communication protocol
+    (see diplomacy.communication.requests), suitable for local games, tests and load testing
+    (see module diplomacy.server.load_generator). Server data (users) and games are kept by a
+    persistence backend (see module diplomacy.server.persistence): in memory by default,
+    or as JSON files if a server folder is given.
+
+    Server can report metrics to an optional hook ``metrics_hook(metric_name, value, label)``
+    (see METRIC_* constants in this module).
+"""
+import base64
+import logging
+import os
+import socket
+import time
+from collections import deque
+
+from tornado import ioloop
+from tornado.web import Application
+
+from diplomacy import settings
+from diplomacy.daide.server import Server as DaideServer
+from diplomacy.engine.map import Map
+from diplomacy.server.connection_handler import ConnectionHandler
+from diplomacy.server.notifier import Notifier
+from diplomacy.server.persistence import FilePersistence, MemoryPersistence
+from diplomacy.server.server_game import ServerGame
+from diplomacy.server.users import Users
+from diplomacy.utils import common, constants, exceptions, strings
+from diplomacy.utils.scheduler_event import SchedulerEvent
+
+LOGGER = logging.getLogger(__name__)
+
+# Metrics reported to Server.metrics_hook (see also METRIC_REQUEST_HANDLING in diplomacy.server.connection_handler).
+METRIC_GAME_PROCESSING = 'game_processing_seconds'      # Time spent to process a game phase (label: phase name).
+METRIC_NOTIFICATIONS_SENT = 'notifications_sent'        # Number of notifications sent in a batch of notifications.
+
+# Default password for default server administrator `admin` (created if server has no administrator).
+DEFAULT_ADMIN_USERNAME = 'admin'
+DEFAULT_ADMIN_PASSWORD = 'password'
+
+# Default range of ports used to start DAIDE servers.
+DEFAULT_DAIDE_MIN_PORT = 8434
+DEFAULT_DAIDE_MAX_PORT = 8600
+
+def is_port_opened(port, hostname='127.0.0.1'):
+    """ Checks if the specified port is opened
+
+        :param port: The port to check
+        :param hostname: The hostname to check, defaults to '127.0.0.1'
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex((hostname, port)) == 0
+
+def get_map_names():
+    """ Return sorted list of names of maps available in diplomacy package. """
+    maps_path = os.path.join(settings.PACKAGE_DIR, 'maps')
+    return sorted(file_name[:-len('.map')] for file_name in os.listdir(maps_path) if file_name.endswith('.map'))
+
+class _ServerBackend:
+    """ Class representing tornado objects used to run a server.
+
+        Properties:
+
+        - **port**: (integer) port where server runs.
+        - **application**: tornado web Application object.
+        - **http_server**: tornado HTTP server object running server code.
+        - **io_loop**: tornado IO loop where server runs.
+    """
+    #pylint: disable=too-few-public-methods
+    __slots__ = ['port', 'application', 'http_server', 'io_loop']
+
+    def __init__(self):
+        """ Initialize server backend. """
+        self.port = None
+        self.application = None
+        self.http_server = None
+        self.io_loop = None
+
+class Server:
+    """ Server class.
+
+        Properties:
+
+        - **persistence**: persistence backend used to save and load server data and games.
+        - **users**: a Users object, with all server users and connected tokens.
+        - **games**: dictionary mapping a game ID to a loaded ServerGame object.
+        - **game_ids**: set of all game IDs (loaded or only saved in persistence backend).
+        - **backend**: a _ServerBackend object, with tornado objects used to run server.
+        - **allow_registrations**: (bool) if True, unknown users are registered when they sign in.
+        - **ping_seconds**: interval (in seconds) between websocket pings sent to clients.
+        - **password_hash_rounds**: bcrypt cost factor used to hash new passwords
+          (can be lowered to register many users quickly, e.g. for load testing).
+        - **daide_min_port**, **daide_max_port**: range of ports where DAIDE servers can be started.
+        - **daide_servers**: dictionary mapping a port to a running DAIDE server.
+        - **schedules**: dictionary mapping a game ID to a couple (deadline timeout handle, time added)
+          for active games with deadline.
+        - **metrics_hook**: (optional) a callable ``metrics_hook(metric_name, value, label)``
+          called with server metrics (see METRIC_* constants in this module).
+
+        A server loaded from a server folder is cached: creating a new Server with the same server folder
+        returns the same Server object. Class attribute `__cache__` maps each server folder to its Server.
+    """
+    # pylint: disable=too-many-instance-attributes
+    __slots__ = ['persistence', 'users', 'games', 'game_ids', 'backend', 'allow_registrations', 'ping_seconds',
+                 'password_hash_rounds', 'daide_min_port', 'daide_max_port', 'daide_servers', 'schedules',
+                 'metrics_hook', 'notifications', 'pending_game_ids', 'dirty_game_ids', 'dirty_data', 'flush_scheduled',
+                 'available_maps']
+
+    __cache__ = {}  # {absolute server folder path => Server}
+
+    def __new__(cls, server_dir=None, **kwargs):
+        # pylint: disable=unused-argument
+        if server_dir is not None and os.path.abspath(server_dir) in cls.__cache__:
+            return cls.__cache__[os.path.abspath(server_dir)]
+        return object.__new__(cls)
+
+    def __init__(self, server_dir=None, persistence=None, allow_registrations=True,
+                 ping_seconds=constants.DEFAULT_PING_SECONDS, password_hash_rounds=14,
+                 daide_min_port=DEFAULT_DAIDE_MIN_PORT, daide_max_port=DEFAULT_DAIDE_MAX_PORT, metrics_hook=None):
+        """ Initialize the server.
+
+            :param server_dir: (optional) path to server folder where data and games are saved as JSON files.
+                If neither server_dir nor persistence is given, data are kept in memory only.
+            :param persistence: (optional) persistence backend to use (see diplomacy.server.persistence).
+            :param allow_registrations: if True, unknown users are registered when they sign in.
+            :param ping_seconds: interval (in seconds) between websocket pings sent to clients.
+            :param password_hash_rounds: bcrypt cost factor used to hash new passwords.
+            :param daide_min_port: lower port (included) where DAIDE servers can be started.
+            :param daide_max_port: upper port (included) where DAIDE servers can be started.
+            :param metrics_hook: (optional) callable ``metrics_hook(metric_name, value, label)``.
+            :type persistence: diplomacy.server.persistence.Persistence
+        """
+        if server_dir is not None:
+            server_dir = os.path.abspath(server_dir)
+            if server_dir in self.__class__.__cache__:
+                # Server already initialized.
+                return
+            persistence = FilePersistence(server_dir)
+        elif persistence is None:
+            persistence = MemoryPersistence()
+
+        self.persistence = persistence
+        self.backend = _ServerBackend()
+        self.allow_registrations = allow_registrations
+        self.ping_seconds = ping_seconds
+        self.password_hash_rounds = password_hash_rounds
+        self.daide_min_port = daide_min_port
+        self.daide_max_port = daide_max_port
+        self.daide_servers = {}
+        self.schedules = {}
+        self.metrics_hook = metrics_hook
+        self.notifications = deque()
+        self.pending_game_ids = set()
+        self.dirty_game_ids = set()
+        self.dirty_data = False
+        self.flush_scheduled = False
+        self.available_maps = {}
+
+        # Load server data and game IDs. Games are loaded only when required.
+        server_data = self.persistence.load_server_data()
+        self.users = Users.from_dict(server_data) if server_data else Users()
+        self.games = {}
+        self.game_ids = self.persistence.get_game_ids()
+        if not self.users.administrators:
+            self.users.add_user(DEFAULT_ADMIN_USERNAME,
+                                common.hash_password(DEFAULT_ADMIN_PASSWORD, self.password_hash_rounds))
+            self.users.add_admin(DEFAULT_ADMIN_USERNAME)
+            self.save_data()
+
+        if server_dir is not None:
+            self.__class__.__cache__[server_dir] = self
+
+    # ================
+    # Server running.
+    # ================
+
+    def start(self, port=None, io_loop=None):
+        """ Start server if not yet started. Raise an exception if server is already started.
+            If IO loop is not yet running, this method starts it and returns only when loop is stopped.
+
+            :param port: (optional) port where server must run. If not provided,
+                try to start on a random selected port. Use property `port` to get current server port.
+            :param io_loop: (optional) tornado IO lopp where server must run. If not provided, get
+                default IO loop instance (tornado.ioloop.IOLoop.current()).
+        """
+        if self.backend.port is not None:
+            raise exceptions.DiplomacyException('Server is already running on port %s.' % self.backend.port)
+        if port is None:
+            port = constants.DEFAULT_PORT
+        if io_loop is None:
+            io_loop = ioloop.IOLoop.current()
+        # Pings only keep connections alive: since tornado 6.5, the pong timeout cannot exceed the ping interval,
+        # so a short interval would drop every client whenever processing a game blocks the IO loop for longer.
+        application = Application([(r'/', ConnectionHandler, {'server': self})],
+                                  websocket_ping_interval=self.ping_seconds,
+                                  websocket_ping_timeout=0,
+                                  websocket_max_message_size=64 * 1024 * 1024)
+        self.backend.application = application
+        self.backend.http_server = application.listen(port)
+        self.backend.io_loop = io_loop
+        self.backend.port = port
+
+        # Schedule deadlines for active loaded games.
+        for server_game in self.games.values():
+            self.schedule_game(server_game)
+
+        LOGGER.info('Running on port %d', port)
+        if not io_loop.asyncio_loop.is_running():
+            io_loop.start()
+
+    def stop(self):
+        """ Stop server (HTTP server, DAIDE servers and deadlines) and save all pending data. """
+        for game_id in list(self.schedules):
+            self._cancel_schedule(game_id)
+        self.stop_daide_server(None)
+        if self.backend.http_server is not None:
+            self.backend.http_server.stop()
+        self.backend = _ServerBackend()
+        self.flush()
+
+    @property
+    def port(self):
+        """ Property: return port where this server currently runs, or None if server is not yet started. """
+        return self.backend.port
+
+    def report_metric(self, metric_name, value, label=None):
+        """ Send a metric to metrics hook, if any. """
+        if self.metrics_hook is not None:
+            try:
+                self.metrics_hook(metric_name, value, label)
+            except Exception:                                                       # pylint: disable=broad-except
+                LOGGER.exception('Error in server metrics hook.')
+
+    def assert_token(self, token, connection_handler):
+        """ Check if given token is associated to an user, check if token is still valid,
+            and link token to given connection handler. If any step failed, raise an exception.
+
+            :param token: token to check
+            :param connection_handler: connection handler associated to this token
+        """
+        if not self.users.has_token(token):
+            raise exceptions.TokenException()
+        if self.users.token_is_alive(token):
+            self.users.relaunch_token(token)
+            self.users.attach_connection_handler(token, connection_handler)
+        else:
+            # Logout on server side and raise exception (invalid token).
+            LOGGER.error('Token too old %s', token)
+            self.remove_token(token)
+            raise exceptions.TokenException()
+
+    def remove_token(self, token):
+        """ Disconnect given token from server and from all loaded games. """
+        for server_game in self.games.values():
+            if server_game.has_token(token):
+                server_game.remove_token(token)
+                self.save_game(server_game)
+        self.users.disconnect_token(token)
+        self.save_data()
+
+    # =============
+    # Persistence.
+    # =============
+
+    def _schedule_flush(self):
+        """ Schedule saving of pending data at next IO loop iteration, so that many changes done
+            in a same loop iteration (e.g. a request and its consequences) are saved once.
+            If server is not running, pending data are saved immediately.
+        """
+        if self.backend.io_loop is None:
+            self.flush()
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.backend.io_loop.add_callback(self.flush)
+
+    def flush(self):
+        """ Save all pending server data and games into persistence backend. """
+        self.flush_scheduled = False
+        if self.dirty_data:
+            self.dirty_data = False
+            self.persistence.save_server_data(self.users.to_dict())
+        dirty_game_ids, self.dirty_game_ids = self.dirty_game_ids, set()
+        for game_id in dirty_game_ids:
+            if game_id in self.games:
+                self.persistence.save_game(game_id, self.games[game_id].to_dict())
+
+    def save_data(self):
+        """ Mark server data (users) to be saved. """
+        self.dirty_data = True
+        self._schedule_flush()
+
+    def save_game(self, server_game):
+        """ Mark given game to be saved.
+
+            :param server_game: game to save.
+            :type server_game: ServerGame
+        """
+        self.dirty_game_ids.add(server_game.game_id)
+        self._schedule_flush()
+
+    # =======
+    # Games.
+    # =======
+
+    def create_game_id(self):
+        """ Return a new game ID not yet used on this server. """
+        game_id = base64.b64encode(os.urandom(12), b'-_').decode('utf-8')
+        while self.has_game_id(game_id):
+            game_id = base64.b64encode(os.urandom(12), b'-_').decode('utf-8')
+        return game_id
+
+    def has_game_id(self, game_id):
+        """ Return True if server has a game with given game ID. """
+        return game_id in self.game_ids
+
+    def add_new_game(self, server_game):
+        """ Add a new game data on server in memory and mark it to be saved.
+
+            :param server_game: game to add.
+            :type server_game: ServerGame
+        """
+        server_game.server = self
+        self.games[server_game.game_id] = server_game
+        self.game_ids.add(server_game.game_id)
+        self.save_game(server_game)
+
+    def get_game(self, game_id):
+        """ Return game saved on server matching given game ID.
+            Raise an exception if game ID not found.
+            Game is loaded from persistence backend if not yet loaded.
+
+            :param game_id: game ID.
+            :return: game
+            :rtype: ServerGame
+        """
+        server_game = self.games.get(game_id, None)
+        if server_game is not None:
+            return server_game
+        json_dict = self.persistence.load_game(game_id) if game_id in self.game_ids else None
+        if json_dict is None:
+            raise exceptions.GameIdException('Unknown game ID %s' % game_id)
+        # Saved games were generated by server itself, so they can be loaded with trusted fast path.
+        server_game = ServerGame.from_trusted_dict(json_dict)
+        server_game.server = self
+        self.games[game_id] = server_game
+        self.schedule_game(server_game)
+        return server_game
+
+    def get_games(self):
+        """ Return list of all server games (loading games not yet loaded). """
+        return [self.get_game(game_id) for game_id in sorted(self.game_ids)]
+
+    def delete_game(self, server_game):
+        """ Delete given game from server (both from memory and persistence backend).
+
+            :param server_game: game to delete
+            :type server_game: ServerGame
+        """
+        self._cancel_schedule(server_game.game_id)
+        self.games.pop(server_game.game_id, None)
+        self.game_ids.discard(server_game.game_id)
+        self.dirty_game_ids.discard(server_game.game_id)
+        self.persistence.delete_game(server_game.game_id)
+
+    def has_map(self, map_name):
+        """ Return True if given map name is a map available in diplomacy package. """
+        return map_name in get_map_names()
+
+    def get_available_maps(self):
+        """ Return a dictionary mapping each available map name to map info (powers, supply centers
+            and locations types). Maps are loaded once and then cached.
+        """
+        for map_name in get_map_names():
+            if map_name not in self.available_maps:
+                try:
+                    game_map = Map(map_name)
+                except Exception:                                                   # pylint: disable=broad-except
+                    LOGGER.exception('Unable to load map %s', map_name)
+                    continue
+                self.available_maps[map_name] = {
+                    'powers': sorted(game_map.powers),
+                    'supply_centers': sorted(game_map.scs),
+                    'loc_type': game_map.loc_type.copy(),
+                }
+        return self.available_maps
+
+    def get_dummy_waiting_power_names(self, buffer_size, bot_token):
+        """ Return names of dummy powers waiting for orders in active loaded games, and register given bot token
+            into these powers, so that bot can play them.
+
+            :param buffer_size: maximum number of powers to return.
+            :param bot_token: private bot token.
+            :return: a dictionary mapping each game ID to a list of power names.
+        """
+        dummy_power_names = {}
+        size = 0
+        for server_game in self.games.values():
+            if size >= buffer_size:
+                break
+            if not server_game.is_game_active:
+                continue
+            power_names = server_game.get_dummy_unordered_power_names()[:buffer_size - size]
+            if power_names:
+                for power_name in power_names:
+                    server_game.get_power(power_name).add_token(bot_token)
+                dummy_power_names[server_game.game_id] = power_names
+                size += len(power_names)
+        return dummy_power_names
+
+    # =================
+    # Games processing.
+    # =================
+
+    def start_game(self, server_game):
+        """ Start given game, schedule its deadline and notify all game tokens about game status. """
+        server_game.set_status(strings.ACTIVE)
+        self.schedule_game(server_game)
+        Notifier(self).notify_game_status(server_game)
+        self.save_game(server_game)
+
+    def stop_game_if_needed(self, server_game):
+        """ Stop given game (back to forming status) if it is active and has not enough controlled powers.
+
+            :param server_game: game to check.
+            :type server_game: ServerGame
+        """
+        if server_game.is_game_active and (
+                server_game.count_controlled_powers() < server_game.get_expected_controls_count()):
+            server_game.set_status(strings.FORMING)
+            self.unschedule_game(server_game)
+            Notifier(self).notify_game_status(server_game)
+
+    def process_game(self, server_game):
+        """ Process given game current phase, notify all game tokens and reschedule game deadline.
+
+            :param server_game: game to process
+            :type server_game: ServerGame
+        """
+        phase = server_game.current_short_phase
+        start_time = time.perf_counter()
+        previous_phase_data, current_phase_data = server_game.process()
+        self.report_metric(METRIC_GAME_PROCESSING, time.perf_counter() - start_time, phase)
+        notifier = Notifier(self)
+        notifier.notify_game_processed(server_game, previous_phase_data, current_phase_data)
+        if server_game.is_game_completed:
+            self._cancel_schedule(server_game.game_id)
+            notifier.notify_game_status(server_game)
+        else:
+            self.schedule_game(server_game)
+        self.save_game(server_game)
+
+    def process_game_if_ready(self, server_game):
+        """ Process given game if it is active and does not wait any power.
+            If server is running, game is checked and processed at next IO loop iteration, so that
+            request which made game ready is completely handled (and answered) before game is processed.
+
+            :param server_game: game to check.
+            :type server_game: ServerGame
+        """
+        if not server_game.is_game_active or not server_game.does_not_wait():
+            return
+        if self.backend.io_loop is None:
+            self.process_game(server_game)
+        elif server_game.game_id not in self.pending_game_ids:
+            self.pending_game_ids.add(server_game.game_id)
+            self.backend.io_loop.add_callback(self._process_pending_game, server_game.game_id)
+
+    def _process_pending_game(self, game_id):
+        """ Process game with given game ID if it is still loaded, active and ready. """
+        self.pending_game_ids.discard(game_id)
+        server_game = self.games.get(game_id, None)
+        if server_game is not None and server_game.is_game_active and server_game.does_not_wait():
+            self.process_game(server_game)
+
+    def draw_game(self, server_game, ignore_addresses=None):
+        """ Complete given game with a draw and notify game tokens.
+
+            :param server_game: game to draw
+            :param ignore_addresses: (optional) game addresses to not notify.
+            :type server_game: ServerGame
+        """
+        previous_phase_data, current_phase_data = server_game.draw()
+        server_game.set_status(strings.COMPLETED)
+        self._cancel_schedule(server_game.game_id)
+        notifier = Notifier(self, ignore_addresses=ignore_addresses)
+        notifier.notify_game_processed(server_game, previous_phase_data, current_phase_data)
+        notifier.notify_game_status(server_game)
+        self.save_game(server_game)
+
+    # ===========
+    # Deadlines.
+    # ===========
+
+    def _cancel_schedule(self, game_id):
+        """ Cancel deadline of given game ID, if any. """
+        schedule = self.schedules.pop(game_id, None)
+        if schedule is not None:
+            self.backend.io_loop.remove_timeout(schedule[0])
+
+    def schedule_game(self, server_game):
+        """ (Re)schedule deadline of given game if game is active and has a deadline.
+            When deadline is reached, game is processed even if some powers did not order.
+            Deadlines are scheduled only when server is running.
+
+            :param server_game: game to schedule
+            :type server_game: ServerGame
+        """
+        self._cancel_schedule(server_game.game_id)
+        if self.backend.io_loop is None or not server_game.is_game_active or not server_game.deadline:
+            return
+        io_loop = self.backend.io_loop
+        timeout = io_loop.call_later(server_game.deadline, self._on_deadline, server_game.game_id)
+        self.schedules[server_game.game_id] = (timeout, io_loop.time())
+
+    def unschedule_game(self, server_game):
+        """ Cancel deadline of given game, if any. """
+        self._cancel_schedule(server_game.game_id)
+
+    reschedule_game = schedule_game
+
+    def get_game_schedule(self, server_game):
+        """ Return a SchedulerEvent describing deadline of given game, or None if game is not scheduled.
+
+            :param server_game: game
+            :type server_game: ServerGame
+            :rtype: SchedulerEvent
+        """
+        schedule = self.schedules.get(server_game.game_id, None)
+        if schedule is None:
+            return None
+        return SchedulerEvent(time_unit=1,
+                              time_added=int(schedule[1]),
+                              delay=server_game.deadline,
+                              current_time=int(self.backend.io_loop.time()))
+
+    def _on_deadline(self, game_id):
+        """ Process game with given game ID when its deadline is reached. """
+        self.schedules.pop(game_id, None)
+        server_game = self.games.get(game_id, None)
+        if server_game is not None and server_game.is_game_active:
+            self.process_game(server_game)
+
+    # ===============
+    # Notifications.
+    # ===============
+
+    def notify(self, notification):
+        """ Register a notification to send to its token. Notifications are sent at next IO loop iteration,
+            so that a response to a request is always sent before notifications caused by this request.
+
+            :param notification: a notification (see diplomacy.communication.notifications).
+            :type notification: notifications._AbstractNotification
+        """
+        if self.backend.io_loop is None:
+            # Server is not running, so there is no connection to notify.
+            return
+        if not self.notifications:
+            self.backend.io_loop.add_callback(self._send_notifications)
+        self.notifications.append(notification)
+
+    def _send_notifications(self):
+        """ Send all registered notifications. """
+        count = 0
+        while self.notifications:
+            notification = self.notifications.popleft()
+            connection_handler = self.users.get_connection_handler(notification.token)
+            if connection_handler is None:
+                continue
+            try:
+                for message in connection_handler.translate_notification(notification) or ():
+                    future = connection_handler.write_message(message)
+                    if future is not None:
+                        future.add_done_callback(self._on_notification_written)
+                    count += 1
+            except Exception:                                                       # pylint: disable=broad-except
+                LOGGER.exception('Unable to send notification %s', notification.name)
+        self.report_metric(METRIC_NOTIFICATIONS_SENT, count)
+
+    @staticmethod
+    def _on_notification_written(future):
+        """ Log notification writing errors (e.g. if socket was closed meanwhile). """
+        exception = future.exception()
+        if exception is not None:
+            LOGGER.error('Unable to write notification: %s', type(exception).__name__)
+
+    # =============
+    # DAIDE server.
+    # =============
+
+    def get_daide_port(self, game_id):
+        """ Return port of DAIDE server running for given game ID, or None if there is no such server. """
+        for port, daide_server in self.daide_servers.items():
+            if daide_server.game_id == game_id:
+                return port
+        return None
+
+    def start_new_daide_server(self, game_id, port=None):
+        """ Start a new DAIDE TCP server to handle DAIDE clients connections for given game ID.
+
+            :param game_id: game id to pass to the DAIDE server
+            :param port: the port to use to start the DAIDE server. If None, use first available port
+                in DAIDE ports range.
+            :return: the port used by DAIDE server
+        """
+        if self.get_daide_port(game_id) is not None:
+            raise exceptions.DiplomacyException('DAIDE server already running for game %s' % game_id)
+        self.get_game(game_id)
+        if port is None:
+            port = next((daide_port for daide_port in range(self.daide_min_port, self.daide_max_port + 1)
+                         if daide_port not in self.daide_servers and not is_port_opened(daide_port)), None)
+            if port is None:
+                raise exceptions.DaidePortException('No available port to start a DAIDE server.')
+        elif port in self.daide_servers or is_port_opened(port):
+            raise exceptions.DaidePortException('Port %d already used.' % port)
+        daide_server = DaideServer(self, game_id)
+        daide_server.listen(port)
+        self.daide_servers[port] = daide_server
+        LOGGER.info('DAIDE server running for game %s on port %d', game_id, port)
+        return port
+
+    def stop_daide_server(self, game_id):
+        """ Stop DAIDE server running for given game ID.
+
+            :param game_id: game ID of DAIDE server to stop. If None, all DAIDE servers are stopped.
+        """
+        for port in list(self.daide_servers):
+            daide_server = self.daide_servers[port]
+            if game_id is None or daide_server.game_id == game_id:
+                daide_server.stop()
+                del self.daide_servers[port]
@@ -0,0 +1,325 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Server game class. """
+from diplomacy.engine.game import Game
+from diplomacy.engine.message import GLOBAL, Message, OBSERVER, OMNISCIENT, SYSTEM
+from diplomacy.engine.power import Power
+from diplomacy.utils import exceptions, parsing, strings
+from diplomacy.utils.game_phase_data import GamePhaseData
+
+# Server-only fields to remove from a server game dictionary before building a client game.
+SERVER_ONLY_FIELDS = (strings.MODERATOR_USERNAMES, strings.OBSERVER, strings.OMNISCIENT,
+                      strings.OMNISCIENT_USERNAMES)
+
+class ServerGame(Game):
+    """ ServerGame class.
+
+        Properties:
+
+        - **server**: (optional) server (Server object) that handles this game.
+        - **omniscient_usernames** (only for server games):
+          set of usernames allowed to be omniscient observers for this game.
+        - **moderator_usernames** (only for server games):
+          set of usernames allowed to be moderators for this game.
+        - **observer** (only for server games):
+          special Power object (diplomacy.Power) used to manage observer tokens.
+        - **omniscient** (only for server games):
+          special Power object (diplomacy.Power) used to manage omniscient tokens.
+    """
+    __slots__ = ['server', 'omniscient_usernames', 'moderator_usernames', 'observer', 'omniscient']
+    model = parsing.update_model(Game.model, {
+        strings.MODERATOR_USERNAMES: parsing.DefaultValueType(parsing.SequenceType(str, sequence_builder=set), ()),
+        strings.OBSERVER: parsing.OptionalValueType(parsing.JsonableClassType(Power)),
+        strings.OMNISCIENT: parsing.OptionalValueType(parsing.JsonableClassType(Power)),
+        strings.OMNISCIENT_USERNAMES: parsing.DefaultValueType(parsing.SequenceType(str, sequence_builder=set), ()),
+    })
+
+    def __init__(self, server=None, **kwargs):
+        """ Constructor
+
+            :param server: (optional) server which handles this game.
+            :param kwargs: game keyword arguments (see diplomacy.engine.game.Game).
+            :type server: diplomacy.server.server.Server
+        """
+        self.server = server
+        self.omniscient_usernames = None  # type: set
+        self.moderator_usernames = None  # type: set
+        self.observer = None  # type: Power
+        self.omniscient = None  # type: Power
+
+        super(ServerGame, self).__init__(**kwargs)
+        assert self.is_server_game()
+
+        # Initialize special powers.
+        if self.observer is None:
+            self.observer = Power(self, name=strings.OBSERVER_TYPE)
+        if self.omniscient is None:
+            self.omniscient = Power(self, name=strings.OMNISCIENT_TYPE)
+        self.observer.game = self
+        self.omniscient.game = self
+        self.observer.set_controlled(strings.OBSERVER_TYPE)
+        self.omniscient.set_controlled(strings.OMNISCIENT_TYPE)
+
+    # ====================================================================
+    #   Public Interface
+    # ====================================================================
+
+    def process(self):
+        """ Process current phase. Return a couple (previous phase data, current phase data).
+            Previous phase data is the phase data for the phase just processed, with orders results.
+            Current phase data is the phase data for the new current phase.
+            Game status is set to COMPLETED if game is done after processing.
+
+            :return: a couple of GamePhaseData objects.
+            :rtype: (GamePhaseData, GamePhaseData)
+        """
+        previous_phase_data = super(ServerGame, self).process()
+        if self.is_game_done:
+            self.set_status(strings.COMPLETED)
+        else:
+            # Controlled powers which still have to order must wait again, unless game is real time.
+            for power in self.powers.values():
+                if not power.order_is_set:
+                    power.wait = power.is_dummy() or not self.real_time
+        return previous_phase_data, Game.get_phase_data(self)
+
+    def new_system_message(self, recipient, body):
+        """ Create a system message (immediately dated) to be sent by server and add it to current game messages.
+
+            :param recipient: recipient description (string). Either:
+
+                - a power name.
+                - 'GLOBAL' (all game players).
+                - 'OBSERVER' (all game observers).
+                - 'OMNISCIENT' (all omniscient observers).
+
+            :param body: message body (string).
+            :return: the new message.
+            :rtype: Message
+        """
+        if recipient not in (GLOBAL, OBSERVER, OMNISCIENT) and not self.has_power(recipient):
+            raise exceptions.MapPowerException(recipient)
+        message = Message(phase=self.current_short_phase, sender=SYSTEM, recipient=recipient, message=body)
+        # Message timestamp is generated when adding message.
+        self.add_message(message)
+        return message
+
+    def get_observer_level(self, username):
+        """ Return the highest observation level allowed for given username.
+
+            :param username: name of user to get observation right
+            :return: either 'master_type', 'omniscient_type', 'observer_type' or None.
+        """
+        if (self.server and self.server.users.has_admin(username)) or self.is_moderator(username):
+            return strings.MASTER_TYPE
+        if self.is_omniscient(username):
+            return strings.OMNISCIENT_TYPE
+        if not self.no_observations:
+            return strings.OBSERVER_TYPE
+        return None
+
+    def is_moderator(self, username):
+        """ Return True if given username is a moderator of this game. """
+        return username in self.moderator_usernames
+
+    def is_omniscient(self, username):
+        """ Return True if given username is allowed to be an omniscient observer of this game. """
+        return username in self.omniscient_usernames
+
+    def is_controlled_by(self, power_name, username):
+        """ Return True if given power name is controlled by given username. """
+        return self.get_power(power_name).is_controlled_by(username)
+
+    def can_be_master(self, username):
+        """ Return True if given username can act as a game master (server administrator or game moderator). """
+        return self.get_observer_level(username) == strings.MASTER_TYPE
+
+    def can_be_omniscient(self, username):
+        """ Return True if given username can join this game as an omniscient observer. """
+        return self.get_observer_level(username) in (strings.MASTER_TYPE, strings.OMNISCIENT_TYPE)
+
+    def promote_moderator(self, username):
+        """ Allow given username to be a moderator of this game. """
+        self.moderator_usernames.add(username)
+
+    def promote_omniscient(self, username):
+        """ Allow given username to be an omniscient observer of this game. """
+        self.omniscient_usernames.add(username)
+
+    def demote_moderator(self, username):
+        """ Remove given username from moderators of this game. """
+        self.moderator_usernames.discard(username)
+
+    def demote_omniscient(self, username):
+        """ Remove given username from omniscient observers of this game. """
+        self.omniscient_usernames.discard(username)
+
+    def filter_phase_data(self, phase_data, role, is_current):
+        """ Return a filtered version of given phase data for given role.
+
+            :param phase_data: phase data to filter.
+            :param role: game role (observer, omniscient or a power name) to filter phase data for.
+            :param is_current: Boolean. Indicate if given phase data is for a current phase (True),
+                or for a past phase (False). Orders of a current phase are private,
+                while orders of a past phase are visible to everyone.
+            :return: a new GamePhaseData object suitable for given role.
+            :type phase_data: GamePhaseData
+            :rtype: GamePhaseData
+        """
+        if role == strings.OMNISCIENT_TYPE:
+            return phase_data
+        orders = phase_data.orders
+        if is_current:
+            orders = {power_name: power_orders for power_name, power_orders in orders.items() if power_name == role}
+        return GamePhaseData(name=phase_data.name,
+                             state=phase_data.state,
+                             orders=orders,
+                             messages=self.filter_messages(phase_data.messages, role),
+                             results=phase_data.results,
+                             summary=phase_data.summary)
+
+    def cast(self, role, for_username):
+        """ Return a client game (Game object) from this server game for given role and username.
+
+            Client game contains only data given role is allowed to see: messages are filtered,
+            orders and votes of other powers are hidden for a player game, and all orders and votes
+            are hidden for an observer game. Tokens are never sent to clients.
+
+            :param role: game role: either observer type, omniscient type or a power name.
+            :param for_username: name of user that will receive client game.
+            :return: a Game object.
+            :rtype: Game
+        """
+        assert strings.role_is_special(role) or self.has_power(role)
+        json_dict = self.to_dict()
+        for field in SERVER_ONLY_FIELDS:
+            json_dict.pop(field, None)
+        json_dict[strings.ROLE] = role
+        json_dict[strings.CONTROLLED_POWERS] = self.get_controlled_power_names(for_username)
+        json_dict[strings.OBSERVER_LEVEL] = self.get_observer_level(for_username)
+        json_dict[strings.DAIDE_PORT] = self.server.get_daide_port(self.game_id) if self.server else None
+        json_dict[strings.MESSAGES] = [message.to_dict()
+                                       for message in self.filter_messages(self.messages, role).values()]
+        json_dict[strings.MESSAGE_HISTORY] = {
+            str(phase): [message.to_dict() for message in self.filter_messages(messages, role).values()]
+            for phase, messages in self.message_history.items()}
+        for power_name, power_dict in json_dict[strings.POWERS].items():
+            power_dict[strings.ROLE] = power_name if self.has_power(role) else role
+            power_dict[strings.TOKENS] = []
+            if role != strings.OMNISCIENT_TYPE and power_name != role:
+                power_dict[strings.ORDERS] = {}
+                power_dict[strings.ADJUST] = []
+                power_dict[strings.VOTE] = strings.NEUTRAL
+        return Game.from_trusted_dict(json_dict)
+
+    # ==============
+    # Token methods.
+    # ==============
+
+    def get_special_power(self, role):
+        """ Return special power (observer or omniscient) associated to given special role. """
+        if role == strings.OBSERVER_TYPE:
+            return self.observer
+        if role == strings.OMNISCIENT_TYPE:
+            return self.omniscient
+        raise exceptions.DiplomacyException('Unknown special role %s' % role)
+
+    def add_observer_token(self, token):
+        """ Add given token to observer tokens. """
+        self.observer.add_token(token)
+
+    def add_omniscient_token(self, token):
+        """ Add given token to omniscient tokens. """
+        self.omniscient.add_token(token)
+
+    def has_observer_token(self, token):
+        """ Return True if given token is an observer token. """
+        return self.observer.has_token(token)
+
+    def has_omniscient_token(self, token):
+        """ Return True if given token is an omniscient token. """
+        return self.omniscient.has_token(token)
+
+    def has_special_token(self, token):
+        """ Return True if given token is an observer or omniscient token. """
+        return self.has_observer_token(token) or self.has_omniscient_token(token)
+
+    def power_has_token(self, power_name, token):
+        """ Return True if given power has given player token. """
+        return self.get_power(power_name).has_token(token)
+
+    def has_token(self, token):
+        """ Return True if game has given token (either observer, omniscient or player token). """
+        return self.has_special_token(token) or any(power.has_token(token) for power in self.powers.values())
+
+    def get_power_name_for_token(self, token):
+        """ Return list of power names associated to given player token. """
+        return [power.name for power in self.powers.values() if power.has_token(token)]
+
+    def control(self, power_name, username, token):
+        """ Control given power name with given username via given token. """
+        power = self.get_power(power_name)
+        power.set_controlled(username)
+        power.add_token(token)
+
+    def remove_special_token(self, special_role, token):
+        """ Remove given token from given special power (observer or omniscient). """
+        self.get_special_power(special_role).remove_tokens([token])
+
+    def remove_token(self, token):
+        """ Remove token from this game (either as observer, omniscient or player token). """
+        for power in (self.observer, self.omniscient) + tuple(self.powers.values()):
+            power.remove_tokens([token])
+
+    def transfer_special_tokens(self, username, from_role):
+        """ Move tokens of given username from given special role to the other special role.
+
+            :param username: name of user to update tokens.
+            :param from_role: either observer type or omniscient type.
+            :return: set of transferred tokens.
+        """
+        from_power = self.get_special_power(from_role)
+        to_power = self.get_special_power(strings.switch_special_role(from_role))
+        user_tokens = self.server.users.get_tokens(username) if self.server else set()
+        transferred_tokens = {token for token in from_power.tokens if token in user_tokens}
+        from_power.remove_tokens(transferred_tokens)
+        for token in transferred_tokens:
+            to_power.add_token(token)
+        return transferred_tokens
+
+    # ================
+    # Address methods.
+    # ================
+
+    def get_power_addresses(self, power_name):
+        """ Return list of addresses (couples (game role, token)) for given power name. """
+        return [(power_name, token) for token in self.get_power(power_name).tokens]
+
+    def get_observer_addresses(self):
+        """ Return list of addresses (couples (game role, token)) for observer tokens. """
+        return [(strings.OBSERVER_TYPE, token) for token in self.observer.tokens]
+
+    def get_omniscient_addresses(self):
+        """ Return list of addresses (couples (game role, token)) for omniscient tokens. """
+        return [(strings.OMNISCIENT_TYPE, token) for token in self.omniscient.tokens]
+
+    def get_reception_addresses(self):
+        """ Return list of all addresses (couples (game role, token)) related to this game. """
+        addresses = self.get_observer_addresses() + self.get_omniscient_addresses()
+        for power_name in self.get_map_power_names():
+            addresses.extend(self.get_power_addresses(power_name))
+        return addresses
@@ -0,0 +1,32 @@
+""" Test cases for the strategic board features """
+from ai_diplomacy.board_features import extract_board_features, format_board_features
+from diplomacy.engine.game import Game
+
+def test_initial_position():
+    """ Tests the features of France at the start of the game """
+    features = extract_board_features(Game(), 'FRANCE')
+    assert features.phase == 'S1901M'
+    assert (features.nb_centers, features.nb_units, features.adjustment) == (3, 3, 0)
+    assert not features.threatened_centers
+    assert features.uncontested_centers == {'SPA': ['A MAR']}
+    assert not features.units_adjacent_to_enemies
+    assert not features.support_opportunities
+    assert format_board_features(features).splitlines()[1:] == ['Threatened centers: none',
+                                                               'Uncontested centers in reach: SPA (A MAR)',
+                                                               'Units adjacent to enemies: none',
+                                                               'Support opportunities: none']
+
+def test_contact_with_enemies():
+    """ Tests threatened centers, contacts and support opportunities """
+    game = Game()
+    game.set_units('FRANCE', ['A BUR', 'A MAR', 'F MAO'], reset=True)
+    game.set_units('GERMANY', ['A RUH', 'A MUN'], reset=True)
+    game.set_units('ITALY', ['A PIE'], reset=True)
+    game.set_centers('FRANCE', ['PAR', 'MAR', 'BRE', 'POR'])
+    features = extract_board_features(game, 'FRANCE')
+    assert features.adjustment == 1
+    assert features.threatened_centers == {'MAR': (['A PIE'], ['A BUR', 'A MAR'])}
+    assert features.uncontested_centers == {'SPA': ['A MAR', 'F MAO']}
+    assert features.units_adjacent_to_enemies == {'A BUR': ['A MUN', 'A RUH'], 'A MAR': ['A PIE']}
+    assert features.support_opportunities == {'SPA': ['A MAR', 'F MAO']}
+    assert 'MAR (attackers: A PIE; defenders: A BUR, A MAR)' in format_board_features(features)
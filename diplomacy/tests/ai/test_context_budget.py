@@ -0,0 +1,69 @@
+""" Test cases for the prompt token budgets """
+from ai_diplomacy.context_budget import (ContextSection, PromptStats, estimate_tokens, fit_sections,
+                                         get_history_token_budget, trim_to_budget)
+
+def test_estimate_tokens():
+    """ Tests the local token estimate """
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('A PAR - BUR') == 4
+    assert estimate_tokens('Constantinople!') == 3
+    assert estimate_tokens('word ' * 100) == 100
+
+def test_history_token_budget():
+    """ Tests that the most specific model name fragment is used """
+    assert get_history_token_budget('gpt-4o-mini') == 3000
+    assert get_history_token_budget('gpt-4o') == 4000
+    assert get_history_token_budget('claude-3-7-sonnet-latest') == 4000
+    assert get_history_token_budget('unknown-model') == 3000
+
+def test_fit_sections():
+    """ Tests that sections are selected by priority, summarized if needed, and kept in order """
+    sections = [ContextSection('old ' * 50, priority=3, summary='old summary '),
+                ContextSection('global ' * 20, priority=2),
+                ContextSection('private ' * 20, priority=0)]
+    assert fit_sections(sections, 1000) == ''.join(section.text for section in sections)
+    assert fit_sections(sections, 45) == 'old summary ' + 'global ' * 20 + 'private ' * 20
+    assert fit_sections(sections, 30) == 'old summary ' + 'private ' * 20
+    assert fit_sections(sections, 10) == 'old summary '
+    assert fit_sections(sections, 1) == ''
+
+def test_fit_sections_over_budget():
+    """ Tests that required sections are always kept, and that sections without summary are truncated """
+    private = ''.join('message %d\n' % ix for ix in range(10))
+    sections = [ContextSection('\nS1901M:\n', priority=0, required=True),
+                ContextSection('\nPRIVATE:\n', priority=0, required=True),
+                ContextSection(private, priority=0),
+                ContextSection('-' * 50 + '\n', priority=0, required=True)]
+    headers = '\nS1901M:\n' + '\nPRIVATE:\n'
+    separator = '-' * 50 + '\n'
+    assert estimate_tokens(headers + separator) == 54
+    assert fit_sections(sections, 1000) == ''.join(section.text for section in sections)
+    assert fit_sections(sections, 58) == headers + 'message 8\nmessage 9\n' + separator
+    assert fit_sections(sections, 10) == headers + separator
+
+def test_trim_to_budget():
+    """ Tests that the most recent entries are kept """
+    entries = ['one two', 'three four', 'five six']
+    assert trim_to_budget(entries, 100) == entries
+    assert trim_to_budget(entries, 5) == ['three four', 'five six']
+    assert trim_to_budget(entries, 1) == []
+
+def test_prompt_stats():
+    """ Tests the recording of prompt sizes """
+    stats = PromptStats()
+    with stats.track('gpt-4o', 'orders', 'system prompt', 'A PAR - BUR') as nb_tokens:
+        assert nb_tokens == 6
+    with stats.track('gpt-4o', 'orders', None, 'one two three four'):
+        pass
+    assert stats.stats[('gpt-4o', 'orders')][:3] == [2, 10, 6]
+    assert 'gpt-4o' in stats.format().splitlines()[1]
+
+def test_prompt_cache_usage():
+    """ Tests the recording of the prompt cache usage reported by providers """
+    stats = PromptStats()
+    assert stats.get_cache_hit_rate('gpt-4o') == 0.
+    stats.record_cache_usage('gpt-4o', 2000, 0)
+    stats.record_cache_usage('gpt-4o', 2000, 1536)
+    assert stats.cache_usage['gpt-4o'] == [2, 4000, 1536]
+    assert stats.get_cache_hit_rate('gpt-4o') == 1536 / 4000
+    assert '38.4%' in stats.format().splitlines()[-1]
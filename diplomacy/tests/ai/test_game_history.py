@@ -0,0 +1,56 @@
+""" Test cases for the game history given to the models """
+from ai_diplomacy.context_budget import estimate_tokens
+from ai_diplomacy.game_history import GameHistory
+
+SEPARATOR = '-' * 50 + '\n'
+
+def _get_game_history(nb_messages):
+    """ Returns a history of 2 phases with messages, orders, a phase summary for France and a directive """
+    history = GameHistory()
+    for phase_name in ('S1901M', 'F1901M'):
+        history.add_phase(phase_name)
+        for ix in range(nb_messages):
+            history.add_message(phase_name, 'ENGLAND', 'FRANCE', 'Peace in the channel? (%d)' % ix)
+            history.add_message(phase_name, 'FRANCE', 'ENGLAND', 'Agreed. (%d)' % ix)
+            history.add_message(phase_name, 'GERMANY', 'GLOBAL', 'Hello all. (%d)' % ix)
+        history.add_message(phase_name, 'GERMANY', 'RUSSIA', 'Secret.')
+        history.add_orders(phase_name, 'FRANCE', ['A PAR - BUR', 'F BRE - MAO'])
+        history.add_results(phase_name, 'FRANCE', [['bounce'], []])
+    history.add_phase_summary('S1901M', 'FRANCE', 'England agreed to a peaceful channel.')
+    history.add_plan('F1901M', 'FRANCE', 'Take Belgium.')
+    return history
+
+def test_game_history_without_budget():
+    """ Tests the history of a power without token budget """
+    phase_text = ('\nGLOBAL:\n GERMANY: Hello all. (0)\n'
+                  '\nPRIVATE:\n ENGLAND:\n\n  ENGLAND: Peace in the channel? (0)\n  FRANCE: Agreed. (0)\n\n'
+                  '\nORDERS:\nFRANCE:\n  A PAR - BUR (bounce)\n  F BRE - MAO (successful)\n\n' + SEPARATOR)
+    directive = ('\nFRANCE STRATEGIC DIRECTIVE:\n'
+                 'Here is a high-level directive you have planned out previously for this phase.\nTake Belgium.\n')
+    history = _get_game_history(nb_messages=1)
+    assert history.get_game_history('FRANCE') == '\nS1901M:\n' + phase_text + '\nF1901M:\n' + phase_text + directive
+    assert history.get_game_history('FRANCE', include_plans=False, num_prev_phases=1) == '\nF1901M:\n' + phase_text
+
+def test_game_history_with_budget():
+    """ Tests that older phases are summarized first, and that current private messages are kept last """
+    history = _get_game_history(nb_messages=10)
+    full_text = history.get_game_history('FRANCE')
+    assert history.get_game_history('FRANCE', token_budget=estimate_tokens(full_text)) == full_text
+
+    # Older phase is replaced by its summary
+    text = history.get_game_history('FRANCE', token_budget=estimate_tokens(full_text) - 1)
+    summary = '\nS1901M (summary):\nEngland agreed to a peaceful channel.\n(20 private messages)\n' + SEPARATOR
+    assert text == summary + full_text[full_text.index('\nF1901M:\n'):]
+
+    # Current private messages and directive only
+    private_text = ''.join('  ENGLAND: Peace in the channel? (%d)\n  FRANCE: Agreed. (%d)\n' % (ix, ix)
+                           for ix in range(10))
+    directive = full_text[full_text.index('\nFRANCE STRATEGIC DIRECTIVE:\n'):]
+    expected = '\nF1901M:\n\nPRIVATE:\n ENGLAND:\n\n' + private_text + '\n' + SEPARATOR + directive
+    assert history.get_game_history('FRANCE', token_budget=estimate_tokens(expected)) == expected
+
+    # Private messages truncated to the most recent ones. Empty sections have no header.
+    expected = ('\nF1901M:\n\nPRIVATE:\n  ENGLAND: Peace in the channel? (9)\n  FRANCE: Agreed. (9)\n\n'
+                + SEPARATOR)
+    assert history.get_game_history('FRANCE', token_budget=estimate_tokens(expected)) == expected
+    assert history.get_game_history('FRANCE', token_budget=1) == '\nF1901M:\n' + SEPARATOR
@@ -0,0 +1,39 @@
+""" Test cases for the strategic map analysis """
+from ai_diplomacy.map_utils import get_map_graph, get_nearest_enemy_units
+from diplomacy.engine.game import Game
+
+def test_distances_and_paths():
+    """ Tests distances and shortest paths for armies and fleets, with coasts """
+    graph = get_map_graph(Game().map)
+    assert graph.distance('A', 'PAR', 'PAR') == 0
+    assert graph.distance('A', 'PAR', 'MOS') == 5
+    assert graph.distance('A', 'PAR', 'LON') is None
+    assert graph.distance('F', 'BUL/EC', 'BLA') == 1
+    assert graph.distance('F', 'BUL/SC', 'BLA') == 2
+    assert graph.distance('F', 'MAO', 'SPA') == 1
+    assert graph.distance('F', 'MAO', 'SPA/NC') == 1
+    assert graph.shortest_path('F', 'BRE', 'STP') == ['BRE', 'ENG', 'NTH', 'NWY', 'STP/NC']
+    assert graph.shortest_path('A', 'PAR', 'LON') is None
+    path = graph.shortest_path('A', 'PAR', 'MOS')
+    assert len(path) == 6 and path[0] == 'PAR' and path[-1] == 'MOS'
+    assert all(graph.distance('A', src, dest) == 1 for src, dest in zip(path, path[1:]))
+
+def test_supply_centers_and_threats():
+    """ Tests the nearest supply center and threat radius tables """
+    graph = get_map_graph(Game().map)
+    assert graph.nearest_supply_center('A', 'PAR') == ('PAR', 0)
+    assert graph.nearest_supply_center('A', 'PAR', excluded=['PAR', 'BRE', 'MAR']) == ('BEL', 2)
+    assert {loc for unit_type, loc, _ in graph.threats('MUN') if unit_type == 'A'} \
+        == {'BER', 'BOH', 'BUR', 'KIE', 'RUH', 'SIL', 'TYR'}
+    assert not [loc for unit_type, loc, _ in graph.threats('MUN') if unit_type == 'F']
+    assert ('F', 'NAO', 1) in graph.threats('LVP') and ('F', 'NWG', 2) in graph.threats('LVP', radius=2)
+
+def test_nearest_enemy_units():
+    """ Tests the nearest enemy unit of each unit of a power """
+    game = Game()
+    assert get_nearest_enemy_units(game, 'FRANCE') == {'F BRE': ('F LON', 2),
+                                                       'A MAR': ('A MUN', 2),
+                                                       'A PAR': ('A MUN', 2)}
+    game.set_units('ENGLAND', ['F ENG'], reset=True)
+    assert get_nearest_enemy_units(game, 'FRANCE')['F BRE'] == ('F ENG', 1)
+    assert get_nearest_enemy_units(game, 'ENGLAND')['F ENG'] == ('F BRE', 1)
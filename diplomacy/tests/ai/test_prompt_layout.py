@@ -0,0 +1,17 @@
+""" Test cases for the cacheable prompt layout """
+from ai_diplomacy.prompt_layout import PromptSegments, get_cacheable_blocks
+
+def test_prompt_segments():
+    """ Tests that segments are joined from the most stable to the most volatile """
+    prompt = PromptSegments('instructions', 'board', 'history')
+    assert str(prompt) == 'instructions\n\nboard\n\nhistory'
+    assert str(PromptSegments('', 'board', 'history')) == 'board\n\nhistory'
+    assert str(PromptSegments('instructions')) == 'instructions'
+
+def test_cacheable_blocks():
+    """ Tests that the blocks are equal to the prompt text once concatenated """
+    prompt = PromptSegments('instructions', 'board', 'history')
+    assert get_cacheable_blocks(prompt) == ['instructions\n\n', 'board\n\n', 'history']
+    assert ''.join(get_cacheable_blocks(prompt)) == str(prompt)
+    assert get_cacheable_blocks(PromptSegments('instructions')) == ['instructions']
+    assert get_cacheable_blocks('raw prompt') == ['raw prompt']
@@ -0,0 +1,214 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test request/response matching in client connection (without server). """
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from diplomacy.client import connection as connection_module
+from diplomacy.client.channel import Channel
+from diplomacy.client.connection import Connection
+from diplomacy.client.game_instances_set import GameInstancesSet
+from diplomacy.client.network_game import NetworkGame
+from diplomacy.client.response_managers import RequestFutureContext
+from diplomacy.communication import frames, requests, responses
+from diplomacy.engine.game import Game
+from diplomacy.engine.message import Message
+from diplomacy.utils import constants, strings
+
+class FakeSocket:
+    """ Fake websocket connection keeping written messages. """
+    def __init__(self):
+        self.written = []
+
+    def write_message(self, message, binary=False):
+        """ Keep message and return a done future. """
+        assert binary == isinstance(message, bytes)
+        self.written.append(message)
+        future = Future()
+        future.set_result(None)
+        return future
+
+def new_connection(metrics):
+    """ Return a connection with a fake websocket, and metrics stored in given list. """
+    connection = Connection('localhost', 0)
+    connection.connection = FakeSocket()
+    connection.is_connecting.set()
+    connection.metrics_hook = lambda name, value, label: metrics.append((name, label))
+    return connection
+
+def port_response(request_id, port):
+    """ Return a JSON response to a GetDaidePort request. """
+    return responses.DataPort(request_id=request_id, data=port).json()
+
+def test_response_matching():
+    """ Test that a response is matched with its request as soon as it is received. """
+
+    @gen.coroutine
+    def run():
+        """ Test body """
+        metrics = []
+        connection = new_connection(metrics)
+        request = requests.GetDaidePort(game_id='game')
+        future = connection.send(request)
+        yield gen.moment
+
+        # Request is registered before being written.
+        assert request.request_id in connection.requests_waiting_responses
+        assert len(connection.connection.written) == 1
+
+        connection._on_socket_message(port_response(request.request_id, 1234))   # pylint: disable=protected-access
+        assert (yield future) == 1234
+        assert not connection.requests_waiting_responses
+        assert (connection_module.METRIC_RESPONSE_LATENCY, request.name) in metrics
+
+    IOLoop.current().run_sync(run)
+
+def test_unknown_responses_are_parked():
+    """ Test that responses for unknown requests are parked without blocking, and bounded. """
+
+    @gen.coroutine
+    def run():
+        """ Test body """
+        metrics = []
+        connection = new_connection(metrics)
+        request = requests.GetDaidePort(game_id='game')
+
+        # Response received before request is registered.
+        connection._on_socket_message(port_response(request.request_id, 4321))   # pylint: disable=protected-access
+        assert request.request_id in connection.pending_responses
+        assert (connection_module.METRIC_PARKED_RESPONSE, None) in metrics
+
+        # Parked response is used as soon as request is sent.
+        assert (yield connection.send(request)) == 4321
+        assert not connection.pending_responses
+        assert not connection.requests_waiting_responses
+        assert not connection.connection.written
+
+        # Parked responses are bounded.
+        for index in range(constants.MAX_PENDING_RESPONSES + 10):
+            connection._on_socket_message(port_response('unknown-%d' % index, index))  # pylint: disable=protected-access
+        assert len(connection.pending_responses) == constants.MAX_PENDING_RESPONSES
+        assert 'unknown-0' not in connection.pending_responses
+        assert metrics.count((connection_module.METRIC_DROPPED_RESPONSE, None)) == 10
+
+    IOLoop.current().run_sync(run)
+
+def test_frames():
+    """ Test encoding and decoding of websocket frames. """
+    sent_requests = [requests.GetDaidePort(game_id='game_%d' % index) for index in range(3)]
+    json_messages = [request.to_dict() for request in sent_requests]
+    for protocol in frames.get_supported_protocols():
+        assert frames.decode_frame(frames.encode_batch(json_messages, protocol)) == json_messages
+    assert frames.decode_frame(sent_requests[0].json()) == json_messages[:1]
+    assert frames.select_protocol(['unknown', frames.BATCH_JSON]) == frames.BATCH_JSON
+    assert frames.select_protocol(['unknown']) is None
+
+def test_batched_requests():
+    """ Test that requests sent together are written in one frame when a batch protocol is negotiated. """
+
+    @gen.coroutine
+    def run():
+        """ Test body """
+        for protocol in frames.get_supported_protocols():
+            metrics = []
+            connection = new_connection(metrics)
+            connection.protocol = protocol
+            sent_requests = [requests.GetDaidePort(game_id='game_%d' % index) for index in range(5)]
+            futures = [connection.send(request) for request in sent_requests]
+            yield gen.moment
+            yield gen.moment
+
+            assert len(connection.connection.written) == 1
+            written = frames.decode_frame(connection.connection.written[0])
+            assert [json_request['request_id'] for json_request in written] \
+                == [request.request_id for request in sent_requests]
+            assert (connection_module.METRIC_FRAME_SENT, 5) in metrics
+
+            # Responses may be received in one batch too.
+            connection._on_socket_message(frames.encode_batch(                   # pylint: disable=protected-access
+                [responses.DataPort(request_id=request.request_id, data=index).to_dict()
+                 for index, request in enumerate(sent_requests)], protocol))
+            assert (yield futures) == list(range(5))
+
+    IOLoop.current().run_sync(run)
+
+def test_reconnection():
+    """ Test that games are synchronized independently and incrementally after a reconnection. """
+
+    @gen.coroutine
+    def run():
+        """ Test body """
+        connection = new_connection([])
+        channel = Channel(connection, 'token')
+        connection.channels[channel.token] = channel
+        server_games = {game_id: Game(game_id=game_id) for game_id in ('g1', 'g2')}
+        for game_id, server_game in server_games.items():
+            game_dict = server_game.to_dict()
+            game_dict['role'] = strings.OMNISCIENT_TYPE
+            for power_dict in game_dict['powers'].values():
+                power_dict['role'] = strings.OMNISCIENT_TYPE
+            client_game = Game.from_dict(game_dict)
+            channel.game_id_to_instances[game_id] = GameInstancesSet(game_id)
+            channel.game_id_to_instances[game_id].add(NetworkGame(channel, client_game))
+        client_games = {game_id: channel.game_id_to_instances[game_id].get_special() for game_id in server_games}
+
+        # Server games changed while client was disconnected.
+        server_games['g1'].add_message(Message(sender='FRANCE', recipient='GLOBAL', message='Hello', phase='S1901M'))
+        server_games['g1'].set_orders('FRANCE', ['A PAR - BUR'])
+
+        # Requests not yet sent when connection was lost.
+        queued_requests = [requests.SetOrders(token=channel.token, game_id='g2', game_role=strings.OMNISCIENT_TYPE,
+                                              phase='S1901M', power_name='ITALY', orders=['A ROM H']),
+                           requests.GetDaidePort(game_id='g1')]
+        for request in queued_requests:
+            connection.requests_to_send[request.request_id] = RequestFutureContext(request, Future(), connection)
+
+        connection.is_reconnecting.clear()
+        connection_module._Reconnection(connection).reconnect()                    # pylint: disable=protected-access
+        for _ in range(3):
+            yield gen.moment
+
+        # Request not related to a game and sync requests are sent, but request for game g2 waits for g2 sync.
+        written = [frames.decode_frame(frame)[0] for frame in connection.connection.written]
+        assert [json_request['name'] for json_request in written] == ['get_daide_port', 'synchronize', 'synchronize']
+        assert connection.is_reconnecting.is_set()
+        assert set(connection.games_reconnecting) == {(game_id, strings.OMNISCIENT_TYPE) for game_id in server_games}
+
+        # Each game is synchronized with changes since its client state.
+        sync_requests = {json_request['game_id']: json_request for json_request in written[1:]}
+        for game_id in ('g1', 'g2'):
+            sync_request = sync_requests[game_id]
+            sync_data = server_games[game_id].get_sync_data(
+                sync_request['phase'], sync_request['timestamp'], sync_request['zobrist_hash'], sync_request['game_role'])
+            assert sync_data.state is None
+            connection._on_socket_message(                                          # pylint: disable=protected-access
+                responses.DataGameSync(request_id=sync_request['request_id'], data=sync_data).json())
+            for _ in range(3):
+                yield gen.moment
+            assert (game_id, strings.OMNISCIENT_TYPE) not in connection.games_reconnecting
+            if game_id == 'g1':
+                # Game g1 is synchronized, but request for game g2 still waits.
+                assert len(connection.connection.written) == 3
+
+        assert len(client_games['g1'].messages) == 1
+        assert client_games['g1'].get_orders('FRANCE') == ['A PAR - BUR']
+        for _ in range(5):
+            yield gen.moment
+        assert frames.decode_frame(connection.connection.written[-1])[0]['name'] == 'set_orders'
+
+    IOLoop.current().run_sync(run)
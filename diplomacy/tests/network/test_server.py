@@ -0,0 +1,87 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test reference server: persistence of server data and games, and load generator. """
+import os
+import tempfile
+
+from diplomacy.server import load_generator
+from diplomacy.server.persistence import FilePersistence, MemoryPersistence
+from diplomacy.server.server import Server
+from diplomacy.server.server_game import ServerGame
+from diplomacy.utils import common
+
+def test_file_persistence():
+    """ Test that server data and games saved in a server folder are reloaded by a new server. """
+    with tempfile.TemporaryDirectory() as server_dir:
+        server = Server(server_dir, password_hash_rounds=4)
+        assert Server(server_dir) is server
+        server.users.add_user('user', common.hash_password('password', 4))
+        server.save_data()
+        server_game = ServerGame(game_id='game_1', rules=['NO_PRESS'])
+        server_game.set_orders('FRANCE', ['A PAR H'])
+        server.add_new_game(server_game)
+        assert os.path.isfile(os.path.join(server_dir, 'data', 'games', 'game_1.json'))
+        Server.__cache__.clear()
+
+        loaded_server = Server(server_dir)
+        assert loaded_server is not server
+        assert loaded_server.users.has_username('user')
+        assert loaded_server.users.get_user('user').is_valid_password('password')
+        assert loaded_server.has_game_id('game_1')
+        assert 'game_1' not in loaded_server.games
+        loaded_game = loaded_server.get_game('game_1')
+        assert loaded_game.server is loaded_server
+        assert loaded_game.get_orders('FRANCE') == ['A PAR H']
+        assert loaded_game.get_hash() == server_game.get_hash()
+
+        loaded_server.delete_game(loaded_game)
+        assert not loaded_server.has_game_id('game_1')
+        assert not os.path.isfile(os.path.join(server_dir, 'data', 'games', 'game_1.json'))
+        Server.__cache__.clear()
+
+def test_memory_persistence():
+    """ Test that servers without server folder are not cached and do not share data. """
+    server_1 = Server(password_hash_rounds=4)
+    server_2 = Server(password_hash_rounds=4)
+    assert server_1 is not server_2
+    assert isinstance(server_1.persistence, MemoryPersistence)
+    server_1.add_new_game(ServerGame(game_id='game_1'))
+    assert server_1.has_game_id('game_1')
+    assert not server_2.has_game_id('game_1')
+    assert not Server.__cache__
+
+def test_server_folder_layout():
+    """ Test file persistence API directly. """
+    with tempfile.TemporaryDirectory() as server_dir:
+        persistence = FilePersistence(server_dir)
+        assert persistence.load_server_data() is None
+        assert persistence.get_game_ids() == set()
+        persistence.save_game('game_1', {'game_id': 'game_1'})
+        assert persistence.get_game_ids() == {'game_1'}
+        assert persistence.load_game('game_1') == {'game_id': 'game_1'}
+        persistence.delete_game('game_1')
+        assert persistence.load_game('game_1') is None
+
+def test_load_generator():
+    """ Test a small load generator run (2 games, 3 phases, with press, batched and compressed frames). """
+    results = load_generator.run(nb_games=2, nb_phases=3, nb_messages=1, use_batching=True, use_compression=True)
+    assert results['games'] == 2
+    assert results['phases'] == 6
+    assert results['requests'] > 0
+    assert results['request_latency']['count'] == results['requests']
+    assert results['game_processing']['count'] == 6
+    assert results['phase_latency']['count'] > 0
@@ -0,0 +1,58 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test cases for engine benchmarks """
+from diplomacy.engine import benchmark
+from diplomacy.engine.benchmark import _datc_games, _get_positions       # pylint: disable=protected-access
+
+def test_measure_fresh_setup():
+    """ Tests that fresh benchmarks get a new setup value for each execution """
+    values = []
+    results = benchmark.measure(benchmark.Benchmark('test', values.append, setup=object, fresh=True),
+                                repeat=2, min_time=0.)
+    assert results['repeat'] == 2
+    assert results['min'] <= results['median']
+    assert len(values) == len(set(id(value) for value in values))
+
+def test_run_with_filter():
+    """ Tests running a filtered set of benchmarks """
+    results = benchmark.run(filters=['process/datc', 'map_load/cached/standard'], repeat=1, min_time=0.)
+    assert 'process/datc' in results['benchmarks']
+    assert 'map_load/cached/standard' in results['benchmarks']
+    assert 'possible_orders/movement' not in results['benchmarks']
+
+def test_datc_positions():
+    """ Tests that DATC orders are all valid """
+    for game, (_, _, orders) in zip(_datc_games(), benchmark.DATC_POSITIONS):
+        for power_name, power_orders in orders.items():
+            assert len(game.get_orders(power_name)) == len(power_orders)
+
+def test_random_positions():
+    """ Tests that positions are taken from a reproducible random game """
+    positions_1, game_1 = _get_positions()
+    positions_2, game_2 = _get_positions()
+    assert sorted(positions_1) == ['A', 'M', 'R']
+    for phase_type, (state, orders) in positions_1.items():
+        assert state['zobrist_hash'] == positions_2[phase_type][0]['zobrist_hash']
+        assert orders == positions_2[phase_type][1]
+    assert game_1.get_state()['units'] == game_2.get_state()['units']
+
+def test_compare():
+    """ Tests comparing results with a baseline """
+    baseline = {'benchmarks': {'a': {'min': 1.}, 'b': {'min': 1.}, 'c': {'min': 1.}}}
+    results = {'benchmarks': {'a': {'min': 1.2}, 'b': {'min': 1.3}, 'd': {'min': 5.}}}
+    assert benchmark.compare(results, baseline, tolerance=0.25) == {'b': 1.3}
+    assert benchmark.compare(results, baseline, tolerance=0.5) == {}
@@ -667,3 +667,29 @@ def test_unit_owner():
 
     assert game._unit_owner('F SEV', coast_required=0) is game.get_power('RUSSIA')                                      # pylint: disable=protected-access
     assert game._unit_owner('F SEV', coast_required=1) is game.get_power('RUSSIA')                                      # pylint: disable=protected-access
+
+def test_from_trusted_dict():
+    """ Test loading a game from a trusted JSON dict """
+    from diplomacy.engine.message import Message
+    game = Game(rules=['NO_DEADLINE', 'POWER_CHOICE'])
+    for _ in range(3):
+        game.add_message(Message(sender='FRANCE', recipient='ENGLAND', message='Hello', phase=game.get_current_phase()))
+        game.set_orders('FRANCE', ['A PAR - BUR', 'F BRE - MAO'])
+        game.set_orders('GERMANY', ['A MUN - BUR'])
+        game.process()
+    game_dict = game.to_dict()
+
+    loaded_game = Game.from_dict(game_dict)
+    trusted_game = Game.from_trusted_dict(game_dict)
+    assert trusted_game.to_dict() == loaded_game.to_dict()
+    assert trusted_game.rules == loaded_game.rules
+    assert trusted_game.get_hash() == loaded_game.get_hash()
+    assert list(trusted_game.state_history.keys()) == list(loaded_game.state_history.keys())
+    assert list(trusted_game.message_history.keys()) == list(loaded_game.message_history.keys())
+    assert all(power.game is trusted_game for power in trusted_game.powers.values())
+
+    # Histories must remain sorted when new phases are added.
+    trusted_game.process()
+    loaded_game.process()
+    assert list(trusted_game.order_history.keys()) == list(loaded_game.order_history.keys())
+    assert trusted_game.get_phase_history()[-1].name == loaded_game.get_phase_history()[-1].name
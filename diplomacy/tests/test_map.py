@@ -185,6 +185,17 @@ def test_compare_phases():
     assert this_map.compare_phases('F1901?', 'F1901R') == 0
     assert this_map.compare_phases('W1901?', 'W1901A') == 0
 
+def test_phase_ordinal():
+    """ Tests map.phase_ordinal """
+    this_map = deepcopy(Map())
+    phases = ['FORMING', 'COMPLETED', 'S1901M', 'S1901R', 'F1901M', 'F1901R', 'W1901A', 'S1902M', 'F1910R',
+              'SPRING 1902 MOVEMENT', 'S1901?', 'F1901?', 'W1901?']
+    for phase_1 in phases:
+        for phase_2 in phases:
+            ordinal_1, ordinal_2 = this_map.phase_ordinal(phase_1), this_map.phase_ordinal(phase_2)
+            expected = this_map.compare_phases(phase_1, phase_2)
+            assert (ordinal_1 > ordinal_2) - (ordinal_1 < ordinal_2) == expected, (phase_1, phase_2)
+
 def test_find_next_phase():
     """ Tests map.find_next_phase """
     this_map = deepcopy(Map())
@@ -0,0 +1,100 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test cases for the possible orders cache """
+from copy import deepcopy
+import random
+from diplomacy.engine.game import Game
+from diplomacy.engine.possible_orders import PossibleOrdersCache
+
+def _sorted_orders(possible_orders):
+    """ Returns possible orders with sorted lists of orders """
+    return {loc: sorted(orders) for loc, orders in possible_orders.items()}
+
+def _get_uncached_orders(game):
+    """ Returns the possible orders of a game, computed without cache """
+    game = deepcopy(game)
+    game._possible_orders_cache = PossibleOrdersCache()                     # pylint: disable=protected-access
+    return _sorted_orders(game.get_all_possible_orders())
+
+def test_incremental_updates():
+    """ Tests that cached possible orders are identical to recomputed orders after random unit changes """
+    rng = random.Random(0)
+    game = Game()
+    locs = sorted(loc.upper() for loc in game.map.locs)
+    for _ in range(60):
+        power_name = rng.choice(sorted(game.powers))
+        units = game.get_units(power_name)
+        if units and rng.random() < 0.4:
+            units.remove(rng.choice(units))
+        unit = '%s %s' % (rng.choice('AF'), rng.choice(locs))
+        occupied = {other_unit[2:5] for other_units in game.get_units().values() for other_unit in other_units}
+        if game.map.is_valid_unit(unit) and unit[2:5] not in occupied:
+            units.append(unit)
+        game.set_units(power_name, units, reset=True)
+        assert _sorted_orders(game.get_all_possible_orders()) == _get_uncached_orders(game)
+
+def test_invalidation_is_local():
+    """ Tests that only the units near a changed location are recomputed """
+    game = Game()
+    game.get_all_possible_orders()
+    cache = game._possible_orders_cache                                     # pylint: disable=protected-access
+    cached_orders = {unit: cache.get(unit) for unit in cache.unit_orders}
+
+    # Moving an army in Turkey does not affect France or England
+    game.set_units('TURKEY', ['A CON', 'A ARM', 'F ANK'], reset=True)
+    possible_orders = game.get_all_possible_orders()
+    assert 'A ARM' in cache.unit_orders
+    assert 'A SMY' not in cache.unit_orders
+    for unit in ('A PAR', 'F BRE', 'F LON', 'A LVP'):
+        assert cache.get(unit) is cached_orders[unit]
+    assert 'A ARM - SYR' in possible_orders['ARM']
+    assert 'F ANK S A ARM' in possible_orders['ANK']
+
+def test_convoy_invalidation():
+    """ Tests that convoy orders are updated when a fleet moves on a convoy path """
+    game = Game()
+    game.clear_units()
+    game.set_units('ENGLAND', ['A LON', 'F NTH'])
+    assert 'A LON - NWY VIA' in game.get_all_possible_orders()['LON']
+    game.set_units('ENGLAND', ['A LON', 'F NWG'], reset=True)
+    possible_orders = game.get_all_possible_orders()
+    assert 'A LON - NWY VIA' not in possible_orders['LON']
+    assert _sorted_orders(possible_orders) == _get_uncached_orders(game)
+
+def test_copied_game():
+    """ Tests that a copied game has its own cache """
+    game = Game()
+    game.get_all_possible_orders()
+    game_copy = deepcopy(game)
+    game_copy.set_units('FRANCE', ['A BUR'], reset=False)
+    assert 'A BUR H' in game_copy.get_all_possible_orders()['BUR']
+    assert not game.get_all_possible_orders()['BUR']
+    assert _sorted_orders(game.get_all_possible_orders()) == _get_uncached_orders(game)
+
+def test_order_templates():
+    """ Tests that order templates are built once per map and unit, and shared by games on the same map """
+    game = Game()
+    game.get_all_possible_orders()
+    template = game.map.order_templates['F LON']
+    assert set(template.static_orders) == {'F LON H', 'F LON - ENG', 'F LON - NTH', 'F LON - WAL', 'F LON - YOR'}
+    assert 'F LON S A YOR' == dict(template.support_holds)['YOR']['A']
+    assert template.convoy_paths == () and not template.via_convoy
+
+    other_game = Game()
+    other_game.get_all_possible_orders()
+    assert other_game.map is game.map
+    assert other_game.map.order_templates['F LON'] is template
@@ -0,0 +1,79 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test cases for engine profiling """
+from diplomacy.engine import profiling
+from diplomacy.engine.game import Game
+from diplomacy.engine.profiling import EngineProfiler, profile_process
+
+def _convoy_paradox_game():
+    """ Returns a game set up with DATC test case 6.F.14 (convoy paradox detection) """
+    game = Game()
+    game.clear_units()
+    game.set_units('ENGLAND', ['F LON', 'F WAL'])
+    game.set_units('FRANCE', ['A BRE', 'F ENG'])
+    game.set_orders('ENGLAND', ['F LON S F WAL - ENG', 'F WAL - ENG'])
+    game.set_orders('FRANCE', ['A BRE - LON', 'F ENG C A BRE - LON'])
+    return game
+
+def test_profile_phase():
+    """ Tests the profile of a movement phase """
+    profiles = []
+    game = _convoy_paradox_game()
+    with profile_process(profiles.append):
+        game.process()
+    assert profiling.get_sink() is None
+    assert len(profiles) == 1
+
+    profile = profiles[0]
+    assert profile.phase == 'S1901M'
+    assert profile.game_id == game.game_id
+    for stage in (profiling.PROCESS, profiling.ARCHIVE_HISTORY, profiling.EXPAND_ORDERS, profiling.RESOLVE,
+                  profiling.RESOLVE_MOVES, profiling.CONVOY_PATHS, profiling.STRENGTHS, profiling.BOUNCES,
+                  profiling.PARADOX_DETECTION, profiling.ADVANCE_PHASE, profiling.PHASE_SUMMARY):
+        assert 0. < profile.timers[stage] <= profile.duration
+    assert profile.timers[profiling.RESOLVE_MOVES] <= profile.timers[profiling.RESOLVE]
+    assert profile.counters[profiling.PARADOX_CHECKS] > 0
+    assert profile.counters[profiling.BOUNCE_PASSES] > 0
+    assert profile.counters[profiling.OCCUPANT_CALLS] > 0
+    assert game._profile is None                                            # pylint: disable=protected-access
+
+def test_profiling_does_not_change_results():
+    """ Tests that results are the same with and without profiling """
+    game, profiled_game = _convoy_paradox_game(), _convoy_paradox_game()
+    game.process()
+    with profile_process(EngineProfiler()):
+        profiled_game.process()
+    assert game.get_state()['units'] == profiled_game.get_state()['units']
+    assert game.result_history.last_value() == profiled_game.result_history.last_value()
+
+def test_engine_profiler():
+    """ Tests aggregating the profiles of many phases """
+    received_phases = []
+    profiler = EngineProfiler(callback=lambda profile: received_phases.append(profile.phase), keep_profiles=True)
+    game = Game()
+    with profile_process(profiler):
+        for _ in range(4):
+            game.process()
+    game.process()
+
+    assert profiler.nb_phases == 4
+    assert received_phases == ['S1901M', 'F1901M', 'S1902M', 'F1902M']
+    assert [profile.phase for profile in profiler.profiles] == received_phases
+    assert abs(profiler.timers[profiling.PROCESS] - sum(profile.duration for profile in profiler.profiles)) < 1e-9
+    assert profiler.counters[profiling.BOUNCE_PASSES] == \
+           sum(profile.counters[profiling.BOUNCE_PASSES] for profile in profiler.profiles)
+    assert 'process' in profiler.format()
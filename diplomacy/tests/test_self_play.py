@@ -0,0 +1,68 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test cases for the self-play runner """
+import pytest
+from diplomacy.engine.self_play import get_policy, play_game, run_self_play, heuristic_policy
+
+def _get_orders(game):
+    """ Returns the orders history of a game """
+    return {str(phase): orders for phase, orders in game.order_history.items()}
+
+@pytest.mark.parametrize('policy', ['random', 'hold', 'heuristic'])
+def test_play_game(policy):
+    """ Tests that games are played without errors or summaries, and are deterministic given a seed """
+    game, nb_phases = play_game(policy, seed=1, max_phases=12)
+    assert nb_phases == 12
+    assert len(game.state_history) == 12
+    assert not game.error
+    assert not game.phase_summaries
+    assert _get_orders(game) == _get_orders(play_game(policy, seed=1, max_phases=12)[0])
+    if policy != 'hold':
+        assert _get_orders(game) != _get_orders(play_game(policy, seed=2, max_phases=12)[0])
+
+def test_policy_per_power():
+    """ Tests playing with a different policy for each power """
+    policies = {power_name: 'hold' for power_name in play_game('hold', max_phases=0)[0].powers}
+    policies['FRANCE'] = heuristic_policy
+    game, _ = play_game(policies, max_phases=2)
+    assert game.order_history.last_value()['FRANCE']
+    assert game.order_history.last_value()['ENGLAND'] == ['F EDI H', 'F LON H', 'A LVP H']
+
+def test_get_policy():
+    """ Tests getting policies by name or import path """
+    assert get_policy('heuristic') is heuristic_policy
+    assert get_policy('diplomacy.engine.self_play:heuristic_policy') is heuristic_policy
+    with pytest.raises(ValueError):
+        get_policy('unknown')
+
+def test_run_self_play(tmpdir):
+    """ Tests that runs stream the same games to archives with and without worker processes """
+    pytest.importorskip('msgpack')
+    from diplomacy.utils.archive import ArchiveReader
+    archives = []
+    for nb_workers in (0, 2):
+        archive_path = str(tmpdir.join('games_%d.arc' % nb_workers))
+        stats = run_self_play(5, policy='random', seed=3, output_path=archive_path, nb_workers=nb_workers,
+                              max_phases=6, chunk_size=2)
+        assert (stats.nb_games, stats.nb_phases) == (5, 30)
+        assert sum(worker_stats[0] for worker_stats in stats.workers.values()) == 5
+        assert 'phases/s' in stats.format()
+        with ArchiveReader(archive_path) as reader:
+            archives.append([(saved_game['id'], saved_game['phases'][-1]['orders'])
+                             for saved_game in reader.iter_saved_games()])
+    assert archives[0] == archives[1]
+    assert [game_id for game_id, _ in archives[0]] == ['self_play_3_%d' % game_ix for game_ix in range(5)]
@@ -0,0 +1 @@
+# Empty file to make tests a package
@@ -0,0 +1,72 @@
+""" Test cases for the HTTP caching (ETag / 304 Not Modified) of the web application """
+from fastapi.testclient import TestClient
+
+import main
+from caching import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, make_etag
+from storage import FileStorage
+
+def _create_game(client):
+    """ Creates a game through the web form and returns its id """
+    response = client.post('/game/new', data={'game_name': 'test', 'player_power': 'FRANCE'}, follow_redirects=False)
+    return response.headers['location'].rsplit('/', 1)[-1]
+
+def test_make_etag():
+    """ Tests that ETags are quoted, deterministic and depend on all their parts """
+    etag = make_etag('game', {'phase': 'S1901M', 'orders': 'abc'}, 'view')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag('game', {'orders': 'abc', 'phase': 'S1901M'}, 'view')
+    assert etag != make_etag('game', {'phase': 'S1901M', 'orders': 'abc'}, 'state')
+    assert etag != make_etag('game', {'phase': 'F1901M', 'orders': 'abc'}, 'view')
+
+def test_game_etags(tmp_path, monkeypatch):
+    """ Tests that game views and states are answered with 304 until the game changes """
+    monkeypatch.setattr(main, 'storage', FileStorage(str(tmp_path)))
+    with TestClient(main.app) as client:
+        game_id = _create_game(client)
+        for url in ('/game/%s' % game_id, '/game/%s/state' % game_id):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.headers['cache-control'] == REVALIDATE_CACHE_CONTROL
+            etag = response.headers['etag']
+
+            # Same ETag, weak ETag, lists and wildcards match
+            for if_none_match in (etag, 'W/' + etag, '"other", %s' % etag, '*'):
+                response = client.get(url, headers={'If-None-Match': if_none_match})
+                assert response.status_code == 304
+                assert response.headers['etag'] == etag
+                assert not response.content
+            assert client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
+
+        # Views and states have different ETags
+        view_etag = client.get('/game/%s' % game_id).headers['etag']
+        state_etag = client.get('/game/%s/state' % game_id).headers['etag']
+        assert view_etag != state_etag
+
+        # Submitting orders changes the view (but not the board), so the ETags change
+        client.post('/game/%s/orders/FRANCE' % game_id, data={'orders': 'A PAR - BUR'}, follow_redirects=False)
+        response = client.get('/game/%s' % game_id, headers={'If-None-Match': view_etag})
+        assert response.status_code == 200
+        assert response.headers['etag'] != view_etag
+        assert client.get('/game/%s/state' % game_id, headers={'If-None-Match': state_etag}).status_code == 200
+
+def test_map_svg_cache():
+    """ Tests that map SVGs are immutable, precompressed and answered with 304 when cached """
+    with TestClient(main.app) as client:
+        response = client.get('/maps/svg/standard.svg', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'image/svg+xml'
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers['vary'] == 'Accept-Encoding'
+        assert '<svg' in response.text
+        etag = response.headers['etag']
+
+        identity = client.get('/maps/svg/standard.svg', headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in identity.headers
+        assert identity.headers['etag'] == etag
+        assert identity.content == response.content
+
+        response = client.get('/maps/svg/standard.svg', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+        assert client.get('/maps/svg/unknown.svg').status_code == 404
@@ -0,0 +1,94 @@
+""" Test cases for the live game updates (server-sent events) of the web application """
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+import main
+from caching import get_game_fingerprint
+from diplomacy.engine.game import Game
+from diplomacy.engine.message import Message
+from events import PHASE, STATE, broker
+from storage import FileStorage
+
+def _save_game(storage, game):
+    """ Saves a game and its metadata """
+    asyncio.run(storage.save_game(game.game_id, game))
+    asyncio.run(storage.save_metadata(game.game_id, {'id': game.game_id, 'name': 'test', 'map': 'standard',
+                                                     'phase': game.phase, 'status': game.status,
+                                                     'player_power': 'FRANCE',
+                                                     'fingerprint': get_game_fingerprint(game)}))
+
+def _get_final_game(game_id):
+    """ Returns an active game in which France wins by moving A MAR to SPA (its 18th center) """
+    game = Game(game_id=game_id)
+    game.set_status('active')
+    game.set_current_phase('F1901M')
+    game.clear_units('ENGLAND')
+    game.set_centers('FRANCE', ['BEL', 'BRE', 'BUL', 'DEN', 'EDI', 'GRE', 'HOL', 'LON', 'LVP',
+                                'MAR', 'NWY', 'PAR', 'POR', 'RUM', 'SER', 'SWE', 'TUN'])
+    game.set_orders('FRANCE', ['A MAR - SPA'])
+    return game
+
+def _parse_events(body):
+    """ Returns the list of (event type, data) of a text/event-stream body, keep-alive comments excluded """
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+def test_stream_phase_delta(tmp_path, monkeypatch):
+    """ Tests that viewers get a snapshot, then the phase delta with the messages sent since the phase started,
+        and that the stream ends with the game
+    """
+    storage = FileStorage(str(tmp_path))
+    monkeypatch.setattr(main, 'storage', storage)
+    game = _get_final_game('endgame')
+    game.add_message(Message(phase='F1901M', sender='FRANCE', recipient='ENGLAND', message='Old news',
+                             time_sent=game.timestamp_created - 1))
+    game.add_message(Message(phase='F1901M', sender='FRANCE', recipient='ENGLAND', message='Spain is mine',
+                             time_sent=game.timestamp_created + 1))
+    _save_game(storage, game)
+
+    with TestClient(main.app) as client, ThreadPoolExecutor(max_workers=1) as executor:
+        stream = executor.submit(client.get, '/game/endgame/events')
+        deadline = time.time() + 10.
+        while not broker.count('endgame'):
+            assert time.time() < deadline, 'Viewer did not subscribe.'
+            time.sleep(0.01)
+        assert client.post('/game/endgame/process', follow_redirects=False).status_code == 303
+        response = stream.result(timeout=30)
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert not broker.count('endgame')
+    (snapshot_type, snapshot), (delta_type, delta) = _parse_events(response.text)
+    assert snapshot_type == STATE
+    assert snapshot['phase'] == 'F1901M'
+    assert snapshot['status'] == 'active'
+    assert 'A MAR' in snapshot['units']['FRANCE']
+    assert delta_type == PHASE
+    assert delta['previous_phase'] == 'F1901M'
+    assert delta['status'] == 'completed'
+    assert delta['units'] == {'FRANCE': {'added': ['A SPA'], 'removed': ['A MAR']}}
+    assert delta['centers'] == {'FRANCE': {'added': ['SPA'], 'removed': []}}
+    assert [(message['sender'], message['message']) for message in delta['messages']] == \
+        [('FRANCE', 'Spain is mine')]
+
+def test_stream_completed_game(tmp_path, monkeypatch):
+    """ Tests that completed games only stream their snapshot, and that unknown games are not found """
+    storage = FileStorage(str(tmp_path))
+    monkeypatch.setattr(main, 'storage', storage)
+    game = _get_final_game('endgame')
+    game.process()
+    _save_game(storage, game)
+
+    with TestClient(main.app) as client:
+        events = _parse_events(client.get('/game/endgame/events').text)
+        assert client.get('/game/unknown/events').status_code == 404
+    assert [(event_type, data['status']) for event_type, data in events] == [(STATE, 'completed')]
+    assert not broker.count('unknown')
@@ -0,0 +1,73 @@
+""" Test cases for the background job executor of the web application """
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from jobs import COMPLETED, QUEUED, RUNNING, job_manager
+from storage import FileStorage
+
+def _create_game(client, **form):
+    """ Creates a game through the web form and returns its id """
+    response = client.post('/game/new', data={'game_name': 'test', **form}, follow_redirects=False)
+    assert response.status_code == 303
+    return response.headers['location'].rsplit('/', 1)[-1]
+
+def _wait_for_job(client, status_url, timeout=30.):
+    """ Polls the status of a job until it is done and returns it """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(status_url).json()
+        if job['status'] not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError('Job %s did not complete.' % status_url)
+
+def test_submit_process_job(tmp_path, monkeypatch):
+    """ Tests that processing is queued as a job, and that its status and result can be retrieved """
+    monkeypatch.setattr(main, 'storage', FileStorage(str(tmp_path)))
+    with TestClient(main.app) as client:
+        game_id = _create_game(client, player_power='FRANCE')
+        client.post('/game/%s/orders/FRANCE' % game_id, data={'orders': 'A PAR - BUR'}, follow_redirects=False)
+
+        response = client.post('/game/%s/process' % game_id, headers={'Accept': 'application/json'})
+        assert response.status_code == 202
+        submitted = response.json()
+        assert submitted['status'] == QUEUED
+        assert response.headers['location'] == submitted['status_url']
+        assert submitted['status_url'] == '/game/%s/jobs/%s' % (game_id, submitted['job_id'])
+
+        job = _wait_for_job(client, submitted['status_url'])
+        assert job['status'] == COMPLETED, job['error']
+        assert job['kind'] == 'process'
+        assert job['result'] == {'phase': 'FALL 1901 MOVEMENT', 'status': 'active'}
+        assert job['started_at'] >= job['created_at'] and job['finished_at'] >= job['started_at']
+
+        # Processed game and metadata were saved
+        state = client.get('/game/%s/state' % game_id).json()
+        assert state['phase'] == 'F1901M'
+        assert 'A BUR' in state['units']['FRANCE']
+        assert client.get('/').status_code == 200
+
+        # HTML form posts are redirected to the game page
+        response = client.post('/game/%s/process' % game_id, follow_redirects=False)
+        assert response.status_code == 303
+        assert response.headers['location'] == '/game/%s' % game_id
+
+def test_job_errors(tmp_path, monkeypatch):
+    """ Tests the responses for unknown games and jobs, and for full job queues """
+    monkeypatch.setattr(main, 'storage', FileStorage(str(tmp_path)))
+    with TestClient(main.app) as client:
+        game_id = _create_game(client)
+        assert client.post('/game/unknown/process').status_code == 404
+        assert client.get('/game/%s/jobs/unknown' % game_id).status_code == 404
+
+        response = client.post('/game/%s/process' % game_id, headers={'Accept': 'application/json'})
+        job_url = response.json()['status_url']
+        assert client.get(job_url.replace(game_id, 'other')).status_code == 404
+        assert _wait_for_job(client, job_url)['status'] == COMPLETED
+
+        monkeypatch.setattr(job_manager, 'max_pending_per_game', 0)
+        response = client.post('/game/%s/process' % game_id, headers={'Accept': 'application/json'})
+        assert response.status_code == 429
+        assert 'Too many pending jobs' in response.json()['detail']
@@ -0,0 +1,687 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Game archives
+    - Compact binary format to store many saved games (from :meth:`diplomacy.utils.export.to_saved_game_format`).
+    - Requires optional package `msgpack`.
+
+    Layout of an archive file:
+
+    - ``MAGIC``
+    - For each game: a game header, followed by blocks of (at most ``block_size``) consecutive phases.
+    - An index (id, offset and header size of each game), followed by the offset of the index and ``MAGIC``.
+
+    Every string of a game (locations, units, orders, power names, ...) is stored once in the string table
+    of the game header, and referenced by its position everywhere else. In a block, each field of the phases
+    (e.g. ``orders`` or ``state.centers``) is stored in its own column, and dictionaries keyed by power names
+    are stored as the list of keys and the list of values. Blocks are compressed separately, so that a phase
+    can be read without decoding the rest of the game, and only the columns of requested fields are decoded.
+"""
+from collections import OrderedDict
+import struct
+import zlib
+import ujson as json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from diplomacy.utils import exceptions
+from diplomacy.utils.export import from_saved_game_format
+
+# Constants
+MAGIC = b'DIPARC01'
+TRAILER_STRUCT = struct.Struct('>Q')                # Offset of the index
+COMPRESSION_LEVEL = 6
+DEFAULT_BLOCK_SIZE = 8
+MAX_CACHED_HEADERS = 128
+
+# Kinds of fields. Fields not matching their expected kind are stored as is.
+STR = 's'                                           # A string
+STR_LIST = 'l'                                      # A list of strings
+RAW = 'r'                                           # Any value (stored as is)
+
+def _map_of(kind):
+    """ Kind of a dictionary with string keys, and values of the given kind """
+    return 'm', kind
+
+def _list_of(kind):
+    """ Kind of a list of values of the given kind """
+    return 'q', kind
+
+def _optional(kind):
+    """ Kind of a value that is either None or of the given kind """
+    return 'o', kind
+
+def _record(schema):
+    """ Kind of a dictionary with known fields. schema is a dictionary {field name: kind} """
+    return 'd', schema
+
+STATE_SCHEMA = {'game_id': STR,
+                'map': STR,
+                'rules': STR_LIST,
+                'name': STR,
+                'phase': STR,
+                'note': STR,
+                'zobrist_hash': STR,
+                'units': _map_of(STR_LIST),
+                'centers': _map_of(STR_LIST),
+                'homes': _map_of(STR_LIST),
+                'influence': _map_of(STR_LIST),
+                'retreats': _map_of(_map_of(STR_LIST)),
+                'civil_disorder': _map_of(RAW),
+                'builds': _map_of(_record({'count': RAW, 'homes': STR_LIST}))}
+MESSAGE_SCHEMA = {'sender': STR, 'recipient': STR, 'phase': STR}
+PHASE_SCHEMA = {'name': STR,
+                'state': _record(STATE_SCHEMA),
+                'orders': _map_of(_optional(STR_LIST)),
+                'results': _map_of(STR_LIST),
+                'messages': _list_of(_record(MESSAGE_SCHEMA)),
+                'summary': _optional(STR)}
+GAME_SCHEMA = {'id': STR, 'map': STR, 'rules': STR_LIST}
+
+def _check_msgpack():
+    """ Raises an error if msgpack is not installed """
+    if msgpack is None:
+        raise ImportError('Package msgpack is required to read or write game archives.')
+
+class _StringTable:
+    """ Assigns an index to each distinct string """
+    __slots__ = ['strings', 'indices']
+
+    def __init__(self):
+        """ Constructor """
+        self.strings = []
+        self.indices = {}
+
+    def intern(self, value):
+        """ Returns the index of the given string (adding it to the table if needed) """
+        index = self.indices.get(value)
+        if index is None:
+            index = self.indices[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+def _encode(value, kind, table):
+    """ Encodes a value of the given kind. Raises TypeError if value does not match the kind.
+
+        :param value: The value to encode
+        :param kind: The kind of the value (e.g. STR, STR_LIST, _map_of(STR_LIST), ...)
+        :param table: The string table of the game
+        :type table: _StringTable
+    """
+    # pylint: disable=too-many-return-statements
+    if kind == RAW:
+        return value
+    if kind == STR:
+        if not isinstance(value, str):
+            raise TypeError()
+        return table.intern(value)
+    if kind == STR_LIST:
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise TypeError()
+        return [table.intern(item) for item in value]
+    container, sub_kind = kind
+    if container == 'o':
+        return None if value is None else _encode(value, sub_kind, table)
+    if container == 'm':
+        if not isinstance(value, dict) or not all(isinstance(key, str) for key in value):
+            raise TypeError()
+        return [[table.intern(key) for key in value], [_encode(item, sub_kind, table) for item in value.values()]]
+    if container == 'q':
+        if not isinstance(value, list):
+            raise TypeError()
+        return [_encode(item, sub_kind, table) for item in value]
+    if container == 'd':
+        return _encode_record(value, sub_kind, table)
+    raise exceptions.DiplomacyException('Unknown kind %s' % str(kind))
+
+def _encode_record(record, schema, table):
+    """ Encodes a dictionary with known fields as a list [encoded fields, other fields].
+        Encoded fields are keyed by the index of the field name. Unknown fields, and fields not
+        matching their expected kind, are stored as is.
+
+        :param record: The dictionary to encode
+        :param schema: Dictionary {field name: kind}
+        :param table: The string table of the game
+    """
+    if not isinstance(record, dict):
+        raise TypeError()
+    encoded_fields, other_fields = {}, {}
+    for field_name, value in record.items():
+        if field_name in schema:
+            try:
+                encoded_fields[table.intern(field_name)] = _encode(value, schema[field_name], table)
+                continue
+            except TypeError:
+                pass
+        other_fields[field_name] = value
+    return [encoded_fields, other_fields]
+
+def _encode_columns(records, schema, table, columns, prefix=''):
+    """ Encodes a list of records (dictionaries with known fields) as columns.
+
+        Each field is stored in column ``{prefix}{field name}`` as ``[record indices, values]`` (record indices
+        being None if the field is set for all records). Fields that are records themselves (e.g. ``state``)
+        are split in sub-columns (e.g. ``state.units``). Unknown fields, and fields not matching their expected
+        kind, are stored as is in column ``{prefix}*``.
+
+        :param records: The list of records (None for a missing record)
+        :param schema: Dictionary {field name: kind}
+        :param table: The string table of the game
+        :param columns: The dictionary {column name: column} to update
+        :param prefix: The prefix of the column names
+    """
+    # pylint: disable=too-many-locals
+    fields, sub_records, other_fields = {}, {}, {}
+    for record_ix, record in enumerate(records):
+        if record is None:
+            continue
+        for field_name, value in record.items():
+            kind = schema.get(field_name)
+            if kind is not None and kind[0] == 'd' and isinstance(value, dict):
+                sub_records.setdefault(field_name, [None] * len(records))[record_ix] = value
+                fields.setdefault(field_name, ([], []))[0].append(record_ix)
+                continue
+            if kind is not None:
+                try:
+                    encoded = _encode(value, kind, table)
+                except TypeError:
+                    pass
+                else:
+                    record_indices, values = fields.setdefault(field_name, ([], []))
+                    record_indices.append(record_ix)
+                    values.append(encoded)
+                    continue
+            other_fields.setdefault(record_ix, {})[field_name] = value
+
+    for field_name, (record_indices, values) in fields.items():
+        is_complete = len(record_indices) == len(records)
+        columns[prefix + field_name] = [None if is_complete else record_indices, values]
+    for field_name, field_records in sub_records.items():
+        _encode_columns(field_records, schema[field_name][1], table, columns, prefix + field_name + '.')
+    if other_fields:
+        columns[prefix + '*'] = [list(other_fields), list(other_fields.values())]
+
+def _compile_decoder(kind):
+    """ Builds the function decoding values of the given kind (encoded with :meth:`_encode`)
+
+        :param kind: The kind of the values
+        :return: A function ``decode(value, strings)``
+    """
+    # pylint: disable=too-many-return-statements
+    if kind == RAW:
+        return lambda value, strings: value
+    if kind == STR:
+        return lambda value, strings: strings[value]
+    if kind == STR_LIST:
+        return lambda value, strings: [strings[index] for index in value]
+    container, sub_kind = kind
+    if container == 'o':
+        decode_item = _compile_decoder(sub_kind)
+        return lambda value, strings: None if value is None else decode_item(value, strings)
+    if container == 'm':
+        if sub_kind == STR_LIST:
+            return lambda value, strings: {strings[key]: [strings[index] for index in item]
+                                           for key, item in zip(*value)}
+        decode_item = _compile_decoder(sub_kind)
+        return lambda value, strings: {strings[key]: decode_item(item, strings) for key, item in zip(*value)}
+    if container == 'q':
+        decode_item = _compile_decoder(sub_kind)
+        return lambda value, strings: [decode_item(item, strings) for item in value]
+    if container == 'd':
+        return _compile_record_decoder(sub_kind)
+    raise exceptions.DiplomacyException('Unknown kind %s' % str(kind))
+
+def _compile_record_decoder(schema):
+    """ Builds the function decoding dictionaries encoded with :meth:`_encode_record` """
+    field_decoders = {field_name: _compile_decoder(kind) for field_name, kind in schema.items()}
+
+    def decode_record(value, strings):
+        """ Decodes a record """
+        encoded_fields, record = value
+        for field_index, field_value in encoded_fields.items():
+            field_name = strings[field_index]
+            record[field_name] = field_decoders[field_name](field_value, strings)
+        return record
+    return decode_record
+
+def _compile_column_decoders(schema, prefix='', decoders=None):
+    """ Builds the functions decoding the values of each column (see :meth:`_encode_columns`)
+
+        :return: A dictionary {prefix: list of (field name, column name, decode function)} with the columns
+            of the record stored with each prefix. The decode function of records is None.
+    """
+    decoders = {} if decoders is None else decoders
+    decoders[prefix] = []
+    for field_name, kind in schema.items():
+        if kind[0] == 'd':
+            decoders[prefix].append((field_name, prefix + field_name, None))
+            _compile_column_decoders(kind[1], prefix + field_name + '.', decoders)
+        else:
+            decoders[prefix].append((field_name, prefix + field_name, _compile_decoder(kind)))
+    return decoders
+
+PHASE_COLUMN_DECODERS = _compile_column_decoders(PHASE_SCHEMA)
+DECODE_GAME = _compile_record_decoder(GAME_SCHEMA)
+
+def _get_selection(fields):
+    """ Converts a list of (dotted) field names (e.g. ['name', 'state.centers']) to a selection
+
+        :param fields: A list of field names, or None to select all fields
+        :return: A dictionary {field name: selection of field}, or None to select all fields
+    """
+    if fields is None:
+        return None
+    selection = {}
+    for field in fields:
+        field_name, _, sub_field = field.partition('.')
+        if sub_field and (field_name not in selection or selection[field_name] is not None):
+            selection[field_name] = selection.get(field_name) or []
+            selection[field_name].append(sub_field)
+        else:
+            selection[field_name] = None
+    return {field_name: _get_selection(sub_fields) for field_name, sub_fields in selection.items()}
+
+class _Block:
+    """ A decompressed block of phases. Columns are only decoded when needed. """
+    __slots__ = ['packed_columns', 'columns', 'strings']
+
+    def __init__(self, packed_columns, strings):
+        """ Constructor
+
+            :param packed_columns: Dictionary {column name: column encoded with msgpack}
+            :param strings: The list of strings of the game
+        """
+        self.packed_columns = packed_columns
+        self.columns = {}                               # {column name: (record positions or None, values)}
+        self.strings = strings
+
+    def get_column(self, column_name):
+        """ Returns a decoded column as a tuple (record positions, values), or None if column does not exist.
+            Record positions is a dictionary {record index: position in values}, or None if all records are set.
+        """
+        if column_name not in self.columns:
+            packed_column = self.packed_columns.get(column_name)
+            if packed_column is None:
+                self.columns[column_name] = None
+            else:
+                record_indices, values = msgpack.unpackb(packed_column, raw=False, strict_map_key=False)
+                positions = None
+                if record_indices is not None:
+                    positions = {record_ix: position for position, record_ix in enumerate(record_indices)}
+                self.columns[column_name] = (positions, values)
+        return self.columns[column_name]
+
+    def get_record(self, record_ix, selection=None, prefix=''):
+        """ Rebuilds a record (e.g. a phase) from the columns of the block
+
+            :param record_ix: The index of the record in the block
+            :param selection: Optional. The fields to rebuild (see :meth:`_get_selection`). None for all fields.
+            :param prefix: The prefix of the column names of the record
+        """
+        record = {}
+        for field_name, column_name, decode in PHASE_COLUMN_DECODERS[prefix]:
+            if selection is not None and field_name not in selection:
+                continue
+            column = self.get_column(column_name)
+            if column is None:
+                continue
+            positions, values = column
+            if positions is not None and record_ix not in positions:
+                continue
+            if decode is None:
+                sub_selection = selection[field_name] if selection is not None else None
+                record[field_name] = self.get_record(record_ix, sub_selection, column_name + '.')
+            else:
+                record[field_name] = decode(values[record_ix if positions is None else positions[record_ix]],
+                                            self.strings)
+
+        # Other fields
+        column = self.get_column(prefix + '*')
+        if column is not None and record_ix in column[0]:
+            for field_name, value in column[1][column[0][record_ix]].items():
+                if selection is None or field_name in selection:
+                    record[field_name] = value
+        return record
+
+def _get_phase_summaries(phases):
+    """ Returns the phase summaries of a game (i.e. {phase name: summary}) as saved by lm_game.py """
+    return {phase['name']: phase['summary'] for phase in phases
+            if isinstance(phase, dict) and phase.get('summary') is not None and 'name' in phase}
+
+def _pack(value, compress):
+    """ Encodes a value with msgpack, and optionally compresses it """
+    blob = msgpack.packb(value, use_bin_type=True)
+    return zlib.compress(blob, COMPRESSION_LEVEL) if compress else blob
+
+def _encode_game(saved_game, compress, block_size):
+    """ Encodes a saved game.
+
+        :param saved_game: The saved game (from to_saved_game_format)
+        :param compress: Boolean. Indicates to compress the header and the blocks of phases.
+        :param block_size: The number of phases per block.
+        :return: The game header (bytes) and the list of blocks of phases (bytes)
+    """
+    table = _StringTable()
+    phases = saved_game.get('phases', [])
+    game_fields = {key: value for key, value in saved_game.items() if key != 'phases'}
+
+    # Top-level phase summaries are a copy of the summary of each phase. Rebuilt when reading.
+    has_phase_summaries = ('phase_summaries' in game_fields
+                           and game_fields['phase_summaries'] == _get_phase_summaries(phases))
+    if has_phase_summaries:
+        del game_fields['phase_summaries']
+
+    blocks = []
+    for block_start in range(0, len(phases), block_size):
+        columns = {}
+        _encode_columns(phases[block_start:block_start + block_size], PHASE_SCHEMA, table, columns)
+        blocks.append(_pack({column_name: msgpack.packb(column, use_bin_type=True)
+                             for column_name, column in columns.items()}, compress))
+    phase_names = [phase.get('name') if isinstance(phase, dict) else None for phase in phases]
+
+    header = {'game': _encode_record(game_fields, GAME_SCHEMA, table),
+              'phase_names': [phase_name if isinstance(phase_name, str) else None for phase_name in phase_names],
+              'block_size': block_size,
+              'block_sizes': [len(block) for block in blocks],
+              'phase_summaries': has_phase_summaries,
+              'strings': table.strings}
+    return _pack(header, compress), blocks
+
+def encode_game(saved_game, compress=True, block_size=DEFAULT_BLOCK_SIZE):
+    """ Encodes a saved game, to be written later with :meth:`ArchiveWriter.write_encoded`
+        (e.g. to encode games in worker processes, and write them in the main process)
+
+        :param saved_game: The saved game (from :meth:`diplomacy.utils.export.to_saved_game_format`)
+        :param compress: Optional. Indicates to compress the game. See :meth:`write_archive`.
+        :param block_size: Optional. The number of consecutive phases compressed together.
+        :return: The encoded game, i.e. a tuple (game id, compressed, header, list of blocks)
+    """
+    _check_msgpack()
+    header, blocks = _encode_game(saved_game, compress, block_size)
+    return saved_game.get('id', None), compress, header, blocks
+
+class ArchiveWriter:
+    """ Writes games one at a time to an archive file. The index is written when the writer is closed.
+
+        Usage::
+
+            with ArchiveWriter(output_path) as writer:
+                for saved_game in saved_games:
+                    writer.write(saved_game)
+    """
+    __slots__ = ['file', 'compress', 'block_size', 'games_index']
+
+    def __init__(self, output_path, compress=True, block_size=DEFAULT_BLOCK_SIZE):
+        """ Constructor
+
+            :param output_path: The path of the archive file to write
+            :param compress: Optional. Indicates to compress the games. See :meth:`write_archive`.
+            :param block_size: Optional. The number of consecutive phases compressed together.
+        """
+        _check_msgpack()
+        self.compress = compress
+        self.block_size = block_size
+        self.games_index = []
+        self.file = open(output_path, 'wb')
+        self.file.write(MAGIC)
+
+    def __enter__(self):
+        """ Enter the runtime context """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """ Exit the runtime context. Games written so far are kept. """
+        self.close()
+
+    def __len__(self):
+        """ Returns the number of games written """
+        return len(self.games_index)
+
+    def write(self, saved_game):
+        """ Writes a saved game (from :meth:`diplomacy.utils.export.to_saved_game_format`) """
+        self.write_encoded(encode_game(saved_game, self.compress, self.block_size))
+
+    def write_encoded(self, encoded_game):
+        """ Writes a game encoded with :meth:`encode_game` """
+        game_id, compressed, header, blocks = encoded_game
+        if compressed != self.compress:
+            raise exceptions.DiplomacyException('Game %s was not encoded with compress=%s.' % (game_id, self.compress))
+        self.games_index.append([game_id, self.file.tell(), len(header)])
+        self.file.write(header)
+        for block in blocks:
+            self.file.write(block)
+
+    def close(self):
+        """ Writes the index and closes the archive file """
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(_pack({'games': self.games_index, 'compressed': self.compress}, False))
+        self.file.write(TRAILER_STRUCT.pack(index_offset))
+        self.file.write(MAGIC)
+        self.file.close()
+
+def write_archive(saved_games, output_path, compress=True, block_size=DEFAULT_BLOCK_SIZE):
+    """ Writes saved games to an archive file
+
+        :param saved_games: An iterable of saved games (from :meth:`diplomacy.utils.export.to_saved_game_format`)
+        :param output_path: The path of the archive file to write
+        :param compress: Optional. Indicates to compress game headers and blocks of phases (with zlib).
+        :param block_size: Optional. The number of consecutive phases compressed together. Larger blocks
+            are smaller on disk, but more phases need to be decompressed to read a single phase.
+        :type output_path: str
+        :type compress: bool, optional
+        :type block_size: int, optional
+        :return: The number of games written
+    """
+    with ArchiveWriter(output_path, compress=compress, block_size=block_size) as writer:
+        for saved_game in saved_games:
+            writer.write(saved_game)
+    return len(writer)
+
+def convert_saved_games_to_archive(input_path, output_path, compress=True, block_size=DEFAULT_BLOCK_SIZE):
+    """ Converts a .jsonl file (one saved game per line) to an archive file
+
+        :param input_path: The path to the input file. Expected content is one saved_game json per line.
+        :param output_path: The path of the archive file to write
+        :param compress: Optional. Indicates to compress the archive. See :meth:`write_archive`.
+        :param block_size: Optional. The number of consecutive phases compressed together.
+        :return: The number of games written
+    """
+    with open(input_path, 'r') as file:
+        return write_archive((json.loads(line) for line in file if line.strip()),
+                             output_path,
+                             compress=compress,
+                             block_size=block_size)
+
+class _GameHeader:
+    """ Decoded game header, with the absolute offset of each block of phases """
+    __slots__ = ['fields', 'phase_names', 'block_size', 'block_offsets', 'block_sizes', 'phase_summaries', 'strings']
+
+    def __init__(self, header, offset):
+        """ Constructor
+
+            :param header: The decoded header (dictionary)
+            :param offset: The absolute offset of the first block of phases
+        """
+        self.strings = header['strings']
+        self.fields = DECODE_GAME(header['game'], self.strings)
+        self.phase_names = header['phase_names']
+        self.block_size = header['block_size']
+        self.block_sizes = header['block_sizes']
+        self.block_offsets = []
+        for size in self.block_sizes:
+            self.block_offsets.append(offset)
+            offset += size
+        self.phase_summaries = header['phase_summaries']
+
+class ArchiveReader:
+    """ Reads games (or a single phase of a game) from an archive file written with :meth:`write_archive`
+
+        Example:
+
+        .. code-block:: python
+
+            with ArchiveReader('games.dat') as reader:
+                game = reader.get_game(0)
+                phase = reader.get_phase(0, 'F1901M', fields=['name', 'state.centers'])
+    """
+    __slots__ = ['file', 'compressed', 'game_ids', 'game_offsets', 'header_sizes', 'headers', 'last_block']
+
+    def __init__(self, input_path):
+        """ Constructor
+
+            :param input_path: The path of the archive file
+            :type input_path: str
+        """
+        _check_msgpack()
+        self.file = open(input_path, 'rb')
+        self.headers = OrderedDict()                    # {game index: _GameHeader}
+        self.last_block = (None, None, None)            # (game index, block index, _Block)
+
+        # Reading index
+        trailer_size = TRAILER_STRUCT.size + len(MAGIC)
+        if self.file.read(len(MAGIC)) != MAGIC:
+            self.close()
+            raise exceptions.DiplomacyException('File %s is not a game archive.' % input_path)
+        self.file.seek(-trailer_size, 2)
+        index_offset, = TRAILER_STRUCT.unpack(self.file.read(TRAILER_STRUCT.size))
+        index_size = self.file.seek(0, 2) - trailer_size - index_offset
+        index = self._read(index_offset, index_size, False)
+        self.compressed = index['compressed']
+        self.game_ids = [game_id for game_id, _, _ in index['games']]
+        self.game_offsets = [offset for _, offset, _ in index['games']]
+        self.header_sizes = [size for _, _, size in index['games']]
+
+    def __enter__(self):
+        """ Enter the context """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """ Exit the context """
+        self.close()
+
+    def __len__(self):
+        """ Returns the number of games """
+        return len(self.game_ids)
+
+    def close(self):
+        """ Closes the archive file """
+        self.file.close()
+
+    def _read(self, offset, size, compressed):
+        """ Reads and decodes a msgpack blob """
+        self.file.seek(offset)
+        blob = self.file.read(size)
+        if compressed:
+            blob = zlib.decompress(blob)
+        return msgpack.unpackb(blob, raw=False, strict_map_key=False)
+
+    def _get_header(self, game_ix):
+        """ Returns the (cached) header of a game """
+        if game_ix in self.headers:
+            self.headers.move_to_end(game_ix)
+        else:
+            offset, size = self.game_offsets[game_ix], self.header_sizes[game_ix]
+            self.headers[game_ix] = _GameHeader(self._read(offset, size, self.compressed), offset + size)
+            while len(self.headers) > MAX_CACHED_HEADERS:
+                self.headers.popitem(last=False)
+        return self.headers[game_ix]
+
+    def _get_block(self, game_ix, block_ix):
+        """ Returns a block of phases. The last block read is cached, so reading consecutive phases
+            only decompresses each block once.
+        """
+        if self.last_block[:2] != (game_ix, block_ix):
+            header = self._get_header(game_ix)
+            packed_columns = self._read(header.block_offsets[block_ix], header.block_sizes[block_ix], self.compressed)
+            self.last_block = (game_ix, block_ix, _Block(packed_columns, header.strings))
+        return self.last_block[2]
+
+    def _get_phase(self, game_ix, phase_ix, selection):
+        """ Rebuilds the selected fields of a phase """
+        block_size = self._get_header(game_ix).block_size
+        return self._get_block(game_ix, phase_ix // block_size).get_record(phase_ix % block_size, selection)
+
+    def get_phase_names(self, game_ix):
+        """ Returns the list of phase names of a game
+
+            :param game_ix: The index of the game in the archive
+            :type game_ix: int
+        """
+        return list(self._get_header(game_ix).phase_names)
+
+    def get_phase(self, game_ix, phase, fields=None):
+        """ Reads a single phase of a game, without decoding the other phases
+
+            :param game_ix: The index of the game in the archive
+            :param phase: The index of the phase in the game (negative to count from the end),
+                or the phase name (e.g. 'S1901M')
+            :param fields: Optional. The list of fields to read (e.g. ['name', 'orders', 'state.centers']).
+                Defaults to all fields.
+            :type game_ix: int
+            :type phase: int | str
+            :type fields: List[str] | None, optional
+            :return: The phase, in the format of the phases of a saved game (dictionary)
+        """
+        header = self._get_header(game_ix)
+        nb_phases = len(header.phase_names)
+        phase_ix = header.phase_names.index(phase) if isinstance(phase, str) else phase
+        if not -nb_phases <= phase_ix < nb_phases:
+            raise IndexError('Game %d has %d phase(s).' % (game_ix, nb_phases))
+        return self._get_phase(game_ix, phase_ix % nb_phases, _get_selection(fields))
+
+    def iter_phases(self, game_ix, fields=None):
+        """ Generates the phases of a game (dictionaries), one at a time
+
+            :param game_ix: The index of the game in the archive
+            :param fields: Optional. The list of fields to read. See :meth:`get_phase`.
+        """
+        header = self._get_header(game_ix)
+        selection = _get_selection(fields)
+        for phase_ix in range(len(header.phase_names)):
+            yield self._get_phase(game_ix, phase_ix, selection)
+
+    def get_saved_game(self, game_ix):
+        """ Reads a complete game
+
+            :param game_ix: The index of the game in the archive
+            :type game_ix: int
+            :return: The saved game, as returned by :meth:`diplomacy.utils.export.to_saved_game_format`
+        """
+        header = self._get_header(game_ix)
+        saved_game = dict(header.fields)
+        saved_game['phases'] = list(self.iter_phases(game_ix))
+        if header.phase_summaries:
+            saved_game['phase_summaries'] = _get_phase_summaries(saved_game['phases'])
+        return saved_game
+
+    def get_game(self, game_ix):
+        """ Reads a complete game and rebuilds it
+
+            :param game_ix: The index of the game in the archive
+            :type game_ix: int
+            :rtype: diplomacy.engine.game.Game
+        """
+        return from_saved_game_format(self.get_saved_game(game_ix))
+
+    def iter_saved_games(self):
+        """ Generates all saved games of the archive, one at a time """
+        for game_ix in range(len(self)):
+            yield self.get_saved_game(game_ix)
@@ -59,14 +59,15 @@ def is_valid_password(password, hashed):
     """
     return bcrypt.checkpw(_sub_hash_password(password), hashed.encode('utf-8'))
 
-def hash_password(password):
+def hash_password(password, rounds=14):
     """ Hash password. Accepts password longer than 72 characters. Public method.
 
         :param password: The password to hash
+        :param rounds: (optional) bcrypt cost factor (log2 of hashing rounds, from 4 to 31).
         :return: The hashed password.
         :rtype: str
     """
-    return bcrypt.hashpw(_sub_hash_password(password), bcrypt.gensalt(14)).decode('utf-8')
+    return bcrypt.hashpw(_sub_hash_password(password), bcrypt.gensalt(rounds)).decode('utf-8')
 
 def generate_token(n_bytes=128):
     """ Generate a token with 2 * n_bytes characters (n_bytes bytes encoded in hexadecimal). """
@@ -207,6 +208,48 @@ def str_cmp_class(compare_function):
     StringComparator.__name__ = 'StringComparator%s' % (id(compare_function))
     return StringComparator
 
+class OrdinalString(str):
+    """ A string sorted by an integer ordinal (e.g. a phase name sorted by phase order) instead of alphabetically.
+        The ordinal is computed once, so comparisons between ordinal strings are integer comparisons.
+        Equality and hash are those of the string, so ordinal strings can be looked up in dicts with plain strings.
+        Ordering with other strings falls back to alphabetical order.
+    """
+
+    def __new__(cls, value, ordinal):
+        """ Create an ordinal string.
+
+            :param value: the string
+            :param ordinal: the integer used to sort the string
+            :type value: str
+            :type ordinal: int
+        """
+        instance = str.__new__(cls, value)
+        instance.ordinal = ordinal
+        return instance
+
+    def __getnewargs__(self):
+        return str(self), self.ordinal
+
+    def __lt__(self, other):
+        if not isinstance(other, OrdinalString):
+            return NotImplemented
+        return self.ordinal < other.ordinal
+
+    def __le__(self, other):
+        if not isinstance(other, OrdinalString):
+            return NotImplemented
+        return self.ordinal <= other.ordinal
+
+    def __gt__(self, other):
+        if not isinstance(other, OrdinalString):
+            return NotImplemented
+        return self.ordinal > other.ordinal
+
+    def __ge__(self, other):
+        if not isinstance(other, OrdinalString):
+            return NotImplemented
+        return self.ordinal >= other.ordinal
+
 def to_string(element):
     """ Convert element to a string and make sure string is wrapped in either simple quotes
         (if contains double quotes) or double quotes (if contains simple quotes).
@@ -31,6 +31,10 @@ DEFAULT_PING_SECONDS = 30
 # Time to wait to receive a response for a request sent to server.
 REQUEST_TIMEOUT_SECONDS = 30
 
+# Maximum number of responses received for unknown requests that a client connection keeps
+# while waiting for the matching request to be registered.
+MAX_PENDING_RESPONSES = 256
+
 # Default host name for a server to connect to.
 DEFAULT_HOST = 'localhost'
 
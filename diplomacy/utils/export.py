@@ -16,7 +16,10 @@
 # ==============================================================================
 """ Exporter
     - Responsible for exporting games in a standardized format to disk
+    - Saved games can be loaded back lazily (one game at a time), optionally across a process pool.
 """
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import logging
 import os
 import ujson as json
@@ -29,6 +32,7 @@ from diplomacy.utils.sorted_dict import SortedDict
 # Constants
 LOGGER = logging.getLogger(__name__)
 RULES_TO_SKIP = ['SOLITAIRE', 'NO_DEADLINE', 'CD_DUMMIES', 'ALWAYS_WAIT', 'IGNORE_ERRORS']
+DEFAULT_CHUNK_SIZE = 16                         # Nb of lines sent to a worker process at once
 
 def to_saved_game_format(game, output_path=None, output_mode='a'):
     """ Converts a game to a standardized JSON format
@@ -77,54 +81,199 @@ def from_saved_game_format(saved_game):
         :rtype: diplomacy.engine.game.Game
         :return: The game object restored from the saved game
     """
-    game_id = saved_game.get('id', None)
-    kwargs = {strings.MAP_NAME: saved_game.get('map', 'standard'),
-              strings.RULES: saved_game.get('rules', [])}
+    return _build_game(saved_game.get('id', None),
+                       saved_game.get('map', 'standard'),
+                       saved_game.get('rules', []),
+                       to_phase_data_list(saved_game))
 
-    # Building game
-    game = Game(game_id=game_id, **kwargs)
-    phase_history = []
+def to_phase_data_list(saved_game):
+    """ Converts the phases of a saved game to a list of :class:`GamePhaseData`, without building a game.
+        The game id, map and rules are also available in the state of each phase.
 
-    # Restoring every phase
-    for phase_dct in saved_game.get('phases', []):
-        phase_history.append(GamePhaseData.from_dict(phase_dct))
-    game.set_phase_data(phase_history, clear_history=True)
+        :param saved_game: The saved game exported from :meth:`to_saved_game_format`
+        :type saved_game: Dict
+        :rtype: List[diplomacy.utils.game_phase_data.GamePhaseData]
+    """
+    return [GamePhaseData.from_dict(phase_dct) for phase_dct in saved_game.get('phases', [])]
+
+def _build_game(game_id, map_name, rules, phase_history):
+    """ Builds a game and restores its phases
 
-    # Returning game
+        :param game_id: The game id
+        :param map_name: The name of the map
+        :param rules: The list of game rules
+        :param phase_history: The list of GamePhaseData of the game (last one is the current phase)
+        :rtype: diplomacy.engine.game.Game
+    """
+    kwargs = {strings.MAP_NAME: map_name, strings.RULES: rules}
+    game = Game(game_id=game_id, **kwargs)
+    game.set_phase_data(phase_history, clear_history=True)
     return game
 
-def load_saved_games_from_disk(input_path, on_error='raise'):
-    """ Rebuids multiple :class:`diplomacy.engine.game.Game` from each line in a .jsonl file
+def _load_line(line, phases_only):
+    """ Parses a saved game line and returns either the game or its list of phases
+
+        :param line: A line from a .jsonl file (i.e. a json-encoded saved game)
+        :param phases_only: Boolean. If True, returns the list of GamePhaseData instead of a game.
+        :return: The game, or its list of GamePhaseData
+    """
+    saved_game = json.loads(line)
+    if phases_only:
+        return to_phase_data_list(saved_game)
+    return from_saved_game_format(saved_game)
+
+def _load_chunk(lines):
+    """ Parses a chunk of saved game lines. Executed in worker processes.
+
+        Games are expensive to pickle (their map is pickled with them), so workers parse the json and build the
+        GamePhaseData objects, and the game itself (if requested) is built from those phases in the main process
+        (see :meth:`_hydrate`).
+
+        :param lines: A list of lines from a .jsonl file
+        :return: A list with, for each line, a tuple (game_id, map_name, rules, phase_history, error)
+    """
+    results = []
+    for line in lines:
+        try:
+            saved_game = json.loads(line)
+            results.append((saved_game.get('id', None),
+                            saved_game.get('map', 'standard'),
+                            saved_game.get('rules', []),
+                            to_phase_data_list(saved_game),
+                            None))
+        except Exception as exc:                        # pylint: disable=broad-except
+            results.append((None, None, None, None, exc))
+    return results
+
+def _hydrate(results, phases_only, on_error):
+    """ Generates the games (or lists of phases) from results returned by a worker (see :meth:`_load_chunk`) """
+    for game_id, map_name, rules, phase_history, error in results:
+        try:
+            if error is not None:
+                raise error
+            yield phase_history if phases_only else _build_game(game_id, map_name, rules, phase_history)
+        except Exception as exc:                        # pylint: disable=broad-except
+            _handle_error(exc, on_error)
+
+def _handle_error(exc, on_error):
+    """ Raises or logs an error that occurred while loading a game, depending on on_error """
+    if on_error == 'raise':
+        raise exc
+    if on_error == 'warn':
+        LOGGER.warning(exc)
+
+def _read_chunks(file, chunk_size):
+    """ Generates lists of (at most chunk_size) non-empty lines from an opened file """
+    chunk = []
+    for line in file:
+        line = line.rstrip('\n')
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_saved_games_from_disk(input_path, on_error='raise', phases_only=False, nb_workers=0, ordered=True,
+                               chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Lazily rebuilds :class:`diplomacy.engine.game.Game` objects from each line in a .jsonl file.
+        Only the games being parsed (at most a few chunks per worker) are kept in memory.
 
         :param input_path: The path to the input file. Expected content is one saved_game json per line.
         :param on_error: Optional. What to do if a game conversion fails. Either 'raise', 'warn', 'ignore'
+        :param phases_only: Optional. If True, yields for each game its list of
+            :class:`diplomacy.utils.game_phase_data.GamePhaseData` instead of building a game.
+        :param nb_workers: Optional. Number of worker processes parsing lines. 0 or 1 to parse in the current
+            process, None to use all CPUs.
+        :param ordered: Optional. With worker processes, indicates to yield games in the order of the file.
+            If False, games are yielded as soon as they are parsed.
+        :param chunk_size: Optional. With worker processes, the number of lines sent to a worker at once.
         :type input_path: str
-        :rtype: List[diplomacy.Game]
-        :return: A list of :class:`diplomacy.engine.game.Game` objects.
+        :type on_error: str, optional
+        :type phases_only: bool, optional
+        :type nb_workers: int | None, optional
+        :type ordered: bool, optional
+        :type chunk_size: int, optional
+        :return: A generator of :class:`diplomacy.engine.game.Game` objects (or lists of GamePhaseData).
     """
-    loaded_games = []
     assert on_error in ('raise', 'warn', 'ignore'), 'Expected values for on_error are "raise", "warn", "ignore".'
 
     # File does not exist
     if not os.path.exists(input_path):
         LOGGER.warning('File %s does not exist. Aborting.', input_path)
-        return loaded_games
+        return
 
-    # Importing each game
     with open(input_path, 'r') as file:
-        for line in file:
-            try:
-                saved_game = json.loads(line.rstrip('\n'))
-                game = from_saved_game_format(saved_game)
-                loaded_games.append(game)
-            except Exception as exc:                    # pylint: disable=broad-except
-                if on_error == 'raise':
-                    raise exc
-                if on_error == 'warn':
-                    LOGGER.warning(exc)
-
-    # Returning
-    return loaded_games
+
+        # Importing each game in current process
+        if nb_workers is not None and nb_workers <= 1:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    loaded = _load_line(line.rstrip('\n'), phases_only)
+                except Exception as exc:                # pylint: disable=broad-except
+                    _handle_error(exc, on_error)
+                    continue
+                yield loaded
+            return
+
+        # Importing games across a process pool, with a bounded number of chunks in flight.
+        nb_workers = nb_workers or os.cpu_count() or 1
+        max_pending = 2 * nb_workers
+        chunks = _read_chunks(file, chunk_size)
+        executor = ProcessPoolExecutor(max_workers=nb_workers)
+        pending = deque() if ordered else set()
+        try:
+            while True:
+                while len(pending) < max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    future = executor.submit(_load_chunk, chunk)
+                    if ordered:
+                        pending.append(future)
+                    else:
+                        pending.add(future)
+                if not pending:
+                    break
+
+                # Ordered - Waiting for the oldest chunk / Unordered - Waiting for any chunk
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _hydrate(future.result(), phases_only, on_error)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+def load_saved_games_from_disk(input_path, on_error='raise', phases_only=False, nb_workers=0, ordered=True):
+    """ Rebuids multiple :class:`diplomacy.engine.game.Game` from each line in a .jsonl file
+        To avoid keeping all games in memory, use :meth:`iter_saved_games_from_disk` instead.
+
+        :param input_path: The path to the input file. Expected content is one saved_game json per line.
+        :param on_error: Optional. What to do if a game conversion fails. Either 'raise', 'warn', 'ignore'
+        :param phases_only: Optional. If True, returns for each game its list of GamePhaseData instead of a game.
+        :param nb_workers: Optional. Number of worker processes. 0 or 1 to load serially, None to use all CPUs.
+        :param ordered: Optional. With worker processes, indicates to return games in the order of the file.
+        :type input_path: str
+        :type on_error: str, optional
+        :type phases_only: bool, optional
+        :type nb_workers: int | None, optional
+        :type ordered: bool, optional
+        :rtype: List[diplomacy.Game]
+        :return: A list of :class:`diplomacy.engine.game.Game` objects.
+    """
+    return list(iter_saved_games_from_disk(input_path,
+                                           on_error=on_error,
+                                           phases_only=phases_only,
+                                           nb_workers=nb_workers,
+                                           ordered=ordered))
 
 def is_valid_saved_game(saved_game):
     """ Checks if the saved game is valid.
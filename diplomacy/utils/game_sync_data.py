@@ -0,0 +1,59 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Utility class to save changes of a game since a client game state, for incremental synchronization. """
+from diplomacy.utils import strings, parsing
+from diplomacy.utils.game_phase_data import GamePhaseData, MESSAGES_TYPE
+from diplomacy.utils.jsonable import Jsonable
+
+class GameSyncData(Jsonable):
+    """ Small class to represent what changed in a game since a client last known game state
+        (client phase, timestamp and zobrist hash):
+
+        - **phase**: current game short phase.
+        - **timestamp**: latest timestamp when data was saved into game.
+        - **clear_history**: if True, client phase was unknown, so client must replace its game history
+          with given phases.
+        - **phases**: list of GamePhaseData to add to client game history, in phase order.
+        - **state**: current game state, or None if client game state is already up to date.
+        - **orders**: current orders of powers visible for client game role
+          (None for a power that did not set orders).
+        - **messages**: current phase messages visible for client game role: messages sent after client
+          timestamp if client is already in current phase, else all current phase messages.
+    """
+    __slots__ = ['phase', 'timestamp', 'clear_history', 'phases', 'state', 'orders', 'messages']
+
+    model = {
+        strings.PHASE: str,
+        strings.TIMESTAMP: int,
+        strings.CLEAR_HISTORY: parsing.DefaultValueType(bool, False),
+        strings.PHASES: parsing.DefaultValueType(parsing.SequenceType(parsing.JsonableClassType(GamePhaseData)), []),
+        strings.STATE: parsing.OptionalValueType(dict),
+        strings.ORDERS: parsing.DefaultValueType(parsing.DictType(str, parsing.OptionalValueType(
+            parsing.SequenceType(str))), {}),
+        strings.MESSAGES: parsing.DefaultValueType(MESSAGES_TYPE, []),
+    }
+
+    def __init__(self, **kwargs):
+        """ Constructor. """
+        self.phase = None
+        self.timestamp = None
+        self.clear_history = None
+        self.phases = None
+        self.state = None
+        self.orders = None
+        self.messages = None
+        super(GameSyncData, self).__init__(**kwargs)
@@ -41,6 +41,7 @@
                 # You can then do any further initialization if needed.
 
 """
+import contextvars
 import logging
 import ujson as json
 
@@ -48,10 +49,14 @@ from diplomacy.utils import exceptions, parsing
 
 LOGGER = logging.getLogger(__name__)
 
+# Instance currently built by Jsonable.from_trusted_dict(), if any.
+_TRUSTED_INSTANCE = contextvars.ContextVar('trusted_jsonable_instance', default=None)
+
 class Jsonable:
     """ Abstract class to ease conversion from/to JSON dict. """
     __slots__ = []
     __cached__models__ = {}
+    __cached__functions__ = {}
     model = {}
 
     def __init__(self, **kwargs):
@@ -65,6 +70,15 @@ class Jsonable:
         """
         model = self.get_model()
 
+        # Values built by from_trusted_dict() are already converted. Only missing keys need default values.
+        if self.is_trusted_init():
+            for model_key, model_type in model.items():
+                if model_key in kwargs:
+                    setattr(self, model_key, kwargs[model_key])
+                else:
+                    setattr(self, model_key, parsing.get_type(model_type).update(None))
+            return
+
         # Adding default value
         updated_kwargs = {model_key: None for model_key in model}
         updated_kwargs.update(kwargs)
@@ -93,8 +107,11 @@ class Jsonable:
 
             :return: dict
         """
-        model = self.get_model()
-        return {key: parsing.to_json(getattr(self, key), key_type) for key, key_type in model.items()}
+        json_dict = {}
+        for key, to_json in self.get_model_functions()[1]:
+            value = getattr(self, key)
+            json_dict[key] = value if to_json is None else to_json(value)
+        return json_dict
 
     @classmethod
     def update_json_dict(cls, json_dict):
@@ -131,6 +148,36 @@ class Jsonable:
         kwargs = {key: parsing.to_type(default_json_dict[key], key_type) for key, key_type in model.items()}
         return cls(**kwargs)
 
+    @classmethod
+    def from_trusted_dict(cls, json_dict):
+        """ Fast version of from_dict() for JSON dictionaries we generated ourselves (e.g. with to_dict()).
+            Values are converted with functions precompiled once per class, and are neither validated
+            nor updated again when building the object. Use from_dict() for any data received from outside.
+
+            :param json_dict: a JSON dictionary to parse, as returned by to_dict().
+            :return: an instance from this class or from a derived one from which it's called.
+            :rtype: cls
+        """
+        cls.update_json_dict(json_dict)
+        kwargs = {}
+        for key, to_type in cls.get_model_functions()[0]:
+            value = json_dict.get(key, None)
+            kwargs[key] = value if to_type is None else to_type(value)
+
+        instance = cls.__new__(cls)
+        token = _TRUSTED_INSTANCE.set(instance)
+        try:
+            instance.__init__(**kwargs)
+        finally:
+            _TRUSTED_INSTANCE.reset(token)
+        return instance
+
+    def is_trusted_init(self):
+        """ Return True if this object is currently being initialized by from_trusted_dict().
+            Derived classes can check it in __init__() to skip checks on trusted data.
+        """
+        return _TRUSTED_INSTANCE.get() is self
+
     @classmethod
     def build_model(cls):
         """ Return model associated to current class. You can either define model class field
@@ -148,3 +195,18 @@ class Jsonable:
         if cls not in cls.__cached__models__:
             cls.__cached__models__[cls] = cls.build_model()
         return cls.__cached__models__[cls]
+
+    @classmethod
+    def get_model_functions(cls):
+        """ Return functions to convert each model attribute from and to JSON, compiled once
+            from class model and cached (see ParserType.get_to_type_function() and get_to_json_function()).
+
+            :return: a couple (to_type functions, to_json functions). Each one is a list of couples
+                (model key, function), where function is None if value does not need to be converted.
+        """
+        if cls not in cls.__cached__functions__:
+            model = cls.get_model()
+            cls.__cached__functions__[cls] = (
+                [(key, parsing.get_type(key_type).get_to_type_function()) for key, key_type in model.items()],
+                [(key, parsing.get_type(key_type).get_to_json_function()) for key, key_type in model.items()])
+        return cls.__cached__functions__[cls]
@@ -38,6 +38,10 @@ from diplomacy.utils.common import assert_no_common_keys, is_dictionary, is_sequ
 
 LOGGER = logging.getLogger(__name__)
 
+def _identity(value):
+    """ Default sequence and dict builder: return given value unchanged. """
+    return value
+
 # -----------------------------------------------------
 # ------------          Functions       ---------------
 # -----------------------------------------------------
@@ -189,6 +193,24 @@ class ParserType(metaclass=ABCMeta):
         # pylint: disable=no-self-use
         return raw_value
 
+    def get_to_type_function(self):
+        """ Return a function equivalent to to_type(), specialized once for this parser type,
+            or None if to_type() returns JSON values unchanged.
+            Returned function does not validate values (e.g. enumeration values), so it must
+            only be used on trusted JSON data (e.g. data generated with to_json()).
+
+            :return: callable or None
+        """
+        return None if type(self).to_type is ParserType.to_type else self.to_type
+
+    def get_to_json_function(self):
+        """ Return a function equivalent to to_json(), specialized once for this parser type,
+            or None if to_json() returns raw values unchanged.
+
+            :return: callable or None
+        """
+        return None if type(self).to_json is ParserType.to_json else self.to_json
+
 class ConverterType(ParserType):
     """ Type checker that allows to use another parser type with a converter function.
         Converter function will be used to convert any raw value to a value expected
@@ -223,6 +245,16 @@ class ConverterType(ParserType):
     def to_json(self, raw_value):
         return self.element_type.to_json(raw_value)
 
+    def get_to_type_function(self):
+        element_to_type = self.element_type.get_to_type_function()
+        json_converter_function = self.json_converter_function
+        if element_to_type is None:
+            return json_converter_function
+        return lambda json_value: element_to_type(json_converter_function(json_value))
+
+    def get_to_json_function(self):
+        return self.element_type.get_to_json_function()
+
 class DefaultValueType(ParserType):
     """ Type checker that allows a default value. """
     __slots__ = ('element_type', 'default_json_value')
@@ -263,6 +295,32 @@ class DefaultValueType(ParserType):
     def to_json(self, raw_value):
         return copy(self.default_json_value) if raw_value is None else self.element_type.to_json(raw_value)
 
+    def get_to_type_function(self):
+        element_to_type = self.element_type.get_to_type_function()
+        default_json_value = self.default_json_value
+        if element_to_type is None:
+            if default_json_value is None:
+                return None
+            return lambda json_value: default_json_value if json_value is None else json_value
+
+        def to_type(json_value):
+            """ Specialized to_type() """
+            if json_value is None:
+                if default_json_value is None:
+                    return None
+                json_value = default_json_value
+            return element_to_type(json_value)
+        return to_type
+
+    def get_to_json_function(self):
+        element_to_json = self.element_type.get_to_json_function()
+        default_json_value = self.default_json_value
+        if element_to_json is None:
+            if default_json_value is None:
+                return None
+            return lambda raw_value: copy(default_json_value) if raw_value is None else raw_value
+        return lambda raw_value: copy(default_json_value) if raw_value is None else element_to_json(raw_value)
+
 class OptionalValueType(DefaultValueType):
     """ Type checker that allows None as default value. """
     __slots__ = []
@@ -286,7 +344,7 @@ class SequenceType(ParserType):
                                      Expected args: Iterable
         """
         self.element_type = get_type(element_type)
-        self.sequence_builder = sequence_builder if sequence_builder is not None else lambda seq: seq
+        self.sequence_builder = sequence_builder if sequence_builder is not None else _identity
 
     def __str__(self):
         """ String representation """
@@ -310,6 +368,23 @@ class SequenceType(ParserType):
     def to_json(self, raw_value):
         return [self.element_type.to_json(seq_element) for seq_element in raw_value]
 
+    def get_to_type_function(self):
+        element_to_type = self.element_type.get_to_type_function()
+        sequence_builder = self.sequence_builder
+        if element_to_type is None:
+            if sequence_builder is _identity:
+                return list
+            return lambda json_value: sequence_builder(list(json_value))
+        if sequence_builder is _identity:
+            return lambda json_value: [element_to_type(seq_element) for seq_element in json_value]
+        return lambda json_value: sequence_builder([element_to_type(seq_element) for seq_element in json_value])
+
+    def get_to_json_function(self):
+        element_to_json = self.element_type.get_to_json_function()
+        if element_to_json is None:
+            return list
+        return lambda raw_value: [element_to_json(seq_element) for seq_element in raw_value]
+
 class JsonableClassType(ParserType):
     """ Type checker for Jsonable classes. """
     __slots__ = ['element_type']
@@ -335,6 +410,9 @@ class JsonableClassType(ParserType):
     def to_type(self, json_value):
         return self.element_type.from_dict(json_value)
 
+    def get_to_type_function(self):
+        return self.element_type.from_trusted_dict
+
     def to_json(self, raw_value):
         return raw_value.to_dict()
 
@@ -387,6 +465,15 @@ class StringableType(ParserType):
     def to_json(self, raw_value):
         return str(raw_value)
 
+    def get_to_type_function(self):
+        # JSON values are strings, so str keys and values can be kept unchanged.
+        if self.element_type is str:
+            return None
+        return self.element_type.from_string if self.use_from_string else self.element_type
+
+    def get_to_json_function(self):
+        return str
+
 class DictType(ParserType):
     """ Type checking for dictionary-like objects. """
     __slots__ = ['key_type', 'val_type', 'dict_builder']
@@ -401,7 +488,7 @@ class DictType(ParserType):
         # key type muse be convertible from/to string.
         self.key_type = key_type if isinstance(key_type, StringableType) else StringableType(key_type)
         self.val_type = get_type(val_type)
-        self.dict_builder = dict_builder if dict_builder is not None else lambda dictionary: dictionary
+        self.dict_builder = dict_builder if dict_builder is not None else _identity
 
     def __str__(self):
         """ String representation """
@@ -425,6 +512,26 @@ class DictType(ParserType):
     def to_json(self, raw_value):
         return {self.key_type.to_json(key): self.val_type.to_json(value) for key, value in raw_value.items()}
 
+    def get_to_type_function(self):
+        key_to_type = self.key_type.get_to_type_function()
+        val_to_type = self.val_type.get_to_type_function()
+        dict_builder = self.dict_builder
+        if key_to_type is None and val_to_type is None:
+            to_type = dict
+        elif key_to_type is None:
+            to_type = lambda json_value: {key: val_to_type(value) for key, value in json_value.items()}
+        else:
+            key_to_type = key_to_type or _identity
+            val_to_type = val_to_type or _identity
+            to_type = lambda json_value: {key_to_type(key): val_to_type(value) for key, value in json_value.items()}
+        if dict_builder is _identity:
+            return to_type
+        return lambda json_value: dict_builder(to_type(json_value))
+
+    def get_to_json_function(self):
+        val_to_json = self.val_type.get_to_json_function() or _identity
+        return lambda raw_value: {str(key): val_to_json(value) for key, value in raw_value.items()}
+
 class IndexedSequenceType(ParserType):
     """ Parser for objects stored as dictionaries in memory and saved as lists in JSON. """
     __slots__ = ['dict_type', 'sequence_type', 'key_name']
@@ -460,6 +567,17 @@ class IndexedSequenceType(ParserType):
         loaded_sequence = self.sequence_type.to_type(json_value)
         return self.dict_type.update({getattr(element, self.key_name): element for element in loaded_sequence})
 
+    def get_to_type_function(self):
+        sequence_to_type = self.sequence_type.get_to_type_function()
+        dict_builder = self.dict_type.dict_builder
+        key_name = self.key_name
+        return lambda json_value: dict_builder({getattr(element, key_name): element
+                                                for element in sequence_to_type(json_value)})
+
+    def get_to_json_function(self):
+        sequence_to_json = self.sequence_type.get_to_json_function()
+        return lambda raw_value: sequence_to_json(raw_value.values())
+
 class EnumerationType(ParserType):
     """ Type checker for a set of allowed basic values. """
     __slots__ = ['enum_values']
@@ -486,6 +604,10 @@ class EnumerationType(ParserType):
         self.validate(json_value)
         return json_value
 
+    def get_to_type_function(self):
+        """ Trusted JSON values are not validated again. """
+        return None
+
 class SequenceOfPrimitivesType(ParserType):
     """ Type checker for a set of allowed basic types. """
     __slots__ = ['seq_of_primitives']
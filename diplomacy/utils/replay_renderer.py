@@ -0,0 +1,196 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Replay renderer
+    - Renders every phase of saved games (from :meth:`diplomacy.utils.export.to_saved_game_format`) to SVG.
+    - Each phase is rebuilt directly from its saved state (no adjudication), so phases are independent
+      and can be rendered in parallel across a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import ujson as json
+from diplomacy.engine.game import Game
+
+# Constants
+LOGGER = logging.getLogger(__name__)
+MANIFEST_FILE_NAME = 'manifest.json'
+
+# Per-process cache of games used for rendering (one per map and rule set).
+# Renderer is attached to the game on first render, so the SVG template is only parsed once per worker.
+_RENDER_GAMES = {}
+
+def _get_render_game(map_name, rules):
+    """ Returns a cached game (for current process) that can be used to render phases of the given map.
+
+        :param map_name: The name of the map.
+        :param rules: The list of game rules.
+        :rtype: diplomacy.engine.game.Game
+    """
+    key = (map_name, tuple(rules))
+    if key not in _RENDER_GAMES:
+        _RENDER_GAMES[key] = Game(map_name=map_name, rules=list(rules))
+    return _RENDER_GAMES[key]
+
+def _render_phase(render_task):
+    """ Renders a single phase to disk. Executed in worker processes.
+
+        :param render_task: A tuple (map_name, rules, state, orders, output_path, incl_orders, incl_abbrev)
+        :return: The output path
+    """
+    map_name, rules, state, orders, output_path, incl_orders, incl_abbrev = render_task
+    game = _get_render_game(map_name, rules)
+
+    # Setting board state directly from saved state, then orders (if any).
+    # Using Game.set_state also clears previous orders and history left by a previously rendered phase.
+    Game.set_state(game, state, clear_history=True)
+    for power_name, power_orders in (orders or {}).items():
+        if power_orders:
+            Game.set_orders(game, power_name, power_orders)
+    game.error = []
+
+    game.render(incl_orders=incl_orders, incl_abbrev=incl_abbrev, output_path=output_path)
+    return output_path
+
+def _build_render_tasks(saved_game, output_dir, incl_orders, incl_abbrev):
+    """ Builds the render tasks and the manifest for a saved game.
+
+        :param saved_game: The saved game (from to_saved_game_format)
+        :param output_dir: The directory where SVGs and manifest are written.
+        :return: A tuple (list of render tasks, manifest)
+    """
+    map_name = saved_game.get('map', 'standard')
+    rules = saved_game.get('rules', [])
+    phases = saved_game.get('phases', [])
+    nb_digits = max(4, len(str(len(phases))))
+
+    render_tasks = []
+    manifest = {'id': saved_game.get('id', None),
+                'map': map_name,
+                'rules': rules,
+                'phases': []}
+
+    for phase_ix, phase_dct in enumerate(phases):
+        file_name = '{}_{}.svg'.format(str(phase_ix).zfill(nb_digits), phase_dct['name'])
+        render_tasks.append((map_name,
+                             rules,
+                             phase_dct['state'],
+                             phase_dct.get('orders', {}),
+                             os.path.join(output_dir, file_name),
+                             incl_orders,
+                             incl_abbrev))
+        manifest['phases'].append({'index': phase_ix,
+                                   'name': phase_dct['name'],
+                                   'file': file_name,
+                                   'zobrist_hash': phase_dct['state'].get('zobrist_hash', None)})
+    return render_tasks, manifest
+
+def _run_render_tasks(render_tasks, nb_workers):
+    """ Renders all tasks, either serially (nb_workers <= 1) or across a process pool.
+
+        :param render_tasks: List of render tasks (see _render_phase)
+        :param nb_workers: The number of worker processes. None to use the number of CPUs.
+    """
+    if not render_tasks:
+        return
+    if nb_workers is not None and nb_workers <= 1:
+        for render_task in render_tasks:
+            _render_phase(render_task)
+        return
+
+    nb_workers = min(nb_workers or os.cpu_count() or 1, len(render_tasks))
+    chunk_size = max(1, len(render_tasks) // (4 * nb_workers))
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        for _ in executor.map(_render_phase, render_tasks, chunksize=chunk_size):
+            pass
+
+def _write_manifest(manifest, output_dir):
+    """ Writes the manifest to disk """
+    with open(os.path.join(output_dir, MANIFEST_FILE_NAME), 'w') as manifest_file:
+        manifest_file.write(json.dumps(manifest, indent=2))
+
+def render_saved_game(saved_game, output_dir, nb_workers=None, incl_orders=True, incl_abbrev=False):
+    """ Renders every phase of a saved game to numbered SVG files, and writes a manifest.
+
+        Files are named ``{phase_index}_{phase_name}.svg`` (e.g. ``0000_S1901M.svg``), and the
+        manifest (``manifest.json``) lists the game id, map, rules and for each phase its index, name,
+        file name and zobrist hash.
+
+        :param saved_game: The saved game (from :meth:`diplomacy.utils.export.to_saved_game_format`)
+        :param output_dir: The directory where SVGs and manifest are written. Created if needed.
+        :param nb_workers: Optional. Number of worker processes. None to use all CPUs, 0 or 1 to render serially.
+        :param incl_orders: Optional. Flag to indicate we also want to render orders.
+        :param incl_abbrev: Optional. Flag to indicate we also want to display the provinces abbreviations.
+        :type saved_game: Dict
+        :type output_dir: str
+        :type nb_workers: int | None, optional
+        :type incl_orders: bool, optional
+        :type incl_abbrev: bool, optional
+        :return: The manifest
+        :rtype: Dict
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    render_tasks, manifest = _build_render_tasks(saved_game, output_dir, incl_orders, incl_abbrev)
+    _run_render_tasks(render_tasks, nb_workers)
+    _write_manifest(manifest, output_dir)
+    return manifest
+
+def load_saved_games(input_path):
+    """ Loads saved games from a .json file (single game, or list of games) or from a .jsonl file (one per line)
+
+        :param input_path: The path to the input file.
+        :return: A list of saved games (dictionaries)
+    """
+    with open(input_path, 'r') as file:
+        content = file.read()
+
+    # Single JSON document
+    try:
+        saved_games = json.loads(content)
+        return saved_games if isinstance(saved_games, list) else [saved_games]
+    except ValueError:
+        pass
+
+    # One saved game per line
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+def render_saved_games_from_disk(input_path, output_dir, nb_workers=None, incl_orders=True, incl_abbrev=False):
+    """ Renders every phase of every saved game in a .json / .jsonl file.
+        Phases from all games share a single process pool. Each game is rendered in
+        its own sub-directory (named after the game id, or the game index if it has no id).
+
+        :param input_path: The path to the input file. See :meth:`load_saved_games`.
+        :param output_dir: The root output directory.
+        :param nb_workers: Optional. Number of worker processes. None to use all CPUs, 0 or 1 to render serially.
+        :param incl_orders: Optional. Flag to indicate we also want to render orders.
+        :param incl_abbrev: Optional. Flag to indicate we also want to display the provinces abbreviations.
+        :return: A list of manifests (one per game)
+        :rtype: List[Dict]
+    """
+    render_tasks, manifests, game_dirs = [], [], []
+    for game_ix, saved_game in enumerate(load_saved_games(input_path)):
+        game_dir = os.path.join(output_dir, str(saved_game.get('id', None) or game_ix))
+        os.makedirs(game_dir, exist_ok=True)
+        game_tasks, manifest = _build_render_tasks(saved_game, game_dir, incl_orders, incl_abbrev)
+        render_tasks += game_tasks
+        manifests.append(manifest)
+        game_dirs.append(game_dir)
+
+    _run_render_tasks(render_tasks, nb_workers)
+    for manifest, game_dir in zip(manifests, game_dirs):
+        _write_manifest(manifest, game_dir)
+    LOGGER.info('Rendered %d phase(s) from %d game(s) to %s', len(render_tasks), len(manifests), output_dir)
+    return manifests
@@ -53,6 +53,24 @@ class SortedDict:
         """
         return lambda dictionary: SortedDict(key_type, val_type, dictionary)
 
+    @staticmethod
+    def from_sorted(key_type, val_type, sorted_items):
+        """ Build a sorted dict from (key, value) couples already sorted by strictly increasing keys,
+            without inserting them one by one. Order is not checked, but value types are.
+
+            :param key_type: expected type for keys.
+            :param val_type: expected type for values.
+            :param sorted_items: iterable of (key, value) couples sorted by key.
+            :return: a new SortedDict
+        """
+        sorted_dict = SortedDict(key_type, val_type)
+        sorted_dict.__couples = dict(sorted_items)
+        for value in sorted_dict.__couples.values():
+            if not isinstance(value, val_type):
+                raise TypeError('Expected value type %s, got %s' % (val_type, type(value)))
+        sorted_dict.__keys = SortedSet.from_sorted(key_type, sorted_dict.__couples)
+        return sorted_dict
+
     @property
     def key_type(self):
         """ Get key type. """
@@ -53,6 +53,19 @@ class SortedSet:
         """
         return lambda iterable: SortedSet(element_type, iterable)
 
+    @staticmethod
+    def from_sorted(element_type, sorted_content):
+        """ Build a sorted set from values already sorted in strictly increasing order,
+            without inserting them one by one. Neither order nor value types are checked.
+
+            :param element_type: Expected type for values.
+            :param sorted_content: Sorted sequence of unique values.
+            :return: a new SortedSet
+        """
+        sorted_set = SortedSet(element_type)
+        sorted_set.__list = list(sorted_content)
+        return sorted_set
+
     @property
     def element_type(self):
         """ Get values type. """
@@ -39,6 +39,7 @@ CANCELED = 'canceled'
 CENTERS = 'centers'
 CHANNEL = 'channel'
 CIVIL_DISORDER = 'civil_disorder'
+CLEAR_HISTORY = 'clear_history'
 CLEAR_INVALID_STATE_HISTORY = 'clear_invalid_state_history'
 CLIENT_NAME = 'client_name'
 CLIENT_VERSION = 'client_version'
@@ -139,6 +140,7 @@ PHASE_ABBR = 'phase_abbr'
 PHASE_DATA = 'phase_data'
 PHASE_DATA_TYPE = 'phase_data_type'
 PHASE_SUMMARIES = 'phase_summaries'
+PHASES = 'phases'
 PING_SECONDS = 'ping_seconds'
 PLAYER_ID = 'player_id'
 PLAYERS = 'players'
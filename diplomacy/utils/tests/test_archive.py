@@ -0,0 +1,114 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test game archives. """
+import os
+import pytest
+import ujson as json
+from diplomacy.engine.self_play import play_game
+from diplomacy.utils import exceptions
+from diplomacy.utils.archive import ArchiveReader, ArchiveWriter, encode_game, write_archive, \
+    convert_saved_games_to_archive
+from diplomacy.utils.export import to_saved_game_format
+
+# Archives require optional package msgpack
+pytest.importorskip('msgpack')
+
+def _get_saved_game(nb_phases, seed):
+    """ Plays a few random phases and returns the saved game (as decoded from JSON) """
+    game, _ = play_game('random', seed=seed, max_phases=nb_phases)
+    return json.loads(json.dumps(to_saved_game_format(game)))
+
+def _get_saved_games():
+    """ Returns a few saved games, including a game with phase summaries and unexpected fields """
+    saved_games = [_get_saved_game(nb_phases=nb_phases, seed=nb_phases) for nb_phases in (0, 3, 11)]
+    saved_game = saved_games[1]
+    for phase in saved_game['phases']:
+        phase['summary'] = 'Summary of %s' % phase['name']
+    saved_game['phase_summaries'] = {phase['name']: phase['summary'] for phase in saved_game['phases']}
+    saved_game['phases'][0]['state']['note'] = None
+    saved_game['phases'][1]['state']['extra'] = {'value': [1, 2]}
+    saved_game['phases'][1]['extra'] = 'value'
+    saved_game['phases'][2]['orders']['FRANCE'] = None
+    saved_game['model'] = 'model_name'
+    return saved_games
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_round_trip(tmpdir, compress):
+    """ Tests that saved games read from an archive are identical to the saved games written """
+    saved_games = _get_saved_games()
+    output_path = os.path.join(str(tmpdir), 'games.dat')
+    assert write_archive(saved_games, output_path, compress=compress, block_size=4) == len(saved_games)
+
+    with ArchiveReader(output_path) as reader:
+        assert len(reader) == len(saved_games)
+        assert reader.game_ids == [saved_game['id'] for saved_game in saved_games]
+        assert list(reader.iter_saved_games()) == saved_games
+        for game_ix, saved_game in enumerate(saved_games):
+            game = reader.get_game(game_ix)
+            assert game.game_id == saved_game['id']
+            assert game.get_current_phase() == saved_game['phases'][-1]['name']
+            assert game.get_hash() == saved_game['phases'][-1]['state']['zobrist_hash']
+
+def test_random_access(tmpdir):
+    """ Tests reading a single phase, or some fields of a phase """
+    saved_games = _get_saved_games()
+    output_path = os.path.join(str(tmpdir), 'games.dat')
+    write_archive(saved_games, output_path, block_size=4)
+
+    with ArchiveReader(output_path) as reader:
+        phases = saved_games[2]['phases']
+        assert reader.get_phase_names(2) == [phase['name'] for phase in phases]
+        assert reader.get_phase(2, 5) == phases[5]
+        assert reader.get_phase(2, -1) == phases[-1]
+        assert reader.get_phase(2, phases[9]['name']) == phases[9]
+        assert reader.get_phase(2, 9, fields=['name', 'state.centers']) == \
+               {'name': phases[9]['name'], 'state': {'centers': phases[9]['state']['centers']}}
+        assert reader.get_phase(1, 1, fields=['extra', 'state.extra']) == \
+               {'extra': 'value', 'state': {'extra': {'value': [1, 2]}}}
+        assert [phase['orders'] for phase in reader.iter_phases(2, fields=['orders'])] == \
+               [phase['orders'] for phase in phases]
+        with pytest.raises(IndexError):
+            reader.get_phase(0, 1)
+
+def test_convert_and_invalid_file(tmpdir):
+    """ Tests converting a .jsonl file, and reading a file that is not an archive """
+    saved_games = _get_saved_games()
+    input_path = os.path.join(str(tmpdir), 'games.jsonl')
+    output_path = os.path.join(str(tmpdir), 'games.dat')
+    with open(input_path, 'w') as file:
+        for saved_game in saved_games:
+            file.write(json.dumps(saved_game) + '\n')
+    assert convert_saved_games_to_archive(input_path, output_path) == len(saved_games)
+    assert os.path.getsize(output_path) < os.path.getsize(input_path)
+    with ArchiveReader(output_path) as reader:
+        assert list(reader.iter_saved_games()) == saved_games
+
+    with pytest.raises(exceptions.DiplomacyException):
+        ArchiveReader(input_path)
+
+def test_archive_writer(tmpdir):
+    """ Tests writing encoded games one at a time """
+    saved_games = _get_saved_games()
+    archive_path = str(tmpdir.join('games.arc'))
+    with ArchiveWriter(archive_path) as writer:
+        writer.write(saved_games[0])
+        writer.write_encoded(encode_game(saved_games[1]))
+        with pytest.raises(exceptions.DiplomacyException):
+            writer.write_encoded(encode_game(saved_games[2], compress=False))
+    assert len(writer) == 2
+    with ArchiveReader(archive_path) as reader:
+        assert list(reader.iter_saved_games()) == saved_games[:2]
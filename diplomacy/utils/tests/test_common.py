@@ -17,6 +17,7 @@
 """ Test for diplomacy network code utils. """
 import ujson as json
 
+from diplomacy.engine.map import Map
 from diplomacy.utils import common, exceptions
 
 def assert_raises(callback, expected_exceptions):
@@ -145,3 +146,32 @@ def test_timestamp():
     assert timestamp2 > 1e6
     assert timestamp3 > 1e6
     assert timestamp1 <= timestamp2 <= timestamp3, (timestamp1, timestamp2, timestamp3)
+
+def test_ordinal_string():
+    """ Test ordinal strings with short and long phase names, unknown phase names and plain strings. """
+    this_map = Map('standard')
+    short_s1901, long_s1901, short_f1901, unknown_1, unknown_2 = [
+        common.OrdinalString(phase, this_map.phase_ordinal(phase))
+        for phase in ('S1901M', 'SPRING 1901 MOVEMENT', 'F1901M', 'UNKNOWN_1', 'UNKNOWN_2')]
+
+    # Equality and hash are the ones of the string
+    assert short_s1901.ordinal == long_s1901.ordinal
+    assert short_s1901 != long_s1901
+    assert len({short_s1901, long_s1901}) == 2
+    assert unknown_1.ordinal == unknown_2.ordinal
+    assert unknown_1 != unknown_2
+    assert short_s1901 == 'S1901M' and hash(short_s1901) == hash('S1901M')
+
+    # Ordering uses ordinals between ordinal strings
+    assert not short_s1901 < long_s1901 and not long_s1901 < short_s1901
+    assert short_s1901 <= long_s1901 <= short_s1901
+    assert long_s1901 < short_f1901 and short_f1901 > long_s1901
+    assert sorted([short_f1901, long_s1901]) == ['SPRING 1901 MOVEMENT', 'F1901M']
+
+    # Lookups and comparisons with plain strings
+    history = {short_s1901: 'spring', short_f1901: 'fall'}
+    assert history['S1901M'] == 'spring' and history['F1901M'] == 'fall'
+    assert 'SPRING 1901 MOVEMENT' not in history
+    assert {'S1901M': 'spring'}[short_s1901] == 'spring'
+    assert short_f1901 < 'S1901M' and 'S1901M' > short_f1901
+    assert short_s1901 >= 'S1901M'
@@ -0,0 +1,89 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette, Steven Bocco
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test loading saved games from disk. """
+import os
+import ujson as json
+from diplomacy.engine.self_play import play_game
+from diplomacy.utils.export import to_saved_game_format, iter_saved_games_from_disk, load_saved_games_from_disk
+
+def _write_games(tmpdir, nb_games, invalid_line_ix=None):
+    """ Writes a .jsonl file with random games (and optionally an invalid line) and returns its path and games """
+    input_path = os.path.join(str(tmpdir), 'games.jsonl')
+    games = [play_game('random', seed=seed, max_phases=seed % 3 + 1)[0] for seed in range(nb_games)]
+    with open(input_path, 'w') as file:
+        for game_ix, game in enumerate(games):
+            if game_ix == invalid_line_ix:
+                file.write('{"id": \n')
+            file.write(json.dumps(to_saved_game_format(game)) + '\n')
+    return input_path, games
+
+def _summarize(game):
+    """ Returns the name, hash, units and orders of each phase of a game (timestamps are regenerated on save) """
+    return [(phase['name'], phase['state']['zobrist_hash'], phase['state']['units'], phase['orders'])
+            for phase in to_saved_game_format(game)['phases']]
+
+def test_load_saved_games_serial(tmpdir):
+    """ Tests that games loaded serially are identical to the saved games """
+    input_path, games = _write_games(tmpdir, nb_games=3)
+    loaded_games = load_saved_games_from_disk(input_path)
+    assert [game.game_id for game in loaded_games] == [game.game_id for game in games]
+    assert [game.get_hash() for game in loaded_games] == [game.get_hash() for game in games]
+    assert [_summarize(game) for game in loaded_games] == [_summarize(game) for game in games]
+
+def test_iter_saved_games_is_lazy(tmpdir):
+    """ Tests that games are yielded one at a time """
+    input_path, games = _write_games(tmpdir, nb_games=3)
+    generator = iter_saved_games_from_disk(input_path)
+    assert next(generator).game_id == games[0].game_id
+    generator.close()
+
+def test_load_saved_games_parallel(tmpdir):
+    """ Tests loading games across a process pool, in order and out of order """
+    input_path, games = _write_games(tmpdir, nb_games=7)
+    expected = [_summarize(game) for game in games]
+    ordered_games = load_saved_games_from_disk(input_path, nb_workers=2, ordered=True)
+    assert [_summarize(game) for game in ordered_games] == expected
+
+    unordered_games = list(iter_saved_games_from_disk(input_path, nb_workers=2, ordered=False, chunk_size=2))
+    assert sorted(game.game_id for game in unordered_games) == sorted(game.game_id for game in games)
+
+def test_load_phases_only(tmpdir):
+    """ Tests loading the list of phases of each game, serially and in parallel """
+    input_path, games = _write_games(tmpdir, nb_games=3)
+    with open(input_path, 'r') as file:
+        expected = [json.loads(line)['phases'] for line in file]
+    for nb_workers in (0, 2):
+        phases = load_saved_games_from_disk(input_path, phases_only=True, nb_workers=nb_workers)
+        assert [[phase.to_dict() for phase in game_phases] for game_phases in phases] == expected
+        assert [game_phases[0].state['game_id'] for game_phases in phases] == [game.game_id for game in games]
+
+def test_load_saved_games_on_error(tmpdir):
+    """ Tests that invalid lines are skipped or raised, serially and in parallel """
+    input_path, games = _write_games(tmpdir, nb_games=4, invalid_line_ix=2)
+    for nb_workers in (0, 2):
+        loaded_games = load_saved_games_from_disk(input_path, on_error='ignore', nb_workers=nb_workers)
+        assert [game.game_id for game in loaded_games] == [game.game_id for game in games]
+        try:
+            load_saved_games_from_disk(input_path, on_error='raise', nb_workers=nb_workers)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('Expected invalid line to raise an error.')
+
+def test_load_missing_file(tmpdir):
+    """ Tests that a missing file returns no games """
+    assert load_saved_games_from_disk(os.path.join(str(tmpdir), 'missing.jsonl')) == []
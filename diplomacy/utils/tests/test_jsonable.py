@@ -79,3 +79,26 @@ def test_jsonable_parsing():
     assert from_json.field_e == my_jsonable.field_e
     assert from_json.field_f == my_jsonable.field_f
     assert from_json.field_g == my_jsonable.field_g
+
+def test_jsonable_trusted_parsing():
+    """ Test fast parsing of trusted JSON dicts for Jsonable. """
+
+    attributes = ('field_a', 'field_b', 'field_c', 'field_d', 'field_e', 'field_f', 'field_g')
+    my_jsonable = MyJsonable(field_a=True, field_b='test', field_c=1.5, field_e=[3, 2], field_f=[6.5, 1.5],
+                             field_g={'y': 2, 'x': 1})
+    json_dict = json.loads(json.dumps(my_jsonable.to_dict()))
+
+    from_json = MyJsonable.from_dict(json_dict)
+    from_trusted_json = MyJsonable.from_trusted_dict(json_dict)
+    assert not from_trusted_json.is_trusted_init()
+    for attribute_name in attributes:
+        assert getattr(from_trusted_json, attribute_name) == getattr(from_json, attribute_name), attribute_name
+    assert isinstance(from_trusted_json.field_f, SortedSet)
+    assert isinstance(from_trusted_json.field_g, SortedDict)
+    assert from_trusted_json.to_dict() == from_json.to_dict() == json_dict
+
+    # Missing keys get default values.
+    from_trusted_json = MyJsonable.from_trusted_dict({'field_a': False, 'field_b': 'b', 'field_e': [], 'field_f': []})
+    assert from_trusted_json.field_c is None
+    assert from_trusted_json.field_d == 'super'
+    assert from_trusted_json.field_g == SortedDict(str, int, {'x': -1})
@@ -0,0 +1,70 @@
+# ==============================================================================
+# Copyright (C) 2019 - Philip Paquette
+#
+#  This program is free software: you can redistribute it and/or modify it under
+#  the terms of the GNU Affero General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option) any
+#  later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#  FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+#  details.
+#
+#  You should have received a copy of the GNU Affero General Public License along
+#  with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ==============================================================================
+""" Test replay renderer. """
+import os
+import ujson as json
+from diplomacy.engine.game import Game
+from diplomacy.engine.self_play import play_game
+from diplomacy.utils.export import to_saved_game_format
+from diplomacy.utils.replay_renderer import render_saved_game, render_saved_games_from_disk, MANIFEST_FILE_NAME
+
+def _get_renderings(game):
+    """ Replays the orders of a game and returns the list of renderings of each phase """
+    replay = Game(map_name=game.map_name)
+    renderings = []
+    for phase in game.get_phase_history():
+        for power_name, power_orders in phase.orders.items():
+            replay.set_orders(power_name, power_orders)
+        renderings.append(replay.render())
+        replay.process()
+    renderings.append(replay.render())
+    return renderings
+
+def test_render_saved_game_matches_replay(tmpdir):
+    """ Tests that rendering from saved states is identical to rendering while replaying the game """
+    game, _ = play_game('random', max_phases=4)
+    renderings = _get_renderings(game)
+    saved_game = to_saved_game_format(game)
+    manifest = render_saved_game(saved_game, str(tmpdir), nb_workers=0)
+
+    assert manifest['id'] == game.game_id
+    assert [phase['index'] for phase in manifest['phases']] == list(range(len(renderings)))
+    assert [phase['name'] for phase in manifest['phases']] == [phase['name'] for phase in saved_game['phases']]
+    for phase, expected_rendering in zip(manifest['phases'], renderings):
+        with open(os.path.join(str(tmpdir), phase['file']), 'r') as svg_file:
+            assert svg_file.read() == expected_rendering
+    with open(os.path.join(str(tmpdir), MANIFEST_FILE_NAME), 'r') as manifest_file:
+        assert json.loads(manifest_file.read()) == manifest
+
+def test_render_saved_games_from_disk_parallel(tmpdir):
+    """ Tests rendering a .jsonl file with several games across a process pool """
+    input_path = os.path.join(str(tmpdir), 'games.jsonl')
+    games = [play_game('random', seed=seed, max_phases=2)[0] for seed in range(2)]
+    for game in games:
+        to_saved_game_format(game, output_path=input_path)
+
+    serial_dir, parallel_dir = os.path.join(str(tmpdir), 'serial'), os.path.join(str(tmpdir), 'parallel')
+    serial_manifests = render_saved_games_from_disk(input_path, serial_dir, nb_workers=1)
+    parallel_manifests = render_saved_games_from_disk(input_path, parallel_dir, nb_workers=2)
+    assert serial_manifests == parallel_manifests
+    assert [manifest['id'] for manifest in parallel_manifests] == [game.game_id for game in games]
+
+    for manifest in parallel_manifests:
+        for phase in manifest['phases']:
+            with open(os.path.join(serial_dir, manifest['id'], phase['file']), 'r') as serial_file, \
+                    open(os.path.join(parallel_dir, manifest['id'], phase['file']), 'r') as parallel_file:
+                assert serial_file.read() == parallel_file.read()
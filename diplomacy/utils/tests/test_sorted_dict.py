@@ -152,3 +152,17 @@ def test_is_sequence_and_is_dict():
     assert common.is_dictionary(SortedDict(str, int, {'a': 3, 'b': -1, 'c': 12}))
     assert common.is_dictionary(SortedDict(int, float), )
     assert not common.is_sequence(SortedDict(str, str))
+
+def test_from_sorted():
+    """ Test building a sorted dict from sorted items. """
+    items = [(-1.5, 'a'), (0.0, 'b'), (2.5, 'c')]
+    sorted_dict = SortedDict.from_sorted(float, str, items)
+    assert sorted_dict == SortedDict(float, str, dict(items))
+    assert list(sorted_dict.keys()) == [-1.5, 0.0, 2.5]
+    sorted_dict.put(1.0, 'd')
+    assert list(sorted_dict.keys()) == [-1.5, 0.0, 1.0, 2.5]
+    try:
+        SortedDict.from_sorted(float, str, [(1.0, 1)])
+        raise AssertionError('Should fail')
+    except TypeError:
+        pass
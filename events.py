@@ -0,0 +1,147 @@
+"""Live game updates for the Diplomacy web application.
+
+Viewers subscribe to a game and receive compact events (server-sent events) instead of
+re-requesting full pages: a state snapshot on connect, then per-phase deltas (units moved,
+centers changed, new messages) and order submission notices. Streams end once the game is completed.
+
+The broker lives in-process, so with several server workers each worker only notifies
+the viewers connected to it.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from diplomacy.engine.game import Game
+from diplomacy.utils import strings
+
+# Event types
+STATE = "state"
+PHASE = "phase"
+ORDERS = "orders"
+
+
+def get_game_state(game: Game) -> Dict[str, Any]:
+    """Compact JSON view of a game: phase, status, units and centers per power.
+
+    Unlike _get_map_data in main.py, this does not include possible orders.
+    """
+    return {
+        "game_id": game.game_id,
+        "phase": game.get_current_phase(),
+        "phase_long": game.phase,
+        "phase_type": game.phase_type,
+        "status": game.status,
+        "zobrist_hash": game.get_hash(),
+        "units": game.get_units(),
+        "centers": game.get_centers(),
+        "message_count": len(game.messages) if game.messages else 0,
+        # Start of the current phase, i.e. when the previous phase delta was published.
+        "phase_start_time": (
+            game.state_history.last_value()["timestamp"] if game.state_history else game.timestamp_created
+        ),
+    }
+
+
+def get_messages_since(game: Game, timestamp: int) -> List[Dict[str, Any]]:
+    """Messages sent after timestamp, from the current phase and the last archived phase."""
+    messages = []
+    if game.message_history:
+        messages.extend(game.message_history.last_value().values())
+    if game.messages:
+        messages.extend(game.messages.values())
+    return [message.to_dict() for message in messages if message.time_sent > timestamp]
+
+
+def is_game_over(event: Dict[str, Any]) -> bool:
+    """Whether an event shows the game completed, i.e. no other event can follow it."""
+    return event.get("status") == strings.COMPLETED
+
+
+def _diff_lists(old: Dict[str, List[str]], new: Dict[str, List[str]]) -> Dict[str, Dict[str, List[str]]]:
+    """Per power added/removed items, only for powers that changed."""
+    diff = {}
+    for power_name in sorted(set(old) | set(new)):
+        old_items, new_items = set(old.get(power_name, ())), set(new.get(power_name, ()))
+        if old_items != new_items:
+            diff[power_name] = {
+                "added": sorted(new_items - old_items),
+                "removed": sorted(old_items - new_items),
+            }
+    return diff
+
+
+def diff_game_states(
+    old_state: Dict[str, Any], new_state: Dict[str, Any], new_messages: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Build a phase delta event between two states returned by get_game_state()."""
+    return {
+        "type": PHASE,
+        "game_id": new_state["game_id"],
+        "previous_phase": old_state["phase"],
+        "phase": new_state["phase"],
+        "phase_long": new_state["phase_long"],
+        "phase_type": new_state["phase_type"],
+        "status": new_state["status"],
+        "zobrist_hash": new_state["zobrist_hash"],
+        "units": _diff_lists(old_state["units"], new_state["units"]),
+        "centers": _diff_lists(old_state["centers"], new_state["centers"]),
+        "messages": new_messages or [],
+    }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event for a text/event-stream response."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """Queue of events for one connected viewer."""
+
+    def __init__(self, game_id: str, max_queued: int):
+        self.game_id = game_id
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        # Set when the viewer falls behind and events were dropped; it must then get a new snapshot.
+        self.needs_resync = False
+
+    def push(self, event: Dict[str, Any]):
+        if self.needs_resync:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.needs_resync = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            # Wake the reader so it can resync.
+            self.queue.put_nowait({"type": STATE})
+
+
+class EventBroker:
+    """Fan-out of game events to subscribed viewers."""
+
+    def __init__(self, max_queued: int = 64):
+        self.max_queued = max_queued
+        self._subscriptions = {}  # {game_id: set of Subscription}
+
+    def subscribe(self, game_id: str) -> Subscription:
+        subscription = Subscription(game_id, self.max_queued)
+        self._subscriptions.setdefault(game_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.game_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.game_id]
+
+    def count(self, game_id: str) -> int:
+        return len(self._subscriptions.get(game_id, ()))
+
+    def publish(self, game_id: str, event: Dict[str, Any]):
+        for subscription in list(self._subscriptions.get(game_id, ())):
+            subscription.push(event)
+
+
+broker = EventBroker()
@@ -0,0 +1,203 @@
+"""Background jobs for the Diplomacy web application.
+
+Phase processing (adjudication, phase summary and full-game serialization) is CPU-bound,
+so it runs in a bounded executor instead of on the ASGI event loop. Jobs touching the same
+game are serialized through a per-game lock, which also guards order submission.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from caching import get_game_fingerprint
+from diplomacy.engine.game import Game
+from events import broker, diff_game_states, get_game_state, get_messages_since
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already pending for a game."""
+
+
+def process_game_json(game_json: str) -> Dict[str, Any]:
+    """Load a serialized game, process its current phase and serialize it back.
+
+    Runs inside the executor (thread or worker process), so it only takes and returns
+    plain data.
+    """
+    game = Game.from_trusted_dict(json.loads(game_json))
+    previous_state = get_game_state(game)
+    game.process()
+    new_messages = get_messages_since(game, previous_state["phase_start_time"])
+    return {
+        "game_json": json.dumps(game.to_dict()),
+        "phase": game.phase,
+        "status": game.status,
+        "fingerprint": get_game_fingerprint(game),
+        "delta": diff_game_states(previous_state, get_game_state(game), new_messages),
+    }
+
+
+class Job:
+    """State of a single background job."""
+
+    def __init__(self, game_id: str, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.game_id = game_id
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None  # type: Optional[Dict[str, Any]]
+        self.error = None  # type: Optional[str]
+        self.created_at = time.time()
+        self.started_at = None  # type: Optional[float]
+        self.finished_at = None  # type: Optional[float]
+
+    @property
+    def is_done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "game_id": self.game_id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Runs game jobs in a bounded executor, one job at a time per game."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        max_pending_per_game: int = 8,
+        max_finished_jobs: int = 1000,
+    ):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.max_pending_per_game = max_pending_per_game
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = None
+        self._jobs = OrderedDict()  # type: OrderedDict[str, Job]
+        self._game_locks = {}  # {game_id: [asyncio.Lock, nb_holders_and_waiters]}
+        self._pending = {}  # {game_id: nb of queued or running jobs}
+        self._tasks = set()
+
+    @property
+    def executor(self):
+        """Executor used for CPU-bound work. Created on first use."""
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="game-job"
+                )
+        return self._executor
+
+    @contextlib.asynccontextmanager
+    async def game_lock(self, game_id: str):
+        """Serialize all read-modify-write operations on a game.
+
+        asyncio.Lock wakes waiters in FIFO order, so jobs run in submission order.
+        """
+        entry = self._game_locks.setdefault(game_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._game_locks[game_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def submit_process(self, game_id: str, storage) -> Job:
+        """Queue processing of the current phase of a game and return immediately."""
+        if self._pending.get(game_id, 0) >= self.max_pending_per_game:
+            raise JobQueueFullError(
+                f"Too many pending jobs for game {game_id} ({self.max_pending_per_game})"
+            )
+        job = Job(game_id, "process")
+        self._jobs[job.id] = job
+        self._pending[game_id] = self._pending.get(game_id, 0) + 1
+        self._trim_finished_jobs()
+
+        task = asyncio.get_running_loop().create_task(self._run_process(job, storage))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run_process(self, job: Job, storage):
+        try:
+            async with self.game_lock(job.game_id):
+                job.status = RUNNING
+                job.started_at = time.time()
+
+                game_json = await storage.load_game_json(job.game_id)
+                if game_json is None:
+                    raise KeyError(f"Game {job.game_id} not found")
+
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.executor, process_game_json, game_json
+                )
+                await storage.save_game_json(job.game_id, result["game_json"])
+
+                metadata = await storage.load_metadata(job.game_id)
+                if metadata:
+                    metadata["phase"] = result["phase"]
+                    metadata["status"] = result["status"]
+                    metadata["fingerprint"] = result["fingerprint"]
+                    await storage.save_metadata(job.game_id, metadata)
+
+                job.result = {"phase": result["phase"], "status": result["status"]}
+                job.status = COMPLETED
+                broker.publish(job.game_id, result["delta"])
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            self._pending[job.game_id] -= 1
+            if not self._pending[job.game_id]:
+                del self._pending[job.game_id]
+
+    def _trim_finished_jobs(self):
+        """Forget the oldest finished jobs once the history limit is reached."""
+        excess = len(self._jobs) - self.max_finished_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.is_done][:excess]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_manager = JobManager(
+    max_workers=int(os.getenv("DIPLOMACY_JOB_WORKERS", "0")) or None,
+    use_processes=os.getenv("DIPLOMACY_JOB_EXECUTOR", "thread") == "process",
+)
@@ -12,9 +12,11 @@ os.environ["GRPC_PYTHON_LOG_LEVEL"] = "40"  # ERROR level only
 
 from diplomacy import Game
 from diplomacy.engine.message import GLOBAL, Message
+from diplomacy.engine.profiling import EngineProfiler, profile_process
 from diplomacy.utils.export import to_saved_game_format
 
 from ai_diplomacy.clients import load_model_client
+from ai_diplomacy.context_budget import PROMPT_STATS
 from ai_diplomacy.utils import (
     get_valid_orders,
     gather_possible_orders,
@@ -84,6 +86,12 @@ def parse_arguments():
         action="store_true",
         help="Run in fast test mode - uses minimal settings for quick testing"
     )
+    parser.add_argument(
+        "--history_token_budget",
+        type=int,
+        default=0,
+        help="Token budget of the game history in prompts. Defaults to a budget per model (0).",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -132,6 +140,13 @@ def main():
     game = Game()
     game_history = GameHistory()
 
+    # Engine processing cost, aggregated over all phases
+    engine_profiler = EngineProfiler(
+        callback=lambda profile: logger.debug(
+            f"Engine processed {profile.phase} in {profile.duration * 1000:.1f} ms: {profile.to_dict()}"
+        )
+    )
+
     # Ensure game has phase_summaries attribute
     if not hasattr(game, "phase_summaries"):
         game.phase_summaries = {}
@@ -176,6 +191,8 @@ def main():
         if not game.powers[power_name].is_eliminated(): # Only create for active powers initially
             try:
                 client = load_model_client(model_id)
+                if args.history_token_budget:
+                    client.history_token_budget = args.history_token_budget
                 # TODO: Potentially load initial goals/relationships from config later
                 agent = DiplomacyAgent(power_name=power_name, client=client) 
                 agents[power_name] = agent
@@ -391,7 +408,8 @@ def main():
             return f"Phase {current_short_phase} Summary:\n\n" + "\n".join(summary_parts)
         
         # Process with our custom callback
-        game.process(phase_summary_callback=phase_summary_callback)
+        with profile_process(engine_profiler):
+            game.process(phase_summary_callback=phase_summary_callback)
 
         # === Add Post-Phase Agent State Analysis ===
         if not game.is_game_done:
@@ -538,6 +556,8 @@ def main():
     # Game is done
     total_time = time.time() - start_whole
     logger.info(f"Game ended after {total_time:.2f}s. Saving results...")
+    logger.info(f"Engine processing cost:\n{engine_profiler.format()}")
+    logger.info(f"LLM prompt sizes and latencies:\n{PROMPT_STATS.format()}")
 
     # Now save the game with our added data
     output_path = game_file_path
@@ -3,15 +3,33 @@
 
 import uvicorn
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from typing import Optional, Dict, Any, List
+import asyncio
 import json
 import uuid
 from pathlib import Path
 import re
 
+from caching import (
+    REVALIDATE_CACHE_CONTROL,
+    get_game_etag,
+    get_game_fingerprint,
+    is_not_modified,
+    not_modified_response,
+    svg_cache,
+)
+from events import ORDERS, STATE, broker, format_sse, get_game_state, is_game_over
+from jobs import JobQueueFullError, job_manager
 from storage import storage
 from diplomacy.engine.game import Game
 from diplomacy.engine.power import Power
@@ -29,6 +47,10 @@ static_dir.mkdir(exist_ok=True)
 templates = Jinja2Templates(directory=str(templates_dir))
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+# Compress large dynamic payloads (pages, possible orders). Event streams and
+# precompressed map SVGs are left untouched by the middleware.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Game rules with descriptions
 RULE_DESCRIPTIONS = {
     "CIVIL_DISORDER": "Powers that don't submit orders will have default orders: units hold, retreats disband, builds waived",
@@ -145,6 +167,7 @@ async def create_game(
         "phase": game.phase,
         "status": game.status,
         "player_power": player_power if not "SOLITAIRE" in rules else "ALL",
+        "fingerprint": get_game_fingerprint(game),
     }
     await storage.save_metadata(game_id, metadata)
 
@@ -154,11 +177,17 @@ async def create_game(
 @app.get("/game/{game_id}", response_class=HTMLResponse)
 async def view_game(request: Request, game_id: str):
     """View a game."""
+    # The page only changes when the game (fingerprint) or the player power changes,
+    # so repeat views can be answered from metadata alone.
+    metadata = await storage.load_metadata(game_id)
+    etag = get_game_etag(game_id, metadata, "view", (metadata or {}).get("player_power"))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     game = await storage.load_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    metadata = await storage.load_metadata(game_id)
     if not metadata:
         raise HTTPException(status_code=404, detail="Game metadata not found")
 
@@ -169,19 +198,18 @@ async def view_game(request: Request, game_id: str):
         # Fallback to first power if invalid
         player_power = list(game.powers.keys())[0]
         metadata["player_power"] = player_power
+        metadata["fingerprint"] = get_game_fingerprint(game)
         await storage.save_metadata(game_id, metadata)
+        etag = get_game_etag(game_id, metadata, "view", player_power)
 
     # Get map SVG content
-    svg_path = (
-        Path(__file__).parent / "diplomacy" / "maps" / "svg" / f"{game.map_name}.svg"
-    )
-    if svg_path.exists():
-        with open(svg_path, "r", encoding="utf-8") as f:
-            map_svg = f.read()
+    map_data = _get_map_data(game)
+    map_svg = svg_cache.get_text(game.map_name)
+    if map_svg is not None:
+        # Unit coordinates let the page redraw units when live updates arrive
+        map_data["unit_coords"] = _get_unit_coords(map_svg)
         # Add unit markers to the map
         map_svg = _add_units_to_svg(map_svg, game)
-    else:
-        map_svg = None
 
     # Get possible orders for the current phase
     possible_orders = {}
@@ -195,6 +223,9 @@ async def view_game(request: Request, game_id: str):
     elif game.phase:
         phase_type = game.phase[-1]
 
+    headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
     return templates.TemplateResponse(
         "game.html",
         {
@@ -204,26 +235,23 @@ async def view_game(request: Request, game_id: str):
             "powers": game.powers,
             "current_phase": game.phase,
             "phase_type": phase_type,
-            "map_data": json.dumps(_get_map_data(game)),
+            "map_data": json.dumps(map_data),
             "player_power": player_power,
             "map_svg": map_svg,
             "is_solitaire": "SOLITAIRE" in game.rules,
             "possible_orders": possible_orders,
         },
+        headers=headers,
     )
 
 
 @app.get("/maps/svg/{map_name}.svg")
-async def get_map_svg(map_name: str):
-    """Serve map SVG files."""
-    svg_path = Path(__file__).parent / "diplomacy" / "maps" / "svg" / f"{map_name}.svg"
-    if not svg_path.exists():
+async def get_map_svg(request: Request, map_name: str):
+    """Serve map SVG files (from memory, with immutable caching headers)."""
+    response = svg_cache.response(request, map_name)
+    if response is None:
         raise HTTPException(status_code=404, detail="Map not found")
-
-    with open(svg_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    return Response(content=content, media_type="image/svg+xml")
+    return response
 
 
 @app.post("/game/{game_id}/orders/{power_name}")
@@ -231,50 +259,144 @@ async def submit_orders(
     request: Request, game_id: str, power_name: str, orders: str = Form("")
 ):
     """Submit orders for a power."""
-    game = await storage.load_game(game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    # Orders are written under the game lock so they can't be lost to a concurrent process job.
+    async with job_manager.game_lock(game_id):
+        game = await storage.load_game(game_id)
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+
+        if power_name not in game.powers:
+            raise HTTPException(status_code=404, detail="Power not found")
+
+        # Parse and set orders
+        order_list = [o.strip() for o in orders.split("\n") if o.strip()]
+        game.set_orders(power_name, order_list)
+
+        # Save updated game
+        await storage.save_game(game_id, game)
+
+        # Update metadata
+        metadata = await storage.load_metadata(game_id)
+        if metadata:
+            metadata["phase"] = game.phase
+            metadata["fingerprint"] = get_game_fingerprint(game)
+            await storage.save_metadata(game_id, metadata)
+
+    # Notify viewers (orders themselves stay private)
+    broker.publish(
+        game_id,
+        {
+            "type": ORDERS,
+            "game_id": game_id,
+            "phase": game.get_current_phase(),
+            "power": power_name,
+            "orders_set": bool(game.get_orders(power_name)),
+        },
+    )
 
-    if power_name not in game.powers:
-        raise HTTPException(status_code=404, detail="Power not found")
+    return RedirectResponse(f"/game/{game_id}", status_code=303)
 
-    # Parse and set orders
-    order_list = [o.strip() for o in orders.split("\n") if o.strip()]
-    game.set_orders(power_name, order_list)
 
-    # Save updated game
-    await storage.save_game(game_id, game)
+@app.post("/game/{game_id}/process")
+async def process_game(request: Request, game_id: str):
+    """Queue processing of the current phase of the game.
 
-    # Update metadata
-    metadata = await storage.load_metadata(game_id)
-    if metadata:
-        metadata["phase"] = game.phase
-        await storage.save_metadata(game_id, metadata)
+    Processing runs in the background job executor. JSON clients get a job id and a status
+    URL back immediately; HTML form posts are redirected to the game page.
+    """
+    if not await storage.load_metadata(game_id):
+        raise HTTPException(status_code=404, detail="Game not found")
 
+    try:
+        job = job_manager.submit_process(game_id, storage)
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+
+    status_url = f"/game/{game_id}/jobs/{job.id}"
+    if "application/json" in request.headers.get("accept", ""):
+        return JSONResponse(
+            {"job_id": job.id, "status": job.status, "status_url": status_url},
+            status_code=202,
+            headers={"Location": status_url},
+        )
     return RedirectResponse(f"/game/{game_id}", status_code=303)
 
 
-@app.post("/game/{game_id}/process")
-async def process_game(request: Request, game_id: str):
-    """Process the current phase of the game."""
+@app.get("/game/{game_id}/jobs/{job_id}")
+async def get_job_status(game_id: str, job_id: str):
+    """Return the status of a background job."""
+    job = job_manager.get(job_id)
+    if not job or job.game_id != game_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/game/{game_id}/state")
+async def get_state(request: Request, game_id: str):
+    """Lightweight JSON state of a game (no possible orders)."""
+    etag = get_game_etag(game_id, await storage.load_metadata(game_id), "state")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     game = await storage.load_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # Process the game
-    game.process()
+    headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
+    return JSONResponse(get_game_state(game), headers=headers)
 
-    # Save updated game
-    await storage.save_game(game_id, game)
 
-    # Update metadata
-    metadata = await storage.load_metadata(game_id)
-    if metadata:
-        metadata["phase"] = game.phase
-        metadata["status"] = game.status
-        await storage.save_metadata(game_id, metadata)
+@app.get("/game/{game_id}/events")
+async def game_events(request: Request, game_id: str):
+    """Stream live game updates as server-sent events.
 
-    return RedirectResponse(f"/game/{game_id}", status_code=303)
+    Sends a state snapshot on connect, then phase deltas and order notices. A viewer
+    that falls too far behind gets a fresh snapshot instead of the dropped events.
+    The stream ends once the game is completed.
+    """
+    # Subscribe before loading so no update is missed between snapshot and stream.
+    subscription = broker.subscribe(game_id)
+    game = await storage.load_game(game_id)
+    if not game:
+        broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    async def stream(game):
+        try:
+            event = {**get_game_state(game), "type": STATE}
+            yield format_sse(event)
+            while not is_game_over(event) and not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if subscription.needs_resync:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.needs_resync = False
+                    game = await storage.load_game(game_id)
+                    if game:
+                        event = {**get_game_state(game), "type": STATE}
+                        yield format_sse(event)
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(game),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    """Stop the background job executor."""
+    job_manager.shutdown()
 
 
 def _get_map_data(game: Game) -> Dict[str, Any]:
@@ -291,11 +413,26 @@ def _get_map_data(game: Game) -> Dict[str, Any]:
             for power_name, power in game.powers.items()
         },
         "phase": game.phase,
+        "short_phase": game.get_current_phase(),
         "phase_type": game.phase_type,
+        "status": game.status,
         "possible_orders": game.get_all_possible_orders(),
     }
 
 
+def _get_unit_coords(svg_content: str) -> Dict[str, List[float]]:
+    """Get the unit marker coordinates of every province in the SVG map."""
+    return {
+        name.upper().replace("-", "/"): [float(x), float(y)]
+        for name, x, y in re.findall(
+            r'<jdipNS:PROVINCE name="([^"]+)"[^>]*>'
+            r'(?:(?!</jdipNS:PROVINCE>).)*?<jdipNS:UNIT x="([^"]+)" y="([^"]+)"/>',
+            svg_content,
+            re.IGNORECASE | re.DOTALL,
+        )
+    }
+
+
 def _add_units_to_svg(svg_content: str, game: Game) -> str:
     """Add unit markers to the SVG map."""
     if not svg_content:
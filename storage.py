@@ -14,19 +14,27 @@ class FileStorage:
         self.metadata_dir.mkdir(exist_ok=True)
 
     async def save_game(self, game_id, game):
-        game_file = self.games_dir / f"{game_id}.json"
         # Convert game to dictionary for JSON serialization
         game_dict = game.to_dict()
-        with open(game_file, "w") as f:
-            json.dump(game_dict, f, indent=2)
+        await self.save_game_json(game_id, json.dumps(game_dict, indent=2))
 
     async def load_game(self, game_id):
+        game_json = await self.load_game_json(game_id)
+        if game_json is None:
+            return None
+        # Reconstruct game from dictionary
+        return Game.from_trusted_dict(json.loads(game_json))
+
+    async def save_game_json(self, game_id, game_json):
+        game_file = self.games_dir / f"{game_id}.json"
+        with open(game_file, "w") as f:
+            f.write(game_json)
+
+    async def load_game_json(self, game_id):
         game_file = self.games_dir / f"{game_id}.json"
         try:
             with open(game_file, "r") as f:
-                game_dict = json.load(f)
-            # Reconstruct game from dictionary
-            return Game.from_dict(game_dict)
+                return f.read()
         except FileNotFoundError:
             return None
 
@@ -70,15 +78,27 @@ class VercelKVStorage:
 
     async def save_game(self, game_id, game):
         game_dict = game.to_dict()
-        # vercel_kv_sdk uses synchronous methods
-        self.kv.set(f"game:{game_id}", json.dumps(game_dict))
+        await self.save_game_json(game_id, json.dumps(game_dict))
 
     async def load_game(self, game_id):
         try:
-            game_data = self.kv.get(f"game:{game_id}")
+            game_data = await self.load_game_json(game_id)
             if game_data:
                 game_dict = json.loads(game_data)
-                return Game.from_dict(game_dict)
+                return Game.from_trusted_dict(game_dict)
+            return None
+        except Exception:
+            return None
+
+    async def save_game_json(self, game_id, game_json):
+        # vercel_kv_sdk uses synchronous methods
+        self.kv.set(f"game:{game_id}", game_json)
+
+    async def load_game_json(self, game_id):
+        try:
+            game_data = self.kv.get(f"game:{game_id}")
+            if game_data:
+                return game_data.decode() if isinstance(game_data, bytes) else game_data
             return None
         except Exception:
             return None